@@ -3,9 +3,13 @@
 # @license Copyright (c) 2018 Dream Overflow
 # terminal general commands and registration
 
+import os
 import sys
+import json
+import time
 
 from terminal.command import Command
+from common.profiler import Profiler
 
 from app.help import display_help, display_command_help, display_version
 from terminal.terminal import Terminal
@@ -201,6 +205,74 @@ class MemoCommand(Command):
                 return True, "No message to record"
 
 
+class ProfilerCommand(Command):
+
+    SUMMARY = "to enable, disable, reset or dump the strategy traders profiler"
+
+    HELP = (
+        "param1: on | off | reset | dump",
+        "param2: <market-id> for dump only (optional)",
+        "dump write the stats of the last minute into the reports path and display the top sections.")
+
+    CHOICES = ("on", "off", "reset", "dump")
+
+    NUM_TOP_SECTIONS = 10
+
+    def __init__(self, strategy_service):
+        super().__init__('profiler', None)
+
+        self._strategy_service = strategy_service
+
+    def execute(self, args):
+        if not args:
+            return False, "Missing parameters"
+
+        if args[0] == "on":
+            Profiler.inst().enable()
+            return True, "Profiler enabled"
+
+        elif args[0] == "off":
+            Profiler.inst().enable(False)
+            return True, "Profiler disabled"
+
+        elif args[0] == "reset":
+            Profiler.inst().reset()
+            return True, "Profiler stats reset"
+
+        elif args[0] == "dump":
+            market_id = args[1] if len(args) >= 2 else None
+            stats = Profiler.inst().stats(market_id)
+
+            report_path = self._strategy_service.report_path if self._strategy_service else "./"
+            filename = os.path.join(report_path, "siis_profiler_%s.json" % time.strftime("%Y%m%d_%H%M%S"))
+
+            try:
+                with open(filename, "wt") as f:
+                    json.dump({'window': Profiler.WINDOW, 'markets': stats}, f, indent=4)
+            except OSError as e:
+                return False, "Unable to write %s : %s" % (filename, repr(e))
+
+            sections = sorted(((m, k, v) for m, s in stats.items() for k, v in s.items()),
+                              key=lambda x: x[2]['load'], reverse=True)
+
+            Terminal.inst().message("Top sections over the last %gs :" % Profiler.WINDOW, view="content")
+
+            for market, section, v in sections[:ProfilerCommand.NUM_TOP_SECTIONS]:
+                Terminal.inst().message("  - %s %s : %.2f calls/s wall %.3fms (max %.3fms) cpu %.3fms allocs %.1f "
+                                        "load %.2f%%" % (market, section, v['rate'], v['wall'], v['max'], v['cpu'],
+                                                         v['allocs'], v['load'] * 100.0), view="content")
+
+            return True, "Profiler stats written to %s" % filename
+
+        return False, "Invalid parameters"
+
+    def completion(self, args, tab_pos, direction):
+        if len(args) <= 1:
+            return self.iterate(0, list(ProfilerCommand.CHOICES), args, tab_pos, direction)
+
+        return args, 0
+
+
 def register_general_commands(commands_handler, strategy_service):
     commands_handler.register(QuitCommand(strategy_service))
     commands_handler.register(HelpCommand(commands_handler))
@@ -209,3 +281,4 @@ def register_general_commands(commands_handler, strategy_service):
     commands_handler.register(AliasCommand(commands_handler))
     commands_handler.register(UnaliasCommand(commands_handler))
     commands_handler.register(MemoCommand(commands_handler))
+    commands_handler.register(ProfilerCommand(strategy_service))
@@ -0,0 +1,241 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Headless backtest, without the terminal views, the monitor, the notifier and the main loop
+
+from typing import Optional, List
+
+import copy
+import json
+import time
+import traceback
+
+from terminal.terminal import Terminal
+
+import logging
+logger = logging.getLogger('siis.app.headless')
+error_logger = logging.getLogger('siis.error.app.headless')
+traceback_logger = logging.getLogger('siis.traceback.app.headless')
+
+# maximum wait in seconds of the markets data of a headless backtest, else it fails
+DEFAULT_READY_TIMEOUT = 300.0
+
+
+class HeadlessBacktest(object):
+    """
+    Wire only the watcher service (dummy watchers), the paper trader and the strategy of a profile, then process
+    the backtest directly into the calling thread (no main loop sleep, no terminal refresh, no watchdog) and
+    returns the results as a dict, the same content as the trainer report.
+
+    Many of them can be processed in the same process and at the same timestamps (see process_headless_backtests),
+    each one with its own services and paper trader account, but all reading the ticks from a shared data feed.
+
+    @note The database must be created before.
+    """
+
+    def __init__(self, options: dict, shared_data_feed=None):
+        self._options = options
+        self._shared_data_feed = shared_data_feed
+
+        self._watcher_service = None
+        self._trader_service = None
+        self._strategy_service = None
+
+        self._begin_ts = 0.0
+        self._duration = 0.0
+
+    @property
+    def profile(self) -> str:
+        return self._options.get('profile', "")
+
+    @property
+    def strategy_service(self):
+        return self._strategy_service
+
+    def start(self) -> bool:
+        from watcher.service import WatcherService
+        from trader.service import TraderService
+        from strategy.service import StrategyService
+
+        options = self._options
+
+        try:
+            self._watcher_service = WatcherService(None, options)
+            self._trader_service = TraderService(self._watcher_service, None, options)
+            self._strategy_service = StrategyService(self._watcher_service, self._trader_service, None, options)
+
+            self._strategy_service.set_shared_data_feed(self._shared_data_feed)
+
+            self._watcher_service.start(options)
+            self._trader_service.start(options)
+
+            # trader service listen to watcher service
+            self._watcher_service.add_listener(self._trader_service)
+
+            self._strategy_service.start(options)
+
+            # strategy service listen to watcher and trader services
+            self._watcher_service.add_listener(self._strategy_service)
+            self._trader_service.add_listener(self._strategy_service)
+
+        except Exception as e:
+            error_logger.error(repr(e))
+            traceback_logger.error(traceback.format_exc())
+            return False
+
+        if not self._strategy_service.strategy():
+            error_logger.error("No strategy to backtest for profile %s" % self.profile)
+            return False
+
+        return True
+
+    def begin(self, ready_timeout: float = 0.0) -> bool:
+        """
+        Wait for the markets data and prepare the strategy.
+        @param ready_timeout: Maximum wait in seconds for the markets data, 0 means no limit.
+        """
+        if not self._strategy_service:
+            return False
+
+        self._begin_ts = time.time()
+
+        return self._strategy_service.begin_backtest(ready_timeout)
+
+    def step(self) -> bool:
+        """
+        Process one time step, returns False once completed.
+        """
+        return self._strategy_service.step_backtest()
+
+    def end(self):
+        self._strategy_service.end_backtest()
+        self._duration = time.time() - self._begin_ts
+
+    def results(self) -> dict:
+        """
+        @return The results (performance, trades, draw-down, statistics...) once the backtest is completed.
+        """
+        strategy = self._strategy_service.strategy()
+
+        results = {
+            'strategy': strategy.name,
+            'identifier': strategy.identifier,
+            'profile': self.profile,
+            'from': self._options['from'].strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'to': self._options['to'].strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'timestep': self._options.get('timestep', 60.0),
+            'duration': self._duration,
+        }
+
+        strategy.dumps_trainer_report(results)
+
+        return results
+
+    def terminate(self):
+        if self._strategy_service:
+            self._strategy_service.terminate()
+            self._strategy_service = None
+
+        if self._trader_service:
+            self._trader_service.terminate()
+            self._trader_service = None
+
+        if self._watcher_service:
+            self._watcher_service.terminate()
+            self._watcher_service = None
+
+
+def process_headless_backtests(backtests: List[HeadlessBacktest], ready_timeout: float = 0.0) -> bool:
+    """
+    Process the started backtests at the same timestamps, one step for each one, until the last one is completed.
+    Then the reads of the shared ticks are always done once, and the results do not depend on the order of the
+    backtests nor on their number.
+    """
+    for backtest in backtests:
+        if not backtest.begin(ready_timeout):
+            return False
+
+    running = list(backtests)
+
+    while running:
+        running = [backtest for backtest in running if backtest.step()]
+
+    for backtest in backtests:
+        backtest.end()
+
+    return True
+
+
+def run_headless_backtest(options: dict, ready_timeout: float = DEFAULT_READY_TIMEOUT) -> Optional[List[dict]]:
+    """
+    Start, process and terminate a headless backtest of one or many profiles (comma separated profile option),
+    using the same period. With many profiles the ticks are read once per market for any of them.
+
+    @param ready_timeout: Maximum wait in seconds for the markets data of each backtest, 0 means no limit.
+
+    @return The results per profile, in the order of the profiles, or None if failed or interrupted.
+    """
+    from database.database import Database
+    from strategy.shareddatafeed import SharedDataFeed
+
+    profiles = [profile for profile in options.get('profile', "").replace(' ', '').split(',') if profile]
+    if not profiles:
+        error_logger.error("Missing profile to backtest")
+        return None
+
+    shared_data_feed = SharedDataFeed() if len(profiles) > 1 else None
+    backtests = []
+
+    for profile in profiles:
+        profile_options = copy.copy(options)
+        profile_options['profile'] = profile
+
+        backtests.append(HeadlessBacktest(profile_options, shared_data_feed))
+
+    results = None
+
+    try:
+        Database.create(options)
+        Database.inst().setup(options)
+
+        if all(backtest.start() for backtest in backtests):
+            if process_headless_backtests(backtests, ready_timeout):
+                results = [backtest.results() for backtest in backtests]
+
+    except KeyboardInterrupt:
+        logger.info("Headless backtest interrupted")
+        results = None
+
+    except Exception as e:
+        error_logger.error(repr(e))
+        traceback_logger.error(traceback.format_exc())
+        results = None
+
+    finally:
+        for backtest in backtests:
+            backtest.terminate()
+
+        Database.terminate()
+
+    return results
+
+
+def display_headless_results(results: dict):
+    Terminal.inst().info("Backtest of %s with profile %s completed in %.3f seconds" % (
+        results['strategy'], results['profile'], results['duration']))
+
+    Terminal.inst().info("- Performance %s, realized PNL %s, final equity %s" % (
+        results.get('performance'), results.get('realized-pnl'), results.get('final-equity')))
+    Terminal.inst().info("- Max draw-down %s (%s)" % (results.get('max-draw-down-rate'),
+                                                       results.get('max-draw-down')))
+    Terminal.inst().info("- Trades %i (succeed %i, failed %i, roe %i)" % (
+        results.get('total-trades', 0), results.get('succeed-trades', 0), results.get('failed-trades', 0),
+        results.get('roe-trades', 0)))
+
+
+def write_headless_results(results: List[dict], filename: str):
+    """
+    Write the results of a single profile as an object, or as a list with many profiles.
+    """
+    with open(filename, 'wt') as f:
+        json.dump(results[0] if len(results) == 1 else results, f, indent=4)
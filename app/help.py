@@ -37,6 +37,8 @@ def display_help(commands_handler, user_context=False):
 
         Terminal.inst().message(" - 'A' show account view", view='content')
         Terminal.inst().message(" - 'Q' show assets view", view='content')
+        Terminal.inst().message(" - 'K' show profiler view", view='content')
+        Terminal.inst().message(" - 'L' show latency view", view='content')
         Terminal.inst().message(" - 'M' show markets view", view='content')
         Terminal.inst().message(" - 'T' show tickers view", view='content')
         Terminal.inst().message(" - 'F' show strategy view", view='content')
@@ -126,6 +128,10 @@ def display_cli_help():
     Terminal.inst().message("  --paper-mode instantiate paper mode trader and simulate as best as possible.")
     Terminal.inst().message("  --backtest process a backtesting, uses paper mode traders and data history avalaible in the database.")
     Terminal.inst().message("  --no-interactive No interactive (command) mode and automatically quit after than a backtest is fully completed.")
+    Terminal.inst().message("  --headless Backtest only, without terminal views, monitor, notifier and main loop, as fast as possible.")
+    Terminal.inst().message("    Display the results at end, optional --filename=<results.json> to write them. Implies --no-interactive.")
+    Terminal.inst().message("    Many comma separated profiles can be given, processed together with a shared data feed and distinct paper traders.")
+    Terminal.inst().message("    Optional --ready-timeout=<seconds> maximum wait of the markets data before failing (default 300, 0 for no limit).")
     Terminal.inst().message("  --timestep=<seconds> Timestep in seconds to increment the backtesting.")
     Terminal.inst().message("    More precise is more accurate but need more computing simulation. Adjust to at least fits to the minimal")
     Terminal.inst().message("    candles size uses in the backtested strategies. Default is 60 seconds.")
@@ -151,9 +157,17 @@ def display_cli_help():
     Terminal.inst().message("  --store-ohlc Write OHLCs to DB. Default not stored.")
     Terminal.inst().message("  --store-trade Write tick/trade/quote to filesystem. Default not stored.")
     Terminal.inst().message("  --monitor Enable Web monitor HTTP socket and WebSocket. Default port is 8080. Websocket port is +1.")
+    Terminal.inst().message("  --latency Trace the latency from the received market data to the order submission (live only).")
+    Terminal.inst().message("  --profiler Profile the wall time, CPU time and allocations of the strategy traders, analysers and indicators.")
+    Terminal.inst().message("  --async-net Host the websockets of the Binance and Kraken connectors into a single asyncio loop, in place of the Twisted reactor and threads (live only).")
+    Terminal.inst().message("  --record=<filename> Record the raw market data received by the connectors (WS messages and REST responses) into a gzip file.")
+    Terminal.inst().message("  --replay=<filename> Replay a record in place of the exchange (Binance connectors), implies --paper-mode.")
+    Terminal.inst().message("  --replay-speed=<factor> Replay speed factor, 1 for real-time, N for N times faster, 0 for as fast as possible (default 1).")
+    Terminal.inst().message("  --startup-report Display the duration of each phase of the startup (imports, services start...), always written to the log.")
     Terminal.inst().message("  --monitor-port Override the default or configured monitor HTTP port. Websocket is +1.")
+    Terminal.inst().message("  --baseline=<filename> Used only with the benchmark tool, baseline to compare with (default user/reports/benchmark/baseline.json).")
     Terminal.inst().message("  --learning=<filename> Must be only used by the trainer or for debug purposes.")
-    Terminal.inst().message("  --parallel=<number> Must be only used by the trainer to specify the maximum number of sub-process to run at the same time (default 1).")
+    Terminal.inst().message("  --parallel=<number> Maximum number of sub-process to run at the same time for the trainer, the rebuilder, the optimizer and the fetcher (default 1).")
     Terminal.inst().message("  --training Allow training sub process to be called during a backtest.")
     Terminal.inst().message("")
     Terminal.inst().message("Tools :")
@@ -164,13 +178,14 @@ def display_cli_help():
     Terminal.inst().message("  --fetch Process the data fetcher.")
     Terminal.inst().message("    Specify --broker, --market, --timeframe, --from and --to date. Optional : --cascaded, --from or --update.")
     Terminal.inst().message("  --install-market Used only with the fetcher tool, to install the fake market data info to database without trying to fetch anything from the exchange.")
+    Terminal.inst().message("  --fill-gaps Used only with the fetcher tool, to fetch only the missing ranges found by the optimizer tool.")
     Terminal.inst().message("  --spec=<specific-option> Specific fetcher option (example STOCK for alphavantage.co fetcher to fetch a stock market).")
     Terminal.inst().message("  --binarize Process ticks/trades/quotes text file to binary conversion.")
-    Terminal.inst().message("    Specify --broker, --market, --from and --to date.")
+    Terminal.inst().message("    Specify --broker, --market, --from and --to date. Optional --timeframe to convert the quotes files.")
     Terminal.inst().message("  --rebuild Rebuild OHLCs from the trades/ticks/quotes file data.")
     Terminal.inst().message("    Specify --broker, --market, --timeframe, --from and --to date. Plus one of : --target or --cascaded.")
     Terminal.inst().message("  --optimize Check OHLCs consistency from the trades/ticks/quotes file data.")
-    Terminal.inst().message("    Specify --broker, --market, --timeframe, --from and --to date.")
+    Terminal.inst().message("    Specify --broker, --market, --timeframe, --from and --to date. Optional : --parallel.")
     Terminal.inst().message("  --import Import a SIIS or MT4 data set from a file.")
     Terminal.inst().message("    For MT4 specify --broker, --market, --timeframe, --from and --to date. Optional --zip.")
     Terminal.inst().message("  --export Export a data set to a SIIS file format.")
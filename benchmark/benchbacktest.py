@@ -0,0 +1,67 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# End-to-end benchmark of a small backtest
+
+import os
+import subprocess
+import sys
+
+from benchmark.benchmark import Benchmark, BenchmarkSkipped
+
+
+class BacktestBenchmark(Benchmark):
+    """
+    Run a complete backtest of a user profile in a sub-process (same as the trainer), with the market data
+    of the local database, then it covers the loading, the streaming, the strategy and the paper trader.
+
+    Only when a profile and a period are given (--profile, --from, --to, optional --timestep).
+    """
+
+    TIMEOUT = 3600.0
+
+    def __init__(self, options: dict):
+        super().__init__("backtest.%s" % options.get('profile', ""))
+
+        self._options = options
+        self._cmd_opts = []
+
+    @property
+    def repeat(self) -> int:
+        return 1
+
+    @property
+    def warmup(self) -> bool:
+        return False
+
+    def setup(self):
+        options = self._options
+
+        if not options.get('profile') or not options.get('from') or not options.get('to'):
+            raise BenchmarkSkipped("specify --profile, --from and --to for the backtest benchmark")
+
+        self._cmd_opts = [
+            sys.executable,
+            os.path.join(options['working-path'], 'siis.py'),
+            options['identity'],
+            '--profile=%s' % options['profile'],
+            '--backtest',
+            '--from=%s' % options['from'].strftime("%Y-%m-%dT%H:%M:%S"),
+            '--to=%s' % options['to'].strftime("%Y-%m-%dT%H:%M:%S"),
+            '--timestep=%s' % options.get('timestep', 60.0),
+            '--no-interactive'
+        ]
+
+    def run(self):
+        result = subprocess.run(self._cmd_opts, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                stdin=subprocess.DEVNULL, cwd=self._options['working-path'],
+                                timeout=BacktestBenchmark.TIMEOUT)
+
+        if result.returncode != 0:
+            raise RuntimeError("Backtest exited with code %i" % result.returncode)
+
+
+def benchmarks(options: dict):
+    return [
+        BacktestBenchmark(options),
+    ]
@@ -0,0 +1,227 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Benchmarks of the compute or update method of each configured indicator
+
+import inspect
+import warnings
+
+from importlib import import_module
+
+import numpy as np
+
+from benchmark.benchmark import Benchmark, BenchmarkSkipped
+from benchmark.datagen import generate_candles, generate_tick_array
+from benchmark.benchinstrument import create_instrument
+
+from instrument.instrument import Instrument
+from strategy.indicator.indicator import Indicator
+
+NUM_CANDLES = 1500
+WINDOW = 500         # number of bars given to compute, as the default history depth of an analyser
+NUM_STEPS = 200      # number of computes, one per new bar
+TICKS_PER_BAR = 100  # number of ticks per bar for the indicators computed or updated from ticks
+
+# specific constructor arguments (after the timeframe) per indicator class
+CONSTRUCTOR_ARGUMENTS = {
+    'CumulativeVolumeDelta': (None,),     # no session
+    'BarCumulativeVolumeDelta': (None,),  # no session
+}
+
+# fewer computes for the slowest indicators, to keep the suite usable as a regression gate
+COMPUTE_STEPS = {
+    'TriangleIndicator': 20,  # two linear regressions per trend of the window
+}
+
+# the updated indicators (volume profiles...) are finalized at each change of this period
+UPDATE_PERIOD = Instrument.TF_HOUR
+
+# compute argument given the ticks of the last bar
+TICKS = 'ticks'
+
+# period in bars of the widening and narrowing of the bottom/top channel
+CHANNEL_PERIOD = 48  # multiple of 4, the extremes are at bars, else two equal widths make no change of trend
+
+
+class IndicatorBenchmark(Benchmark):
+    """
+    Compute an indicator on a sliding window of bars, once per bar, as an analyser does at each closed bar.
+
+    The arguments of compute are given from their names (prices, high, low, volumes, ticks...), the ticks being
+    those of the last bar. An indicator without compute method but with an update method (volume profiles,
+    VWAP) is updated bar per bar, or tick per tick if based on ticks, then one item is one update.
+
+    An indicator having an unknown argument or that cannot be constructed (ie. constructor arguments) is skipped.
+    """
+
+    TIMEFRAME = Instrument.TF_MIN
+
+    def __init__(self, name: str, classpath: str):
+        super().__init__("indicator.%s" % name)
+
+        self._classpath = classpath
+
+        self._clazz = None
+        self._instrument = None
+        self._indicator = None
+
+        self._series = {}
+        self._arguments = []
+        self._updates = []
+        self._num_steps = NUM_STEPS
+
+    @property
+    def num_items(self) -> int:
+        return len(self._updates) if self._updates else self._num_steps
+
+    def setup(self):
+        parts = self._classpath.split('.')
+
+        try:
+            module = import_module('.'.join(parts[:-1]))
+            self._clazz = getattr(module, parts[-1])
+        except ImportError as e:
+            raise BenchmarkSkipped("missing module %s" % e.name)
+
+        self._instrument = create_instrument()
+        self._indicator = self.create_indicator()
+
+        candles = generate_candles(NUM_CANDLES, IndicatorBenchmark.TIMEFRAME)
+
+        compute = getattr(self._clazz, 'compute', None)
+        if compute is not None:
+            self.setup_compute(compute, candles)
+        elif getattr(self._clazz, 'update', None) is not None:
+            self.setup_update(candles)
+        else:
+            raise BenchmarkSkipped("no compute nor update method")
+
+    def create_indicator(self) -> Indicator:
+        try:
+            indicator = self._clazz(IndicatorBenchmark.TIMEFRAME,
+                                    *CONSTRUCTOR_ARGUMENTS.get(self._clazz.__name__, ()))
+        except TypeError as e:
+            raise BenchmarkSkipped("cannot be constructed (%s)" % e)
+
+        indicator.setup(self._instrument)
+
+        return indicator
+
+    def setup_compute(self, compute, candles):
+        timestamps = np.array([c.timestamp for c in candles])
+        opens = np.array([c.open for c in candles])
+        highs = np.array([c.high for c in candles])
+        lows = np.array([c.low for c in candles])
+        closes = np.array([c.close for c in candles])
+        volumes = np.array([c.volume for c in candles])
+
+        # not from the lows and highs of a random walk, else each bar is a change of trend
+        channel = (highs - lows).mean() * (2.0 + np.sin(np.arange(len(candles)) * 2.0 * np.pi / CHANNEL_PERIOD))
+
+        self._series = {
+            'timestamps': timestamps,
+            '_open': opens,
+            'open': opens,
+            'high': highs,
+            'highs': highs,
+            'low': lows,
+            'lows': lows,
+            'close': closes,
+            'closes': closes,
+            'prices': closes,
+            'price': closes,
+            'values': closes,
+            'volumes': volumes,
+            'candles': candles,
+            # channel around the closes, alternately widening and narrowing (as triangles)
+            'bottom': closes - channel,
+            'top': closes + channel,
+        }
+
+        self._arguments = []
+        self._num_steps = COMPUTE_STEPS.get(self._clazz.__name__, NUM_STEPS)
+
+        for param in list(inspect.signature(compute).parameters.values())[1:]:
+            if param.name in ('timestamp', 'last_timestamp'):
+                self._arguments.append(None)
+            elif param.name == 'ticks':
+                self._series['ticks'] = self.ticks_per_bar(candles)
+                self._arguments.append(TICKS)
+            elif param.name in self._series:
+                self._arguments.append(self._series[param.name])
+            elif param.default is not inspect.Parameter.empty:
+                break
+            else:
+                raise BenchmarkSkipped("unsupported compute argument %s" % param.name)
+
+    def setup_update(self, candles):
+        if self._clazz.indicator_base() & (Indicator.BASE_TIMEFRAME | Indicator.BASE_TICKBAR):
+            # the bars of the steps
+            self._updates = [(c, c.timestamp) for c in candles[NUM_CANDLES-NUM_STEPS:]]
+        else:
+            self._updates = [(tick, tick[0]) for ticks in self.ticks_per_bar(candles)[NUM_CANDLES-NUM_STEPS:]
+                             for tick in ticks]
+
+    def ticks_per_bar(self, candles) -> list:
+        """
+        List of the ticks of each bar of the steps, the previous bars have no tick.
+        """
+        first = NUM_CANDLES - NUM_STEPS
+        tick_array = generate_tick_array(NUM_STEPS * TICKS_PER_BAR, IndicatorBenchmark.TIMEFRAME / TICKS_PER_BAR,
+                                         candles[first].close, from_timestamp=candles[first].timestamp)
+
+        bounds = np.searchsorted(tick_array['t'], [c.timestamp for c in candles[first:]] + [np.inf])
+        ticks = tick_array.tolist()
+
+        return [[] for _ in range(first)] + [ticks[bounds[i]:bounds[i+1]] for i in range(NUM_STEPS)]
+
+    def reset(self):
+        if self._updates:
+            # the updates accumulate into the indicator
+            self._indicator = self.create_indicator()
+
+    def run(self):
+        if self._updates:
+            self.run_update()
+        else:
+            self.run_compute()
+
+    def run_compute(self):
+        compute = self._indicator.compute
+        arguments = self._arguments
+        timestamps = self._series['timestamps']
+        ticks = self._series.get('ticks')
+
+        with warnings.catch_warnings():
+            # degenerated computes (ie. a regression of a single bar at the end of the window) are expected
+            warnings.simplefilter('ignore', RuntimeWarning)
+
+            for i in range(NUM_CANDLES - self._num_steps, NUM_CANDLES):
+                begin = i + 1 - WINDOW
+                timestamp = timestamps[i]
+
+                compute(*(timestamp if arg is None else ticks[i] if arg is TICKS else arg[begin:i+1]
+                          for arg in arguments))
+
+    def run_update(self):
+        update = self._indicator.update
+        basetime = Instrument.basetime
+        period = None
+
+        for data, timestamp in self._updates:
+            # finalize at the beginning of a new period
+            base_time = basetime(UPDATE_PERIOD, timestamp)
+            update(data, period is not None and base_time != period)
+            period = base_time
+
+
+def benchmarks(options: dict):
+    from config import utils
+
+    results = []
+
+    for name, indicator in utils.load_config(options, 'indicators').items():
+        if indicator.get('status') == "load" and indicator.get('classpath'):
+            results.append(IndicatorBenchmark(name, indicator['classpath']))
+
+    return results
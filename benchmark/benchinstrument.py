@@ -0,0 +1,296 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Benchmarks of the instrument, the bar generators, the watcher OHLC updates and the tick signals
+
+import collections
+
+from benchmark.benchmark import Benchmark
+from benchmark.datagen import generate_ticks, generate_candles
+from benchmark.harness import BenchWatcherService
+
+from common.signal import Signal
+from instrument.instrument import Instrument
+from instrument.timeframebargenerator import TimeframeBarGenerator
+from instrument.tickbargenerator import TickBarGenerator
+from instrument.rangebargenerator import RangeBarGenerator
+from instrument.volumebargenerator import VolumeBarGenerator
+from instrument.reversalbargenerator import ReversalBarGenerator
+
+NUM_TICKS = 200000
+NUM_CANDLES = 20000
+
+
+def create_instrument() -> Instrument:
+    instrument = Instrument("BENCHUSD", "BENCHUSD")
+
+    instrument.set_price_limits(0.0, 0.0, 0.01)
+    instrument.set_size_limits(0.0001, 0.0, 0.0001)
+    instrument.set_base_timeframe(Instrument.TF_MIN)
+
+    return instrument
+
+
+class InstrumentAddTickBenchmark(Benchmark):
+    """
+    Ticks added one by one, as received from the watcher.
+    """
+
+    def __init__(self):
+        super().__init__("instrument.add_tick")
+
+        self._instrument = None
+        self._ticks = []
+
+    @property
+    def num_items(self) -> int:
+        return len(self._ticks)
+
+    def setup(self):
+        self._instrument = create_instrument()
+        self._ticks = generate_ticks(NUM_TICKS)
+
+    def reset(self):
+        self._instrument.clear_ticks()
+
+    def run(self):
+        add_tick = self._instrument.add_tick
+
+        for tick in self._ticks:
+            add_tick(tick)
+
+
+class InstrumentAddTicksBenchmark(Benchmark):
+    """
+    Ticks added by batch of 100, as during a backtest.
+    """
+
+    BATCH_SIZE = 100
+
+    def __init__(self):
+        super().__init__("instrument.add_ticks")
+
+        self._instrument = None
+        self._batches = []
+
+    @property
+    def num_items(self) -> int:
+        return NUM_TICKS
+
+    def setup(self):
+        self._instrument = create_instrument()
+
+        ticks = generate_ticks(NUM_TICKS)
+        n = InstrumentAddTicksBenchmark.BATCH_SIZE
+
+        self._batches = [ticks[i:i+n] for i in range(0, len(ticks), n)]
+
+    def reset(self):
+        # an initial older tick, else the first batch would be adopted (then modified) by the instrument
+        self._instrument.detach_ticks()
+        self._instrument.add_tick((0.0, 0.0, 0.0, 0.0, 0.0, 0))
+
+    def run(self):
+        for batch in self._batches:
+            self._instrument.add_ticks(batch)
+
+
+class InstrumentAddCandlesBenchmark(Benchmark):
+    """
+    Candles added by batch of 10 with a limited history, as the strategy traders do.
+    """
+
+    BATCH_SIZE = 10
+    MAX_CANDLES = 500
+
+    def __init__(self):
+        super().__init__("instrument.add_candles")
+
+        self._instrument = None
+        self._seed = None
+        self._batches = []
+
+    @property
+    def num_items(self) -> int:
+        return NUM_CANDLES
+
+    def setup(self):
+        self._instrument = create_instrument()
+
+        candles = generate_candles(NUM_CANDLES + 1, Instrument.TF_MIN)
+        n = InstrumentAddCandlesBenchmark.BATCH_SIZE
+
+        self._seed = candles[0]
+        self._batches = [candles[i:i+n] for i in range(1, len(candles), n)]
+
+    def reset(self):
+        # an initial older candle, else the first batch would be adopted (then modified) by the instrument
+        self._instrument.detach_candles()
+        self._instrument.add_candle(self._seed)
+
+    def run(self):
+        for batch in self._batches:
+            self._instrument.add_candles(batch, InstrumentAddCandlesBenchmark.MAX_CANDLES)
+
+
+class TimeframeFromTicksBenchmark(Benchmark):
+
+    def __init__(self, timeframe: float):
+        super().__init__("bargenerator.timeframe.ticks.%s" % int(timeframe))
+
+        self._timeframe = timeframe
+        self._generator = None
+        self._ticks = []
+
+    @property
+    def num_items(self) -> int:
+        return len(self._ticks)
+
+    def setup(self):
+        self._ticks = generate_ticks(NUM_TICKS)
+
+    def reset(self):
+        self._generator = TimeframeBarGenerator(0, self._timeframe)
+
+    def run(self):
+        self._generator.generate_from_ticks(self._ticks)
+
+
+class TimeframeFromCandlesBenchmark(Benchmark):
+
+    def __init__(self, from_timeframe: float, to_timeframe: float):
+        super().__init__("bargenerator.timeframe.candles.%s.%s" % (int(from_timeframe), int(to_timeframe)))
+
+        self._from_timeframe = from_timeframe
+        self._to_timeframe = to_timeframe
+
+        self._generator = None
+        self._candles = []
+
+    @property
+    def num_items(self) -> int:
+        return len(self._candles)
+
+    def setup(self):
+        self._candles = generate_candles(NUM_CANDLES, self._from_timeframe)
+
+    def reset(self):
+        self._generator = TimeframeBarGenerator(self._from_timeframe, self._to_timeframe)
+
+    def run(self):
+        self._generator.generate_from_candles(self._candles)
+
+
+class NonTemporalBarBenchmark(Benchmark):
+    """
+    Tick, range, volume and reversal bars, from ticks.
+    """
+
+    def __init__(self, name: str, factory):
+        super().__init__("bargenerator.%s" % name)
+
+        self._factory = factory
+        self._instrument = None
+        self._generator = None
+        self._ticks = []
+
+    @property
+    def num_items(self) -> int:
+        return len(self._ticks)
+
+    def setup(self):
+        self._instrument = create_instrument()
+        self._ticks = generate_ticks(NUM_TICKS)
+
+    def reset(self):
+        self._generator = self._factory()
+        self._generator.setup(self._instrument)
+
+    def run(self):
+        self._generator.generate_from_ticks(self._ticks)
+
+
+class WatcherUpdateOhlcBenchmark(Benchmark):
+    """
+    Update of the current OHLCs of 3 timeframes at each trade, as done by the live watchers.
+    """
+
+    TIMEFRAMES = (Instrument.TF_MIN, Instrument.TF_5MIN, Instrument.TF_HOUR)
+
+    def __init__(self):
+        super().__init__("watcher.update_ohlc")
+
+        self._service = None
+        self._watcher = None
+        self._ticks = []
+
+    @property
+    def num_items(self) -> int:
+        return len(self._ticks) * len(WatcherUpdateOhlcBenchmark.TIMEFRAMES)
+
+    def setup(self):
+        self._service = BenchWatcherService()
+        self._ticks = generate_ticks(NUM_TICKS // 2)
+
+    def reset(self):
+        from watcher.connector.dummywatcher.watcher import DummyWatcher
+        self._watcher = DummyWatcher(self._service, "bench")
+
+    def run(self):
+        update_ohlc = self._watcher.update_ohlc
+        timeframes = WatcherUpdateOhlcBenchmark.TIMEFRAMES
+
+        for tick in self._ticks:
+            spread = tick[2] - tick[1]
+
+            for tf in timeframes:
+                update_ohlc("BENCHUSD", tf, tick[0], tick[3], spread, tick[4])
+
+
+class TickSignalBenchmark(Benchmark):
+    """
+    Signal of each trade, from the watcher to the instrument of the strategy trader, as in live mode.
+    """
+
+    def __init__(self):
+        super().__init__("signal.tick")
+
+        self._instrument = None
+        self._ticks = []
+
+    @property
+    def num_items(self) -> int:
+        return len(self._ticks)
+
+    def setup(self):
+        self._instrument = create_instrument()
+        self._ticks = generate_ticks(NUM_TICKS)
+
+    def reset(self):
+        self._instrument.clear_ticks()
+
+    def run(self):
+        signals = collections.deque()
+        add_tick = self._instrument.add_tick
+
+        for tick in self._ticks:
+            signals.append(Signal(Signal.SOURCE_WATCHER, "bench", Signal.SIGNAL_STREAM_TICK_DATA, ("BENCHUSD", tick)))
+
+            while signals:
+                add_tick(signals.popleft().data[1])
+
+
+def benchmarks(options: dict):
+    return [
+        InstrumentAddTickBenchmark(),
+        InstrumentAddTicksBenchmark(),
+        InstrumentAddCandlesBenchmark(),
+        TimeframeFromTicksBenchmark(Instrument.TF_MIN),
+        TimeframeFromCandlesBenchmark(Instrument.TF_MIN, Instrument.TF_HOUR),
+        NonTemporalBarBenchmark("tickbar", lambda: TickBarGenerator(100)),
+        NonTemporalBarBenchmark("rangebar", lambda: RangeBarGenerator(500)),
+        NonTemporalBarBenchmark("volumebar", lambda: VolumeBarGenerator(50)),
+        NonTemporalBarBenchmark("reversalbar", lambda: ReversalBarGenerator(500, 200)),
+        WatcherUpdateOhlcBenchmark(),
+        TickSignalBenchmark(),
+    ]
@@ -0,0 +1,266 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Benchmark model, runner and baseline comparison
+
+import fnmatch
+import json
+import platform
+import statistics
+import sys
+import time
+import traceback
+
+from importlib import import_module
+from typing import Optional, List, Dict, Tuple
+
+import logging
+logger = logging.getLogger('siis.benchmark')
+error_logger = logging.getLogger('siis.error.benchmark')
+traceback_logger = logging.getLogger('siis.traceback.benchmark')
+
+
+class BenchmarkSkipped(Exception):
+    """
+    Raised by a setup when the benchmark cannot be run in this environment (missing dependency, data...).
+    """
+    pass
+
+
+class Benchmark(object):
+    """
+    Base model of a benchmark of a hot path.
+
+    The setup prepares the synthetic data and the objects, it is not measured. Each call to run is measured
+    and must process the same amount of work, then num_items returns the number of processed items (ticks,
+    candles, orders...) per run, to report a duration per item.
+
+    A run can mutate its objects (ex: append ticks), then reset is called before each run, not measured.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def num_items(self) -> int:
+        return 1
+
+    @property
+    def repeat(self) -> Optional[int]:
+        """Number of measured runs, or None for the default of the runner."""
+        return None
+
+    @property
+    def warmup(self) -> bool:
+        """Run once before the measures."""
+        return True
+
+    def setup(self):
+        pass
+
+    def reset(self):
+        pass
+
+    def run(self):
+        pass
+
+    def teardown(self):
+        pass
+
+
+class BenchmarkResult(object):
+
+    __slots__ = 'name', 'samples', 'num_items'
+
+    def __init__(self, name: str, samples: List[float], num_items: int):
+        self.name = name
+        self.samples = samples
+        self.num_items = num_items
+
+    @property
+    def best(self) -> float:
+        return min(self.samples)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def per_item(self) -> float:
+        return self.best / self.num_items if self.num_items else self.best
+
+    def dumps(self) -> dict:
+        return {
+            'best': self.best,
+            'median': self.median,
+            'worst': max(self.samples),
+            'repeat': len(self.samples),
+            'items': self.num_items,
+            'per-item-ns': self.per_item * 1e9
+        }
+
+
+class BenchmarkRunner(object):
+    """
+    Run a list of benchmarks, compare with a baseline and dump the results as JSON.
+
+    Each benchmark is measured repeat times (after a warm-up run) and the best duration is retained, being the
+    least disturbed by the others processes. A regression is reported when the best duration exceeds the one of
+    the baseline by more than the threshold ratio.
+
+    @note The baseline must be produced on the same host, durations are not comparable between machines.
+    """
+
+    VERSION = 1
+
+    DEFAULT_REPEAT = 5
+    DEFAULT_THRESHOLD = 0.25   # +25%
+
+    def __init__(self, repeat: int = DEFAULT_REPEAT, threshold: float = DEFAULT_THRESHOLD):
+        self._repeat = max(1, repeat)
+        self._threshold = threshold
+
+        self._results = {}
+        self._skipped = {}
+
+    @property
+    def results(self) -> Dict[str, BenchmarkResult]:
+        return self._results
+
+    @property
+    def skipped(self) -> Dict[str, str]:
+        return self._skipped
+
+    @staticmethod
+    def select(benchmarks: List[Benchmark], patterns: Optional[List[str]]) -> List[Benchmark]:
+        """
+        Filter the benchmarks by name using shell-style patterns (ex: indicator.*).
+        """
+        if not patterns:
+            return benchmarks
+
+        return [b for b in benchmarks if any(fnmatch.fnmatch(b.name, p) for p in patterns)]
+
+    def run(self, benchmarks: List[Benchmark], listener=None):
+        for benchmark in benchmarks:
+            try:
+                benchmark.setup()
+            except BenchmarkSkipped as e:
+                self._skipped[benchmark.name] = str(e)
+                continue
+            except Exception as e:
+                self._skipped[benchmark.name] = repr(e)
+                traceback_logger.error(traceback.format_exc())
+                continue
+
+            samples = []
+
+            try:
+                if benchmark.warmup:
+                    benchmark.reset()
+                    benchmark.run()
+
+                for i in range(0, benchmark.repeat or self._repeat):
+                    benchmark.reset()
+
+                    begin = time.perf_counter()
+                    benchmark.run()
+                    samples.append(time.perf_counter() - begin)
+
+            except Exception as e:
+                self._skipped[benchmark.name] = repr(e)
+                traceback_logger.error(traceback.format_exc())
+                samples = []
+
+            finally:
+                benchmark.teardown()
+
+            if samples:
+                result = self._results[benchmark.name] = BenchmarkResult(benchmark.name, samples, benchmark.num_items)
+
+                if listener:
+                    listener(result)
+
+    def compare(self, baseline: dict) -> Dict[str, float]:
+        """
+        Ratio of the best duration of each benchmark over its baseline, for the benchmarks present in both.
+        """
+        ratios = {}
+
+        for name, result in self._results.items():
+            base = baseline.get('results', {}).get(name)
+            if base and base.get('best'):
+                ratios[name] = result.best / base['best']
+
+        return ratios
+
+    def regressions(self, ratios: Dict[str, float]) -> List[str]:
+        return [name for name, ratio in ratios.items() if ratio > 1.0 + self._threshold]
+
+    def dumps(self) -> dict:
+        return {
+            'version': BenchmarkRunner.VERSION,
+            'timestamp': time.time(),
+            'python': sys.version.split(' ')[0],
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'repeat': self._repeat,
+            'results': {name: result.dumps() for name, result in self._results.items()},
+            'skipped': self._skipped
+        }
+
+    def save(self, filename: str):
+        with open(filename, 'wt') as f:
+            json.dump(self.dumps(), f, indent=4)
+
+    @staticmethod
+    def load(filename: str) -> Optional[dict]:
+        try:
+            with open(filename, 'rt') as f:
+                data = json.load(f)
+
+            if data.get('version') != BenchmarkRunner.VERSION:
+                logger.warning("Incompatible baseline version in %s, ignored" % filename)
+                return None
+
+            return data
+
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            error_logger.error("Unable to load baseline %s : %s" % (filename, repr(e)))
+            return None
+
+
+BENCHMARK_MODULES = (
+    'benchmark.benchstorage',
+    'benchmark.benchinstrument',
+    'benchmark.benchindicator',
+    'benchmark.benchtrader',
+    'benchmark.benchbacktest',
+)
+
+
+def collect_benchmarks(options: dict) -> Tuple[List[Benchmark], Dict[str, str]]:
+    """
+    Instantiate the benchmarks of each module (from its benchmarks(options) function).
+    @return A list of benchmarks and per module the reason why it cannot be loaded.
+    """
+    benchmarks = []
+    failed = {}
+
+    for module_name in BENCHMARK_MODULES:
+        try:
+            module = import_module(module_name)
+            benchmarks += module.benchmarks(options)
+        except ImportError as e:
+            failed[module_name] = "missing module %s" % e.name
+        except Exception as e:
+            failed[module_name] = repr(e)
+            traceback_logger.error(traceback.format_exc())
+
+    return benchmarks, failed
@@ -0,0 +1,96 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Benchmarks of the tick streamer reads
+
+import pathlib
+import shutil
+import tempfile
+
+from datetime import datetime
+
+from benchmark.benchmark import Benchmark
+from benchmark.datagen import generate_tick_array
+
+from common.utils import UTC
+from database.tickstorage import TickStreamer
+
+NUM_TICKS = 500000
+
+
+class TickStreamerBenchmark(Benchmark):
+    """
+    Stream a month of synthetic ticks written in a temporary markets directory, by steps of one minute as
+    during a backtest.
+    """
+
+    BROKER_ID = "bench"
+    MARKET_ID = "BENCHUSD"
+
+    STEP = 60.0
+
+    def __init__(self, binary: bool):
+        super().__init__("tickstreamer.next.%s" % ("binary" if binary else "text"))
+
+        self._binary = binary
+        self._markets_path = None
+        self._num_ticks = 0
+
+        self._from_date = None
+        self._to_date = None
+
+    @property
+    def num_items(self) -> int:
+        return self._num_ticks
+
+    def setup(self):
+        # less ticks for the text format, more than 10 times slower
+        ticks = generate_tick_array(NUM_TICKS if self._binary else NUM_TICKS // 10, interval=1.0)
+        self._num_ticks = len(ticks)
+
+        self._markets_path = tempfile.mkdtemp(prefix="siis-bench-")
+
+        data_path = pathlib.Path(self._markets_path, self.BROKER_ID, self.MARKET_ID, 'T')
+        data_path.mkdir(parents=True)
+
+        first_date = datetime.utcfromtimestamp(ticks[0]['t'])
+        last_date = datetime.utcfromtimestamp(ticks[-1]['t'])
+
+        if (first_date.year, first_date.month) != (last_date.year, last_date.month):
+            raise ValueError("Synthetic ticks must be contained in a single month")
+
+        filename = first_date.strftime('%Y%m') + self.MARKET_ID
+
+        if self._binary:
+            ticks.tofile(str(data_path.joinpath(filename + ".dat")))
+        else:
+            with open(str(data_path.joinpath(filename)), 'wt') as f:
+                for t in ticks.tolist():
+                    f.write("%i\t%s\t%s\t%s\t%s\t%i\n" % (t[0] * 1000.0, t[1], t[2], t[3], t[4], t[5]))
+
+        self._from_date = first_date.replace(tzinfo=UTC())
+        self._to_date = last_date.replace(tzinfo=UTC())
+
+    def run(self):
+        streamer = TickStreamer(self._markets_path, self.BROKER_ID, self.MARKET_ID, self._from_date, self._to_date,
+                                binary=self._binary)
+
+        timestamp = self._from_date.timestamp()
+
+        while not streamer.finished():
+            timestamp += TickStreamerBenchmark.STEP
+            streamer.next(timestamp)
+
+        streamer.close()
+
+    def teardown(self):
+        if self._markets_path:
+            shutil.rmtree(self._markets_path, ignore_errors=True)
+            self._markets_path = None
+
+
+def benchmarks(options: dict):
+    return [
+        TickStreamerBenchmark(True),
+        TickStreamerBenchmark(False),
+    ]
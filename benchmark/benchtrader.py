@@ -0,0 +1,208 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Benchmarks of the paper trader and of the strategy statistics
+
+from datetime import datetime
+
+import numpy as np
+
+from benchmark.benchmark import Benchmark
+from benchmark.datagen import SEED, BASE_TIMESTAMP
+from benchmark.harness import BenchWatcherService, BenchTraderService, BenchStrategy, BenchStrategyTrader
+
+from instrument.instrument import Instrument
+
+NUM_MARKETS = 20
+NUM_ORDERS_PER_MARKET = 100
+NUM_UPDATES = 200
+
+NUM_CLOSED_TRADES = 10000
+
+
+def create_paper_trader():
+    from trader.account import Account
+    from trader.connector.papertrader.trader import PaperTrader
+
+    trader = PaperTrader(BenchTraderService(BenchWatcherService()))
+
+    trader.account.account_type = Account.TYPE_MARGIN
+    trader.set_timestamp(BASE_TIMESTAMP)
+
+    return trader
+
+
+def create_market(market_id: str, price: float):
+    from trader.market import Market
+
+    market = Market(market_id, market_id)
+
+    market.is_open = True
+    market.set_base("BENCH", "BENCH", 8)
+    market.set_quote("USD", "USD", 2)
+
+    market.one_pip_means = 0.01
+    market.value_per_pip = 1.0
+    market.contract_size = 1.0
+    market.lot_size = 1.0
+    market.margin_factor = 1.0
+
+    market.set_size_limits(0.0001, 0.0, 0.0001)
+    market.set_price_limits(0.0, 0.0, 0.01)
+    market.set_notional_limits(0.0, 0.0, 0.0)
+
+    market.unit_type = Market.UNIT_AMOUNT
+    market.market_type = Market.TYPE_CRYPTO
+    market.contract_type = Market.CONTRACT_SPOT
+    market.trade = Market.TRADE_MARGIN
+
+    market.bid = price
+    market.ask = price + 0.1
+    market.base_exchange_rate = 1.0
+
+    return market
+
+
+class PaperTraderUpdateBenchmark(Benchmark):
+    """
+    Update of the paper trader with many pending limit and stop orders never reached, then the cost of the
+    scan of the orders and of the account, at each update of the prices.
+    """
+
+    def __init__(self):
+        super().__init__("papertrader.update")
+
+        self._trader = None
+        self._prices = None
+
+    @property
+    def num_items(self) -> int:
+        return NUM_UPDATES * NUM_MARKETS * NUM_ORDERS_PER_MARKET
+
+    def setup(self):
+        from trader.order import Order
+
+        self._trader = create_paper_trader()
+
+        rng = np.random.default_rng(SEED)
+
+        for m in range(0, NUM_MARKETS):
+            market = create_market("BENCH%iUSD" % m, 20000.0)
+            self._trader.set_market(market)
+
+            for n in range(0, NUM_ORDERS_PER_MARKET):
+                order = Order(self._trader, market.market_id)
+
+                order.direction = Order.LONG if n % 2 == 0 else Order.SHORT
+                order.quantity = 0.01
+
+                if n % 4 < 2:
+                    # limit far from the market price
+                    order.order_type = Order.ORDER_LIMIT
+                    order.price = 10000.0 if order.direction == Order.LONG else 30000.0
+                else:
+                    # stop far from the market price
+                    order.order_type = Order.ORDER_STOP
+                    order.stop_price = 30000.0 if order.direction == Order.LONG else 10000.0
+
+                order.margin_trade = True
+
+                self._trader.create_order(order, market)
+
+        # per update and per market a bid price
+        self._prices = (20000.0 + np.cumsum(rng.normal(0.0, 5.0, (NUM_UPDATES, NUM_MARKETS)), axis=0)).tolist()
+
+    def run(self):
+        trader = self._trader
+
+        for n, prices in enumerate(self._prices):
+            timestamp = BASE_TIMESTAMP + n
+
+            for m, price in enumerate(prices):
+                trader.on_update_market("BENCH%iUSD" % m, True, timestamp, price, price + 0.1)
+
+            trader.set_timestamp(timestamp)
+            trader.update()
+
+
+class StrategyStatisticsBenchmark(Benchmark):
+    """
+    Statistics of a strategy having many closed trades, as computed at the end of a backtest.
+    """
+
+    def __init__(self):
+        super().__init__("strategy.statistics")
+
+        self._strategy = None
+
+    @property
+    def num_items(self) -> int:
+        return NUM_CLOSED_TRADES
+
+    def setup(self):
+        trader = create_paper_trader()
+        rng = np.random.default_rng(SEED)
+
+        strategy_traders = {}
+
+        # one trade per hour
+        entry_prices = 20000.0 + np.cumsum(rng.normal(0.0, 50.0, NUM_CLOSED_TRADES))
+        exit_prices = entry_prices * (1.0 + rng.normal(0.0, 0.01, NUM_CLOSED_TRADES))
+        directions = rng.choice(np.array([-1, 1]), NUM_CLOSED_TRADES)
+
+        for n in range(0, NUM_CLOSED_TRADES):
+            entry_ts = BASE_TIMESTAMP + n * Instrument.TF_HOUR
+            exit_ts = entry_ts + Instrument.TF_30MIN
+
+            entry_price = float(entry_prices[n])
+            exit_price = float(exit_prices[n])
+            direction = int(directions[n])
+
+            pnl_pct = direction * (exit_price - entry_price) / entry_price * 100.0
+
+            trade = {
+                'direction': "long" if direction > 0 else "short",
+                'avg-entry-price': str(entry_price),
+                'avg-exit-price': str(exit_price),
+                'profit-loss-pct': pnl_pct,
+                'stats': {
+                    'best-price': str(max(entry_price, exit_price) * 1.001),
+                    'worst-price': str(min(entry_price, exit_price) * 0.999),
+                    'first-realized-entry-datetime': datetime.utcfromtimestamp(entry_ts).strftime(
+                        '%Y-%m-%dT%H:%M:%S.%fZ'),
+                    'last-realized-exit-datetime': datetime.utcfromtimestamp(exit_ts).strftime(
+                        '%Y-%m-%dT%H:%M:%S.%fZ'),
+                    'profit-loss': pnl_pct * 10.0,
+                }
+            }
+
+            market_id = "BENCH%iUSD" % (n % NUM_MARKETS)
+
+            if market_id not in strategy_traders:
+                strategy_traders[market_id] = BenchStrategyTrader({'success': [], 'failed': [], 'roe': []})
+
+            strategy_traders[market_id]._stats['success' if pnl_pct > 0 else 'failed'].append(trade)
+
+        # daily account samples over the period, with some unrealized losses
+        timestamp = BASE_TIMESTAMP
+
+        while timestamp <= BASE_TIMESTAMP + NUM_CLOSED_TRADES * Instrument.TF_HOUR:
+            trader.set_timestamp(timestamp)
+            trader.account.set_unrealized_profit_loss(-abs(float(rng.normal(0.0, 20.0))))
+            trader.account.update_draw_down()
+            trader.account.update_stats(timestamp)
+
+            timestamp += Instrument.TF_DAY
+
+        self._strategy = BenchStrategy(trader, strategy_traders)
+
+    def run(self):
+        from strategy.helpers.statistic import compute_strategy_statistics
+        compute_strategy_statistics(self._strategy)
+
+
+def benchmarks(options: dict):
+    return [
+        PaperTraderUpdateBenchmark(),
+        StrategyStatisticsBenchmark(),
+    ]
@@ -0,0 +1,79 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Synthetic market data for the benchmarks
+
+from typing import List, Tuple
+
+import numpy as np
+
+from database.tickstorage import TickStorage
+from instrument.instrument import Candle
+
+# fixed seed, each run of the benchmarks processes the same data
+SEED = 631
+
+# 2023-01-01T00:00:00Z
+BASE_TIMESTAMP = 1672531200.0
+
+
+def generate_tick_array(num: int, interval: float = 0.25, price: float = 20000.0, volatility: float = 0.0002,
+                        from_timestamp: float = BASE_TIMESTAMP) -> np.ndarray:
+    """
+    Random walk of trades, as a TickStorage.TICK_DTYPE array.
+    @param num: Number of ticks.
+    @param interval: Average interval in seconds between two ticks.
+    @param price: Initial price.
+    @param volatility: Standard deviation of the relative price change per tick.
+    @param from_timestamp: Timestamp of the first tick.
+    """
+    rng = np.random.default_rng(SEED)
+
+    ticks = np.empty(num, dtype=TickStorage.TICK_DTYPE)
+
+    ticks['t'] = from_timestamp + np.cumsum(rng.exponential(interval, num))
+    ticks['l'] = np.round(price * np.exp(np.cumsum(rng.normal(0.0, volatility, num))), 2)
+
+    spread = np.round(rng.uniform(0.01, 0.5, num), 2)
+    ticks['b'] = ticks['l'] - spread * 0.5
+    ticks['a'] = ticks['l'] + spread * 0.5
+
+    ticks['v'] = np.round(rng.exponential(0.05, num), 5)
+    ticks['d'] = rng.choice(np.array([-1, 1], dtype=np.int8), num)
+
+    return ticks
+
+
+def generate_ticks(num: int, interval: float = 0.25, price: float = 20000.0) -> List[Tuple]:
+    """
+    Same as generate_tick_array but as a list of TickType.
+    """
+    return generate_tick_array(num, interval, price).tolist()
+
+
+def generate_candles(num: int, timeframe: float, price: float = 20000.0, volatility: float = 0.002,
+                     from_timestamp: float = BASE_TIMESTAMP) -> List[Candle]:
+    """
+    Random walk of consolidated candles.
+    """
+    rng = np.random.default_rng(SEED)
+
+    closes = price * np.exp(np.cumsum(rng.normal(0.0, volatility, num)))
+    opens = np.concatenate(([price], closes[:-1]))
+    highs = np.maximum(opens, closes) * (1.0 + rng.exponential(volatility * 0.5, num))
+    lows = np.minimum(opens, closes) * (1.0 - rng.exponential(volatility * 0.5, num))
+    volumes = rng.exponential(10.0, num)
+
+    candles = []
+
+    for i in range(0, num):
+        candle = Candle(from_timestamp + i * timeframe, timeframe)
+
+        candle.set_ohlc(float(opens[i]), float(highs[i]), float(lows[i]), float(closes[i]))
+        candle.set_spread(0.1)
+        candle.set_volume(float(volumes[i]))
+        candle.set_consolidated(True)
+
+        candles.append(candle)
+
+    return candles
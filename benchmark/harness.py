@@ -0,0 +1,83 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Minimal services to instantiate the traders, watchers and strategies outside the application
+
+import itertools
+import threading
+
+
+class BenchWatcherService(object):
+    """
+    In place of the WatcherService, signals are dropped and nothing is stored.
+    """
+
+    def __init__(self):
+        self.store_ohlc = False
+        self.store_trade = False
+        self.initial_fetch = False
+
+        self.monitor_service = None
+        self.backtesting = True
+
+        self._count = 0
+
+    def add_listener(self, listener):
+        pass
+
+    def notify(self, signal_type, source_name, signal_data):
+        self._count += 1
+
+    def watcher_config(self, name: str) -> dict:
+        return {}
+
+
+class BenchTraderService(object):
+    """
+    In place of the TraderService in backtesting mode, for a paper trader.
+    """
+
+    def __init__(self, watcher_service: BenchWatcherService, trader_config: dict = None):
+        self.watcher_service = watcher_service
+        self.monitor_service = None
+        self.backtesting = True
+
+        self._trader_config = trader_config or {}
+        self._keys = itertools.count(1)
+
+    def add_listener(self, listener):
+        pass
+
+    def notify(self, signal_type, source_name, signal_data):
+        self.watcher_service.notify(signal_type, source_name, signal_data)
+
+    def trader_config(self) -> dict:
+        return self._trader_config
+
+    def gen_key(self) -> str:
+        return str(next(self._keys))
+
+
+class BenchStrategyTrader(object):
+    """
+    Only the members read by the statistics helpers.
+    """
+
+    def __init__(self, stats: dict):
+        self.mutex = threading.RLock()
+        self._stats = stats
+
+
+class BenchStrategy(object):
+    """
+    Only the members read by the statistics helpers, the closed trades per market and the trader.
+    """
+
+    def __init__(self, trader, strategy_traders: dict):
+        self.mutex = threading.RLock()
+
+        self._trader = trader
+        self._strategy_traders = strategy_traders
+
+    def trader(self):
+        return self._trader
@@ -21,9 +21,13 @@ from datetime import datetime, timedelta
 
 from matplotlib.dates import date2num
 
+from charting.downsample import lttb
+
 
 class SubChart(object):
 
+	MAX_POINTS = 2 * 1400  # more points than twice the default width are not visible, LTTB downsampled
+
 	def __init__(self, subchart_id, main_label=""):
 		self.subchart_id = subchart_id
 		self.main_label = main_label
@@ -117,10 +121,17 @@ class SubChart(object):
 
 		for d in self.plots:
 			if d is not None:
+				xaxis, values = d[4] or self.xaxis, d[0]
+
+				if len(values) > SubChart.MAX_POINTS and len(xaxis) == len(values):
+					indices = lttb(values, SubChart.MAX_POINTS)
+					xaxis = [xaxis[i] for i in indices]
+					values = [values[i] for i in indices]
+
 				if d[1]:
-					plt.plot(d[4] or self.xaxis, d[0], d[1], c=d[3], linestyle=d[5])
+					plt.plot(xaxis, values, d[1], c=d[3], linestyle=d[5])
 				else:
-					plt.plot(d[4] or self.xaxis, d[0], c=d[3], linestyle=d[5])
+					plt.plot(xaxis, values, c=d[3], linestyle=d[5])
 
 				plt.ylabel(d[2])
 
@@ -0,0 +1,145 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Series downsampling (LTTB, min-max and OHLC aggregation) for the charts.
+
+from typing import Optional
+
+import numpy as np
+
+# columns of an OHLC 2d array, as returned by OhlcStreamer.query_array
+OHLC_TIMESTAMP = 0
+OHLC_OPEN = 1
+OHLC_HIGH = 2
+OHLC_LOW = 3
+OHLC_CLOSE = 4
+OHLC_SPREAD = 5
+OHLC_VOLUME = 6
+
+
+def lttb(y: np.ndarray, threshold: int, x: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling. Keep the points that preserve the visual shape of a line.
+
+    @param y: Values.
+    @param threshold: Max number of returned points, at least 3.
+    @param x: Optional abscissa (timestamps), else the index is used.
+    @return Array of the indices of the kept points, ascending, always including the first and the last.
+    @note NaN values (warmup of the indicators) are never selected, except for the first and last points,
+        then a bucket having only NaN values has no point and fewer points than the threshold are returned.
+    """
+    n = len(y)
+
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    if x is None:
+        x = np.arange(n, dtype=np.float64)
+
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+
+    # the first and the last points are kept, then threshold-2 buckets for the others
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    indices = [0]
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i+1]
+
+        # average point of the next bucket (or the last point)
+        next_end = edges[i+2] if i + 2 < len(edges) else n
+        if next_end > end:
+            avg_x = x[end:next_end].mean()
+            next_y = y[end:next_end]
+            avg_y = next_y[~np.isnan(next_y)].mean() if not np.isnan(next_y).all() else y[a]
+        else:
+            avg_x = x[n-1]
+            avg_y = y[n-1]
+
+        # from the average if the previous selected is NaN (a first point into the warmup)
+        prev_y = avg_y if np.isnan(y[a]) else y[a]
+
+        # the point of the current bucket making the largest triangle with the previous selected and the average
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - prev_y) - (x[a] - x[start:end]) * (avg_y - prev_y))
+
+        if np.isnan(areas).all():
+            # no valid point into this bucket (or nothing to compare with)
+            continue
+
+        a = start + int(np.nanargmax(areas))
+        indices.append(a)
+
+    indices.append(n - 1)
+
+    return np.array(indices, dtype=np.int64)
+
+
+def minmax(y: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Min-max downsampling. Keep the lowest and the highest point of each bucket, then the extremes are never lost.
+
+    @param y: Values.
+    @param buckets: Number of buckets, then at most 2 * buckets returned points.
+    @return Array of the indices of the kept points, ascending.
+    """
+    n = len(y)
+
+    if buckets <= 0 or 2 * buckets >= n:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+
+    indices = []
+
+    for i in range(buckets):
+        start, end = edges[i], edges[i+1]
+        if end <= start:
+            continue
+
+        values = y[start:end]
+        if np.isnan(values).all():
+            indices.append(start)
+            continue
+
+        lo = start + int(np.nanargmin(values))
+        hi = start + int(np.nanargmax(values))
+
+        if lo < hi:
+            indices.extend((lo, hi))
+        elif lo > hi:
+            indices.extend((hi, lo))
+        else:
+            indices.append(lo)
+
+    return np.array(indices, dtype=np.int64)
+
+
+def aggregate_ohlc(ohlc: np.ndarray, period: float) -> np.ndarray:
+    """
+    Aggregate an OHLC 2d array into bars of a greater period, aligned on the period like the candles of a timeframe.
+    First open, max high, min low, last close, max spread and sum of the volumes.
+
+    @param ohlc: 2d array, sorted by timestamp, with the columns of OhlcStreamer.query_array.
+    @param period: Period in seconds of the resulting bars.
+    """
+    if not len(ohlc) or period <= 0.0:
+        return ohlc
+
+    keys = np.floor(ohlc[:, OHLC_TIMESTAMP] / period)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(ohlc)] - 1
+
+    results = np.empty((len(starts), ohlc.shape[1]), dtype=np.float64)
+
+    results[:, OHLC_TIMESTAMP] = keys[starts] * period
+    results[:, OHLC_OPEN] = ohlc[starts, OHLC_OPEN]
+    results[:, OHLC_HIGH] = np.maximum.reduceat(ohlc[:, OHLC_HIGH], starts)
+    results[:, OHLC_LOW] = np.minimum.reduceat(ohlc[:, OHLC_LOW], starts)
+    results[:, OHLC_CLOSE] = ohlc[ends, OHLC_CLOSE]
+    results[:, OHLC_SPREAD] = np.maximum.reduceat(ohlc[:, OHLC_SPREAD], starts)
+    results[:, OHLC_VOLUME] = np.add.reduceat(ohlc[:, OHLC_VOLUME], starts)
+
+    return results
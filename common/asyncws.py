@@ -0,0 +1,198 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Websocket client connection hosted by the network core
+
+from __future__ import annotations
+
+from typing import Callable, Optional, Union
+
+import asyncio
+import json
+import ssl
+import traceback
+import urllib.parse
+
+from autobahn.asyncio.websocket import WebSocketClientFactory, WebSocketClientProtocol
+
+from common.codec import loads
+from common.netcore import NetworkCore
+
+import logging
+logger = logging.getLogger('siis.common.asyncws')
+error_logger = logging.getLogger('siis.error.common.asyncws')
+traceback_logger = logging.getLogger('siis.traceback.common.asyncws')
+
+
+class AsyncClientProtocol(WebSocketClientProtocol):
+
+    def onOpen(self):
+        connection = self.factory.connection
+        connection.protocol_instance = self
+
+        try:
+            connection.opened()
+        except Exception as e:
+            error_logger.error(repr(e))
+            traceback_logger.error(traceback.format_exc())
+
+    def onMessage(self, payload, isBinary):
+        if not isBinary:
+            try:
+                payload_obj = loads(payload)
+            except ValueError:
+                pass
+            else:
+                try:
+                    self.factory.connection.callback(payload_obj)
+                except Exception as e:
+                    error_logger.error(repr(e))
+                    traceback_logger.error(traceback.format_exc())
+
+    def onClose(self, wasClean, code, reason):
+        self.factory.connection.closed(self, reason)
+
+
+class WebSocketConnection(object):
+    """
+    A websocket client connection running into the network core loop, with an optional reconnection.
+
+    It has the same members as the Twisted client factories of the connectors (subscriptions, protocol_instance,
+    callback, reconnect), then their subscribe and unsubscribe methods works as is with it.
+
+    @note Except the constructor and connect, disconnect, every method must be called from the loop thread.
+    """
+
+    # retry delays, doubled at each retry
+    INITIAL_DELAY = 0.1
+    MAX_DELAY = 10.0
+    MAX_RETRIES = 30
+
+    RECONNECT_ERROR_PAYLOAD = {
+        'e': 'error',
+        'm': 'Max reconnect retries reached'
+    }
+
+    def __init__(self, url: str, callback: Callable, on_open: Optional[Callable] = None,
+                 subscriptions: Union[dict, set, None] = None, reconnect: bool = True):
+        """
+        @param url: wss:// URL.
+        @param callback: Called with each received and decoded message.
+        @param on_open: Called with the connection once opened, to send the subscriptions.
+        @param subscriptions: Container of the subscriptions, managed by the socket manager.
+        @param reconnect: Retry a lost or failed connection.
+        """
+        self.url = url
+        self.callback = callback
+        self.on_open = on_open
+        self.subscriptions = subscriptions if subscriptions is not None else {}
+        self.reconnect = reconnect
+
+        self.protocol_instance = None
+
+        self._task = None
+        self._lost = None
+        self._closing = False
+
+    def connect(self):
+        """
+        Start the connection, from any thread.
+        """
+        NetworkCore.inst().call(self._start)
+
+    def disconnect(self):
+        """
+        Close the connection and disable the reconnection, from any thread.
+        """
+        self.reconnect = False
+        self._closing = True
+
+        if NetworkCore.inst().running:
+            NetworkCore.inst().call(self._stop)
+
+    def send(self, data: dict):
+        """
+        Send a JSON message if connected.
+        """
+        if self.protocol_instance:
+            payload = json.dumps(data, ensure_ascii=False).encode('utf8')
+            self.protocol_instance.sendMessage(payload, isBinary=False)
+
+    #
+    # protocol events
+    #
+
+    def opened(self):
+        if self.on_open:
+            self.on_open(self)
+
+    def closed(self, protocol, reason):
+        if self.protocol_instance is protocol:
+            self.protocol_instance = None
+
+        if self._lost and not self._lost.done():
+            self._lost.set_result(reason)
+
+    #
+    # internal
+    #
+
+    def _start(self):
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    def _stop(self):
+        if self.protocol_instance:
+            self.protocol_instance.sendClose()
+
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        delay = WebSocketConnection.INITIAL_DELAY
+        retries = 0
+
+        while not self._closing:
+            try:
+                await self._connect()
+                await self._lost
+
+                # was connected, reset the delay
+                delay = WebSocketConnection.INITIAL_DELAY
+                retries = 0
+
+            except asyncio.CancelledError:
+                if self.protocol_instance:
+                    self.protocol_instance.dropConnection(abort=True)
+                raise
+
+            except (OSError, asyncio.TimeoutError) as e:
+                error_logger.error("Websocket %s : %s" % (self.url, repr(e)))
+
+            if not self.reconnect or self._closing:
+                break
+
+            retries += 1
+            if retries > WebSocketConnection.MAX_RETRIES:
+                self.callback(WebSocketConnection.RECONNECT_ERROR_PAYLOAD)
+                break
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2.0, WebSocketConnection.MAX_DELAY)
+
+    async def _connect(self):
+        loop = asyncio.get_event_loop()
+        url = urllib.parse.urlparse(self.url)
+
+        if url.scheme != "wss":
+            raise ValueError("expected wss:// URL prefix")
+
+        factory = WebSocketClientFactory(self.url)
+        factory.protocol = AsyncClientProtocol
+        factory.connection = self
+
+        self._lost = loop.create_future()
+
+        await loop.create_connection(factory, url.hostname, url.port or 443, ssl=ssl.create_default_context(),
+                                     server_hostname=url.hostname)
@@ -0,0 +1,42 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# JSON payload decoding using the fastest available codec
+
+from typing import Union
+
+import json
+
+import logging
+logger = logging.getLogger('siis.common.codec')
+
+try:
+    import orjson
+
+    CODEC = "orjson"
+
+    def loads(payload: Union[bytes, str]):
+        """Decode a JSON payload, bytes (UTF-8) or str."""
+        return orjson.loads(payload)
+
+except ImportError:
+    try:
+        import ujson
+
+        CODEC = "ujson"
+
+        def loads(payload: Union[bytes, str]):
+            """Decode a JSON payload, bytes (UTF-8) or str."""
+            return ujson.loads(payload)
+
+    except ImportError:
+        CODEC = "json"
+
+        def loads(payload: Union[bytes, str]):
+            """Decode a JSON payload, bytes (UTF-8) or str."""
+            return json.loads(payload)
+
+
+def codec_name() -> str:
+    """Name of the codec used by loads (orjson, ujson or json)."""
+    return CODEC
@@ -0,0 +1,164 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Shared HTTP transport for the REST connectors.
+
+import socket
+import threading
+
+from typing import Optional, Dict
+
+import numpy as np
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.connection import HTTPConnection
+
+import logging
+logger = logging.getLogger('siis.common.httpsession')
+
+
+class HttpStats(object):
+    """
+    Per connector count of requests, errors and retries, and the duration of the last requests
+    (from the send to the reception of the headers).
+    """
+
+    NUM_SAMPLES = 1024
+
+    __instance = None
+
+    @classmethod
+    def inst(cls):
+        if HttpStats.__instance is None:
+            HttpStats.__instance = HttpStats()
+
+        return HttpStats.__instance
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._connectors = {}
+
+    def record(self, name: str, elapsed: float, error: bool, retries: int):
+        stats = self._connectors.get(name)
+
+        if stats is None:
+            with self._mutex:
+                stats = self._connectors.get(name)
+                if stats is None:
+                    stats = self._connectors[name] = {
+                        'count': 0,
+                        'errors': 0,
+                        'retries': 0,
+                        'samples': np.zeros(HttpStats.NUM_SAMPLES)
+                    }
+
+        stats['samples'][stats['count'] % HttpStats.NUM_SAMPLES] = elapsed
+        stats['count'] += 1
+
+        if error:
+            stats['errors'] += 1
+
+        stats['retries'] += retries
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Per connector the number of requests, errors and retries and the p50, p99 and max durations in milliseconds.
+        """
+        results = {}
+
+        with self._mutex:
+            names = list(self._connectors.keys())
+
+        for name in names:
+            stats = self._connectors[name]
+            count = stats['count']
+
+            if not count:
+                continue
+
+            values = stats['samples'][:min(count, HttpStats.NUM_SAMPLES)] * 1000.0
+            p50, p99 = np.percentile(values, (50, 99))
+
+            results[name] = {
+                'count': count,
+                'errors': stats['errors'],
+                'retries': stats['retries'],
+                'p50': float(p50),
+                'p99': float(p99),
+                'max': float(values.max())
+            }
+
+        return results
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """
+    HTTP adapter with TCP keep-alive on the pooled connections, in way to detect and avoid the connections silently
+    dropped during inactivity, then a new TCP connection and TLS handshake at the next request (an order).
+    """
+
+    KEEP_ALIVE_IDLE = 30       # seconds before the first probe
+    KEEP_ALIVE_INTERVAL = 10   # seconds between probes
+    KEEP_ALIVE_COUNT = 3       # probes before the connection is dropped
+
+    def init_poolmanager(self, *args, **kwargs):
+        socket_options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            socket_options += [
+                (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KeepAliveAdapter.KEEP_ALIVE_IDLE),
+                (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KeepAliveAdapter.KEEP_ALIVE_INTERVAL),
+                (socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KeepAliveAdapter.KEEP_ALIVE_COUNT)]
+
+        kwargs['socket_options'] = socket_options
+
+        super().init_poolmanager(*args, **kwargs)
+
+
+def create_session(name: str, pool_maxsize: int = 16, max_retries: int = 3, backoff_factor: float = 0.5,
+                   headers: Optional[dict] = None) -> requests.Session:
+    """
+    Create a requests session for a REST connector, with :
+        - a pool of persistent connections (keep-alive) per host, large enough for the concurrent threads
+        - TCP keep-alive on the idle connections
+        - compressed responses (gzip, deflate)
+        - retries with an exponential backoff on connection errors, and on 502, 503 and 504 for the idempotent
+          methods only (never a POST, that could create a duplicate order), respecting the Retry-After header
+        - timing, errors and retries stats per connector name (see HttpStats)
+
+    @param name: Name of the connector for the stats.
+    @param pool_maxsize: Maximum number of connections kept per host.
+    @param max_retries: Maximum number of retries.
+    @param backoff_factor: Delay before the retry N is backoff_factor * 2^(N-1) seconds.
+    @param headers: Optional default headers.
+    """
+    session = requests.Session()
+
+    retry = Retry(total=max_retries, connect=max_retries, read=max_retries, status=max_retries,
+                  backoff_factor=backoff_factor, status_forcelist=(502, 503, 504),
+                  allowed_methods=Retry.DEFAULT_ALLOWED_METHODS, raise_on_status=False,
+                  respect_retry_after_header=True)
+
+    adapter = KeepAliveAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive'
+    })
+
+    if headers:
+        session.headers.update(headers)
+
+    def on_response(response, *args, **kwargs):
+        retries = response.raw.retries if response.raw is not None else None
+        HttpStats.inst().record(name, response.elapsed.total_seconds(), response.status_code >= 400,
+                                len(retries.history) if retries else 0)
+
+    session.hooks['response'].append(on_response)
+
+    return session
@@ -0,0 +1,224 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# End-to-end latency tracing of the market data to the order submission.
+
+import threading
+import time
+
+from typing import Optional, Dict
+
+import numpy as np
+
+import logging
+logger = logging.getLogger('siis.common.latency')
+
+
+class LatencyTrace(object):
+    """
+    Timestamps (time.perf_counter) of a market data message along the pipeline.
+    It is stamped on the signal by the watcher service, then kept by the strategy trader until it is processed.
+    """
+
+    __slots__ = 'market_id', 'received', 'notified', 'dequeued', 'started'
+
+    def __init__(self, market_id: str, received: float):
+        self.market_id = market_id
+
+        self.received = received   # message received by the watcher
+        self.notified = 0.0        # signal notified by the watcher service
+        self.dequeued = 0.0        # signal dequeued by the strategy
+        self.started = 0.0         # process started by a worker
+
+
+class LatencyTracer(object):
+    """
+    Collect the duration of each stage of the pipeline, per market, into a fixed size ring of samples.
+    Percentiles are only computed on demand.
+
+    Stages :
+        - parse : message received by the watcher to signal notified (parsing)
+        - dispatch : signal notified to signal dequeued by the strategy (signals handler and strategy queue)
+        - schedule : signal dequeued to process started (worker pool queue)
+        - compute : strategy trader process (strategy compute)
+        - order : process started to order submitted to the trader (decision)
+        - total : message received to order submitted
+
+    It is disabled by default, then every method returns immediately.
+    """
+
+    STAGE_PARSE = 0
+    STAGE_DISPATCH = 1
+    STAGE_SCHEDULE = 2
+    STAGE_COMPUTE = 3
+    STAGE_ORDER = 4
+    STAGE_TOTAL = 5
+
+    STAGES = ('parse', 'dispatch', 'schedule', 'compute', 'order', 'total')
+
+    NUM_SAMPLES = 1024
+
+    __instance = None
+
+    @classmethod
+    def inst(cls):
+        if LatencyTracer.__instance is None:
+            LatencyTracer.__instance = LatencyTracer()
+
+        return LatencyTracer.__instance
+
+    def __init__(self):
+        self._enabled = False
+
+        self._mutex = threading.Lock()
+        self._samples = {}   # per market array of samples (stage, n)
+        self._counts = {}    # per market array of counts per stage
+
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self, status: bool = True):
+        self._enabled = status
+
+    def reset(self):
+        with self._mutex:
+            self._samples = {}
+            self._counts = {}
+
+    def record(self, market_id: str, stage: int, duration: float):
+        samples = self._samples.get(market_id)
+
+        if samples is None:
+            with self._mutex:
+                samples = self._samples.get(market_id)
+                if samples is None:
+                    self._counts[market_id] = np.zeros(len(LatencyTracer.STAGES), dtype=np.int64)
+                    samples = self._samples[market_id] = np.zeros((len(LatencyTracer.STAGES),
+                                                                   LatencyTracer.NUM_SAMPLES))
+
+        counts = self._counts[market_id]
+
+        samples[stage, counts[stage] % LatencyTracer.NUM_SAMPLES] = duration
+        counts[stage] += 1
+
+    #
+    # pipeline
+    #
+
+    def notified(self, market_id: str, received: float) -> Optional[LatencyTrace]:
+        """
+        Create a trace at the signal notification.
+        @param market_id:
+        @param received: Perf-counter at the reception of the message.
+        """
+        if not self._enabled or not received:
+            return None
+
+        trace = LatencyTrace(market_id, received)
+        trace.notified = time.perf_counter()
+
+        self.record(market_id, LatencyTracer.STAGE_PARSE, trace.notified - received)
+
+        return trace
+
+    def dequeued(self, trace: Optional[LatencyTrace], strategy_trader):
+        """
+        The signal is dequeued by the strategy. The trace is kept by the strategy trader until it is processed,
+        and only the older trace is kept when many signals are received before the processing.
+        """
+        if trace is None:
+            return
+
+        trace.dequeued = time.perf_counter()
+        self.record(trace.market_id, LatencyTracer.STAGE_DISPATCH, trace.dequeued - trace.notified)
+
+        if strategy_trader.latency_trace is None:
+            strategy_trader.latency_trace = trace
+
+    def begin(self, strategy_trader) -> Optional[LatencyTrace]:
+        """
+        A worker begin the processing of a strategy trader. The trace becomes the current one of the thread.
+        """
+        if not self._enabled:
+            return None
+
+        trace = strategy_trader.latency_trace
+        if trace is None:
+            return None
+
+        strategy_trader.latency_trace = None
+
+        trace.started = time.perf_counter()
+        self.record(trace.market_id, LatencyTracer.STAGE_SCHEDULE, trace.started - trace.dequeued)
+
+        self._local.trace = trace
+
+        return trace
+
+    def end(self, trace: Optional[LatencyTrace]):
+        if trace is None:
+            return
+
+        self.record(trace.market_id, LatencyTracer.STAGE_COMPUTE, time.perf_counter() - trace.started)
+        self._local.trace = None
+
+    def order(self):
+        """
+        An order is submitted to the trader, from the processing of the current trace of this thread.
+        """
+        if not self._enabled:
+            return
+
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return
+
+        now = time.perf_counter()
+
+        self.record(trace.market_id, LatencyTracer.STAGE_ORDER, now - trace.started)
+        self.record(trace.market_id, LatencyTracer.STAGE_TOTAL, now - trace.received)
+
+    #
+    # report
+    #
+
+    def stats(self, market_id: Optional[str] = None) -> Dict[str, Dict[str, dict]]:
+        """
+        Per market, per stage the number of samples and the p50, p99 and max durations in milliseconds,
+        on the last NUM_SAMPLES samples.
+        """
+        results = {}
+
+        with self._mutex:
+            markets = [market_id] if market_id else list(self._samples.keys())
+
+        for market in markets:
+            samples = self._samples.get(market)
+            counts = self._counts.get(market)
+
+            if samples is None:
+                continue
+
+            stages = {}
+
+            for stage, name in enumerate(LatencyTracer.STAGES):
+                count = int(counts[stage])
+                if not count:
+                    continue
+
+                values = samples[stage, :min(count, LatencyTracer.NUM_SAMPLES)] * 1000.0
+                p50, p99 = np.percentile(values, (50, 99))
+
+                stages[name] = {
+                    'count': count,
+                    'p50': float(p50),
+                    'p99': float(p99),
+                    'max': float(values.max())
+                }
+
+            results[market] = stages
+
+        return results
@@ -0,0 +1,191 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Optional single asyncio event loop for the network I/O of the connectors
+
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+import asyncio
+import functools
+import threading
+import traceback
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import logging
+logger = logging.getLogger('siis.common.netcore')
+error_logger = logging.getLogger('siis.error.common.netcore')
+traceback_logger = logging.getLogger('siis.traceback.common.netcore')
+
+
+class NetworkCore(object):
+    """
+    A single asyncio event loop, running into its own thread, hosting the websocket connections of the connectors
+    supporting it (see common.asyncws), in place of a Twisted reactor or a thread per connection.
+
+    The blocking REST requests issued from the loop are processed by a small shared executor (see request), then
+    the loop is never blocked by them.
+
+    The message callbacks are called from the loop thread. They notify the services as before, and then the signals
+    are queued to the strategy thread (the thread bridge is the signal handler of the services). In the other way
+    call and submit schedule a function or a coroutine into the loop from any thread.
+
+    It is disabled by default (see --async-net option), then the connectors use their previous threading model.
+    """
+
+    MAX_REQUEST_WORKERS = 4
+
+    __instance = None
+
+    @classmethod
+    def inst(cls):
+        if NetworkCore.__instance is None:
+            NetworkCore.__instance = NetworkCore()
+
+        return NetworkCore.__instance
+
+    def __init__(self):
+        self._enabled = False
+
+        self._loop = None
+        self._thread = None
+        self._executor = None
+
+        self._mutex = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    def enable(self):
+        """
+        Select the network core for the connectors supporting it. The loop is started at the first use.
+        """
+        self._enabled = True
+
+    def start(self):
+        """
+        Start the event loop thread if not already running. Can be called many times.
+        """
+        with self._mutex:
+            if self._loop is not None:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(max_workers=NetworkCore.MAX_REQUEST_WORKERS,
+                                                thread_name_prefix="netcore-req")
+
+            self._loop.set_default_executor(self._executor)
+
+            started = threading.Event()
+
+            self._thread = threading.Thread(name="netcore", target=self._run, args=(started,), daemon=True)
+            self._thread.start()
+
+            started.wait()
+
+        logger.debug("Network core started")
+
+    def stop(self):
+        """
+        Cancel the remaining tasks, stop the loop and join its thread.
+        """
+        with self._mutex:
+            if self._loop is None:
+                return
+
+            loop = self._loop
+            thread = self._thread
+
+            self._loop = None
+            self._thread = None
+
+        if loop.is_running():
+            loop.call_soon_threadsafe(self._cancel_all, loop)
+
+        if thread:
+            thread.join()
+
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        logger.debug("Network core stopped")
+
+    #
+    # thread bridge
+    #
+
+    def call(self, callback: Callable, *args):
+        """
+        Schedule a function call into the loop thread, from any thread.
+        """
+        if self._loop is None:
+            self.start()
+
+        self._loop.call_soon_threadsafe(callback, *args)
+
+    def call_later(self, delay: float, callback: Callable, *args):
+        """
+        Schedule a delayed function call into the loop thread, from the loop thread only.
+        @return A handle having a cancel method.
+        """
+        return self._loop.call_later(delay, callback, *args)
+
+    def submit(self, coro) -> Future:
+        """
+        Schedule a coroutine into the loop, from any thread.
+        @return A concurrent future of the result of the coroutine.
+        """
+        if self._loop is None:
+            self.start()
+
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def request(self, fn: Callable, *args, **kwargs):
+        """
+        Await a blocking function (REST request of a client) processed by the shared executor, from the loop thread.
+        """
+        return await self._loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    #
+    # internal
+    #
+
+    def _run(self, started: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        loop = self._loop
+
+        loop.call_soon(started.set)
+
+        try:
+            loop.run_forever()
+        except Exception as e:
+            error_logger.error(repr(e))
+            traceback_logger.error(traceback.format_exc())
+        finally:
+            loop.close()
+
+    @staticmethod
+    def _cancel_all(loop: asyncio.AbstractEventLoop):
+        tasks = [task for task in asyncio.all_tasks(loop) if not task.done()]
+
+        for task in tasks:
+            task.cancel()
+
+        if tasks:
+            # stop once the cancelled tasks are completed (closing the connections)
+            gathered = asyncio.gather(*tasks, return_exceptions=True)
+            gathered.add_done_callback(lambda f: loop.stop())
+        else:
+            loop.stop()
@@ -0,0 +1,238 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Per strategy-trader wall time, CPU time and allocations profiler.
+
+import sys
+import inspect
+import threading
+import time
+
+from typing import Optional, Dict, Tuple
+
+import numpy as np
+
+import logging
+logger = logging.getLogger('siis.common.profiler')
+
+
+class Profiler(object):
+    """
+    Measure the wall time, the CPU time of the thread and the allocated memory blocks of the processing of each
+    strategy trader, detailed per section :
+        - process : the whole StrategyTraderBase.process call
+        - update-trades : StrategyTraderBase.update_trades
+        - analyser:<name> : each analyser process
+        - indicator:<name> : each indicator compute
+
+    Each measure is inclusive (the process contains its analysers that contain their indicators).
+    The samples are kept into a fixed size ring and aggregated on demand over a sliding window of time.
+
+    It is disabled by default. Once enabled, the process and compute methods of the analysers and indicators
+    classes are wrapped. They are restored when disabled, then there is no overhead at all when not profiling.
+
+    @note The allocations count is the difference of sys.getallocatedblocks, then it is the net number of blocks
+        kept by the section, and it is approximate when many workers run concurrently.
+    """
+
+    NUM_SAMPLES = 4096
+    WINDOW = 60.0              # default aggregation window in seconds
+    INSTRUMENT_DELAY = 5.0     # delay between two lookups of newly loaded classes to instrument
+
+    SECTION_PROCESS = 'process'
+    SECTION_UPDATE_TRADES = 'update-trades'
+
+    # sample columns
+    COL_TIME = 0
+    COL_WALL = 1
+    COL_CPU = 2
+    COL_ALLOCS = 3
+
+    __instance = None
+
+    @classmethod
+    def inst(cls):
+        if Profiler.__instance is None:
+            Profiler.__instance = Profiler()
+
+        return Profiler.__instance
+
+    def __init__(self):
+        self._enabled = False
+
+        self._mutex = threading.Lock()
+        self._samples = {}    # per (market-id, section) array of samples (n, 4)
+        self._counts = {}     # per (market-id, section) number of samples
+
+        self._originals = {}  # per (class, method name) original function
+        self._last_instrument = 0.0
+
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self, status: bool = True):
+        with self._mutex:
+            if status == self._enabled:
+                return
+
+            self._enabled = status
+
+            if status:
+                self._instrument()
+            else:
+                self._restore()
+
+    def reset(self):
+        with self._mutex:
+            self._samples = {}
+            self._counts = {}
+
+    def record(self, market_id: str, section: str, wall: float, cpu: float, allocs: int):
+        key = (market_id, section)
+        samples = self._samples.get(key)
+
+        if samples is None:
+            with self._mutex:
+                samples = self._samples.get(key)
+                if samples is None:
+                    self._counts[key] = 0
+                    samples = self._samples[key] = np.zeros((Profiler.NUM_SAMPLES, 4))
+
+        count = self._counts[key]
+
+        samples[count % Profiler.NUM_SAMPLES] = (time.monotonic(), wall, cpu, allocs)
+        self._counts[key] = count + 1
+
+    #
+    # measures
+    #
+
+    def begin(self, strategy_trader) -> Optional[Tuple[float, float, int]]:
+        """
+        A worker begin the processing of a strategy trader. It becomes the current one of the thread.
+        """
+        if not self._enabled:
+            return None
+
+        if time.monotonic() - self._last_instrument >= Profiler.INSTRUMENT_DELAY:
+            # instrument the classes of the strategies loaded since
+            with self._mutex:
+                if self._enabled:
+                    self._instrument()
+
+        self._local.market_id = strategy_trader.instrument.market_id
+
+        return time.perf_counter(), time.thread_time(), sys.getallocatedblocks()
+
+    def end(self, measure: Optional[Tuple[float, float, int]]):
+        if measure is None:
+            return
+
+        market_id = getattr(self._local, 'market_id', None)
+        self._local.market_id = None
+
+        if market_id:
+            self.record(market_id, Profiler.SECTION_PROCESS, time.perf_counter() - measure[0],
+                        time.thread_time() - measure[1], sys.getallocatedblocks() - measure[2])
+
+    def _wrap(self, func, section):
+        """
+        Wrap a method to measure each call into the section of the current strategy trader of the thread.
+        @param func: Original function.
+        @param section: Function returning the name of the section from the instance.
+        """
+        profiler = self
+
+        def wrapper(obj, *args, **kwargs):
+            market_id = getattr(profiler._local, 'market_id', None)
+            if market_id is None:
+                # out of a process (bootstrap...)
+                return func(obj, *args, **kwargs)
+
+            wall = time.perf_counter()
+            cpu = time.thread_time()
+            allocs = sys.getallocatedblocks()
+
+            try:
+                return func(obj, *args, **kwargs)
+            finally:
+                profiler.record(market_id, section(obj), time.perf_counter() - wall, time.thread_time() - cpu,
+                                sys.getallocatedblocks() - allocs)
+
+        wrapper.__wrapped__ = func
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+
+        return wrapper
+
+    def _instrument(self):
+        from strategy.strategytraderbase import StrategyTraderBase
+        from strategy.strategybaseanalyser import StrategyBaseAnalyser
+        from strategy.indicator.indicator import Indicator
+
+        for base, method, section in (
+                (StrategyTraderBase, 'update_trades', lambda obj: Profiler.SECTION_UPDATE_TRADES),
+                (StrategyBaseAnalyser, 'process', lambda obj: "analyser:" + obj.name),
+                (Indicator, 'compute', lambda obj: "indicator:" + obj.__class__.__name__)):
+            classes = [base]
+
+            while classes:
+                cls = classes.pop()
+                classes.extend(cls.__subclasses__())
+
+                # only the classes defining their own method
+                func = cls.__dict__.get(method)
+                if not inspect.isfunction(func) or (cls, method) in self._originals:
+                    continue
+
+                self._originals[(cls, method)] = func
+                setattr(cls, method, self._wrap(func, section))
+
+        self._last_instrument = time.monotonic()
+
+    def _restore(self):
+        for (cls, method), func in self._originals.items():
+            setattr(cls, method, func)
+
+        self._originals = {}
+
+    #
+    # report
+    #
+
+    def stats(self, market_id: Optional[str] = None, window: float = WINDOW) -> Dict[str, Dict[str, dict]]:
+        """
+        Per market, per section the number of calls, the calls per second, the mean and max wall time and
+        the mean CPU time in milliseconds, the mean allocated blocks and the load (ratio of the window passed into
+        the section), over the last window of seconds.
+        """
+        results = {}
+        now = time.monotonic()
+
+        with self._mutex:
+            keys = [k for k in self._samples.keys() if market_id is None or k[0] == market_id]
+
+        for key in keys:
+            samples = self._samples[key][:min(self._counts[key], Profiler.NUM_SAMPLES)]
+            samples = samples[samples[:, Profiler.COL_TIME] >= now - window]
+
+            count = len(samples)
+            if not count:
+                continue
+
+            wall = samples[:, Profiler.COL_WALL]
+
+            results.setdefault(key[0], {})[key[1]] = {
+                'count': count,
+                'rate': count / window,
+                'wall': float(wall.mean()) * 1000.0,
+                'max': float(wall.max()) * 1000.0,
+                'cpu': float(samples[:, Profiler.COL_CPU].mean()) * 1000.0,
+                'allocs': float(samples[:, Profiler.COL_ALLOCS].mean()),
+                'load': float(wall.sum()) / window
+            }
+
+        return results
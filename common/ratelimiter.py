@@ -0,0 +1,111 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Token bucket rate limiter shared between the threads querying an exchange.
+
+import threading
+import time
+
+import logging
+logger = logging.getLogger('siis.common.ratelimiter')
+
+
+class TokenBucket(object):
+    """
+    Token bucket of request weights, refilled continuously at capacity per interval.
+
+    Each request acquires its weight before being sent, waiting if necessary. The bucket could be synchronized
+    with the weight used counter returned by the exchange (ex: X-MBX-USED-WEIGHT-1M for Binance), to take care
+    of the others clients using the same quota, and paused when the exchange asks for a cool-down (Retry-After).
+
+    It is thread safe and shared by every thread of a client.
+    """
+
+    __slots__ = '_capacity', '_interval', '_rate', '_tokens', '_last_time', '_paused_until', '_condition'
+
+    def __init__(self, capacity: float, interval: float = 60.0):
+        """
+        @param capacity: Maximum weight per interval.
+        @param interval: Interval in seconds.
+        """
+        self._capacity = capacity
+        self._interval = interval
+        self._rate = capacity / interval
+
+        self._tokens = capacity
+        self._last_time = time.monotonic()
+        self._paused_until = 0.0
+
+        self._condition = threading.Condition()
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    @property
+    def tokens(self) -> float:
+        with self._condition:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def _refill(self, now: float):
+        if now > self._last_time:
+            self._tokens = min(self._capacity, self._tokens + (now - self._last_time) * self._rate)
+            self._last_time = now
+
+    def acquire(self, weight: float = 1.0, timeout: float = -1) -> bool:
+        """
+        Acquire the weight of a request, waiting for the tokens and the end of a pause.
+        @param weight: Weight of the request, never more than the capacity.
+        @param timeout: Maximum delay in seconds or -1 to wait until available.
+        @return True if acquired, False on timeout.
+        """
+        weight = min(weight, self._capacity)
+        deadline = time.monotonic() + timeout if timeout >= 0 else 0.0
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now >= self._paused_until and self._tokens >= weight:
+                    self._tokens -= weight
+                    return True
+
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    delay = (weight - self._tokens) / self._rate
+
+                if deadline:
+                    if now >= deadline:
+                        return False
+
+                    delay = min(delay, deadline - now)
+
+                self._condition.wait(delay)
+
+    def sync(self, used: float):
+        """
+        Synchronize the available tokens with the weight used during the current interval as reported by the exchange.
+        It only reduces the available tokens.
+        """
+        with self._condition:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, self._capacity - used)
+
+    def pause(self, delay: float):
+        """
+        Stop every request for a delay in seconds, after a cool-down or a ban returned by the exchange.
+        The tokens are then emptied.
+        """
+        with self._condition:
+            now = time.monotonic()
+
+            self._paused_until = max(self._paused_until, now + delay)
+            self._tokens = 0.0
+            self._last_time = self._paused_until
+
+            self._condition.notify_all()
+
+        logger.warning("Rate limit reached, requests paused for %g seconds" % delay)
@@ -0,0 +1,262 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Recorder and replayer of the raw market data payloads of the connectors.
+
+import gzip
+import json
+import threading
+import time
+
+from typing import Callable, Optional
+
+import logging
+logger = logging.getLogger('siis.common.recorder')
+error_logger = logging.getLogger('siis.error.common.recorder')
+
+
+class Recorder(object):
+    """
+    Record the raw payloads received by the connectors (WS messages and REST responses) into a gzip compressed
+    file of JSON lines : [elapsed time in seconds, source, channel, payload].
+
+    The source is the name of the connector (ex: binance.com), the channel is the WS stream (ex: aggTrade, user)
+    or "rest". A REST payload is {'method', 'path', 'params', 'result'}, params is the query string of the sorted
+    parameters of the request, excepted the signing ones (see query_string).
+
+    It is disabled by default, then wrap returns the callback itself and record returns immediately.
+    """
+
+    CHANNEL_REST = "rest"
+
+    # parameters changing at each request, not part of the query of a REST response
+    UNSIGNED_PARAMS = ('timestamp', 'signature', 'recvWindow', 'requests_params')
+
+    __instance = None
+
+    @classmethod
+    def inst(cls):
+        if Recorder.__instance is None:
+            Recorder.__instance = Recorder()
+
+        return Recorder.__instance
+
+    def __init__(self):
+        self._file = None
+        self._start_time = 0.0
+        self._count = 0
+
+        self._mutex = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def open(self, filename: str):
+        with self._mutex:
+            if self._file:
+                return
+
+            try:
+                self._file = gzip.open(filename, "wt", encoding="utf-8")
+                self._start_time = time.time()
+                self._count = 0
+
+                logger.info("Record the market data into %s" % filename)
+            except OSError as e:
+                error_logger.error("Unable to open record file %s : %s" % (filename, repr(e)))
+
+    def close(self):
+        with self._mutex:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+                logger.info("Recorded %i messages" % self._count)
+
+    def record(self, source: str, channel: str, payload):
+        if self._file is None:
+            return
+
+        line = json.dumps((time.time() - self._start_time, source, channel, payload), separators=(',', ':'))
+
+        with self._mutex:
+            if self._file:
+                self._file.write(line)
+                self._file.write('\n')
+                self._count += 1
+
+    def record_response(self, source: str, method: str, path: str, params: str, result):
+        """
+        @param params: Query string of the request, see query_string.
+        """
+        self.record(source, Recorder.CHANNEL_REST, {'method': method, 'path': path, 'params': params or "",
+                                                    'result': result})
+
+    @staticmethod
+    def query_string(params: Optional[dict]) -> str:
+        """
+        Query string of the parameters of a REST request, sorted by key, without the None values and the signing
+        parameters, identifying the request on both the record and the replay side.
+        """
+        if not params:
+            return ""
+
+        return '&'.join('%s=%s' % (k, v) for k, v in sorted(params.items())
+                        if v is not None and k not in Recorder.UNSIGNED_PARAMS)
+
+    def wrap(self, source: str, channel: str, callback: Callable) -> Callable:
+        """
+        Return a callback recording the payload before calling the original callback.
+        """
+        if self._file is None:
+            return callback
+
+        def recorded_callback(payload):
+            self.record(source, channel, payload)
+            return callback(payload)
+
+        return recorded_callback
+
+
+class Replayer(object):
+    """
+    Replay a file of the recorder, as a local exchange stand-in, through the parsing code of the connectors.
+
+    The REST responses are loaded at open and returned by response, the last one for a method, path and parameters.
+    The WS messages are dispatched by a thread to the callbacks registered per source and channel, once started,
+    at the recorded pace multiplied by speed, or as fast as possible if speed is 0.
+
+    Messages of a channel without callback are ignored.
+    """
+
+    __instance = None
+
+    @classmethod
+    def inst(cls):
+        if Replayer.__instance is None:
+            Replayer.__instance = Replayer()
+
+        return Replayer.__instance
+
+    def __init__(self):
+        self._filename = None
+        self._speed = 1.0
+
+        self._responses = {}   # per (source, method, path, params) last result
+        self._callbacks = {}   # per (source, channel) callback
+
+        self._thread = None
+        self._running = False
+
+        self._count = 0
+        self._ignored = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._filename is not None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def open(self, filename: str, speed: float = 1.0):
+        """
+        @param filename: Recorded file.
+        @param speed: Replay speed factor, 1 for real-time, N for N times faster and 0 for as fast as possible.
+        """
+        self._filename = filename
+        self._speed = max(0.0, speed)
+
+        self._responses = {}
+
+        try:
+            with gzip.open(filename, "rt", encoding="utf-8") as f:
+                for line in f:
+                    elapsed, source, channel, payload = json.loads(line)
+
+                    if channel == Recorder.CHANNEL_REST:
+                        self._responses[(source, payload['method'], payload['path'],
+                                         payload.get('params', ""))] = payload['result']
+
+        except (OSError, ValueError) as e:
+            error_logger.error("Unable to read record file %s : %s" % (filename, repr(e)))
+
+        logger.info("Replay %s at speed %s, %i REST responses" % (filename, self._speed or "max",
+                                                                   len(self._responses)))
+
+    def response(self, source: str, method: str, path: str, params: str = ""):
+        """
+        Recorded result of a REST request or None.
+        @param params: Query string of the request, see Recorder.query_string.
+        """
+        return self._responses.get((source, method, path, params or ""))
+
+    def register(self, source: str, channel: str, callback: Optional[Callable]):
+        self._callbacks[(source, channel)] = callback
+
+    def start(self):
+        if self._thread or not self._filename:
+            return
+
+        self._running = True
+
+        self._thread = threading.Thread(name="replayer", target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+        self._thread = None
+
+    def run(self):
+        self._count = 0
+        self._ignored = 0
+
+        start_time = time.perf_counter()
+        speed = self._speed
+
+        try:
+            with gzip.open(self._filename, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if not self._running:
+                        break
+
+                    elapsed, source, channel, payload = json.loads(line)
+
+                    if channel == Recorder.CHANNEL_REST:
+                        continue
+
+                    callback = self._callbacks.get((source, channel))
+                    if callback is None:
+                        self._ignored += 1
+                        continue
+
+                    if speed > 0.0:
+                        delay = start_time + elapsed / speed - time.perf_counter()
+                        if delay > 0.0:
+                            time.sleep(delay)
+
+                    try:
+                        callback(payload)
+                    except Exception as e:
+                        error_logger.error(repr(e))
+
+                    self._count += 1
+
+        except (OSError, ValueError) as e:
+            error_logger.error("Unable to replay %s : %s" % (self._filename, repr(e)))
+
+        duration = time.perf_counter() - start_time
+
+        logger.info("Replayed %i messages in %.3f seconds (%.0f msg/s), %i ignored" % (
+            self._count, duration, self._count / duration if duration > 0 else 0.0, self._ignored))
+
+        self._running = False
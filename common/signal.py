@@ -71,12 +71,17 @@ class Signal(object):
 	SOURCE_VIEW = 6
 	SOURCE_WATCHDOG = 7
 
+	# one signal per tick and per candle update, no per instance dict
+	__slots__ = '_source', '_source_name', '_signal_type', '_data', 'trace'
+
 	def __init__(self, source, source_name, signal_type, data):
 		self._source = source
 		self._source_name = source_name
 		self._signal_type = signal_type
 		self._data = data
 
+		self.trace = None  # optional LatencyTrace for market data signals
+
 	@property
 	def source(self):
 		return self._source
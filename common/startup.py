@@ -0,0 +1,63 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Startup timing of the application phases (imports, services start...).
+
+import time
+
+from typing import List, Tuple
+
+import logging
+logger = logging.getLogger('siis.common.startup')
+
+
+class StartupTimer(object):
+    """
+    Measure the duration of each phase of the startup, from the launch of the process to the main loop.
+    Each call to mark ends the current phase and begins the next one.
+    """
+
+    __instance = None
+
+    @classmethod
+    def inst(cls):
+        if StartupTimer.__instance is None:
+            StartupTimer.__instance = StartupTimer()
+
+        return StartupTimer.__instance
+
+    def __init__(self):
+        self._begin = time.perf_counter()
+        self._last = self._begin
+        self._phases = []
+
+    def mark(self, phase: str):
+        """
+        Ends the current phase with the given name.
+        """
+        now = time.perf_counter()
+
+        self._phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def phases(self) -> List[Tuple[str, float]]:
+        """List of tuple (phase name, duration in seconds)."""
+        return self._phases
+
+    @property
+    def total(self) -> float:
+        return self._last - self._begin
+
+    def report(self) -> List[str]:
+        """
+        Lines of the report, one per phase plus the total, with the durations in milliseconds.
+        Also written into the log file.
+        """
+        lines = ["%-24s %10.1f ms" % (phase, duration * 1000.0) for phase, duration in self._phases]
+        lines.append("%-24s %10.1f ms" % ("total", self.total * 1000.0))
+
+        for line in lines:
+            logger.info("Startup %s" % line)
+
+        return lines
@@ -145,10 +145,29 @@ class Worker(threading.Thread):
 
 
 class WorkerPool(object):
+    """
+    Pool of workers processing the jobs of the strategy.
 
-    __slots__ = '_num_workers', '_workers', '_queue', '_condition'
+    Jobs are queued per priority class and processed from the highest priority (order/position signals),
+    then the tick updates, then the bootstrap/initialization jobs. Jobs of a same class are processed in FIFO order.
 
-    def __init__(self, num_workers=None):
+    A job without count-down can be given a key, generally the strategy trader, then at most one job per key is
+    pending. A newer job of the same key replaces the pending one, and promotes it if its priority is higher.
+
+    With affinity, jobs having a key (except the bootstrap ones) are always processed by the same worker,
+    then the data of a market stay on the same thread. Others jobs are processed by the first available worker.
+    """
+
+    PRIORITY_ORDER = 0
+    PRIORITY_TICK = 1
+    PRIORITY_BOOTSTRAP = 2
+
+    NUM_PRIORITIES = 3
+
+    __slots__ = '_num_workers', '_workers', '_queues', '_worker_queues', '_pending', '_affinity', '_affinities', \
+        '_condition'
+
+    def __init__(self, num_workers=None, affinity=False):
         # at least 3 workers in case of one is block, another intensive work, need a available one
         if not num_workers:
             num_cpus = multiprocessing.cpu_count()
@@ -157,12 +176,24 @@ class WorkerPool(object):
             self._num_workers = max(3, num_workers)
 
         self._workers = []
-        self._queue = collections.deque()
+
+        # entries are list of [count_down, job, key, priority], a job of None mean a replaced entry
+        self._queues = [collections.deque() for _ in range(0, WorkerPool.NUM_PRIORITIES)]
+        self._worker_queues = {}  # per worker uid the queues per priority when affinity
+        self._pending = {}        # pending entry per key
+
+        self._affinity = affinity
+        self._affinities = {}     # worker uid per key
+
         self._condition = threading.Condition()
 
     def start(self):
         self._workers = [Worker(self, i) for i in range(0, self._num_workers)]
 
+        if self._affinity:
+            self._worker_queues = {worker.uid: [collections.deque() for _ in range(0, WorkerPool.NUM_PRIORITIES)]
+                                   for worker in self._workers}
+
         for worker in self._workers:
             worker.start()
 
@@ -206,24 +237,90 @@ class WorkerPool(object):
         else:
             watchdog_service.service_timeout("workerpool", "Unable to join worker pool for %s seconds" % timeout)
 
-    def add_job(self, count_down, job):
+    @property
+    def affinity(self) -> bool:
+        return self._affinity
+
+    def num_pending_jobs(self) -> int:
+        with self._condition:
+            queues = self._queues + [q for queues in self._worker_queues.values() for q in queues]
+            return sum(1 for q in queues for entry in q if entry[1] is not None)
+
+    def add_job(self, count_down, job, priority: int = PRIORITY_TICK, key=None):
+        """
+        Queue a job.
+
+        @param count_down Optional count-down, done once the job is processed.
+        @param job Tuple of the callable and its arguments.
+        @param priority One of the PRIORITY_ constants.
+        @param key Optional coalescing key, ignored when a count-down is given.
+        """
         with self._condition:
-            self._queue.append((count_down, job))
-            self._condition.notify()
+            if key is not None and count_down is None:
+                entry = self._pending.get(key)
 
-    def next_job(self, worker):
-        count_down = None
-        job = None
+                if entry is not None:
+                    if entry[3] <= priority:
+                        # keep the pending one with the newest arguments
+                        entry[1] = job
+                        return
+
+                    # promote, replace the pending entry by a new one
+                    entry[1] = None
+
+                entry = [None, job, key, priority]
+                self._pending[key] = entry
+            else:
+                entry = [count_down, job, None, priority]
 
+            if self._affinity and self._worker_queues and key is not None and \
+                    priority < WorkerPool.PRIORITY_BOOTSTRAP:
+                uid = self._affinities.get(key)
+                if uid is None:
+                    uid = self._affinities[key] = len(self._affinities) % self._num_workers
+
+                self._worker_queues[uid][priority].append(entry)
+
+                # need to wake up this specific worker
+                self._condition.notify_all()
+            else:
+                self._queues[priority].append(entry)
+                self._condition.notify()
+
+    def __pop_job(self, worker):
+        worker_queues = self._worker_queues.get(worker.uid)
+
+        for priority in range(0, WorkerPool.NUM_PRIORITIES):
+            if worker_queues:
+                queue = worker_queues[priority]
+            else:
+                queue = None
+
+            for q in (queue, self._queues[priority]):
+                while q:
+                    count_down, job, key, _ = entry = q.popleft()
+
+                    if job is None:
+                        # replaced entry
+                        continue
+
+                    if key is not None and self._pending.get(key) is entry:
+                        del self._pending[key]
+
+                    return count_down, job
+
+        return None
+
+    def next_job(self, worker):
         with self._condition:
             # running cancel wait, ping too, normal case is a job is pending
-            while not len(self._queue) and worker._running and not worker._ping:
-                self._condition.wait()
+            result = self.__pop_job(worker)
 
-            if len(self._queue):
-                count_down, job = self._queue.popleft()
+            while result is None and worker._running and not worker._ping:
+                self._condition.wait()
+                result = self.__pop_job(worker)
 
-        return count_down, job
+        return result or (None, None)
 
     def new_count_down(self, n):
         return CountDown(n)
@@ -0,0 +1,127 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Binance Websocket connector hosted by the network core.
+
+import traceback
+
+from common.asyncws import WebSocketConnection
+from common.netcore import NetworkCore
+from common.recorder import Recorder
+from connector.binance.websockets import BinanceSocketManager
+
+import logging
+logger = logging.getLogger('siis.connector.binance.aiows')
+error_logger = logging.getLogger('siis.error.connector.binance.aiows')
+traceback_logger = logging.getLogger('siis.traceback.connector.binance.aiows')
+
+
+class AsyncBinanceSocketManager(BinanceSocketManager):
+    """
+    Same as BinanceSocketManager but the connections are hosted by the asyncio loop of the network core,
+    without Twisted reactor neither thread.
+    """
+
+    def _start_socket(self, id_, path, callback, prefix='ws/', subscription=None, pair=None):
+        try:
+            if id_ in self._conns:
+                return False
+
+            connection = WebSocketConnection(
+                self._url + prefix + path,
+                Recorder.inst().wrap(self.source_name, id_, callback),
+                on_open=self._on_open,
+                subscriptions={subscription: set(pair or [])} if subscription else {},
+                reconnect=True)
+
+            self.factories[id_] = connection
+            self._conns[id_] = connection
+
+            connection.connect()
+        except Exception as e:
+            logger.error(repr(e))
+            traceback_logger.error(traceback.format_exc())
+
+        return path
+
+    @staticmethod
+    def _on_open(connection):
+        params = []
+
+        for subscription, pair in connection.subscriptions.items():
+            if pair:
+                params += ["%s@%s" % (p.lower(), subscription) for p in pair]
+
+        if params:
+            connection.send({
+                "method": "SUBSCRIBE",
+                "params": params,
+                "id": 1
+            })
+
+    def subscribe_public(self, subscription, pair, callback):
+        id_ = "_".join([subscription])
+
+        if id_ not in self._conns:
+            stream_path = '?streams={}'.format(subscription)
+            return self._start_socket(subscription, stream_path, callback, prefix='stream', subscription=subscription,
+                                      pair=pair)
+        else:
+            NetworkCore.inst().call(self.send_subscribe, id_, subscription, pair)
+
+    def unsubscribe_public(self, subscription, pair):
+        id_ = "_".join([subscription])
+
+        if id_ in self._conns:
+            NetworkCore.inst().call(self.send_unsubscribe, id_, subscription, pair)
+
+    def _start_user_timer(self):
+        # keep alive from the loop, the REST request itself is processed by the executor
+        NetworkCore.inst().call(self._schedule_user_timer)
+
+    def _schedule_user_timer(self):
+        if not self._user_listen_key:
+            # user socket stopped meanwhile
+            return
+
+        self._user_timer = NetworkCore.inst().call_later(self._user_timeout, self._keepalive_user_timer)
+
+    def _cancel_user_timer(self):
+        if self._user_timer:
+            self._user_timer.cancel()
+            self._user_timer = None
+
+    def _keepalive_user_timer(self):
+        self._user_timer = None
+
+        if self._user_listen_key:
+            NetworkCore.inst().loop.run_in_executor(None, self._keepalive_user_socket)
+
+    def _stop_user_socket(self):
+        if not self._user_listen_key:
+            return
+
+        self._user_listen_key = None
+
+        # scheduled and canceled from the loop thread, in order, then never after a pending schedule
+        NetworkCore.inst().call(self._cancel_user_timer)
+
+    def stop_socket(self, conn_key):
+        if conn_key not in self._conns:
+            return
+
+        self._conns[conn_key].disconnect()
+        del self._conns[conn_key]
+
+        self.factories.pop(conn_key, None)
+
+        # check if we have a user stream socket
+        if len(conn_key) >= 60 and conn_key[:60] == self._user_listen_key:
+            self._stop_user_socket()
+
+    def start(self):
+        # no thread, shared loop started once
+        NetworkCore.inst().start()
+
+    def run(self):
+        pass
@@ -8,8 +8,14 @@ import hmac
 import requests
 import time
 import threading
+import urllib.parse
 
 from operator import itemgetter
+
+from common.ratelimiter import TokenBucket
+from common.httpsession import create_session
+from common.recorder import Recorder
+
 from .helpers import date_to_milliseconds, interval_to_milliseconds
 from .exceptions import BinanceAPIException, BinanceRequestException, BinanceWithdrawException
 
@@ -98,6 +104,10 @@ class Client(object):
 
     QUERY_MAX_RETRY = 3
 
+    # request weight per minute, synced with the X-MBX-USED-WEIGHT-1M header of each response
+    API_WEIGHT_PER_MINUTE = 1200
+    FUTURES_WEIGHT_PER_MINUTE = 2400
+
     def __init__(self, api_key, api_secret, requests_params=None, tld='com'):
         """Binance API Client constructor (spot support, margin support, no margin, no lending)
 
@@ -125,15 +135,18 @@ class Client(object):
         self._exclusive = False
         self._condition = threading.Condition()
 
+        # shared by any thread using this client (fetcher workers, watcher, trader)
+        self._api_rate_limiter = TokenBucket(Client.API_WEIGHT_PER_MINUTE, 60.0)
+        self._futures_rate_limiter = TokenBucket(Client.FUTURES_WEIGHT_PER_MINUTE, 60.0)
+
         # init DNS and SSL cert
         self.ping()
 
     def _init_session(self):
-        session = requests.session()
-        session.headers.update({'Accept': 'application/json',
-                                'User-Agent': 'binance/python',
-                                'X-MBX-APIKEY': self.API_KEY})
-        return session
+        return create_session('binance.com', headers={
+            'Accept': 'application/json',
+            'User-Agent': 'binance/python',
+            'X-MBX-APIKEY': self.API_KEY})
 
     def _create_api_uri(self, path, signed=True, version=PUBLIC_API_VERSION):
         v = self.PRIVATE_API_VERSION if signed else version
@@ -184,6 +197,10 @@ class Client(object):
             kwargs.update(self._requests_params)
 
         data = kwargs.get('data', None)
+
+        # before signing, the data are modified in place
+        query = Recorder.query_string(data) if Recorder.inst().enabled and isinstance(data, dict) else ""
+
         # if data and isinstance(data, dict):
         #     kwargs['data'] = data
         # if signed:
@@ -257,7 +274,11 @@ class Client(object):
 
         # self._request_exclusive.acquire(timeout=180.0)
 
+        rate_limiter = self.rate_limiter(uri)
+
         while 1:
+            rate_limiter.acquire()
+
             try:
                 response = getattr(self.session, method)(uri, **kwargs)
             except requests.exceptions.HTTPError as e:
@@ -272,8 +293,12 @@ class Client(object):
 
                     continue
 
+            used_weight = response.headers.get('X-MBX-USED-WEIGHT-1M')
+            if used_weight:
+                rate_limiter.sync(float(used_weight))
+
             if response.status_code == 429:
-                # cool-down, retry in 5 seconds (could look at header Retry-After)
+                # cool-down, retry after the delay given by the header Retry-After else in 5 seconds
                 # self._request_exclusive.acquire(timeout=180.0)
                 # self._exclusive = exclusive = True
                 # self._request_exclusive.release()
@@ -282,7 +307,8 @@ class Client(object):
                     self._exclusive = exclusive = True
                     self._condition.release()
 
-                time.sleep((retry_count+1)*5.0)
+                # every thread sharing the quota wait
+                rate_limiter.pause(float(response.headers.get('Retry-After', (retry_count+1)*5.0)))
 
                 retry_count += 1
 
@@ -292,7 +318,7 @@ class Client(object):
                 continue
 
             elif response.status_code == 418:
-                # ban, retry in 3 minutes (could look at header Retry-After)
+                # ban, retry after the delay given by the header Retry-After else in 3 minutes
                 # self._request_exclusive.acquire(timeout=180.0)
                 # self._exclusive = exclusive = True
                 # self._request_exclusive.release()
@@ -301,7 +327,7 @@ class Client(object):
                     self._exclusive = exclusive = True
                     self._condition.release()
 
-                time.sleep(180.0)
+                rate_limiter.pause(float(response.headers.get('Retry-After', 180.0)))
 
                 retry_count += 1
 
@@ -322,7 +348,19 @@ class Client(object):
                 self._condition.notify()
                 self._condition.release()
 
-        return self._handle_response(response)
+        result = self._handle_response(response)
+
+        if Recorder.inst().enabled:
+            Recorder.inst().record_response('binance.com', method, urllib.parse.urlparse(uri).path, query, result)
+
+        return result
+
+    def rate_limiter(self, uri: str) -> TokenBucket:
+        """Rate limiter of the quota used by an URI, futures or others."""
+        if uri.startswith(self.FUTURES_URL):
+            return self._futures_rate_limiter
+
+        return self._api_rate_limiter
 
     def _request_api(self, method, path, signed=False, version=PUBLIC_API_VERSION, **kwargs):
         uri = self._create_api_uri(path, signed, version)
@@ -961,7 +999,6 @@ class Client(object):
 
         retry_count = 0
 
-        idx = 0
         while 1:
             # fetch the klines from start_ts up to max 500 entries or the end_ts if set
             try:
@@ -1003,19 +1040,14 @@ class Client(object):
             # set our start timestamp using the last value in the array
             start_ts = temp_data[-1][0]
 
-            idx += 1
             # check if we received less than the required limit and exit the loop
             if len(temp_data) < limit:
                 # exit the while loop
                 break
 
-            # increment next call by our timeframe
+            # increment next call by our timeframe (the request rate is limited by the token bucket)
             start_ts += timeframe
 
-            # sleep after every 3rd call to be kind to the API
-            if idx % 3 == 0:
-                time.sleep(1)
-
         return output_data
 
     def get_historical_klines_generator(self, symbol, interval, start_str, end_str=None):
@@ -1062,7 +1094,6 @@ class Client(object):
             else:
                 end_ts = date_to_milliseconds(end_str)
 
-        idx = 0
         while 1:
             # fetch the klines from start_ts up to max 500 entries or the end_ts if set
             output_data = self.get_klines(
@@ -1084,19 +1115,14 @@ class Client(object):
             # set our start timestamp using the last value in the array
             start_ts = output_data[-1][0]
 
-            idx += 1
             # check if we received less than the required limit and exit the loop
             if len(output_data) < limit:
                 # exit the while loop
                 break
 
-            # increment next call by our timeframe
+            # increment next call by our timeframe (the request rate is limited by the token bucket)
             start_ts += timeframe
 
-            # sleep after every 3rd call to be kind to the API
-            if idx % 3 == 0:
-                time.sleep(1)
-
     def get_ticker(self, **params):
         """24 hour price change statistics.
 
@@ -2750,7 +2776,6 @@ class Client(object):
 
         retry_count = 0
 
-        idx = 0
         while 1:
             # fetch the klines from start_ts up to max 500 entries or the end_ts if set
             try:
@@ -2792,19 +2817,14 @@ class Client(object):
             # set our start timestamp using the last value in the array
             start_ts = temp_data[-1][0]
 
-            idx += 1
             # check if we received less than the required limit and exit the loop
             if len(temp_data) < limit:
                 # exit the while loop
                 break
 
-            # increment next call by our timeframe
+            # increment next call by our timeframe (the request rate is limited by the token bucket)
             start_ts += timeframe
 
-            # sleep after every 3rd call to be kind to the API
-            if idx % 3 == 0:
-                time.sleep(1)
-
         return output_data
 
     def futures_mark_price(self, **params):
@@ -5,6 +5,8 @@
 
 from monitor.service import MonitorService
 
+from common.netcore import NetworkCore
+from common.recorder import Replayer
 from connector.binance.client import Client
 from connector.binance.websockets import BinanceSocketManager
 
@@ -48,21 +50,45 @@ class Connector(object):
         self._session = None
         self._ws = None
 
+        self._replay = False
+        self._async_net = False
+
     def connect(self, use_ws=True, futures=False):
+        if Replayer.inst().enabled:
+            # replay of a record as exchange stand-in
+            return self.connect_replay(use_ws, futures)
+
         if self._session is None:
             # Create HTTPS session
             self._session = Client(self.__api_key, self.__api_secret, None)
 
         if self._ws is None and use_ws:
-            self._ws = BinanceSocketManager(self._session, futures=futures)
+            if NetworkCore.inst().enabled:
+                from connector.binance.aiowebsockets import AsyncBinanceSocketManager
+                self._ws = AsyncBinanceSocketManager(self._session, futures=futures)
+                self._async_net = True
+            else:
+                self._ws = BinanceSocketManager(self._session, futures=futures)
+
+    def connect_replay(self, use_ws=True, futures=False):
+        from connector.binance.replay import ReplayClient, ReplaySocketManager
+
+        self._replay = True
+
+        if self._session is None:
+            self._session = ReplayClient(self.__api_key, self.__api_secret, None)
+
+        if self._ws is None and use_ws:
+            self._ws = ReplaySocketManager(self._session, futures=futures)
 
     def disconnect(self):
         if self._ws:
             self._ws.close()
             self._ws = None
 
-            # or could be called from ws.stop
-            MonitorService.release_reactor()
+            if not self._replay and not self._async_net:
+                # or could be called from ws.stop
+                MonitorService.release_reactor()
 
         if self._session:
             self._session = None
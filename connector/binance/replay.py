@@ -0,0 +1,61 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Binance REST client and WS manager replaying a record, without network.
+
+import urllib.parse
+
+from common.recorder import Recorder, Replayer
+from connector.binance.client import Client
+
+import logging
+logger = logging.getLogger('siis.connector.binance.replay')
+
+
+class ReplayClient(Client):
+    """
+    Binance client returning the recorded REST responses, or an empty dict if not recorded.
+    """
+
+    def _request(self, method, uri, signed, force_params=False, **kwargs):
+        data = kwargs.get('data')
+        query = Recorder.query_string(data) if isinstance(data, dict) else ""
+
+        result = Replayer.inst().response('binance.com', method, urllib.parse.urlparse(uri).path, query)
+        return result if result is not None else {}
+
+
+class ReplaySocketManager(object):
+    """
+    Same interface as BinanceSocketManager, the callbacks of the subscriptions receive the recorded messages
+    from the replayer.
+    """
+
+    def __init__(self, client, futures=False):
+        self._client = client
+        self._future = futures
+
+    @property
+    def source_name(self) -> str:
+        return "binancefutures.com" if self._future else "binance.com"
+
+    def subscribe_public(self, subscription, pair, callback):
+        Replayer.inst().register(self.source_name, subscription, callback)
+
+    def unsubscribe_public(self, subscription, pair):
+        # keep the callback, the recorded messages are dispatched per stream and not per pair
+        pass
+
+    def start_user_socket(self, callback):
+        Replayer.inst().register(self.source_name, 'user', callback)
+        return 'user'
+
+    def stop_socket(self, conn_key):
+        Replayer.inst().register(self.source_name, conn_key, None)
+
+    def start(self):
+        # shared by the spot and futures watchers, started once
+        Replayer.inst().start()
+
+    def close(self):
+        Replayer.inst().stop()
@@ -11,6 +11,8 @@ from autobahn.twisted.websocket import WebSocketClientFactory, WebSocketClientPr
 from twisted.internet import ssl, reactor
 from twisted.internet.protocol import ReconnectingClientFactory
 
+from common.codec import loads
+from common.recorder import Recorder
 from connector.binance.client import Client
 from monitor.service import MonitorService
 
@@ -61,7 +63,7 @@ class BinanceClientProtocol(WebSocketClientProtocol):
     def onMessage(self, payload, isBinary):
         if not isBinary:
             try:
-                payload_obj = json.loads(payload.decode('utf8'))
+                payload_obj = loads(payload)
             except ValueError:
                 pass
             else:
@@ -169,6 +171,11 @@ class BinanceSocketManager(threading.Thread):
         self._future = futures
         self._url = BinanceSocketManager.FUTURES_STREAM_URL if futures else BinanceSocketManager.STREAM_URL
 
+    @property
+    def source_name(self) -> str:
+        """Name of the source of the messages for the recorder."""
+        return "binancefutures.com" if self._future else "binance.com"
+
     def _start_socket(self, id_, path, callback, prefix='ws/', subscription=None, pair=None):
         try:
             if id_ in self._conns:  # path in self._conns:
@@ -178,7 +185,7 @@ class BinanceSocketManager(threading.Thread):
             factory = BinanceClientFactory(factory_url, subscription=subscription, pair=pair)
             factory.base_client = self
             factory.protocol = BinanceClientProtocol
-            factory.callback = callback
+            factory.callback = Recorder.inst().wrap(self.source_name, id_, callback)
             factory.reconnect = True
             self.factories[id_] = factory
             context_factory = ssl.ClientContextFactory()
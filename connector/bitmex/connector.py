@@ -11,6 +11,7 @@ import requests
 
 from datetime import datetime, timedelta
 from common.utils import UTC
+from common.httpsession import create_session
 
 from .apikeyauthwithexpires import APIKeyAuthWithExpires
 from .ws import BitMEXWebsocket
@@ -57,7 +58,7 @@ class Connector(object):
     def connect(self, use_ws=True, user_data=True):
         # Prepare HTTPS session
         if self._session is None:
-            self._session = requests.Session()
+            self._session = create_session('bitmex.com')
 
             # These headers are always sent
             self._session.headers.update({'user-agent': 'siis-' + '1.0'})
@@ -24,6 +24,8 @@ import requests
 from datetime import datetime as dt
 from concurrent.futures import ThreadPoolExecutor
 
+from common.httpsession import create_session
+
 from .exceptions import FailedRequestError, InvalidRequestError
 
 # Requests will use simplejson if available.
@@ -157,7 +159,8 @@ class HTTP:
             self.ignore_codes = ignore_codes
 
         # Initialize requests session.
-        self.client = requests.Session()
+        # pooled keep-alive session, retries are managed below
+        self.client = create_session('bybit.com', max_retries=0)
         self.client.headers.update(
             {
                 'User-Agent': 'pybit-' + VERSION,
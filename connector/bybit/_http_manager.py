@@ -7,6 +7,8 @@ import requests
 
 from datetime import datetime as dt
 
+from common.httpsession import create_session
+
 from .exceptions import FailedRequestError, InvalidRequestError
 from . import VERSION
 from . import _helpers
@@ -62,7 +64,8 @@ class _HTTPManager:
             self.ignore_codes = ignore_codes
 
         # Initialize requests session.
-        self.client = requests.Session()
+        # pooled keep-alive session, retries are managed below
+        self.client = create_session('bybit.com', max_retries=0)
         self.client.headers.update(
             {
                 "User-Agent": "pybit-" + VERSION,
@@ -3,8 +3,7 @@
 # @license Copyright (c) 2018 Dream Overflow
 # HTTPS+WS connector for ig.com
 
-import requests
-
+from common.httpsession import create_session
 from instrument.instrument import Instrument
 
 from .rest import IGService
@@ -66,7 +65,7 @@ class IGConnector(object):
         if self.connected:
             return
 
-        self._session = requests.Session()
+        self._session = create_session('ig.com')
 
         self._ig_service = IGService(
             self.__username,
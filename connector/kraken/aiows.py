@@ -0,0 +1,118 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Kraken Websocket connector hosted by the network core.
+
+from common.asyncws import WebSocketConnection
+from common.netcore import NetworkCore
+
+from .ws import WssClient
+
+import logging
+logger = logging.getLogger('siis.kraken.aiows')
+error_logger = logging.getLogger('siis.error.kraken.aiows')
+traceback_logger = logging.getLogger('siis.traceback.kraken.aiows')
+
+
+class AsyncWssClient(WssClient):
+    """
+    Same as WssClient but the public and private sockets are hosted by the asyncio loop of the network core,
+    without Twisted reactor neither thread.
+
+    As with WssClient there is no automatic reconnection, it is managed by the watcher.
+    """
+
+    def _start_socket(self, id_, subscription, pair, callback):
+        if id_ in self._conns:
+            return False
+
+        connection = WebSocketConnection(
+            self.STREAM_URL,
+            callback,
+            on_open=self._on_open,
+            subscriptions={subscription: set(pair)} if subscription and pair else {},
+            reconnect=False)
+
+        self.factories[id_] = connection
+        self._conns[id_] = connection
+
+        connection.connect()
+
+    def _start_private_socket(self, id_, token, subscription, callback):
+        if id_ in self._private_conns:
+            return False
+
+        connection = WebSocketConnection(
+            self.PRIVATE_STREAM_URL,
+            callback,
+            on_open=self._on_open_private,
+            subscriptions={subscription} if subscription else set(),
+            reconnect=False)
+
+        connection.token = token
+
+        self.factories[id_] = connection
+        self._private_conns[id_] = connection
+
+        connection.connect()
+
+    @staticmethod
+    def _on_open(connection):
+        for subscription, pair in connection.subscriptions.items():
+            if pair:
+                connection.send({
+                    'event': 'subscribe',
+                    'subscription': {
+                        'name': subscription
+                    },
+                    'pair': list(pair)
+                })
+
+    @staticmethod
+    def _on_open_private(connection):
+        for subscription in connection.subscriptions:
+            connection.send({
+                'event': 'subscribe',
+                'subscription': {
+                    'name': subscription,
+                    'token': connection.token
+                }
+            })
+
+    def subscribe_public(self, subscription, pair, callback):
+        id_ = "_".join([subscription])
+
+        if id_ not in self._conns:
+            self._start_socket(id_, subscription, pair, callback)
+        else:
+            NetworkCore.inst().call(self.send_subscribe, id_, subscription, pair)
+
+    def unsubscribe_public(self, subscription, pair):
+        id_ = "_".join([subscription])
+
+        if id_ in self._conns:
+            NetworkCore.inst().call(self.send_unsubscribe, id_, subscription, pair)
+
+    def stop_socket(self, conn_key):
+        if conn_key not in self._conns:
+            return
+
+        self._conns[conn_key].disconnect()
+        del self._conns[conn_key]
+
+    def stop_private_socket(self, conn_key):
+        if conn_key not in self._private_conns:
+            return
+
+        self._private_conns[conn_key].disconnect()
+        del self._private_conns[conn_key]
+
+    def start(self):
+        # no thread, shared loop started once
+        NetworkCore.inst().start()
+
+    def run(self):
+        pass
+
+    def stop(self):
+        self.close()
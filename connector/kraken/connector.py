@@ -14,6 +14,8 @@ import hmac
 
 from datetime import datetime, timedelta
 from common.utils import UTC
+from common.httpsession import create_session
+from common.netcore import NetworkCore
 
 from __init__ import APP_VERSION, APP_SHORT_NAME
 
@@ -207,13 +209,17 @@ class Connector(object):
     def connect(self, use_ws=True):
         # Prepare HTTPS session
         if self._session is None:
-            self._session = requests.Session()
-            self._session.headers.update({'user-agent': "%s-%s" % (APP_SHORT_NAME,
-                                                                   '.'.join([str(x) for x in APP_VERSION]))})
+            # POST queries are not retried by the session (orders), look at the retry of the queries
+            self._session = create_session('kraken.com', headers={
+                'user-agent': "%s-%s" % (APP_SHORT_NAME, '.'.join([str(x) for x in APP_VERSION]))})
 
         if self._ws is None and use_ws:
             # only subscribe to available instruments
-            self._ws = WssClient(self.__api_key, self.__api_secret)
+            if NetworkCore.inst().enabled:
+                from .aiows import AsyncWssClient
+                self._ws = AsyncWssClient(self.__api_key, self.__api_secret)
+            else:
+                self._ws = WssClient(self.__api_key, self.__api_secret)
 
     def disconnect(self):
         if self._ws:
@@ -12,6 +12,7 @@ from autobahn.twisted.websocket import WebSocketClientFactory, WebSocketClientPr
 from twisted.internet import reactor, ssl
 from twisted.internet.protocol import ReconnectingClientFactory
 
+from common.codec import loads
 from monitor.service import MonitorService
 
 logger = logging.getLogger('siis.kraken.ws')
@@ -50,7 +51,7 @@ class KrakenClientProtocol(WebSocketClientProtocol):
     def onMessage(self, payload, isBinary):
         if not isBinary:
             try:
-                payload_obj = json.loads(payload.decode('utf8'))
+                payload_obj = loads(payload)
             except ValueError:
                 pass
             else:
@@ -95,7 +96,7 @@ class KrakenPrivateClientProtocol(WebSocketClientProtocol):
     def onMessage(self, payload, isBinary):
         if not isBinary:
             try:
-                payload_obj = json.loads(payload.decode('utf8'))
+                payload_obj = loads(payload)
             except ValueError:
                 pass
             else:
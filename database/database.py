@@ -5,7 +5,10 @@
 
 from __future__ import annotations
 
-from typing import Tuple, Optional, Union, List
+from typing import TYPE_CHECKING, Tuple, Optional, Union, List, Dict
+
+if TYPE_CHECKING:
+    from trader.market import Market
 
 import time
 import threading
@@ -120,6 +123,8 @@ class Database(object):
 
     OHLC_CLEANUP_DELAY = 4 * 60 * 60  # each 4 hours
 
+    BULK_INSERT_SIZE = 5000  # max rows per insert query for bulk saves
+
     # from lesser to higher timeframe, higher timeframes are never purged
     OHLC_HOLD_DURATION = (
         (5 * 60, 8 * 24 * 60 * 60),  # until 5m keep for 8 days
@@ -380,6 +385,26 @@ class Database(object):
         with self._condition:
             self._condition.notify()
 
+    def store_market_trade_array(self, broker_id: str, market_id: str, ticks):
+        """
+        Synchronous write of an array of ticks/trades ordered by timestamp, directly into the binary (and text if
+        configured) month files, bypassing the pending queue.
+
+        @param broker_id: str broker_id (not empty)
+        @param market_id: str market_id (not empty)
+        @param ticks: Structured array with fields t (timestamp in seconds), b, a, l, v, d (see TickStorage).
+        """
+        with self._mutex:
+            key = broker_id+'/'+market_id
+            tick_storage = self._tick_storages.get(key)
+
+            if not tick_storage:
+                tick_storage = TickStorage(self._markets_path, broker_id, market_id,
+                                           text=self._store_trade_text, binary=self._store_trade_binary)
+                self._tick_storages[key] = tick_storage
+
+        tick_storage.write_array(ticks)
+
     def num_pending_ticks_storage(self) -> int:
         """
         Return current pending tick list size, for storage.
@@ -571,6 +596,33 @@ class Database(object):
             with self._condition:
                 self._condition.notify()
 
+    #
+    # bulk saves
+    #
+
+    def bulk_store_market_ohlc(self, data: List[Tuple[str, str, int, int, str, str, str, str, str, str]]):
+        """
+        Synchronous insert of many OHLCs at once, bypassing the pending queue. Same format as store_market_ohlc.
+        Mostly for tools generating a large amount of bars, the call returns once the rows are committed.
+        Default implementation pushes to the asynchronous queue.
+
+        @note Replace if exists.
+        @note Must not be used concurrently with the asynchronous insert of OHLCs from another thread.
+        @raise DatabaseException in case of failure.
+        """
+        self.store_market_ohlc(list(data))
+
+    def bulk_store_market_range_bar(self, data: List[Tuple[str, str, int, int, int, str, str, str, str, str]]):
+        """
+        Synchronous insert of many range-bars at once, bypassing the pending queue.
+        Same format as store_market_range_bar. Default implementation pushes to the asynchronous queue.
+
+        @note Replace if exists.
+        @note Must not be used concurrently with the asynchronous insert of range-bars from another thread.
+        @raise DatabaseException in case of failure.
+        """
+        self.store_market_range_bar(list(data))
+
     #
     # economic event
     #
@@ -602,6 +654,20 @@ class Database(object):
         with self._condition:
             self._condition.notify()
 
+    def load_market_infos(self, service, broker_id: str, market_ids: List[str]):
+        """
+        Load the market info of many markets, in a single query. A signal is notified per market.
+        @param service to be notified once done
+        @param broker_id:
+        @param market_ids:
+        """
+        with self._mutex:
+            for market_id in market_ids:
+                self._pending_market_info_select.append((service, broker_id, market_id))
+
+        with self._condition:
+            self._condition.notify()
+
     def load_market_ohlc(self, service, broker_id: str, market_id: str, analyser_name: str, timeframe: float,
                          from_datetime: Optional[datetime] = None, to_datetime: Optional[datetime] = None):
         """
@@ -793,6 +859,13 @@ class Database(object):
         """Load and return market info data."""
         return None
 
+    def get_market_infos(self, broker_id: str, market_ids: Optional[List[str]] = None) -> Dict[str, Market]:
+        """
+        Load and return the market info data of many markets (or any markets of the broker if None),
+        indexed by market identifier.
+        """
+        return {}
+
     #
     # Tick and ohlc streamer
     #
@@ -916,6 +989,16 @@ class Database(object):
         with self._condition:
             self._condition.notify()
 
+    def delete_user_trade(self, broker_id: str, account_id: str, market_id: str, strategy_id: str, trade_id: int):
+        """
+        Delete a single user trade for a specific strategy_id / broker_id / account_id / market_id.
+        """
+        with self._mutex:
+            self._pending_user_trade_delete.append((broker_id, account_id, market_id, strategy_id, trade_id))
+
+        with self._condition:
+            self._condition.notify()
+
     def store_user_trader(self, data: Tuple[str, str, str, str, int, dict, dict, dict]):
         """
         @param data: is a tuple or an array of tuples containing data in that order and format :
@@ -0,0 +1,374 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Time-indexed economic events cache with filtered indexes, shared in the process.
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import threading
+
+import numpy as np
+
+from datetime import datetime
+
+from watcher.event import EconomicEvent
+
+import logging
+logger = logging.getLogger('siis.database.economiceventcache')
+error_logger = logging.getLogger('siis.error.database.economiceventcache')
+
+
+class EconomicEventFilter(object):
+    """
+    Immutable filter of economic events, by country, currency, min level and codes.
+    An empty country, currency or codes means any. It is hashable to cache its index.
+    """
+
+    __slots__ = '_countries', '_currencies', '_min_level', '_codes', '_key'
+
+    def __init__(self, country: Optional[str] = None, currency: Optional[str] = None, min_level: int = 0,
+                 codes: Optional[Sequence[str]] = None):
+        """
+        @param country: A country or comma separated countries.
+        @param currency: A currency or comma separated currencies.
+        @param min_level: Min level of importance (1 low, 2 medium, 3 high).
+        @param codes: Optional list of events codes.
+        """
+        self._countries = frozenset(c.strip() for c in country.split(',') if c.strip()) if country else frozenset()
+        self._currencies = frozenset(c.strip() for c in currency.split(',') if c.strip()) if currency else frozenset()
+        self._min_level = min_level or 0
+        self._codes = frozenset(codes) if codes else frozenset()
+
+        self._key = (self._countries, self._currencies, self._min_level, self._codes)
+
+    @property
+    def countries(self) -> frozenset:
+        return self._countries
+
+    @property
+    def currencies(self) -> frozenset:
+        return self._currencies
+
+    @property
+    def min_level(self) -> int:
+        return self._min_level
+
+    @property
+    def codes(self) -> frozenset:
+        return self._codes
+
+    def accept(self, economic_event: EconomicEvent) -> bool:
+        if self._currencies and economic_event.currency not in self._currencies:
+            return False
+
+        if self._countries and economic_event.country not in self._countries:
+            return False
+
+        if self._min_level and economic_event.level < self._min_level:
+            return False
+
+        if self._codes and economic_event.code not in self._codes:
+            return False
+
+        return True
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __eq__(self, other):
+        return isinstance(other, EconomicEventFilter) and self._key == other._key
+
+
+class EconomicEventCache(object):
+    """
+    Economic events of the process sorted by timestamp, shared by the strategy traders and the backtest feeders.
+
+    Columns arrays (timestamp, level, country bit, currency bit) are kept aligned with the list of events.
+    Countries and currencies are mapped to a bit of an int64, a filter is then made of two bitmasks and a level,
+    evaluated once for all the events, giving the sorted positions of the qualifying events.
+    This index is cached per filter until the next insertion, then next/previous qualifying event is a binary search.
+
+    The events are loaded from the database for a range (load) and completed by the live events (add).
+
+    @note Events are shared and must not be modified.
+    """
+
+    MAX_BITS = 63  # countries or currencies beyond are matched by value, slower but correct
+
+    __instance = None
+
+    @classmethod
+    def inst(cls) -> EconomicEventCache:
+        if EconomicEventCache.__instance is None:
+            EconomicEventCache.__instance = EconomicEventCache()
+
+        return EconomicEventCache.__instance
+
+    @classmethod
+    def terminate(cls):
+        EconomicEventCache.__instance = None
+
+    def __init__(self):
+        self._mutex = threading.RLock()
+
+        self._events: List[EconomicEvent] = []
+        self._keys = set()  # (code, timestamp, country) to ignore duplicates
+
+        self._timestamps = np.empty(0, dtype=np.float64)
+        self._levels = np.empty(0, dtype=np.int8)
+        self._country_bits = np.empty(0, dtype=np.int64)
+        self._currency_bits = np.empty(0, dtype=np.int64)
+
+        self._country_ids: Dict[str, int] = {}
+        self._currency_ids: Dict[str, int] = {}
+
+        self._indexes: Dict[EconomicEventFilter, Tuple[np.ndarray, np.ndarray]] = {}
+
+        self._loaded: List[Tuple[float, float]] = []  # loaded ranges from the database
+
+    def __len__(self):
+        return len(self._events)
+
+    #
+    # feeding
+    #
+
+    def load(self, from_date: datetime, to_date: datetime) -> int:
+        """
+        Load the economic events of a range from the database, if not already loaded.
+        @return Number of new events.
+        """
+        from_ts, to_ts = from_date.timestamp(), to_date.timestamp()
+
+        with self._mutex:
+            for loaded_from, loaded_to in self._loaded:
+                if loaded_from <= from_ts and to_ts <= loaded_to:
+                    return 0
+
+        from database.database import Database
+
+        # any country, currency and level
+        streamer = Database.inst().create_economic_event_streamer("", "", 0, from_date, to_date)
+
+        # dates are stored as minutes string
+        events = streamer.query(from_date.strftime('%Y-%m-%dT%H:%M'), to_date.strftime('%Y-%m-%dT%H:%M'), None)
+
+        with self._mutex:
+            n = self.add(events)
+            self._loaded.append((from_ts, to_ts))
+
+        logger.debug("Loaded %i economic events from %s to %s" % (n, from_date, to_date))
+
+        return n
+
+    def add(self, economic_events) -> int:
+        """
+        Insert one or many economic events, ignoring the already known ones.
+        @return Number of new events.
+        """
+        if isinstance(economic_events, EconomicEvent):
+            economic_events = [economic_events]
+
+        with self._mutex:
+            news = []
+
+            for economic_event in economic_events:
+                if economic_event is None or economic_event.date is None:
+                    continue
+
+                key = (economic_event.code, economic_event.date.timestamp(), economic_event.country)
+                if key in self._keys:
+                    continue
+
+                self._keys.add(key)
+                news.append(economic_event)
+
+            if not news:
+                return 0
+
+            news.sort(key=lambda evt: evt.date.timestamp())
+
+            timestamps = np.array([evt.date.timestamp() for evt in news], dtype=np.float64)
+            levels = np.array([evt.level for evt in news], dtype=np.int8)
+            country_bits = np.array([self._bit(self._country_ids, evt.country) for evt in news], dtype=np.int64)
+            currency_bits = np.array([self._bit(self._currency_ids, evt.currency) for evt in news], dtype=np.int64)
+
+            if len(self._events) and timestamps[0] < self._timestamps[-1]:
+                # insert in order, stable for the events at the same time
+                positions = np.searchsorted(self._timestamps, timestamps, side='right')
+
+                self._timestamps = np.insert(self._timestamps, positions, timestamps)
+                self._levels = np.insert(self._levels, positions, levels)
+                self._country_bits = np.insert(self._country_bits, positions, country_bits)
+                self._currency_bits = np.insert(self._currency_bits, positions, currency_bits)
+
+                events = self._events
+                merged = []
+                i = 0
+
+                for position, evt in zip(positions.tolist(), news):
+                    merged.extend(events[i:position])
+                    merged.append(evt)
+                    i = position
+
+                merged.extend(events[i:])
+                self._events = merged
+            else:
+                # common case, append newer
+                self._timestamps = np.concatenate((self._timestamps, timestamps))
+                self._levels = np.concatenate((self._levels, levels))
+                self._country_bits = np.concatenate((self._country_bits, country_bits))
+                self._currency_bits = np.concatenate((self._currency_bits, currency_bits))
+
+                self._events.extend(news)
+
+            # positions changed
+            self._indexes.clear()
+
+            return len(news)
+
+    #
+    # queries
+    #
+
+    def next_event(self, event_filter: EconomicEventFilter, timestamp: float) -> Optional[EconomicEvent]:
+        """
+        First qualifying event at or after the timestamp, in O(log n) once the filter is indexed.
+        """
+        with self._mutex:
+            timestamps, positions = self._index(event_filter)
+
+            i = np.searchsorted(timestamps, timestamp, side='left')
+            return self._events[positions[i]] if i < len(positions) else None
+
+    def previous_event(self, event_filter: EconomicEventFilter, timestamp: float) -> Optional[EconomicEvent]:
+        """
+        Last qualifying event strictly before the timestamp, in O(log n) once the filter is indexed.
+        """
+        with self._mutex:
+            timestamps, positions = self._index(event_filter)
+
+            i = np.searchsorted(timestamps, timestamp, side='left')
+            return self._events[positions[i-1]] if i > 0 else None
+
+    def events_between(self, event_filter: EconomicEventFilter, from_ts: float, to_ts: float) -> List[EconomicEvent]:
+        """
+        Qualifying events from (included) to (included) timestamps, ordered by time.
+        """
+        with self._mutex:
+            timestamps, positions = self._index(event_filter)
+
+            lo = np.searchsorted(timestamps, from_ts, side='left')
+            hi = np.searchsorted(timestamps, to_ts, side='right')
+
+            return [self._events[p] for p in positions[lo:hi].tolist()]
+
+    def create_streamer(self, event_filter: EconomicEventFilter, from_date: datetime,
+                        to_date: datetime) -> EconomicEventCacheStreamer:
+        """
+        Streamer of the qualifying events, for the backtesting feeders, in place of a database streamer.
+        """
+        return EconomicEventCacheStreamer(self, event_filter, from_date, to_date)
+
+    #
+    # internal
+    #
+
+    def _bit(self, ids: Dict[str, int], value: str) -> int:
+        bit = ids.get(value)
+        if bit is None:
+            bit = ids[value] = len(ids)
+
+        return 1 << bit if bit < EconomicEventCache.MAX_BITS else 0
+
+    def _mask(self, ids: Dict[str, int], values: frozenset) -> Tuple[int, bool]:
+        """Bitmask of the values, and True if some values have no bit (then matched by value)."""
+        mask = 0
+        overflow = False
+
+        for value in values:
+            bit = ids.get(value)
+            if bit is None:
+                continue
+
+            if bit < EconomicEventCache.MAX_BITS:
+                mask |= 1 << bit
+            else:
+                overflow = True
+
+        return mask, overflow
+
+    def _index(self, event_filter: EconomicEventFilter) -> Tuple[np.ndarray, np.ndarray]:
+        index = self._indexes.get(event_filter)
+        if index is not None:
+            return index
+
+        selected = np.ones(len(self._events), dtype=bool)
+
+        if event_filter.min_level:
+            selected &= self._levels >= event_filter.min_level
+
+        if event_filter.countries:
+            mask, overflow = self._mask(self._country_ids, event_filter.countries)
+            matched = (self._country_bits & mask) != 0
+            if overflow:
+                matched |= np.array([evt.country in event_filter.countries for evt in self._events], dtype=bool)
+            selected &= matched
+
+        if event_filter.currencies:
+            mask, overflow = self._mask(self._currency_ids, event_filter.currencies)
+            matched = (self._currency_bits & mask) != 0
+            if overflow:
+                matched |= np.array([evt.currency in event_filter.currencies for evt in self._events], dtype=bool)
+            selected &= matched
+
+        if event_filter.codes:
+            selected &= np.array([evt.code in event_filter.codes for evt in self._events], dtype=bool)
+
+        positions = np.flatnonzero(selected)
+        index = self._indexes[event_filter] = (self._timestamps[positions], positions)
+
+        return index
+
+
+class EconomicEventCacheStreamer(object):
+    """
+    Stream the qualifying events of the cache, same interface as EconomicEventStreamer.
+    Events inserted into the cache before the cursor are ignored.
+    """
+
+    def __init__(self, cache: EconomicEventCache, event_filter: EconomicEventFilter,
+                 from_date: datetime, to_date: Optional[datetime]):
+        self._cache = cache
+        self._filter = event_filter
+
+        self._from_date = from_date
+        self._to_date = to_date
+
+        self._cursor = from_date.timestamp()  # next event at or after
+        self._to_ts = to_date.timestamp() if to_date else float('inf')
+
+    @property
+    def from_date(self):
+        return self._from_date
+
+    @property
+    def to_date(self):
+        return self._to_date
+
+    def finished(self):
+        return self._cursor > self._to_ts
+
+    def next(self, timestamp: float) -> List[EconomicEvent]:
+        if timestamp < self._cursor:
+            return []
+
+        to_ts = min(timestamp, self._to_ts)
+        results = self._cache.events_between(self._filter, self._cursor, to_ts)
+
+        # strictly after the last returned
+        self._cursor = np.nextafter(to_ts, np.inf)
+
+        return results
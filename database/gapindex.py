@@ -0,0 +1,149 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Persistent index of missing ranges of data per market
+
+import os
+import json
+import pathlib
+
+from typing import List, Tuple, Optional
+
+import logging
+logger = logging.getLogger('siis.database.gapindex')
+error_logger = logging.getLogger('siis.error.database.gapindex')
+
+
+class GapIndex(object):
+    """
+    Index of the missing ranges (gaps) of ticks or OHLCs of a market, per timeframe.
+    It is written by the optimizer tool and consumed by the fetcher tool to back-fill only the missing ranges.
+
+    The file is located into the market data directory : <markets-path>/<broker>/<market>/gaps.json
+
+    For each timeframe it contains the scanned ranges and the list of missing ranges.
+    A missing range is a tuple (from, to) of timestamps in seconds, both included,
+    from the first missing sample to the last missing sample.
+
+    @note The key of a timeframe is its value in seconds formatted with %g, "0" for ticks.
+    """
+
+    VERSION = 1
+
+    def __init__(self, markets_path: str, broker_id: str, market_id: str):
+        self._path = pathlib.Path(markets_path, broker_id, market_id.replace('/', ''), "gaps.json")
+        self._data = {}
+
+    @staticmethod
+    def key(timeframe: float) -> str:
+        return "%g" % timeframe
+
+    @property
+    def path(self) -> pathlib.Path:
+        return self._path
+
+    def load(self):
+        self._data = {}
+
+        if not self._path.exists():
+            return
+
+        try:
+            with open(str(self._path), "rt") as f:
+                data = json.load(f)
+
+            if data.get('version') == GapIndex.VERSION:
+                self._data = data.get('timeframes', {})
+        except (OSError, ValueError) as e:
+            error_logger.error("Unable to load gap index %s : %s" % (self._path, repr(e)))
+
+    def save(self):
+        if not self._path.parent.exists():
+            self._path.parent.mkdir(parents=True)
+
+        tmp_pathname = str(self._path) + ".tmp"
+
+        try:
+            with open(tmp_pathname, "wt") as f:
+                json.dump({'version': GapIndex.VERSION, 'timeframes': self._data}, f)
+
+            # atomic replace
+            os.replace(tmp_pathname, str(self._path))
+        except OSError as e:
+            error_logger.error("Unable to save gap index %s : %s" % (self._path, repr(e)))
+
+    def gaps(self, timeframe: float, from_ts: Optional[float] = None,
+             to_ts: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        Missing ranges of a timeframe intersecting [from_ts, to_ts], clipped to this range.
+        """
+        results = []
+
+        for gap_from, gap_to in self._data.get(GapIndex.key(timeframe), {}).get('gaps', []):
+            if from_ts is not None:
+                if gap_to < from_ts:
+                    continue
+
+                gap_from = max(gap_from, from_ts)
+
+            if to_ts is not None:
+                if gap_from > to_ts:
+                    continue
+
+                gap_to = min(gap_to, to_ts)
+
+            results.append((gap_from, gap_to))
+
+        return results
+
+    def scanned(self, timeframe: float) -> List[Tuple[float, float]]:
+        """
+        Ranges of a timeframe scanned by the optimizer.
+        """
+        return [tuple(r) for r in self._data.get(GapIndex.key(timeframe), {}).get('scans', [])]
+
+    def update(self, timeframe: float, from_ts: float, to_ts: float, gaps: List[Tuple[float, float]]):
+        """
+        Replace the missing ranges of a scanned range [from_ts, to_ts] by a new list of gaps.
+        """
+        entry = self._data.setdefault(GapIndex.key(timeframe), {'scans': [], 'gaps': []})
+
+        entry['scans'] = GapIndex._merge(entry['scans'] + [[from_ts, to_ts]])
+        entry['gaps'] = sorted(GapIndex._subtract(entry['gaps'], from_ts, to_ts) + [[g[0], g[1]] for g in gaps])
+
+    def remove(self, timeframe: float, from_ts: float, to_ts: float):
+        """
+        Remove a range of missing data, once it was back-filled.
+        """
+        entry = self._data.get(GapIndex.key(timeframe))
+        if entry:
+            entry['gaps'] = GapIndex._subtract(entry['gaps'], from_ts, to_ts)
+
+    @staticmethod
+    def _merge(ranges: List[List[float]]) -> List[List[float]]:
+        results = []
+
+        for r_from, r_to in sorted(ranges):
+            if results and r_from <= results[-1][1]:
+                results[-1][1] = max(results[-1][1], r_to)
+            else:
+                results.append([r_from, r_to])
+
+        return results
+
+    @staticmethod
+    def _subtract(ranges: List[List[float]], from_ts: float, to_ts: float) -> List[List[float]]:
+        results = []
+
+        for r_from, r_to in ranges:
+            if r_to < from_ts or r_from > to_ts:
+                results.append([r_from, r_to])
+                continue
+
+            # keep the parts outside of the range
+            if r_from < from_ts:
+                results.append([r_from, from_ts])
+            if r_to > to_ts:
+                results.append([to_ts, r_to])
+
+        return results
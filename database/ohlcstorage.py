@@ -12,6 +12,8 @@ import copy
 import threading
 import collections
 
+import numpy as np
+
 from datetime import datetime, timedelta
 
 from instrument.instrument import Candle
@@ -358,6 +360,33 @@ class OhlcStreamer(object):
 
         return ohlcs
 
+    def query_array(self, timeframe, from_date, to_date) -> np.ndarray:
+        """
+        Query ohlcs for a timeframe into a 2d array, without creating any Candle object.
+        Columns are : timestamp (in seconds), open, high, low, close, spread, volume.
+        @param timeframe:
+        @param from_date Included
+        @param to_date Included
+        """
+        cursor = self._db.cursor()
+
+        try:
+            from_ts = int(from_date.timestamp() * 1000.0)
+            to_ts = int(to_date.timestamp() * 1000.0)
+            self.query_from_to(cursor, timeframe, from_ts, to_ts)
+        except Exception as e:
+            logger.error(repr(e))
+            return np.empty((0, 7))
+
+        rows = cursor.fetchall()
+        if not rows:
+            return np.empty((0, 7))
+
+        results = np.array(rows, dtype=np.float64).reshape(len(rows), 7)
+        results[:, 0] *= 0.001  # to float second timestamp
+
+        return results
+
     def query_all(self, cursor, timeframe):
         cursor.execute("""SELECT timestamp, open, high, low, close, spread, volume FROM ohlc
                             WHERE broker_id = '%s' AND market_id = '%s' AND timeframe = %s ORDER BY timestamp ASC""" % (
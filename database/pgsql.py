@@ -8,7 +8,7 @@ import time
 from datetime import datetime
 
 from importlib import import_module
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 
 from common.signal import Signal
 
@@ -447,78 +447,100 @@ class PgSql(Database):
         return user_closed_trades
 
     def get_market_info(self, broker_id: str, market_id: str):
-        market_info = None
+        return self.get_market_infos(broker_id, [market_id]).get(market_id)
+
+    def get_market_infos(self, broker_id: str, market_ids: Optional[List[str]] = None) -> Dict[str, Market]:
+        market_infos = {}
 
         try:
             cursor = self._db.cursor()
+            market_infos = self._query_market_infos(cursor, broker_id, market_ids)
+        except self.psycopg2.OperationalError as e:
+            error_logger.error(e)
+        except Exception as e:
+            self.on_error(e)
 
-            cursor.execute("""SELECT symbol,
-                                market_type, unit_type, contract_type,
-                                trade_type, orders,
-                                base, base_display, base_precision,
-                                quote, quote_display, quote_precision,
-                                settlement, settlement_display, settlement_precision,
-                                expiry, timestamp,
-                                lot_size, contract_size, base_exchange_rate,
-                                value_per_pip, one_pip_means, margin_factor,
-                                min_size, max_size, step_size,
-                                min_notional, max_notional, step_notional,
-                                min_price, max_price, step_price,
-                                maker_fee, taker_fee, 
-                                maker_commission, taker_commission,
-                                flags FROM market
-                            WHERE broker_id = '%s' AND market_id = '%s'""" % (
-                broker_id, market_id))
-
-            row = cursor.fetchone()
-
-            if row:
-                market_info = Market(market_id, row[0])
-
-                market_info.is_open = True
-
-                market_info.market_type = row[1]
-                market_info.unit_type = row[2]
-                market_info.contract_type = row[3]
-
-                market_info.trade = row[4]
-                market_info.orders = row[5]
-
-                market_info.set_base(row[6], row[7], int(row[8]))
-                market_info.set_quote(row[9], row[10], int(row[11]))
-                market_info.set_settlement(row[12], row[13], int(row[14]))
-
-                market_info.expiry = row[15]
-                market_info.last_update_time = row[16] * 0.001
-
-                market_info.lot_size = float(row[17])
-                market_info.contract_size = float(row[18])
-                market_info.base_exchange_rate = float(row[19])
-                market_info.value_per_pip = float(row[20])
-                market_info.one_pip_means = float(row[21])
-
-                if row[22] is not None or row[22] != 'None':
-                    if row[22] == '-':  # not defined mean 1.0 or no margin
-                        market_info.margin_factor = 1.0
-                    else:
-                        market_info.margin_factor = float(row[22] or "1.0")
+        return market_infos
 
-                market_info.set_size_limits(float(row[23]), float(row[24]), float(row[25]))
-                market_info.set_notional_limits(float(row[26]), float(row[27]), float(row[28]))
-                market_info.set_price_limits(float(row[29]), float(row[30]), float(row[31]))
+    def _query_market_infos(self, cursor, broker_id: str, market_ids: Optional[List[str]]) -> Dict[str, Market]:
+        """
+        Select the market info of many markets (or any markets of the broker if None) in a single query.
+        @return Dict of Market per market identifier, the not found market are missing.
+        """
+        if market_ids is not None and not market_ids:
+            return {}
+
+        query = """SELECT market_id, symbol,
+                        market_type, unit_type, contract_type,
+                        trade_type, orders,
+                        base, base_display, base_precision,
+                        quote, quote_display, quote_precision,
+                        settlement, settlement_display, settlement_precision,
+                        expiry, timestamp,
+                        lot_size, contract_size, base_exchange_rate,
+                        value_per_pip, one_pip_means, margin_factor,
+                        min_size, max_size, step_size,
+                        min_notional, max_notional, step_notional,
+                        min_price, max_price, step_price,
+                        maker_fee, taker_fee,
+                        maker_commission, taker_commission,
+                        flags FROM market
+                    WHERE broker_id = '%s'""" % broker_id
+
+        if market_ids is not None:
+            query += " AND market_id IN (%s)" % ','.join(["'%s'" % market_id for market_id in market_ids])
+
+        cursor.execute(query)
+
+        market_infos = {}
+
+        for row in cursor.fetchall():
+            market_infos[row[0]] = self._market_info_from_row(row[0], row[1:])
+
+        return market_infos
+
+    def _market_info_from_row(self, market_id: str, row) -> Market:
+        market_info = Market(market_id, row[0])
+
+        market_info.is_open = True
+
+        market_info.market_type = row[1]
+        market_info.unit_type = row[2]
+        market_info.contract_type = row[3]
+
+        market_info.trade = row[4]
+        market_info.orders = row[5]
+
+        market_info.set_base(row[6], row[7], int(row[8]))
+        market_info.set_quote(row[9], row[10], int(row[11]))
+        market_info.set_settlement(row[12], row[13], int(row[14]))
+
+        market_info.expiry = row[15]
+        market_info.last_update_time = row[16] * 0.001
+
+        market_info.lot_size = float(row[17])
+        market_info.contract_size = float(row[18])
+        market_info.base_exchange_rate = float(row[19])
+        market_info.value_per_pip = float(row[20])
+        market_info.one_pip_means = float(row[21])
+
+        if row[22] is not None or row[22] != 'None':
+            if row[22] == '-':  # not defined mean 1.0 or no margin
+                market_info.margin_factor = 1.0
+            else:
+                market_info.margin_factor = float(row[22] or "1.0")
 
-                market_info.maker_fee = float(row[32])
-                market_info.taker_fee = float(row[33])
+        market_info.set_size_limits(float(row[23]), float(row[24]), float(row[25]))
+        market_info.set_notional_limits(float(row[26]), float(row[27]), float(row[28]))
+        market_info.set_price_limits(float(row[29]), float(row[30]), float(row[31]))
 
-                market_info.maker_commission = float(row[34])
-                market_info.taker_commission = float(row[35])
+        market_info.maker_fee = float(row[32])
+        market_info.taker_fee = float(row[33])
 
-                market_info.flags_from_int(row[36])
+        market_info.maker_commission = float(row[34])
+        market_info.taker_commission = float(row[35])
 
-        except self.psycopg2.OperationalError as e:
-            error_logger.error(e)
-        except Exception as e:
-            self.on_error(e)
+        market_info.flags_from_int(row[36])
 
         return market_info
 
@@ -614,77 +636,22 @@ class PgSql(Database):
             self._pending_market_info_select = []
 
         if mis:
-            try:
-                for mi in mis:
-                    cursor = self._db.cursor()
-
-                    cursor.execute("""SELECT symbol,
-                                        market_type, unit_type, contract_type,
-                                        trade_type, orders,
-                                        base, base_display, base_precision,
-                                        quote, quote_display, quote_precision,
-                                        settlement, settlement_display, settlement_precision,
-                                        expiry, timestamp,
-                                        lot_size, contract_size, base_exchange_rate,
-                                        value_per_pip, one_pip_means, margin_factor,
-                                        min_size, max_size, step_size,
-                                        min_notional, max_notional, step_notional,
-                                        min_price, max_price, step_price,
-                                        maker_fee, taker_fee, 
-                                        maker_commission, taker_commission, flags
-                                        FROM market
-                                    WHERE broker_id = '%s' AND market_id = '%s'""" % (
-                                        mi[1], mi[2]))
-
-                    row = cursor.fetchone()
-
-                    if row:
-                        market_info = Market(mi[2], row[0])
-
-                        market_info.is_open = True
-
-                        market_info.market_type = row[1]
-                        market_info.unit_type = row[2]
-                        market_info.contract_type = row[3]
-
-                        market_info.trade = row[4]
-                        market_info.orders = row[5]
+            # a single query per service and broker for all the pending markets
+            requests = {}
 
-                        market_info.set_base(row[6], row[7], int(row[8]))
-                        market_info.set_quote(row[9], row[10], int(row[11]))
-                        market_info.set_settlement(row[12], row[13], int(row[14]))
+            for mi in mis:
+                requests.setdefault((mi[0], mi[1]), []).append(mi[2])
 
-                        market_info.expiry = row[15]
-                        market_info.last_update_time = row[16] * 0.001
-
-                        market_info.lot_size = float(row[17])
-                        market_info.contract_size = float(row[18])
-                        market_info.base_exchange_rate = float(row[19])
-                        market_info.value_per_pip = float(row[20])
-                        market_info.one_pip_means = float(row[21])
-
-                        if row[22] is not None or row[22] != 'None':
-                            if row[22] == '-':  # not defined mean 1.0 or no margin
-                                market_info.margin_factor = 1.0
-                            else:
-                                market_info.margin_factor = float(row[22] or "1.0")
-
-                        market_info.set_size_limits(float(row[23]), float(row[24]), float(row[25]))
-                        market_info.set_notional_limits(float(row[26]), float(row[27]), float(row[28]))
-                        market_info.set_price_limits(float(row[29]), float(row[30]), float(row[31]))
-
-                        market_info.maker_fee = float(row[32])
-                        market_info.taker_fee = float(row[33])
-
-                        market_info.maker_commission = float(row[34])
-                        market_info.taker_commission = float(row[35])
+            try:
+                cursor = self._db.cursor()
 
-                        market_info.flags_from_int(row[36])
-                    else:
-                        market_info = None
+                for (service, broker_id), market_ids in requests.items():
+                    market_infos = self._query_market_infos(cursor, broker_id, market_ids)
 
-                    # notify
-                    mi[0].notify(Signal.SIGNAL_MARKET_INFO_DATA, mi[1], (mi[2], market_info))
+                    # notify per market, None if not found
+                    for market_id in market_ids:
+                        market_info = market_infos.get(market_id)
+                        service.notify(Signal.SIGNAL_MARKET_INFO_DATA, broker_id, (market_id, market_info))
             except self.psycopg2.OperationalError as e:
                 self.try_reconnect(e)
 
@@ -870,8 +837,14 @@ class PgSql(Database):
 
                 # and cleanup
                 for ut in utd:
-                    cursor.execute("""DELETE FROM user_trade WHERE
-                        broker_id = '%s' AND account_id = '%s' AND strategy_id = '%s'""" % (ut[0], ut[1], ut[2]))
+                    if len(ut) > 3:
+                        # a single trade
+                        cursor.execute("""DELETE FROM user_trade WHERE
+                            broker_id = '%s' AND account_id = '%s' AND market_id = '%s' AND strategy_id = '%s' AND
+                            trade_id = %i""" % (ut[0], ut[1], ut[2], ut[3], ut[4]))
+                    else:
+                        cursor.execute("""DELETE FROM user_trade WHERE
+                            broker_id = '%s' AND account_id = '%s' AND strategy_id = '%s'""" % (ut[0], ut[1], ut[2]))
 
                 self._db.commit()
             except self.psycopg2.OperationalError as e:
@@ -1460,6 +1433,72 @@ class PgSql(Database):
     #         raise DatabaseException("Unable to get a range of cached Volume Profile for %s %s" % (broker_id, market_id))
     #
 
+    #
+    # bulk saves
+    #
+
+    def bulk_store_market_ohlc(self, data):
+        if not data:
+            return
+
+        try:
+            cursor = self._db.cursor()
+
+            for i in range(0, len(data), Database.BULK_INSERT_SIZE):
+                elts = []
+                keys = set()
+
+                for mk in data[i:i+Database.BULK_INSERT_SIZE]:
+                    if (mk[0], mk[1], mk[2], mk[3]) not in keys:
+                        elts.append("('%s', '%s', %i, %i, '%s', '%s', '%s', '%s', '%s', '%s')" % (mk[0], mk[1], mk[2], mk[3], mk[4], mk[5], mk[6], mk[7], mk[8], mk[9]))
+                        keys.add((mk[0], mk[1], mk[2], mk[3]))
+
+                query = ' '.join(("INSERT INTO ohlc(broker_id, market_id, timestamp, timeframe, open, high, low, close, spread, volume) VALUES",
+                            ','.join(elts),
+                            "ON CONFLICT (broker_id, market_id, timestamp, timeframe) DO UPDATE SET open = EXCLUDED.open, high = EXCLUDED.high, low = EXCLUDED.low, close = EXCLUDED.close, spread = EXCLUDED.spread, volume = EXCLUDED.volume"))
+
+                cursor.execute(query)
+
+            self._db.commit()
+        except self.psycopg2.OperationalError as e:
+            self.try_reconnect(e)
+            raise DatabaseException("Unable to bulk insert OHLCs : %s" % repr(e))
+        except Exception as e:
+            error_logger.error(repr(e))
+            self._db.rollback()
+            raise DatabaseException("Unable to bulk insert OHLCs : %s" % repr(e))
+
+    def bulk_store_market_range_bar(self, data):
+        if not data:
+            return
+
+        try:
+            cursor = self._db.cursor()
+
+            for i in range(0, len(data), Database.BULK_INSERT_SIZE):
+                elts = []
+                keys = set()
+
+                for mk in data[i:i+Database.BULK_INSERT_SIZE]:
+                    if (mk[0], mk[1], mk[2], mk[4]) not in keys:
+                        elts.append("('%s', '%s', %i, %i, %i, '%s', '%s', '%s', '%s', '%s')" % (mk[0], mk[1], mk[2], mk[3], mk[4], mk[5], mk[6], mk[7], mk[8], mk[9]))
+                        keys.add((mk[0], mk[1], mk[2], mk[4]))
+
+                query = ' '.join(("INSERT INTO range_bar(broker_id, market_id, timestamp, duration, size, open, high, low, close, volume) VALUES",
+                            ','.join(elts),
+                            "ON CONFLICT (broker_id, market_id, timestamp, size) DO UPDATE SET duration = EXCLUDED.duration, open = EXCLUDED.open, high = EXCLUDED.high, low = EXCLUDED.low, close = EXCLUDED.close, volume = EXCLUDED.volume"))
+
+                cursor.execute(query)
+
+            self._db.commit()
+        except self.psycopg2.OperationalError as e:
+            self.try_reconnect(e)
+            raise DatabaseException("Unable to bulk insert range-bars : %s" % repr(e))
+        except Exception as e:
+            error_logger.error(repr(e))
+            self._db.rollback()
+            raise DatabaseException("Unable to bulk insert range-bars : %s" % repr(e))
+
     #
     # states
     #
@@ -3,6 +3,8 @@
 # @license Copyright (c) 2020 Dream Overflow
 # Quote streaming per market using file system in the same manner as TickStorage.
 
+from __future__ import annotations
+
 import os
 import time
 import threading
@@ -10,6 +12,8 @@ import pathlib
 import struct
 import collections
 
+from typing import Optional
+
 import numpy as np
 
 from datetime import datetime
@@ -20,6 +24,154 @@ import logging
 logger = logging.getLogger('siis.database.quotestorage')
 
 
+# binary quote record, t o h l c s v (t in second), same as the struct '<ddddddd'
+QUOTE_DTYPE = np.dtype([('t', '<f8'), ('o', '<f8'), ('h', '<f8'), ('l', '<f8'), ('c', '<f8'), ('s', '<f8'),
+                        ('v', '<f8')])
+
+
+def month_bounds(year: int, month: int):
+    """Timestamps of the beginning of the month and of the next month (UTC)."""
+    begin = datetime(year=year, month=month, day=1, tzinfo=UTC())
+
+    if month == 12:
+        end = datetime(year=year+1, month=1, day=1, tzinfo=UTC())
+    else:
+        end = datetime(year=year, month=month+1, day=1, tzinfo=UTC())
+
+    return begin.timestamp(), end.timestamp()
+
+
+class QuoteFileHeader(object):
+    """
+    Header of a binary quote file (version 2), one file per month, followed by the records (QUOTE_DTYPE).
+
+    magic(8s) version(uint16) precision(uint16) year(uint16) month(uint8) pad timeframe(double) count(int64)
+    then the index of the 31 days of the month, the first record of the day or -1 if none.
+
+    The last quote at a timestamp or the start of a range are then found with the index of its day and a binary
+    search into the records of this day only.
+    Files without the magic are of the version 1 (the records only), they are still read.
+
+    @note The records must be appended in time order.
+    """
+
+    MAGIC = b'SIISQUOT'
+    VERSION = 2
+
+    NUM_DAYS = 31
+    DAY = 86400.0
+
+    STRUCT = struct.Struct('<8sHHHBxdq31q')
+    SIZE = STRUCT.size  # 280 bytes
+
+    __slots__ = 'version', 'precision', 'year', 'month', 'timeframe', 'count', 'days'
+
+    def __init__(self, timeframe: float = 0.0, precision: int = 0, year: int = 1970, month: int = 1):
+        self.version = QuoteFileHeader.VERSION
+        self.precision = precision
+        self.year = year
+        self.month = month
+        self.timeframe = timeframe
+        self.count = 0
+        self.days = [-1] * QuoteFileHeader.NUM_DAYS
+
+    @classmethod
+    def read(cls, f) -> Optional[QuoteFileHeader]:
+        """
+        Read the header at the beginning of the file, None if the file is of the version 1 (or empty).
+        """
+        f.seek(0, 0)
+        data = f.read(QuoteFileHeader.SIZE)
+
+        if len(data) < QuoteFileHeader.SIZE or data[:8] != QuoteFileHeader.MAGIC:
+            f.seek(0, 0)
+            return None
+
+        values = QuoteFileHeader.STRUCT.unpack(data)
+
+        if values[1] > QuoteFileHeader.VERSION:
+            raise ValueError("Unsupported quote file version %i" % values[1])
+
+        header = QuoteFileHeader(values[5], values[2], values[3], values[4])
+        header.version = values[1]
+        header.count = values[6]
+        header.days = list(values[7:])
+
+        return header
+
+    def write(self, f):
+        f.seek(0, 0)
+        f.write(QuoteFileHeader.STRUCT.pack(QuoteFileHeader.MAGIC, self.version, self.precision, self.year,
+                                            self.month, self.timeframe, self.count, *self.days))
+
+    @staticmethod
+    def offset(record: int) -> int:
+        return QuoteFileHeader.SIZE + record * QuoteStreamer.QUOTE_SIZE
+
+    def day_of(self, timestamp: float) -> int:
+        """Index of the day of the month of the timestamp, -1 if before the month, NUM_DAYS if after."""
+        begin, end = month_bounds(self.year, self.month)
+
+        if timestamp < begin:
+            return -1
+        if timestamp >= end:
+            return QuoteFileHeader.NUM_DAYS
+
+        return int((timestamp - begin) // QuoteFileHeader.DAY)
+
+    def add(self, timestamp: float):
+        """Count an appended record and index its day."""
+        day = self.day_of(timestamp)
+
+        if 0 <= day < QuoteFileHeader.NUM_DAYS and self.days[day] < 0:
+            self.days[day] = self.count
+
+        self.count += 1
+
+    def index(self, timestamps: np.ndarray):
+        """Set the count and the index from the ordered timestamps of all the records."""
+        begin, end = month_bounds(self.year, self.month)
+
+        self.count = len(timestamps)
+        self.days = [-1] * QuoteFileHeader.NUM_DAYS
+
+        day_begins = begin + np.arange(QuoteFileHeader.NUM_DAYS + 1) * QuoteFileHeader.DAY
+        firsts = np.searchsorted(timestamps, day_begins, side='left')
+
+        for day in range(0, QuoteFileHeader.NUM_DAYS):
+            if firsts[day] < firsts[day+1] and day_begins[day] < end:
+                self.days[day] = int(firsts[day])
+
+    def find(self, f, timestamp: float, side: str = 'left') -> int:
+        """
+        Record index of the first quote at (left) or after (right) the timestamp, count if none.
+        Only the records of the day of the timestamp are read.
+        """
+        day = self.day_of(timestamp)
+
+        if day < 0:
+            return 0
+        if day >= QuoteFileHeader.NUM_DAYS:
+            return self.count
+
+        # first record of the following days
+        hi = self.count
+        for n in range(day+1, QuoteFileHeader.NUM_DAYS):
+            if self.days[n] >= 0:
+                hi = self.days[n]
+                break
+
+        lo = self.days[day]
+        if lo < 0:
+            # no quote this day
+            return hi
+
+        f.seek(QuoteFileHeader.offset(lo), 0)
+        records = np.frombuffer(f.read((hi - lo) * QuoteStreamer.QUOTE_SIZE), dtype=QUOTE_DTYPE)
+
+        return lo + int(np.searchsorted(records['t'], timestamp, side=side))
+
+
 class QuoteStorage(object):
     """
     Default implementation store in a single file but further one file per month.
@@ -29,13 +181,16 @@ class QuoteStorage(object):
     Price and volume should be formatted with the asset precision if possible but scientific notation
     is tolerated.
 
+    The binary files are of the version 2 (@see QuoteFileHeader), except when appending to an existing
+    file of the version 1. They can be converted with QuoteConverter.
+
     @note It is not used because main database contains OHLC, but planned for the of the data source only returns
         history as OHLC and not as tick/trade.
     """
 
     FLUSH_DELAY = 60.0
 
-    def __init__(self, markets_path, broker_id, market_id, timeframe, text=True, binary=True):
+    def __init__(self, markets_path, broker_id, market_id, timeframe, text=True, binary=True, precision=0):
         self._markets_path = markets_path
         self._mutex = threading.RLock()
 
@@ -52,9 +207,11 @@ class QuoteStorage(object):
 
         self._text_file = None
         self._binary_file = None
+        self._binary_header = None  # None for a file of the version 1
 
         self._text = text
         self._binary = binary
+        self._precision = precision
 
         self._struct = struct.Struct('<ddddddd')
 
@@ -99,7 +256,24 @@ class QuoteStorage(object):
 
                 # append to file, filename according to the month (UTC) of the timestamp
                 filename = "%s%s_%s.dat" % (self._curr_date.strftime('%Y%m'), self._market_id, self._timeframe_str)
-                self._binary_file = open(str(broker_path) + '/' + filename, 'ab')  # user market as file name
+                pathname = str(broker_path) + '/' + filename  # user market as file name
+
+                if os.path.isfile(pathname) and os.path.getsize(pathname) > 0:
+                    self._binary_file = open(pathname, 'r+b')
+                    self._binary_header = QuoteFileHeader.read(self._binary_file)
+
+                    if self._binary_header:
+                        # after the last complete record
+                        self._binary_file.seek(QuoteFileHeader.offset(self._binary_header.count), 0)
+                    else:
+                        # version 1, continue without index
+                        self._binary_file.seek(0, 2)
+                else:
+                    self._binary_file = open(pathname, 'w+b')
+                    self._binary_header = QuoteFileHeader(self._timeframe, self._precision,
+                                                          self._curr_date.year, self._curr_date.month)
+
+                    self._binary_header.write(self._binary_file)
             except Exception as e:
                 logger.error(repr(e))
 
@@ -109,8 +283,13 @@ class QuoteStorage(object):
             self._text_file = None
 
         if self._binary_file:
+            if self._binary_header:
+                # count and index of the appended records
+                self._binary_header.write(self._binary_file)
+                self._binary_header = None
+
             self._binary_file.close()
-            self._binary_file = None            
+            self._binary_file = None
 
     def can_flush(self):
         # save only once per minute
@@ -131,7 +310,7 @@ class QuoteStorage(object):
                 #     # process next
                 #     d = quotes.pop(0)  # too slow when millions of elements
 
-                date_utc = datetime.utcfromtimestamp(d[2] * 0.001)  # .replace(tzinfo=UTC()) not necessary because not directly compared
+                date_utc = datetime.utcfromtimestamp(d.timestamp)  # .replace(tzinfo=UTC()) not necessary because not directly compared
 
                 if self._curr_date and (self._curr_date.year != date_utc.year or self._curr_date.month != date_utc.month):
                     self.close()
@@ -140,19 +319,22 @@ class QuoteStorage(object):
 
                 if self._text_file: 
                     # convert to a tabular row          
-                    content = "%i\t%s\t%s\t%s\t%s\t%s\t%s\n" % (d.timestamp, d.open, d.high, d.low, d.close,
+                    content = "%i\t%s\t%s\t%s\t%s\t%s\t%s\n" % (d.timestamp * 1000, d.open, d.high, d.low, d.close,
                                                                 d.spread, d.volume)  # t o h l c s v
                     self._text_file.write(content)
 
                 if self._binary_file:
                     # convert to a struct
-                    f = (float(d[2]) * 0.001, float(d[3]), float(d[4]), float(d[5]), float(d[6]),
-                         float(d[7]), float(d[8]))  # t o h l c s v (t in second)
+                    f = (float(d.timestamp), float(d.open), float(d.high), float(d.low), float(d.close),
+                         float(d.spread), float(d.volume))  # t o h l c s v (t in second)
                     # s = struct.pack('<ddddddd', *f)
                     s = self._struct.pack(*f)
 
                     self._binary_file.write(s)
 
+                    if self._binary_header:
+                        self._binary_header.add(f[0])
+
                 n += 1
 
         except TypeError as e:
@@ -167,6 +349,12 @@ class QuoteStorage(object):
                 # self._quotes = quotes + self._quotes
                 self._quotes = quotes[n:] + self._quotes
 
+        if self._binary_file and self._binary_header:
+            # keep the count and the index up to date if the file stays open
+            pos = self._binary_file.tell()
+            self._binary_header.write(self._binary_file)
+            self._binary_file.seek(pos, 0)
+
         self._last_save = time.time()
 
         if close_at_end:
@@ -205,6 +393,7 @@ class QuoteStreamer(object):
 
         self._binary = binary  # use binary format
         self._is_binary = False
+        self._remaining = -1  # records left to read into a file of the version 2, -1 for version 1
 
         self._struct = struct.Struct('ddddddd')
         self._format = np.dtype([('t', 'float64'), ('o', 'float64'), ('h', 'float64'), ('l', 'float64'),
@@ -236,6 +425,18 @@ class QuoteStreamer(object):
                 self._file = open(pathname, "rb")
                 self._is_binary = True
 
+                header = QuoteFileHeader.read(self._file)
+                if header:
+                    # seek to the initial position using the index of the day
+                    record = header.find(self._file, self._curr_date.timestamp())
+
+                    self._file.seek(QuoteFileHeader.offset(record), 0)
+                    self._remaining = header.count - record
+
+                    return
+
+                self._remaining = -1
+
                 st = os.stat(pathname)
                 file_size = st.st_size
 
@@ -370,10 +571,16 @@ class QuoteStreamer(object):
 
             if self._file:
                 if self._is_binary:
-                    arr = self._file.read(QuoteStreamer.QUOTE_SIZE*self._buffer_size)
+                    n = self._buffer_size if self._remaining < 0 else min(self._buffer_size, self._remaining)
+
+                    arr = self._file.read(QuoteStreamer.QUOTE_SIZE*n)
+                    arr = arr[:len(arr) - len(arr) % QuoteStreamer.QUOTE_SIZE]  # ignore a partial record
                     data = self._struct.iter_unpack(arr)
 
-                    if len(arr) < self._buffer_size:
+                    if self._remaining >= 0:
+                        self._remaining -= len(arr) // QuoteStreamer.QUOTE_SIZE
+
+                    if len(arr) < QuoteStreamer.QUOTE_SIZE*self._buffer_size:
                         file_end = True
 
                     # speedup using numpy fromfile but its a one shot loads
@@ -418,6 +625,114 @@ class QuoteStreamer(object):
                                                day=1, tzinfo=UTC())
 
 
+class QuoteConverter(object):
+    """
+    Convert the quote files of a market timeframe to binary files of the version 2, from the binary files of the
+    version 1, or from the text files if there is no binary file. Files already converted are ignored.
+    """
+
+    def __init__(self, markets_path, broker_id, market_id, timeframe, from_date, to_date, precision=0):
+        """
+        @param from_date datetime Object
+        @param to_date datetime Object
+        @param precision Optional decimal precision of the prices, stored into the header.
+        """
+        self._markets_path = markets_path
+
+        self._broker_id = broker_id
+        self._market_id = market_id
+
+        self._timeframe = timeframe
+        self._timeframe_str = timeframe_to_str(timeframe)
+
+        self._from_date = from_date
+        self._to_date = to_date
+
+        self._precision = precision
+
+        self._curr_date = datetime(year=from_date.year, month=from_date.month, day=1, tzinfo=UTC())
+
+        self._converted = 0
+
+    @property
+    def converted(self) -> int:
+        """Number of converted files."""
+        return self._converted
+
+    def process(self):
+        while not self.finished():
+            self.next()
+
+    def finished(self):
+        return self._curr_date >= self._to_date
+
+    def next(self):
+        if self._curr_date < self._to_date:
+            data_path = pathlib.Path(self._markets_path, self._broker_id, self._market_id, self._timeframe_str)
+
+            filename = "%s%s_%s" % (self._curr_date.strftime('%Y%m'), self._market_id, self._timeframe_str)
+            text_pathname = '/'.join((str(data_path), filename))
+            binary_pathname = text_pathname + ".dat"
+
+            try:
+                records = self.read(text_pathname, binary_pathname)
+
+                if records is not None:
+                    self.write(binary_pathname, records)
+                    self._converted += 1
+
+                    logger.info("Converted %i quotes into %s" % (len(records), binary_pathname))
+            except Exception as e:
+                logger.error("Unable to convert %s : %s" % (binary_pathname, repr(e)))
+
+            # next month/year
+            if self._curr_date.month == 12:
+                self._curr_date = datetime(year=self._curr_date.year+1, month=1, day=1, tzinfo=UTC())
+            else:
+                self._curr_date = datetime(year=self._curr_date.year, month=self._curr_date.month+1, day=1,
+                                           tzinfo=UTC())
+
+    def read(self, text_pathname: str, binary_pathname: str) -> Optional[np.ndarray]:
+        """
+        Read the records of the current month, None if already converted or not found.
+        """
+        if os.path.isfile(binary_pathname):
+            with open(binary_pathname, "rb") as bfile:
+                if QuoteFileHeader.read(bfile):
+                    # already converted
+                    return None
+
+                records = np.fromfile(bfile, dtype=QUOTE_DTYPE)
+
+        elif os.path.isfile(text_pathname):
+            rows = []
+
+            with open(text_pathname, "rt") as tfile:
+                for row in tfile:
+                    ts, o, h, l, c, s, vol = row.rstrip('\n').split('\t')
+                    rows.append((float(ts) * 0.001, float(o), float(h), float(l), float(c), float(s), float(vol)))
+
+            records = np.array(rows, dtype=QUOTE_DTYPE)
+        else:
+            return None
+
+        # index requires ordered records
+        return records[np.argsort(records['t'], kind='stable')]
+
+    def write(self, pathname: str, records: np.ndarray):
+        header = QuoteFileHeader(self._timeframe, self._precision, self._curr_date.year, self._curr_date.month)
+        header.index(records['t'])
+
+        # replace the file once complete
+        tmp_pathname = pathname + ".tmp"
+
+        with open(tmp_pathname, "wb") as bfile:
+            header.write(bfile)
+            bfile.write(records.tobytes())
+
+        os.replace(tmp_pathname, pathname)
+
+
 class LastQuoteFinder(object):
     """
     Last quote find helper.
@@ -425,7 +740,11 @@ class LastQuoteFinder(object):
 
     QUOTE_SIZE = 7*8  # 56bytes
 
-    def __init__(self, markets_path, broker_id, market_id, timeframe, buffer_size=1000, binary=True):
+    def __init__(self, markets_path, broker_id, market_id, timeframe, buffer_size=1000, binary=True,
+                 timestamp: Optional[float] = None):
+        """
+        @param timestamp: Optional, find the last quote at this timestamp (included), else the very last.
+        """
         self._markets_path = markets_path
 
         self._broker_id = broker_id
@@ -434,7 +753,8 @@ class LastQuoteFinder(object):
         self._timeframe = timeframe
         self._timeframe_str = timeframe_to_str(timeframe)
 
-        self._curr_date = datetime.now()
+        self._timestamp = timestamp
+        self._curr_date = datetime.fromtimestamp(timestamp, tz=UTC()) if timestamp is not None else datetime.now()
 
         self._buffer_size = buffer_size
         self._binary = binary  # use binary format
@@ -450,28 +770,16 @@ class LastQuoteFinder(object):
 
         # try first with binary file
         if self._binary:
-            # with .dat extension
-            filename = "%s%s_%s.dat" % (self._curr_date.strftime('%Y%m'), self._market_id, self._timeframe_str)
-            pathname = '/'.join((str(data_path), filename))
-
-            quote = None
-
-            if os.path.isfile(pathname):
-                bfile = open(pathname, "rb")
+            quote = self._read_binary(data_path, self._curr_date, self._timestamp)
 
-                # directly seek to the last quote entry
-                try:
-                    bfile.seek(-QuoteStreamer.QUOTE_SIZE, 2)
-                    arr = bfile.read(QuoteStreamer.QUOTE_SIZE)
-
-                    elt = self._struct.unpack(arr)
-
-                    quote = Candle(elt[0], self._timeframe)
-                    quote.set_ohlc_s_v(elt[1], elt[2], elt[3], elt[4], elt[5], elt[6])
-                except:
-                    pass
+            if quote is None and self._timestamp is not None:
+                # no file or no quote before the timestamp this month, then the last quote of the previous month
+                if self._curr_date.month == 1:
+                    prev_date = self._curr_date.replace(year=self._curr_date.year-1, month=12, day=1)
+                else:
+                    prev_date = self._curr_date.replace(month=self._curr_date.month-1, day=1)
 
-                bfile.close()
+                quote = self._read_binary(data_path, prev_date, None)
 
             return quote
 
@@ -505,6 +813,57 @@ class LastQuoteFinder(object):
 
             return quote
 
+    def _read_binary(self, data_path: pathlib.Path, date: datetime, timestamp: Optional[float]):
+        """
+        Read the last quote of the binary file of the month of date, at timestamp (included) if defined.
+        @return Candle or None if no file or no such quote.
+        """
+        # with .dat extension
+        filename = "%s%s_%s.dat" % (date.strftime('%Y%m'), self._market_id, self._timeframe_str)
+        pathname = '/'.join((str(data_path), filename))
+
+        quote = None
+
+        if os.path.isfile(pathname):
+            bfile = open(pathname, "rb")
+
+            try:
+                header = QuoteFileHeader.read(bfile)
+
+                if header:
+                    # the last before the next, using the index of the day
+                    if timestamp is not None:
+                        record = header.find(bfile, timestamp, side='right') - 1
+                    else:
+                        record = header.count - 1
+
+                    if record >= 0:
+                        bfile.seek(QuoteFileHeader.offset(record), 0)
+                        elt = self._struct.unpack(bfile.read(QuoteStreamer.QUOTE_SIZE))
+                    else:
+                        elt = None
+
+                elif timestamp is not None:
+                    # version 1, load and search
+                    records = np.fromfile(bfile, dtype=QUOTE_DTYPE)
+                    record = int(np.searchsorted(records['t'], timestamp, side='right')) - 1
+
+                    elt = tuple(records[record].tolist()) if record >= 0 else None
+                else:
+                    # version 1, directly seek to the last quote entry
+                    bfile.seek(-QuoteStreamer.QUOTE_SIZE, 2)
+                    elt = self._struct.unpack(bfile.read(QuoteStreamer.QUOTE_SIZE))
+
+                if elt:
+                    quote = Candle(elt[0], self._timeframe)
+                    quote.set_ohlc_s_v(elt[1], elt[2], elt[3], elt[4], elt[5], elt[6])
+            except Exception as e:
+                logger.debug(repr(e))
+
+            bfile.close()
+
+        return quote
+
     def last(self):
         quote = None
 
@@ -33,6 +33,9 @@ class TickStorage(object):
 
     FLUSH_DELAY = 60.0
 
+    # binary record, same as the struct '<dddddb'
+    TICK_DTYPE = np.dtype([('t', '<f8'), ('b', '<f8'), ('a', '<f8'), ('l', '<f8'), ('v', '<f8'), ('d', 'i1')])
+
     def __init__(self, markets_path, broker_id, market_id, text=True, binary=True):
         self._markets_path = markets_path
         self._mutex = threading.RLock()
@@ -163,6 +166,45 @@ class TickStorage(object):
         if close_at_end:
             self.close()  # avoid too many handles
 
+    def write_array(self, ticks, close_at_end=False):
+        """
+        Synchronously append an array of ticks ordered by timestamp, a month file at time.
+        Pending ticks are written before to keep the order.
+
+        @param ticks Structured array with fields t (in seconds), b, a, l, v, d.
+        @note Mostly for importers, must not be used concurrently with the asynchronous flush of the same market.
+        """
+        self.flush(close_at_end=False)
+
+        if not len(ticks):
+            return
+
+        data = ticks.astype(TickStorage.TICK_DTYPE, copy=False)
+
+        # split at each change of month (UTC)
+        months = data['t'].astype('datetime64[s]').astype('datetime64[M]')
+        bounds = np.flatnonzero(months[1:] != months[:-1]) + 1
+
+        for part in np.split(data, bounds):
+            date_utc = datetime.utcfromtimestamp(float(part['t'][0]))
+
+            if self._curr_date and (self._curr_date.year != date_utc.year or self._curr_date.month != date_utc.month):
+                self.close()
+
+            self.open(date_utc)  # if necessary
+
+            if self._text_file:
+                self._text_file.writelines("%i\t%s\t%s\t%s\t%s\t%i\n" % (round(t * 1000.0), b, a, l, v, d)
+                                           for t, b, a, l, v, d in part.tolist())  # t b a l v d
+
+            if self._binary_file:
+                self._binary_file.write(part.tobytes())
+
+        self._last_save = time.time()
+
+        if close_at_end:
+            self.close()
+
 
 class TickStreamer(object):
     """
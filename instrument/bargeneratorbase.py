@@ -13,11 +13,21 @@ if TYPE_CHECKING:
 
 from common.utils import truncate
 
+import numpy as np
+
 from instrument.instrument import Instrument, TickType, Candle
 from instrument.bar import RangeBar, ReversalBar, TickBar, VolumeBar
 
 logger = logging.getLogger('siis.instrument.bargeneratorbase')
 
+# same layout as the binary tick file record (timestamp, bid, ask, last, volume, direction)
+TickArrayType = np.dtype([('t', 'float64'), ('b', 'float64'), ('a', 'float64'), ('l', 'float64'),
+                          ('v', 'float64'), ('d', 'int8')])
+
+# columnar output of the batch mode generation
+BarArrayType = np.dtype([('timestamp', 'float64'), ('duration', 'float64'), ('open', 'float64'),
+                         ('high', 'float64'), ('low', 'float64'), ('close', 'float64'), ('volume', 'float64')])
+
 
 class BarGeneratorBase(object):
     """
@@ -123,6 +133,104 @@ class BarGeneratorBase(object):
 
         return to_tickbars
 
+    def generate_from_tick_array(self, from_ticks: np.ndarray) -> np.ndarray:
+        """
+        Batch mode. Generate as many bars as possible from a contiguous array of ticks or trades (TickArrayType).
+        The result is the same as generate_from_ticks, and the two modes can be interleaved, but completed bars are
+        returned as a BarArrayType array, and only the current non-ended bar is instantiated.
+
+        Bars boundaries are computed by the specialization (see _bar_starts), then OHLCV are aggregated by segment.
+
+        @note Tick based indicators cannot be updated alongside in this mode.
+        """
+        self._last_consumed = 0
+
+        num_ticks = len(from_ticks)
+
+        if self._last_timestamp > 0.0:
+            # ignore the ticks older than the last one, as update does
+            from_ticks = from_ticks[from_ticks['t'] >= self._last_timestamp]
+
+        n = len(from_ticks)
+        if not n:
+            self._last_consumed = num_ticks
+            return np.empty(0, dtype=BarArrayType)
+
+        starts = self._bar_starts(from_ticks)
+
+        timestamps = from_ticks['t']
+        prices = from_ticks['l']
+        volumes = from_ticks['v']
+
+        first = int(starts[0]) if len(starts) else n
+
+        if first > 0:
+            # leading ticks continue the current bar
+            self._update_current(float(timestamps[first-1]), float(prices[first-1]),
+                                 float(prices[:first].min()), float(prices[:first].max()),
+                                 float(volumes[:first].sum()))
+
+        self._last_consumed = num_ticks
+
+        if not len(starts):
+            return np.empty(0, dtype=BarArrayType)
+
+        ends = np.append(starts[1:], n)
+        num_bars = len(starts) - 1
+
+        # previous current bar is completed, plus any bar of this batch except the last one
+        prev = 1 if self._current is not None else 0
+        bars = np.empty(num_bars + prev, dtype=BarArrayType)
+
+        if prev:
+            self._current._ended = True
+
+            bars[0] = (self._current._timestamp, self._current._duration, self._current._open,
+                       self._current._high, self._current._low, self._current._close, self._current._volume)
+
+        highs = np.maximum.reduceat(prices, starts)
+        lows = np.minimum.reduceat(prices, starts)
+        sums = np.add.reduceat(volumes, starts)
+
+        completed = bars[prev:]
+
+        completed['timestamp'] = timestamps[starts[:-1]]
+        completed['duration'] = timestamps[ends[:-1] - 1] - timestamps[starts[:-1]]
+        completed['open'] = prices[starts[:-1]]
+        completed['high'] = highs[:-1]
+        completed['low'] = lows[:-1]
+        completed['close'] = prices[ends[:-1] - 1]
+        completed['volume'] = sums[:-1]
+
+        # last segment is the new current bar
+        s, e = int(starts[-1]), n
+
+        self._current = self._new_bar(float(timestamps[s]), float(prices[s]))
+        self._update_current(float(timestamps[e-1]), float(prices[e-1]), float(lows[-1]), float(highs[-1]),
+                             float(sums[-1]))
+
+        return bars
+
+    def _update_current(self, timestamp: float, close: float, low: float, high: float, volume: float):
+        self._current._duration = timestamp - self._current._timestamp
+        self._current._close = close
+        self._current._volume += volume
+        self._current._low = min(self._current._low, low)
+        self._current._high = max(self._current._high, high)
+
+    def _new_bar(self, timestamp: float, price: float):
+        """
+        Overrides this method to instantiate the specialized bar model.
+        """
+        return None
+
+    def _bar_starts(self, from_ticks: np.ndarray) -> np.ndarray:
+        """
+        Overrides this method to returns the ascending indices of the ticks opening a new bar,
+        and to update the internal state of the generator as if each tick was processed by update.
+        """
+        return np.empty(0, dtype=np.int64)
+
     def update(self, tick: TickType):
         """
         Overrides this method to implements specifics computed tick-bar model from a single tick or trade.
@@ -12,6 +12,8 @@ from instrument.instrument import TickType
 from instrument.bar import RangeBar
 from instrument.bargeneratorbase import BarGeneratorBase
 
+import numpy as np
+
 import logging
 logger = logging.getLogger('siis.instrument.rangebargenerator')
 
@@ -40,6 +42,41 @@ class RangeBarGenerator(BarGeneratorBase):
 
         return last_tickbar
 
+    def _new_bar(self, timestamp: float, price: float) -> RangeBar:
+        return RangeBar(timestamp, price)
+
+    def _bar_starts(self, from_ticks: np.ndarray) -> np.ndarray:
+        # path dependent, the kernel only works on floats, bars are aggregated after
+        prices = from_ticks['l'].tolist()
+
+        starts = []
+        tick_size = self._tick_size
+        max_size = self._size
+
+        if self._current is None:
+            starts.append(0)
+            low = high = prices[0]
+        else:
+            low = self._current._low
+            high = self._current._high
+
+        for i, price in enumerate(prices):
+            if price > high:
+                if int((price - low) / tick_size) > max_size:
+                    starts.append(i)
+                    low = price
+
+                high = price
+
+            elif price < low:
+                if int((high - price) / tick_size) > max_size:
+                    starts.append(i)
+                    high = price
+
+                low = price
+
+        return np.array(starts, dtype=np.int64)
+
     def update(self, tick: TickType) -> Optional[RangeBar]:
         if tick[0] < self._last_timestamp:
             return None
@@ -12,6 +12,8 @@ from instrument.instrument import TickType
 from instrument.bar import ReversalBar
 from instrument.rangebargenerator import BarGeneratorBase
 
+import numpy as np
+
 import logging
 logger = logging.getLogger('siis.instrument.reversalbargenerator')
 
@@ -51,6 +53,58 @@ class ReversalBarGenerator(BarGeneratorBase):
 
         return last_tickbar
 
+    def _new_bar(self, timestamp: float, price: float) -> ReversalBar:
+        return ReversalBar(timestamp, price)
+
+    def _bar_starts(self, from_ticks: np.ndarray) -> np.ndarray:
+        # path dependent, the kernel only works on floats, bars are aggregated after
+        prices = from_ticks['l'].tolist()
+
+        starts = []
+        tick_size = self._tick_size
+        max_size = self._size
+        reversal = self._reversal
+        reversing = self._reversing
+
+        if self._current is None:
+            starts.append(0)
+            low = high = prices[0]
+            reversing = 0
+        else:
+            low = self._current._low
+            high = self._current._high
+
+        for i, price in enumerate(prices):
+            # close at reversal size
+            if reversing > 0:
+                if int((price - low) / tick_size) > reversal:
+                    starts.append(i)
+                    low = high = price
+                    reversing = 0
+
+            elif reversing < 0:
+                if int((high - price) / tick_size) > reversal:
+                    starts.append(i)
+                    low = high = price
+                    reversing = 0
+
+            # lookup for reversal size
+            if price > high:
+                if int((price - low) / tick_size) >= max_size:
+                    reversing = -1
+
+                high = price
+
+            elif price < low:
+                if int((high - price) / tick_size) > max_size:
+                    reversing = 1
+
+                low = price
+
+        self._reversing = reversing
+
+        return np.array(starts, dtype=np.int64)
+
     def update(self, tick: TickType) -> Optional[ReversalBar]:
         if tick[0] < self._last_timestamp:
             return None
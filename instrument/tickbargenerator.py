@@ -1 +1,97 @@
-# @todo
\ No newline at end of file
+# @date 2023-09-27
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Tick bar generator.
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    pass
+
+from instrument.instrument import TickType
+from instrument.bar import TickBar
+from instrument.bargeneratorbase import BarGeneratorBase
+
+import numpy as np
+
+import logging
+logger = logging.getLogger('siis.instrument.tickbargenerator')
+
+
+class TickBarGenerator(BarGeneratorBase):
+    """
+    Specialization for tick bar. A bar is completed once it contains size ticks or trades.
+    """
+
+    __slots__ = '_count'
+
+    _count: int
+
+    def __init__(self, size: int, tick_scale: float = 1.0):
+        """
+        @param size Generated tick bar tick number.
+        """
+        super().__init__(size, tick_scale)
+
+        self._count = 0
+
+    def _new_tick_bar(self, tick: TickType) -> TickBar:
+        # complete the current tick-bar
+        if self._current is not None:
+            self._current._ended = True
+
+        # return the current as last completed
+        last_tickbar = self._current
+
+        # create a new tick-bar
+        self._current = TickBar(tick[0], tick[3])
+
+        # reset ticks count
+        self._count = 0
+
+        return last_tickbar
+
+    def _new_bar(self, timestamp: float, price: float) -> TickBar:
+        return TickBar(timestamp, price)
+
+    def _bar_starts(self, from_ticks: np.ndarray) -> np.ndarray:
+        n = len(from_ticks)
+
+        # a full or a missing current bar is replaced at the first tick
+        count = self._count if self._current is not None else self._size
+
+        first = (self._size - count) % self._size
+        starts = np.arange(first, n, self._size, dtype=np.int64)
+
+        self._count = n - int(starts[-1]) if len(starts) else count + n
+
+        return starts
+
+    def update(self, tick: TickType) -> Optional[TickBar]:
+        if tick[0] < self._last_timestamp:
+            return None
+
+        last_tickbar = None
+
+        if self._current is None or self._count >= self._size:
+            last_tickbar = self._new_tick_bar(tick)
+
+        self._count += 1
+
+        # update the current bar
+
+        # duration of the bar in seconds
+        self._current._duration = tick[0] - self._current._timestamp
+
+        # last trade price as close price
+        self._current._close = tick[3]
+
+        # cumulative volume per tick-bar
+        self._current._volume += tick[4]
+
+        # retains low and high tick prices
+        self._current._low = min(self._current._low, tick[3])
+        self._current._high = max(self._current._high, tick[3])
+
+        # return the last completed bar or None
+        return last_tickbar
@@ -1 +1,156 @@
-#@todo
\ No newline at end of file
+# @date 2023-09-27
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Volume bar generator.
+
+import math
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    pass
+
+from instrument.instrument import TickType
+from instrument.bar import VolumeBar
+from instrument.bargeneratorbase import BarGeneratorBase
+
+import numpy as np
+
+import logging
+logger = logging.getLogger('siis.instrument.volumebargenerator')
+
+
+class VolumeBarGenerator(BarGeneratorBase):
+    """
+    Specialization for volume bar.
+
+    A bar is completed with the tick or trade making its cumulative volume reaching the size, the next one opens
+    a new bar. The exceeding volume (modulo the size) is carried to the next bar.
+    """
+
+    WINDOW = 256        # initial number of ticks accumulated at once by the batch mode
+    SCALAR_WINDOW = 32  # below this number of ticks per bar, the batch mode accumulates them one by one
+
+    __slots__ = '_cum_volume'
+
+    _cum_volume: float
+
+    def __init__(self, size: int, tick_scale: float = 1.0):
+        """
+        @param size Generated volume bar volume.
+        """
+        super().__init__(size, tick_scale)
+
+        self._cum_volume = 0.0
+
+    def _new_volume_bar(self, tick: TickType) -> VolumeBar:
+        # complete the current tick-bar
+        if self._current is not None:
+            self._current._ended = True
+            self._cum_volume = math.fmod(self._cum_volume, self._size)
+        else:
+            self._cum_volume = 0.0
+
+        # return the current as last completed
+        last_tickbar = self._current
+
+        # create a new tick-bar
+        self._current = VolumeBar(tick[0], tick[3])
+
+        return last_tickbar
+
+    def _new_bar(self, timestamp: float, price: float) -> VolumeBar:
+        return VolumeBar(timestamp, price)
+
+    def _bar_starts(self, from_ticks: np.ndarray) -> np.ndarray:
+        volumes = from_ticks['v']
+        n = len(volumes)
+
+        size = self._size
+        starts = []
+
+        i = 0
+        window = VolumeBarGenerator.WINDOW
+        scalar_volumes = None
+
+        if self._current is None:
+            # the first tick opens the first bar
+            starts.append(0)
+            cum_volume = 0.0
+        else:
+            cum_volume = self._cum_volume
+
+        while i < n:
+            # same rule as update : a tick opens a new bar if the previous reached the size, the overflow is carried
+            if cum_volume >= size:
+                starts.append(i)
+                cum_volume = math.fmod(cum_volume, size)
+
+            if window <= VolumeBarGenerator.SCALAR_WINDOW:
+                # few ticks per bar, accumulated one by one, cheaper than the numpy calls
+                if scalar_volumes is None:
+                    scalar_volumes = volumes.tolist()
+
+                j = i
+                last = min(i + window, n)
+
+                while j < last and cum_volume < size:
+                    cum_volume += scalar_volumes[j]
+                    j += 1
+
+                k = j - i
+                i = j
+
+                reached = cum_volume >= size
+            else:
+                # cumulative volume before each tick of the window, accumulated in the same order as update does
+                segment = volumes[i:i+window]
+                cum = np.cumsum(np.concatenate(((cum_volume,), segment)))
+
+                found = np.flatnonzero(cum[1:] >= size)
+                reached = len(found) > 0
+
+                # the tick reaching the size ends the bar, the next one opens a new bar
+                k = int(found[0]) + 1 if reached else len(segment)
+                cum_volume = float(cum[k])
+                i += k
+
+            if reached:
+                # the next bar is expected to be about as long as this one, the window must not be carried from
+                # a quiet stretch else each next bar would sum a much longer slice than needed
+                window = max(2 * k, 1)
+            else:
+                window *= 2
+
+        self._cum_volume = cum_volume
+
+        return np.array(starts, dtype=np.int64)
+
+    def update(self, tick: TickType) -> Optional[VolumeBar]:
+        if tick[0] < self._last_timestamp:
+            return None
+
+        last_tickbar = None
+
+        if self._current is None or self._cum_volume >= self._size:
+            last_tickbar = self._new_volume_bar(tick)
+
+        self._cum_volume += tick[4]
+
+        # update the current bar
+
+        # duration of the bar in seconds
+        self._current._duration = tick[0] - self._current._timestamp
+
+        # last trade price as close price
+        self._current._close = tick[3]
+
+        # cumulative volume per tick-bar
+        self._current._volume += tick[4]
+
+        # retains low and high tick prices
+        self._current._low = min(self._current._low, tick[3])
+        self._current._high = max(self._current._high, tick[3])
+
+        # return the last completed bar or None
+        return last_tickbar
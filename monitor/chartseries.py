@@ -0,0 +1,216 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Downsampled OHLC and indicator series for the charts, with a cached pyramid per market timeframe.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Tuple
+
+if TYPE_CHECKING:
+    from strategy.strategytraderbase import StrategyTraderBase
+
+import collections
+import threading
+import time
+
+from datetime import datetime
+
+import numpy as np
+
+from charting.downsample import lttb, minmax, aggregate_ohlc, OHLC_TIMESTAMP
+from common.utils import UTC
+from database.database import Database
+
+import logging
+logger = logging.getLogger('siis.monitor.chartseries')
+error_logger = logging.getLogger('siis.error.monitor.chartseries')
+
+
+class OhlcPyramid(object):
+    """
+    OHLC of a market timeframe for a loaded range, with the aggregated levels.
+    The level n is made of bars of timeframe * FACTOR^n, computed on demand.
+
+    @note Thread-safe, the levels are built and selected under the lock of the pyramid, then the lock of the cache
+        is not held during an aggregation.
+    """
+
+    FACTOR = 4
+    MAX_LEVELS = 8
+
+    def __init__(self, timeframe: float, ohlc: np.ndarray, from_ts: float, to_ts: float):
+        self.timeframe = timeframe
+        self.from_ts = from_ts
+        self.to_ts = to_ts
+        self.loaded = time.time()
+
+        self._mutex = threading.Lock()
+        self._levels = [ohlc]
+
+    def level(self, n: int) -> np.ndarray:
+        with self._mutex:
+            return self._level(n)
+
+    def _level(self, n: int) -> np.ndarray:
+        while len(self._levels) <= n:
+            self._levels.append(aggregate_ohlc(self._levels[0], self.timeframe * OhlcPyramid.FACTOR ** len(
+                self._levels)))
+
+        return self._levels[n]
+
+    def contains(self, from_ts: float, to_ts: float) -> bool:
+        return self.from_ts <= from_ts and to_ts <= self.to_ts
+
+    def select(self, from_ts: float, to_ts: float, resolution: int) -> Tuple[int, np.ndarray]:
+        """
+        Select the finest level having at most resolution bars into the range.
+        @return Tuple of level and 2d array of the bars into the range.
+        """
+        with self._mutex:
+            return self._select(from_ts, to_ts, resolution)
+
+    def _select(self, from_ts: float, to_ts: float, resolution: int) -> Tuple[int, np.ndarray]:
+        for n in range(OhlcPyramid.MAX_LEVELS):
+            ohlc = self._level(n)
+
+            lo = np.searchsorted(ohlc[:, OHLC_TIMESTAMP], from_ts, side='left')
+            hi = np.searchsorted(ohlc[:, OHLC_TIMESTAMP], to_ts, side='right')
+
+            if hi - lo <= resolution or n == OhlcPyramid.MAX_LEVELS - 1:
+                return n, ohlc[lo:hi]
+
+        return 0, self._levels[0][0:0]
+
+
+class ChartSeries(object):
+    """
+    Server side series for the charts. Only the requested range at the requested resolution is returned,
+    then a chart of some months of 1m bars only transfer a few thousand of points.
+
+    - OHLC are read from the database and cached as pyramid (bars aggregated by a factor of 4 per level),
+      the finest level with at most the resolution bars into the range is returned.
+    - Indicators are read from the live analyser of the strategy trader, and reduced with LTTB (by default)
+      or min-max.
+    """
+
+    MAX_ENTRIES = 16          # max cached pyramids (LRU)
+    MAX_RESOLUTION = 10000    # max returned points per series
+    DEFAULT_RESOLUTION = 1000
+
+    MODE_LTTB = "lttb"
+    MODE_MINMAX = "minmax"
+
+    def __init__(self):
+        self._mutex = threading.RLock()
+        self._pyramids = collections.OrderedDict()
+
+    def clear(self):
+        with self._mutex:
+            self._pyramids.clear()
+
+    def ohlc(self, broker_id: str, market_id: str, timeframe: float, from_ts: float, to_ts: float,
+             resolution: int = DEFAULT_RESOLUTION) -> Tuple[int, np.ndarray]:
+        """
+        Downsampled OHLC of a market for a range.
+
+        @param broker_id: Broker (watcher) name of the stored OHLC.
+        @param market_id: Market identifier.
+        @param timeframe: Timeframe of the stored OHLC in seconds.
+        @param from_ts: Range start timestamp in seconds (included).
+        @param to_ts: Range end timestamp in seconds (included).
+        @param resolution: Max number of returned bars.
+        @return Tuple of the timeframe of the returned bars and the 2d array of OHLC
+            (columns of OhlcStreamer.query_array).
+        """
+        resolution = max(1, min(resolution, ChartSeries.MAX_RESOLUTION))
+        key = (broker_id, market_id, timeframe)
+
+        with self._mutex:
+            pyramid = self._pyramids.get(key)
+
+            if pyramid is None or not pyramid.contains(from_ts, to_ts) or self._outdated(pyramid, to_ts):
+                # load the union with the previous range, to not reload when panning back
+                if pyramid is not None and pyramid.to_ts >= from_ts and to_ts >= pyramid.from_ts:
+                    from_ts_, to_ts_ = min(from_ts, pyramid.from_ts), max(to_ts, pyramid.to_ts)
+                else:
+                    from_ts_, to_ts_ = from_ts, to_ts
+
+                pyramid = self._load(broker_id, market_id, timeframe, from_ts_, to_ts_)
+                self._pyramids[key] = pyramid
+
+                while len(self._pyramids) > ChartSeries.MAX_ENTRIES:
+                    self._pyramids.popitem(last=False)
+            else:
+                self._pyramids.move_to_end(key)
+
+        level, ohlc = pyramid.select(from_ts, to_ts, resolution)
+
+        return timeframe * OhlcPyramid.FACTOR ** level, ohlc
+
+    def indicator(self, strategy_trader: StrategyTraderBase, analyser_name: str, indicator_name: str,
+                  from_ts: float, to_ts: float, resolution: int = DEFAULT_RESOLUTION,
+                  mode: str = MODE_LTTB) -> Optional[np.ndarray]:
+        """
+        Downsampled values of an indicator of an analyser of a strategy trader for a range.
+
+        @param strategy_trader: Strategy trader of the market.
+        @param analyser_name: Name of the analyser (timeframe based).
+        @param indicator_name: Member name of the indicator into the analyser.
+        @param mode: MODE_LTTB or MODE_MINMAX.
+        @return 2d array of timestamp and value, or None if not found.
+        """
+        resolution = max(3, min(resolution, ChartSeries.MAX_RESOLUTION))
+
+        with strategy_trader.mutex:
+            analyser = strategy_trader.find_analyser(analyser_name)
+            if analyser is None:
+                return None
+
+            price = getattr(analyser, 'price', None)
+            indicator = getattr(analyser, indicator_name, None)
+
+            if price is None or indicator is None or not hasattr(indicator, 'values'):
+                return None
+
+            # copies, the analyser continue to update its arrays
+            timestamps = np.array(price.timestamp, dtype=np.float64)
+            values = np.array(indicator.values, dtype=np.float64)
+
+        # right aligned, the indicator can have less values than the price
+        n = min(len(timestamps), len(values))
+        timestamps = timestamps[len(timestamps)-n:]
+        values = values[len(values)-n:]
+
+        lo = np.searchsorted(timestamps, from_ts, side='left')
+        hi = np.searchsorted(timestamps, to_ts, side='right')
+
+        timestamps = timestamps[lo:hi]
+        values = values[lo:hi]
+
+        if mode == ChartSeries.MODE_MINMAX:
+            indices = minmax(values, resolution // 2)
+        else:
+            indices = lttb(values, resolution, timestamps)
+
+        return np.column_stack((timestamps[indices], values[indices]))
+
+    #
+    # internal
+    #
+
+    def _outdated(self, pyramid: OhlcPyramid, to_ts: float) -> bool:
+        # a range up to the current bar must be reloaded once a new bar could be stored
+        return to_ts > pyramid.loaded - pyramid.timeframe and time.time() - pyramid.loaded >= pyramid.timeframe
+
+    def _load(self, broker_id: str, market_id: str, timeframe: float, from_ts: float, to_ts: float) -> OhlcPyramid:
+        streamer = Database.inst().create_ohlc_streamer(
+            broker_id, market_id, timeframe,
+            datetime.fromtimestamp(from_ts, tz=UTC()), datetime.fromtimestamp(to_ts, tz=UTC()))
+
+        ohlc = streamer.query_array(timeframe, datetime.fromtimestamp(from_ts, tz=UTC()),
+                                    datetime.fromtimestamp(to_ts, tz=UTC()))
+
+        logger.debug("Loaded %i OHLC of %s %s %s" % (len(ohlc), broker_id, market_id, timeframe))
+
+        return OhlcPyramid(timeframe, ohlc, from_ts, to_ts)
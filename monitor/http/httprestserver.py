@@ -4,15 +4,18 @@
 # http rest server
 
 import json
+import time
 import base64
 import uuid
 
+import numpy as np
+
 from monitor.service import MonitorService
 
 from twisted.web import server, resource, static
 from twisted.web.server import Session
 from twisted.web.resource import NoResource
-from twisted.internet import reactor
+from twisted.internet import reactor, threads
 from twisted.python.components import registerAdapter
 
 from zope.interface import Interface, Attribute, implementer
@@ -20,6 +23,14 @@ from zope.interface import Interface, Attribute, implementer
 from strategy.strategy import Strategy
 from trader.trader import Trader
 
+from common.latency import LatencyTracer
+from common.httpsession import HttpStats
+from common.utils import timeframe_from_str
+
+from monitor.chartseries import ChartSeries
+
+from watcher.watcher import Watcher
+
 import logging
 
 logger = logging.getLogger('siis.monitor.httprestserver')
@@ -1046,6 +1057,127 @@ class Charting(resource.Resource):
         return json.dumps(results).encode("utf-8")
 
 
+class ChartSeriesRestAPI(resource.Resource):
+    """
+    Downsampled OHLC and indicators series of a market for a visible range and a resolution.
+
+    Query arguments :
+        - market-id: Strategy trader market identifier.
+        - timeframe: Timeframe of the OHLC (str like 1m, 4h or float in seconds).
+        - from, to: Visible range timestamps in seconds. Default to resolution bars until now.
+        - resolution: Max number of points per series (default 1000, max 10000).
+        - analyser: Optional analyser name, for the indicators.
+        - indicators: Optional comma separated names of the indicators members of the analyser.
+        - mode: lttb (default) or minmax, for the indicators.
+    """
+    isLeaf = True
+
+    def __init__(self, monitor_service, strategy_service, trader_service):
+        super().__init__()
+
+        self._strategy_service = strategy_service
+        self._trader_service = trader_service
+
+        self._allow_chart = monitor_service.has_strategy_chart_perm
+
+        self._series = ChartSeries()
+
+    def render_GET(self, request):
+        if not check_auth_token(request):
+            return json.dumps({'error': True, 'messages': ['invalid-auth-token']}).encode("utf-8")
+
+        if not self._allow_chart:
+            return json.dumps({'error': True, 'messages': ['permission-not-allowed']}).encode("utf-8")
+
+        try:
+            market_id = request.args[b'market-id'][0].decode("utf-8")
+        except (KeyError, ValueError):
+            return NoResource("Incorrect market-id value")
+
+        try:
+            timeframe_arg = request.args[b'timeframe'][0].decode("utf-8")
+            timeframe = float(timeframe_arg) if timeframe_arg.replace('.', '', 1).isdigit() else timeframe_from_str(
+                timeframe_arg)
+        except (KeyError, ValueError):
+            return NoResource("Incorrect timeframe value")
+
+        if not timeframe:
+            return NoResource("Incorrect timeframe value")
+
+        try:
+            resolution = int(request.args[b'resolution'][0]) if b'resolution' in request.args else \
+                ChartSeries.DEFAULT_RESOLUTION
+            to_ts = float(request.args[b'to'][0]) if b'to' in request.args else time.time()
+            from_ts = float(request.args[b'from'][0]) if b'from' in request.args else to_ts - resolution * timeframe
+        except ValueError:
+            return NoResource("Incorrect from, to or resolution value")
+
+        analyser_name = request.args[b'analyser'][0].decode("utf-8") if b'analyser' in request.args else None
+        indicators = request.args[b'indicators'][0].decode("utf-8").split(',') if b'indicators' in request.args else []
+        mode = request.args[b'mode'][0].decode("utf-8") if b'mode' in request.args else ChartSeries.MODE_LTTB
+
+        strategy = self._strategy_service.strategy()
+        if strategy is None:
+            return NoResource("No strategy")
+
+        with strategy.mutex:
+            strategy_trader = strategy.strategy_traders.get(market_id)
+
+        if strategy_trader is None:
+            return NoResource("Unknown market-id %s" % market_id)
+
+        watcher = strategy_trader.instrument.watcher(Watcher.WATCHER_MARKET_DATA)
+        if watcher is None:
+            return NoResource("No market data for market-id %s" % market_id)
+
+        broker_id = watcher.name
+
+        def query():
+            bar_timeframe, ohlc = self._series.ohlc(broker_id, market_id, timeframe, from_ts, to_ts, resolution)
+
+            results = {
+                'error': False,
+                'messages': [],
+                'data': {
+                    'market-id': market_id,
+                    'timeframe': bar_timeframe,
+                    'from': from_ts,
+                    'to': to_ts,
+                    # timestamp, open, high, low, close, volume
+                    'ohlc': ohlc[:, (0, 1, 2, 3, 4, 6)].tolist(),
+                    'indicators': {}
+                }
+            }
+
+            if analyser_name:
+                for indicator_name in indicators:
+                    values = self._series.indicator(strategy_trader, analyser_name, indicator_name,
+                                                    from_ts, to_ts, resolution, mode)
+                    if values is not None:
+                        results['data']['indicators'][indicator_name] = np.where(
+                            np.isnan(values), None, values).tolist()
+
+            return json.dumps(results).encode("utf-8")
+
+        def done(data):
+            if not request._disconnected:
+                request.write(data)
+                request.finish()
+
+        def failed(failure):
+            error_logger.error(failure.getErrorMessage())
+
+            if not request._disconnected:
+                request.write(json.dumps({'error': True, 'messages': ['query-failed']}).encode("utf-8"))
+                request.finish()
+
+        # the database query must not block the reactor
+        d = threads.deferToThread(query)
+        d.addCallbacks(done, failed)
+
+        return server.NOT_DONE_YET
+
+
 class StatusInfoRestAPI(resource.Resource):
     isLeaf = True
 
@@ -1096,6 +1228,58 @@ class StatusInfoRestAPI(resource.Resource):
         return json.dumps(results).encode("utf-8")
 
 
+class LatencyInfoRestAPI(resource.Resource):
+    isLeaf = True
+
+    def __init__(self, monitor_service):
+        super().__init__()
+
+    def render_GET(self, request):
+        if not check_auth_token(request):
+            return json.dumps({'error': True, 'messages': ['invalid-auth-token']}).encode("utf-8")
+
+        market_id = None
+
+        if b'market-id' in request.args:
+            try:
+                market_id = request.args[b'market-id'][0].decode("utf-8")
+            except ValueError:
+                return NoResource("Incorrect market-id value")
+
+        results = {
+            'error': False,
+            'messages': [],
+            'data': {
+                'enabled': LatencyTracer.inst().enabled,
+                'stages': LatencyTracer.STAGES,
+                'markets': LatencyTracer.inst().stats(market_id)
+            }
+        }
+
+        return json.dumps(results).encode("utf-8")
+
+
+class HttpInfoRestAPI(resource.Resource):
+    isLeaf = True
+
+    def __init__(self, monitor_service):
+        super().__init__()
+
+    def render_GET(self, request):
+        if not check_auth_token(request):
+            return json.dumps({'error': True, 'messages': ['invalid-auth-token']}).encode("utf-8")
+
+        results = {
+            'error': False,
+            'messages': [],
+            'data': {
+                'connectors': HttpStats.inst().stats()
+            }
+        }
+
+        return json.dumps(results).encode("utf-8")
+
+
 class AllowedIPOnlyFactory(server.Site):
 
     def buildProtocol(self, addr):
@@ -1190,9 +1374,19 @@ class HttpRestServer(object):
                                        self._watcher_service)
         monitor_api.putChild(b"status", status_api)
 
+        latency_api = LatencyInfoRestAPI(self._monitor_service)
+        monitor_api.putChild(b"latency", latency_api)
+
+        http_api = HttpInfoRestAPI(self._monitor_service)
+        monitor_api.putChild(b"http", http_api)
+
         # charting
         strategy_api.putChild(b"chart", Charting(self._monitor_service, self._strategy_service, self._trader_service))
 
+        # downsampled chart series
+        chart_series_api = ChartSeriesRestAPI(self._monitor_service, self._strategy_service, self._trader_service)
+        strategy_api.putChild(b"chart-series", chart_series_api)
+
         factory = AllowedIPOnlyFactory(root)
         factory.sessionFactory = LongSession
 
@@ -116,7 +116,75 @@ function setup_charting(elt, market_id, analyser_name) {
     let label = market_id; // @todo
     let timeframeUnit = "minute";
 
-    create_chart(canvas, label, timeframeUnit);
+    let chart = create_chart(canvas, label, timeframeUnit);
+
+    // initial visible range, the last bars until now
+    fetch_chart_series(chart, market_id, "1m", null, null);
+}
+
+/**
+ * Fetch the downsampled OHLC for the visible range of the chart, at most one bar per pixel.
+ * @param timeframe Timeframe of the stored OHLC (str like 1m or float in seconds).
+ * @param from Range start timestamp in seconds or null.
+ * @param to Range end timestamp in seconds or null for now.
+ */
+function fetch_chart_series(chart, market_id, timeframe, from, to) {
+    let endpoint = "strategy/chart-series";
+    let url = base_url() + '/' + endpoint;
+
+    let params = {
+        'market-id': market_id,
+        'timeframe': timeframe,
+        'resolution': Math.max(100, Math.floor(chart.width)),
+    };
+
+    if (from != null) {
+        params['from'] = from;
+    }
+
+    if (to != null) {
+        params['to'] = to;
+    }
+
+    $.ajax({
+        type: "GET",
+        url: url,
+        headers: {
+            'Authorization': "Bearer " + server['auth-token'],
+            'TWISTED_SESSION': server.session,
+        },
+        data: params,
+        dataType: 'json',
+        contentType: 'application/json'
+    })
+    .done(function(data) {
+        if (data.error) {
+            for (let msg in data.messages) {
+                notify({'message': data.messages[msg], 'title': 'Chart Series', 'type': 'error'});
+            }
+        } else {
+            chart.data.datasets[0].data = data.data.ohlc.map(function(bar) {
+                return {'x': bar[0] * 1000, 'o': bar[1], 'h': bar[2], 'l': bar[3], 'c': bar[4]};
+            });
+
+            chart.siis = {'market-id': market_id, 'timeframe': timeframe};
+            chart.update('none');
+        }
+    })
+    .fail(function(data) {
+        notify({'message': "Unable to fetch the chart series", 'title': 'Chart Series', 'type': 'error'});
+    });
+}
+
+function on_chart_range_changed(context) {
+    let chart = context.chart;
+
+    if (chart.siis) {
+        // fetch the new visible range
+        let scale = chart.scales.x;
+        fetch_chart_series(chart, chart.siis['market-id'], chart.siis['timeframe'], scale.min * 0.001,
+            scale.max * 0.001);
+    }
 }
 
 function remove_charting() {
@@ -193,6 +261,7 @@ function create_chart(canvas, label, timeframeUnit) {
               },
               enabled: true,
               mode: 'xy',
+              onPanComplete: on_chart_range_changed,
             },
             zoom: {
               wheel: {
@@ -202,9 +271,12 @@ function create_chart(canvas, label, timeframeUnit) {
                 enabled: true
               },
               mode: 'xy',
+              onZoomComplete: on_chart_range_changed,
            },
         }
       },
       },
     });
+
+    return chart;
 }
\ No newline at end of file
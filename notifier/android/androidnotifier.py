@@ -8,6 +8,8 @@ import time
 from datetime import datetime, timedelta
 
 from notifier.notifier import Notifier
+from notifier.dispatcher import NotificationDispatcher
+from notifier.notifierexception import NotifierException
 
 from notifier.android.androidpush import send_to_android
 
@@ -26,6 +28,15 @@ class AndroidNotifier(Notifier):
     @todo Strategy alert notifications
     """
 
+    # alerts, errors and watchdog are not grouped with the trades messages
+    HIGH_PRIORITY_SIGNALS = (
+        Signal.SIGNAL_STRATEGY_TRADE_ERROR,
+        Signal.SIGNAL_STRATEGY_ALERT,
+        Signal.SIGNAL_WATCHDOG_TIMEOUT,
+        Signal.SIGNAL_WATCHDOG_UNREACHABLE,
+        Signal.SIGNAL_DATA_TIMEOUT,
+    )
+
     def __init__(self, identifier: str, service, options: dict):
         super().__init__("android", identifier, service)
 
@@ -79,6 +90,21 @@ class AndroidNotifier(Notifier):
     def notify(self):
         pass
 
+    def send_message(self, channel, message, extra):
+        response = send_to_android(self._auth_key, channel, self._who, message, extra.get('sound', "default"))
+
+        if response.status_code == 429 or response.status_code >= 500:
+            # quota exceeded or unavailable, retry after
+            try:
+                return float(response.headers.get('Retry-After', 10.0))
+            except ValueError:
+                return 10.0
+
+        if response.status_code != 200:
+            raise NotifierException(self.name, self.identifier, "Send message error %i" % response.status_code)
+
+        return None
+
     def process_signal(self, signal):
         message = ""
         locale = "fr"
@@ -178,10 +204,10 @@ class AndroidNotifier(Notifier):
 
         if message:
             if channel and self._auth_key:
-                try:
-                    send_to_android(self._auth_key, channel, self._who, message, sound)
-                except:
-                    pass
+                priority = NotificationDispatcher.PRIORITY_HIGH if signal.signal_type in \
+                    AndroidNotifier.HIGH_PRIORITY_SIGNALS else NotificationDispatcher.PRIORITY_NORMAL
+
+                self.dispatch(channel, message, priority, {'sound': sound})
 
     def format_trade_entry(self, t, locale):
         messages = []
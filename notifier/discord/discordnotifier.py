@@ -10,6 +10,7 @@ from tabulate import tabulate
 from datetime import datetime, timedelta
 
 from notifier.notifier import Notifier
+from notifier.dispatcher import NotificationDispatcher
 from terminal.terminal import Color
 
 from notifier.discord.webhooks import send_to_discord
@@ -34,6 +35,13 @@ class DiscordNotifier(Notifier):
     @todo trade-quantity
     """
 
+    # webhooks allow about 5 requests per 2 seconds, 2000 characters max including the code block markers
+    DISPATCHER_OPTIONS = {
+        'rate': 2.0,
+        'burst': 5,
+        'max-size': 2000 - 6 - 25,
+    }
+
     def __init__(self, identifier, service, options):
         super().__init__("discord", identifier, service)
 
@@ -292,9 +300,25 @@ class DiscordNotifier(Notifier):
 
         return messages
 
+    def send_message(self, channel, message, extra):
+        response = send_to_discord(channel, self._who, '```' + message + '```', extra)
+
+        if response.status_code == 429:
+            # too many requests
+            try:
+                return float(response.json().get('retry_after', 1.0))
+            except ValueError:
+                return 1.0
+
+        if response.status_code >= 300:
+            raise NotifierException(self.name, self.identifier, "Send message error %i" % response.status_code)
+
+        return None
+
     def process_signal(self, signal):
         message = ""
         locale = "fr"
+        priority = NotificationDispatcher.PRIORITY_NORMAL
 
         #
         # messages
@@ -326,6 +350,7 @@ class DiscordNotifier(Notifier):
                 return
 
             border = "orange"
+            priority = NotificationDispatcher.PRIORITY_HIGH
 
             ldatetime = datetime.fromtimestamp(signal.data['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
 
@@ -340,6 +365,7 @@ class DiscordNotifier(Notifier):
 
             # detailed alert reason
             reason = signal.data['reason']
+            priority = NotificationDispatcher.PRIORITY_HIGH
 
             if signal.data['trigger'] > 0:
                 border = "green"
@@ -439,10 +465,7 @@ class DiscordNotifier(Notifier):
                 extra = None
 
             if dst:
-                try:
-                    send_to_discord(dst, self._who, '```' + message + '```', extra)
-                except:
-                    pass
+                self.dispatch(dst, message, priority, extra)
 
     def receiver(self, signal):
         if not self._playpause or self._backtesting or not signal:
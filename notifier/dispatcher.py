@@ -0,0 +1,246 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Notification dispatcher with batching and per-channel rate limiting.
+
+from typing import Callable, Optional, Union
+
+import time
+import collections
+import traceback
+
+import logging
+logger = logging.getLogger('siis.notifier.dispatcher')
+error_logger = logging.getLogger('siis.error.notifier.dispatcher')
+traceback_logger = logging.getLogger('siis.traceback.notifier.dispatcher')
+
+
+class NotificationMessage(object):
+
+    __slots__ = 'channel', 'message', 'priority', 'extra', 'timestamp'
+
+    def __init__(self, channel: str, message: str, priority: int, extra: Optional[dict], timestamp: float):
+        self.channel = channel
+        self.message = message
+        self.priority = priority
+        self.extra = extra
+        self.timestamp = timestamp
+
+
+class NotificationChannel(object):
+    """
+    State of a destination channel : queues per priority, token bucket and backoff.
+    """
+
+    def __init__(self, channel: str, burst: int, timestamp: float):
+        self.channel = channel
+
+        self.queues = (collections.deque(), collections.deque())  # per priority
+        self.dropped = 0
+
+        self.tokens = float(burst)
+        self.last_refill = timestamp
+
+        self.retry_at = 0.0   # rate limited or failed until this timestamp
+        self.retries = 0      # consecutive failures
+
+    def pending(self) -> int:
+        return len(self.queues[0]) + len(self.queues[1])
+
+
+class NotificationDispatcher(object):
+    """
+    Dispatch the formatted messages of a notifier to its channels (chat, webhook...) from the notifier thread.
+
+    - Messages of normal priority are retained batch-delay seconds, then the burst is sent as digest messages
+      (joined up to max-size), for example on a stop cascade of many trades.
+    - Messages of high priority (alerts, errors) are sent first, never behind a backlog of normal messages.
+    - Each channel has a token bucket of rate messages per second and up to burst messages at once.
+    - When a send is rate limited (the sender returns a delay) or fails (the sender raises), the messages are
+      kept and the channel waits, the delay or an exponential backoff, before retrying.
+
+    The sender is a callable(channel, message, extra) returning None if sent, or the delay in seconds to wait
+    before a retry if rate limited. It raises on failure.
+
+    @note Not thread safe, push and process are called from the notifier thread.
+    """
+
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 1
+
+    DIGEST_SEPARATOR = "\n\n"
+
+    def __init__(self, sender: Callable[[str, str, Optional[dict]], Union[float, None]], options: Optional[dict] = None):
+        """
+        @param sender: Send a message to a channel.
+        @param options: Optional dict with rate (messages per second), burst (messages), batch-delay (seconds),
+            max-size (characters per message), max-queue (pending messages per channel),
+            max-backoff (seconds) and max-retries.
+        """
+        options = options or {}
+
+        self._sender = sender
+
+        self._rate = max(0.001, float(options.get('rate', 1.0)))
+        self._burst = max(1, int(options.get('burst', 5)))
+        self._batch_delay = max(0.0, float(options.get('batch-delay', 1.0)))
+        self._max_size = max(64, int(options.get('max-size', 4000)))
+        self._max_queue = max(1, int(options.get('max-queue', 500)))
+        self._max_backoff = max(1.0, float(options.get('max-backoff', 60.0)))
+        self._max_retries = max(1, int(options.get('max-retries', 10)))
+
+        self._channels = {}
+
+    @property
+    def pending(self) -> int:
+        return sum(channel.pending() for channel in self._channels.values())
+
+    def push(self, channel: str, message: str, priority: int = PRIORITY_NORMAL, extra: Optional[dict] = None):
+        """
+        Queue a message for a channel. Once the queue of a channel is full the oldest normal messages are dropped,
+        and the count of dropped messages is appended to the next digest.
+        """
+        if not channel or not message:
+            return
+
+        now = time.time()
+
+        state = self._channels.get(channel)
+        if state is None:
+            state = self._channels[channel] = NotificationChannel(channel, self._burst, now)
+
+        priority = NotificationDispatcher.PRIORITY_HIGH if priority == NotificationDispatcher.PRIORITY_HIGH else \
+            NotificationDispatcher.PRIORITY_NORMAL
+
+        state.queues[priority].append(NotificationMessage(channel, message, priority, extra, now))
+
+        while state.pending() > self._max_queue and state.queues[NotificationDispatcher.PRIORITY_NORMAL]:
+            state.queues[NotificationDispatcher.PRIORITY_NORMAL].popleft()
+            state.dropped += 1
+
+    def process(self, force: bool = False):
+        """
+        Send what is allowed for each channel.
+        @param force: Don't retain the normal messages for the batch delay, the rate limits are respected.
+        """
+        now = time.time()
+
+        for state in self._channels.values():
+            if now < state.retry_at:
+                continue
+
+            # refill the token bucket
+            state.tokens = min(float(self._burst), state.tokens + (now - state.last_refill) * self._rate)
+            state.last_refill = now
+
+            while state.tokens >= 1.0:
+                batch = self._next_batch(state, now, force)
+                if not batch:
+                    break
+
+                if not self._send(state, batch, now):
+                    break
+
+                state.tokens -= 1.0
+
+    def next_timeout(self, timestamp: Optional[float] = None) -> Optional[float]:
+        """
+        Delay in seconds until the next message could be sent, or None if nothing is pending.
+        """
+        now = timestamp or time.time()
+        timeout = None
+
+        for state in self._channels.values():
+            if not state.pending():
+                continue
+
+            at = state.retry_at
+
+            if state.tokens < 1.0:
+                at = max(at, state.last_refill + (1.0 - state.tokens) / self._rate)
+
+            if not state.queues[NotificationDispatcher.PRIORITY_HIGH]:
+                at = max(at, state.queues[NotificationDispatcher.PRIORITY_NORMAL][0].timestamp + self._batch_delay)
+
+            delay = max(0.0, at - now)
+            timeout = delay if timeout is None else min(timeout, delay)
+
+        return timeout
+
+    def flush(self):
+        """
+        Send any pending message without waiting for the batch delay, but respecting the rate limits.
+        """
+        self.process(True)
+
+    #
+    # internal
+    #
+
+    def _next_batch(self, state: NotificationChannel, now: float, force: bool) -> list:
+        queue = state.queues[NotificationDispatcher.PRIORITY_HIGH]
+
+        if not queue:
+            queue = state.queues[NotificationDispatcher.PRIORITY_NORMAL]
+
+            # retain the first messages of a burst to make a digest
+            if not queue or (not force and now - queue[0].timestamp < self._batch_delay):
+                return []
+
+        batch = [queue.popleft()]
+        size = len(batch[0].message)
+
+        # join the following messages of the same kind, up to the max size
+        while queue and queue[0].extra == batch[0].extra:
+            size += len(NotificationDispatcher.DIGEST_SEPARATOR) + len(queue[0].message)
+            if size > self._max_size:
+                break
+
+            batch.append(queue.popleft())
+
+        return batch
+
+    def _send(self, state: NotificationChannel, batch: list, now: float) -> bool:
+        message = NotificationDispatcher.DIGEST_SEPARATOR.join(m.message for m in batch)
+
+        if state.dropped and batch[0].priority == NotificationDispatcher.PRIORITY_NORMAL:
+            message += "%s(%i messages dropped)" % (NotificationDispatcher.DIGEST_SEPARATOR, state.dropped)
+
+        if len(message) > self._max_size:
+            message = message[:self._max_size-3] + "..."
+
+        try:
+            retry_after = self._sender(state.channel, message, batch[0].extra)
+        except Exception as e:
+            retry_after = None
+            state.retries += 1
+
+            if state.retries > self._max_retries:
+                error_logger.error("Notification to %s dropped after %i retries : %s" % (
+                    state.channel, self._max_retries, repr(e)))
+                traceback_logger.error(traceback.format_exc())
+
+                state.retries = 0
+                return True
+
+            # exponential backoff
+            state.retry_at = now + min(self._max_backoff, 2.0 ** (state.retries - 1))
+        else:
+            if not retry_after:
+                # sent
+                state.retries = 0
+
+                if batch[0].priority == NotificationDispatcher.PRIORITY_NORMAL:
+                    state.dropped = 0
+
+                return True
+
+            # rate limited by the remote
+            logger.debug("Notification to %s rate limited, retry after %gs" % (state.channel, retry_after))
+            state.retry_at = now + min(self._max_backoff, retry_after)
+
+        # keep the messages in order for the retry
+        queue = state.queues[batch[0].priority]
+        queue.extendleft(reversed(batch))
+
+        return False
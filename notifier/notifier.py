@@ -5,7 +5,7 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from .service import NotifierService
@@ -21,6 +21,8 @@ from datetime import datetime
 from common.runnable import Runnable
 from terminal.terminal import Terminal
 
+from notifier.dispatcher import NotificationDispatcher
+
 import logging
 logger = logging.getLogger('siis.notifier')
 
@@ -36,6 +38,8 @@ class Notifier(Runnable):
     COMMAND_INFO = 1
     COMMAND_TOGGLE = 2
 
+    DISPATCHER_OPTIONS = {}  # default options of the dispatcher, overridden by the dispatcher notifier config
+
     _notifier_service: NotifierService
 
     def __init__(self, name: str, identifier: str, service: NotifierService):
@@ -58,6 +62,12 @@ class Notifier(Runnable):
         self._display_percent_in_pip = notifier_config.get('display-percent-in-pip', False)
         self._display_quantity_in_local = notifier_config.get('display-quantity-in-local', True)
 
+        # formatted messages are batched and rate limited per channel, see send_message
+        dispatcher_options = dict(self.DISPATCHER_OPTIONS)
+        dispatcher_options.update(notifier_config.get('dispatcher', {}))
+
+        self._dispatcher = NotificationDispatcher(self.send_message, dispatcher_options)
+
         # listen to its service
         self.service.add_listener(self)
 
@@ -106,6 +116,12 @@ class Notifier(Runnable):
     def post_run(self):
         Terminal.inst().message("Joining notifier %s - %s..." % (self._name, self._identifier), view='content')
 
+        # last chance for the pending messages
+        try:
+            self._dispatcher.flush()
+        except Exception as e:
+            logger.error(repr(e))
+
     def pre_update(self):
         self.wait_signal()
 
@@ -131,6 +147,12 @@ class Notifier(Runnable):
                 # yield
                 time.sleep(0)
 
+        # send the formatted messages allowed by the rate limits
+        try:
+            self._dispatcher.process()
+        except Exception as e:
+            logger.error(repr(e))
+
         return True
 
     def post_update(self):
@@ -139,6 +161,13 @@ class Notifier(Runnable):
     def wait_signal(self):
         self._condition.acquire()
         while self._running and not self._signals:
+            # wake-up for the next pending message to dispatch
+            timeout = self._dispatcher.next_timeout()
+            if timeout is not None:
+                if timeout > 0.0:
+                    self._condition.wait(timeout)
+                break
+
             self._condition.wait()
         self._condition.release()
 
@@ -151,6 +180,27 @@ class Notifier(Runnable):
         self._condition.notify()
         self._condition.release()
 
+    def dispatch(self, channel: str, message: str, priority: int = NotificationDispatcher.PRIORITY_NORMAL,
+                 extra: Optional[dict] = None):
+        """
+        Queue a formatted message to be sent to a channel by send_message, from the notifier thread.
+        The messages of normal priority are grouped into digest messages on burst.
+
+        @param channel: Destination (chat-id, webhook, topic...).
+        @param message: Formatted message.
+        @param priority: NotificationDispatcher.PRIORITY_HIGH for alerts and errors, else PRIORITY_NORMAL.
+        @param extra: Optional data given to send_message, only the messages with the same extra are grouped.
+        """
+        self._dispatcher.push(channel, message, priority, extra)
+
+    def send_message(self, channel: str, message: str, extra: Optional[dict]) -> Optional[float]:
+        """
+        To override for the notifiers using dispatch. Send a message to a channel.
+        @return None if sent, or the delay in seconds before a retry if rate limited.
+        @note Must raise an exception on failure, the message is retried with a backoff.
+        """
+        return None
+
     def command(self, command_type: int, data: dict):
         if command_type == self.COMMAND_INFO:
             message = "%s notifier is %s" % (self.identifier, "active" if self._playpause else "disabled")
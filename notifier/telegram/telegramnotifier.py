@@ -10,6 +10,7 @@ import traceback
 from datetime import datetime, timedelta
 
 from notifier.notifier import Notifier
+from notifier.dispatcher import NotificationDispatcher
 
 from notifier.telegram.telegramapi import send_to_telegram, get_telegram_updates
 from notifier.notifierexception import NotifierException
@@ -34,6 +35,13 @@ class TelegramNotifier(Notifier):
 
     WAIT_DELAY = 1.0  # 1 second to check bot command
 
+    # about 1 message per second per chat, 4096 characters max
+    DISPATCHER_OPTIONS = {
+        'rate': 1.0,
+        'burst': 3,
+        'max-size': 4000,
+    }
+
     def __init__(self, identifier: str, service, options: dict):
         super().__init__("telegram", identifier, service)
 
@@ -122,12 +130,20 @@ class TelegramNotifier(Notifier):
     def wait_signal(self):
         self._condition.acquire()
         while self._running and not self._signals:
+            # wake-up for the next pending message to dispatch
+            timeout = self._dispatcher.next_timeout()
+
             if self._commands:
                 # have commands to process, wake-up frequently
-                self._condition.wait(TelegramNotifier.WAIT_DELAY)
+                timeout = min(timeout, TelegramNotifier.WAIT_DELAY) if timeout is not None else \
+                    TelegramNotifier.WAIT_DELAY
+
+            if timeout is not None:
+                if timeout > 0.0:
+                    self._condition.wait(timeout)
                 break
-            else:
-                self._condition.wait()
+
+            self._condition.wait()
         self._condition.release()
 
     def update(self):
@@ -336,9 +352,25 @@ class TelegramNotifier(Notifier):
 
         return messages
 
+    def send_message(self, channel, message, extra):
+        response = send_to_telegram(self._bot_token, channel, message)
+
+        if response.status_code == 429:
+            # too many requests
+            try:
+                return float(response.json().get('parameters', {}).get('retry_after', 1.0))
+            except ValueError:
+                return 1.0
+
+        if response.status_code != 200:
+            raise NotifierException(self.name, self.identifier, "Send message error %i" % response.status_code)
+
+        return None
+
     def process_signal(self, signal):
         message = ""
         locale = "fr"
+        priority = NotificationDispatcher.PRIORITY_NORMAL
 
         #
         # messages
@@ -370,6 +402,7 @@ class TelegramNotifier(Notifier):
                 return
 
             border = "orange"
+            priority = NotificationDispatcher.PRIORITY_HIGH
 
             fmt_datetime = datetime.fromtimestamp(signal.data['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
 
@@ -384,6 +417,7 @@ class TelegramNotifier(Notifier):
 
             # detailed alert reason
             reason = signal.data['reason']
+            priority = NotificationDispatcher.PRIORITY_HIGH
 
             if signal.data['trigger'] > 0:
                 border = "green"
@@ -479,10 +513,7 @@ class TelegramNotifier(Notifier):
         if message:
             dst = self._chats.get('signals')
             if dst:
-                try:
-                    send_to_telegram(self._bot_token, dst, message)
-                except:
-                    pass
+                self.dispatch(dst, message, priority)
 
     def receiver(self, signal):
         if not self._playpause or self._backtesting or not signal:
@@ -693,9 +724,7 @@ class TelegramNotifier(Notifier):
                 messages.append("Trade %s:%s does not exists" % (symbol, trade_id))
 
         if messages and chat_id:
-            try:
-                send_to_telegram(self._bot_token, chat_id, '\n'.join(messages))
-            except:
-                pass
+            # reply to the command before any pending notification
+            self.dispatch(chat_id, '\n'.join(messages), NotificationDispatcher.PRIORITY_HIGH)
 
         return True
@@ -5,6 +5,7 @@
 
 from __init__ import APP_VERSION, APP_SHORT_NAME, APP_RELEASE
 
+import gc
 import signal
 import sys
 import os
@@ -15,34 +16,18 @@ import traceback
 from datetime import datetime
 
 from common.utils import parse_utc_datetime, fix_thread_set_name, UTC, duration_to_str, timeframe_to_str
+from common.startup import StartupTimer
 
-from watcher.service import WatcherService
-
-from notifier.notifier import Notifier
-from trader.service import TraderService
-from strategy.service import StrategyService
-from monitor.service import MonitorService
-from notifier.service import NotifierService
-from common.watchdog import WatchdogService
 from tools.tool import Tool
 
 from terminal.terminal import Terminal
-from terminal.command import CommandsHandler
-
-from database.database import Database
 
 from common.siislog import SiisLog
 
-from view.service import ViewService
-from view.defaultviews import setup_default_views
-
 from app.help import display_cli_help, display_welcome
 from app.setup import install
-from app.generalcommands import register_general_commands
-from app.tradingcommands import register_trading_commands
-from app.regioncommands import register_region_commands
-from app.alertcommands import register_alert_commands
-from app.statisticcommands import register_statistic_commands
+
+# services, views and commands modules are only imported in normal mode, tools don't need them
 
 running = False  # main loop state
 
@@ -60,6 +45,10 @@ def signal_int_handler(sig, frame):
 
 def terminate(watchdog_service, watcher_service, trader_service, strategy_service, monitor_service,
               view_service, notifier_service):
+    from monitor.service import MonitorService
+    from database.database import Database
+    from common.recorder import Recorder
+    from common.netcore import NetworkCore
 
     if watcher_service:
         watcher_service.terminate()
@@ -80,6 +69,9 @@ def terminate(watchdog_service, watcher_service, trader_service, strategy_servic
         watchdog_service.terminate()
 
     MonitorService.stop_reactor()
+    NetworkCore.inst().stop()
+
+    Recorder.inst().close()
 
     Terminal.inst().info("Flushing database...")
     Terminal.inst().flush()
@@ -96,6 +88,9 @@ def terminate(watchdog_service, watcher_service, trader_service, strategy_servic
 
 
 def application(argv):
+    # begin of the startup timing
+    StartupTimer.inst()
+
     fix_thread_set_name()
 
     # init terminal display
@@ -174,6 +169,9 @@ def application(argv):
                 elif arg == '--trainer':
                     # use the machine learning / trainer tool
                     options['tool'] = "trainer"
+                elif arg == '--bench':
+                    # use the benchmark tool
+                    options['tool'] = "benchmark"
                 elif arg.startswith("--tool="):
                     # use a named tool
                     options['tool'] = arg.split('=')[1]
@@ -186,10 +184,32 @@ def application(argv):
                     options['zip'] = True
                 elif arg == '--update':
                     options['update'] = True
+                elif arg.startswith('--baseline='):
+                    # benchmark baseline filename
+                    options['baseline'] = arg.split('=')[1]
 
                 elif arg == '--monitor':
                     # use the importer
                     options['monitor'] = True
+                elif arg == '--latency':
+                    # trace the latency from the market data to the order submission
+                    options['latency'] = True
+                elif arg == '--profiler':
+                    # profile the processing of the strategy traders
+                    options['profiler'] = True
+                elif arg == '--async-net':
+                    # host the websockets of the supported connectors into a single asyncio loop
+                    options['async-net'] = True
+                elif arg.startswith('--record='):
+                    # record the raw market data of the connectors
+                    options['record'] = arg.split('=')[1]
+                elif arg.startswith('--replay='):
+                    # replay a record in place of the exchange, always paper-mode
+                    options['replay'] = arg.split('=')[1]
+                    options['paper-mode'] = True
+                elif arg.startswith('--replay-speed='):
+                    # replay speed factor, 0 for as fast as possible
+                    options['replay-speed'] = float(arg.split('=')[1])
                 elif arg.startswith('--monitor-port='):
                     # override monitor HTTP port (+1 for WS port)
                     options['monitor-port'] = int(arg.split('=')[1])
@@ -197,6 +217,9 @@ def application(argv):
                 elif arg == '--install-market':
                     # fetcher option
                     options['install-market'] = True
+                elif arg == '--fill-gaps':
+                    # fetcher option, only fetch the missing ranges found by the optimizer
+                    options['fill-gaps'] = True
                 elif arg == '--initial-fetch' or arg == '--prefetch':
                     # do the initial OHLC fetch for watchers (syncer, watcher), default False
                     options['initial-fetch'] = True
@@ -298,6 +321,22 @@ def application(argv):
                     # auto-quit only in backtest mode
                     options['no-interactive'] = True
 
+                elif arg == '--headless':
+                    # backtest only, without terminal views, monitor, notifier and main loop
+                    options['headless'] = True
+                    options['no-interactive'] = True
+
+                elif arg.startswith('--ready-timeout='):
+                    # maximum wait in seconds of the markets data before a headless backtest, 0 for no limit
+                    options['ready-timeout'] = float(arg.split('=')[1])
+                    if options['ready-timeout'] < 0.0:
+                        Terminal.inst().error("Invalid 'ready-timeout' value. Must be positive or 0")
+                        sys.exit(-1)
+
+                elif arg == '--startup-report':
+                    # display the duration of each phase of the startup
+                    options['startup-report'] = True
+
                 elif arg == '--version':
                     Terminal.inst().info('%s %s release %s' % (
                         APP_SHORT_NAME, '.'.join([str(x) for x in APP_VERSION]), APP_RELEASE))
@@ -320,6 +359,10 @@ def application(argv):
                 Terminal.inst().error("Backtesting need from= and to= date time")
                 sys.exit(-1)
         else:
+            if options.get('headless'):
+                Terminal.inst().error("Headless mode (--headless) is only allowed in backtest mode")
+                sys.exit(-1)
+
             if options['no-interactive']:
                 Terminal.inst().error("No interactive mode (--no-interactive) at end is only allowed in backtest mode")
                 sys.exit(-1)
@@ -420,6 +463,41 @@ def application(argv):
         else:
             sys.exit(-1)
 
+    #
+    # headless backtest
+    #
+
+    if options.get('headless'):
+        from app.headless import run_headless_backtest, display_headless_results, write_headless_results, \
+            DEFAULT_READY_TIMEOUT
+
+        if options['identity'].startswith('-'):
+            Terminal.inst().error("First option must be the identity name")
+            Terminal.inst().flush()
+
+            sys.exit(-1)
+
+        Terminal.inst().info("Starting SIIS headless backtest using %s identity..." % options['identity'])
+        Terminal.inst().flush()
+
+        # exit with an error if failed, ie. the markets data are not ready in time
+        results = run_headless_backtest(options, options.get('ready-timeout', DEFAULT_READY_TIMEOUT))
+
+        if results:
+            for profile_results in results:
+                display_headless_results(profile_results)
+
+            if options.get('filename'):
+                write_headless_results(results, options['filename'])
+                Terminal.inst().info("Results written to %s" % options['filename'])
+        else:
+            Terminal.inst().error("Headless backtest failed")
+
+        Terminal.inst().flush()
+        Terminal.terminate()
+
+        sys.exit(0 if results else -1)
+
     #
     # normal mode
     #
@@ -427,6 +505,36 @@ def application(argv):
     if options['identity'].startswith('-'):
         Terminal.inst().error("First option must be the identity name")
 
+    StartupTimer.inst().mark("init")
+
+    from watcher.service import WatcherService
+
+    from notifier.notifier import Notifier
+    from trader.service import TraderService
+    from strategy.service import StrategyService
+    from monitor.service import MonitorService
+    from notifier.service import NotifierService
+    from common.watchdog import WatchdogService
+    from common.latency import LatencyTracer
+    from common.profiler import Profiler
+    from common.recorder import Recorder, Replayer
+    from common.netcore import NetworkCore
+
+    from terminal.command import CommandsHandler
+
+    from database.database import Database
+
+    from view.service import ViewService
+    from view.defaultviews import setup_default_views
+
+    from app.generalcommands import register_general_commands
+    from app.tradingcommands import register_trading_commands
+    from app.regioncommands import register_region_commands
+    from app.alertcommands import register_alert_commands
+    from app.statisticcommands import register_statistic_commands
+
+    StartupTimer.inst().mark("imports")
+
     Terminal.inst().info("Starting SIIS using %s identity..." % options['identity'])
     Terminal.inst().action("- type ':quit<Enter>' to terminate")
     Terminal.inst().action("- type ':h<Enter> or :help<Enter>' to display help")
@@ -452,6 +560,20 @@ def application(argv):
 
     # application services
 
+    if options.get('latency') and not options.get('backtesting'):
+        LatencyTracer.inst().enable()
+
+    if options.get('profiler'):
+        Profiler.inst().enable()
+
+    if options.get('async-net') and not options.get('backtesting'):
+        NetworkCore.inst().enable()
+
+    if options.get('replay') and not options.get('backtesting'):
+        Replayer.inst().open(options['replay'], options.get('replay-speed', 1.0))
+    elif options.get('record') and not options.get('backtesting'):
+        Recorder.inst().open(options['record'])
+
     watchdog_service = WatchdogService(options)  
     monitor_service = MonitorService(options)
     view_service = ViewService(options)
@@ -460,6 +582,8 @@ def application(argv):
     trader_service = TraderService(watcher_service, monitor_service, options)
     strategy_service = StrategyService(watcher_service, trader_service, monitor_service, options)
 
+    StartupTimer.inst().mark("services creation")
+
     # watchdog service
     Terminal.inst().info("Starting watchdog service...")
     try:
@@ -509,6 +633,8 @@ def application(argv):
     #               view_service, notifier_service)
     #     sys.exit(-1)
 
+    StartupTimer.inst().mark("watchdog, monitor, notifier")
+
     # database manager
     try:
         Database.create(options)
@@ -521,6 +647,8 @@ def application(argv):
                   view_service, notifier_service)
         sys.exit(-1)
 
+    StartupTimer.inst().mark("database")
+
     # watcher service
     Terminal.inst().info("Starting watcher service...")
     try:
@@ -534,6 +662,8 @@ def application(argv):
                   view_service, notifier_service)
         sys.exit(-1)
 
+    StartupTimer.inst().mark("watcher service")
+
     # trader service
     Terminal.inst().message("Starting trader service...")
     try:
@@ -556,6 +686,8 @@ def application(argv):
     # trader service listen to watcher service and update views
     watcher_service.add_listener(trader_service)
 
+    StartupTimer.inst().mark("trader service")
+
     # strategy service
     Terminal.inst().message("Starting strategy service...")
     try:
@@ -569,6 +701,8 @@ def application(argv):
                   view_service, notifier_service)
         sys.exit(-1)
 
+    StartupTimer.inst().mark("strategy service")
+
     # want to be notifier of system errors
     watchdog_service.add_listener(notifier_service)
 
@@ -629,6 +763,20 @@ def application(argv):
                       view_service, notifier_service)
             sys.exit(-1)
 
+    StartupTimer.inst().mark("commands and views")
+
+    # the objects of the startup (markets, configs, loaded history...) are long living, move them out of the
+    # collected generations, then the full collections only scan the market data objects created since
+    gc.collect()
+    gc.freeze()
+
+    startup_report = StartupTimer.inst().report()
+
+    if options.get('startup-report'):
+        Terminal.inst().info("Startup timing :")
+        for line in startup_report:
+            Terminal.inst().info("- " + line)
+
     display_welcome()
 
     LOOP_SLEEP = 0.016  # in second
@@ -741,8 +889,8 @@ def application(argv):
                             result = commands_handler.process_accelerator(key)
 
                             # @todo convert to Command object accelerator
-                            # used : ABCDFIMNOPQRSTWXZ? an%,;:!
-                            # unused : EGHJKLUVY
+                            # used : ABCDFILMNOPQRSTWXZ? an%,;:!
+                            # unused : EGHJKUVY
                             if not result:
                                 result = True
 
@@ -759,6 +907,10 @@ def application(argv):
                                     Terminal.inst().switch_view('strategy')
                                 elif value == 'I':
                                     Terminal.inst().switch_view('content')
+                                elif value == 'K':
+                                    Terminal.inst().switch_view('profiler')
+                                elif value == 'L':
+                                    Terminal.inst().switch_view('latency')
                                 elif value == 'M':
                                     Terminal.inst().switch_view('market')
                                 elif value == 'N':
@@ -941,6 +1093,9 @@ def application(argv):
     notifier_service.terminate() if notifier_service else None
 
     MonitorService.stop_reactor()
+    NetworkCore.inst().stop()
+
+    Recorder.inst().close()
 
     Terminal.inst().info("Flushing database...")
     Terminal.inst().flush() 
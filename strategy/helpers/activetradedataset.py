@@ -10,6 +10,8 @@
 
 import traceback
 
+from typing import Optional
+
 from common.utils import timeframe_to_str
 
 import logging
@@ -23,7 +25,7 @@ def fmt_pips(value):
     return ("%.2f" % value).rstrip('0').rstrip('.')
 
 
-def get_all_active_trades(strategy):
+def get_all_active_trades(strategy, cache: Optional[dict] = None):
     """
     Generate and return an array of all the actives trades :
         symbol: str market identifier
@@ -62,89 +64,134 @@ def get_all_active_trades(strategy):
         mae-dist-pips: distance in pips from entry price and worst price
         mfe-dist-pips: distance in pips from entry price and best price
         etd-dist-pips: distance in pips from MFE and last price
+
+    @param cache: Optional dict kept by the caller between two calls. A trade is dumped again only if its state or
+        the prices of its market changed, else the previous dump is reused (it must not be modified).
     """
     results = []
+    dumps = {}
 
     with strategy.mutex:
         try:
             for k, strategy_trader in strategy.strategy_traders.items():
                 with strategy_trader.mutex:
                     for trade in strategy_trader.trades:
-                        pip_means = strategy_trader.instrument.one_pip_means
+                        if cache is not None:
+                            key = (strategy_trader.instrument.market_id, trade.id)
+                            source = active_trade_source(strategy_trader, trade)
 
-                        profit_loss_rate = trade.estimate_profit_loss_rate(strategy_trader.instrument)
+                            cached = cache.get(key)
+                            if cached is not None and cached[0] == source:
+                                dump = cached[1]
+                            else:
+                                dump = dumps_active_trade(strategy_trader, trade)
 
-                        if trade.entry_price or trade.order_price:
-                            sl_dist_pips = (trade.direction * (trade.stop_loss - (
-                                    trade.entry_price or trade.order_price))) / pip_means
-                            tp_dist_pips = (trade.direction * (trade.take_profit - (
-                                    trade.entry_price or trade.order_price))) / pip_means
-
-                            entry_dist_pips = (trade.direction * (strategy_trader.instrument.open_exec_price(
-                                trade.direction) - trade.entry_price)) / pip_means if trade.entry_price else 0.0
-                            order_dist_pips = (trade.direction * (strategy_trader.instrument.open_exec_price(
-                                trade.direction) - trade.order_price)) / pip_means if trade.order_price else 0.0
-                        else:
-                            sl_dist_pips = 0.0
-                            tp_dist_pips = 0.0
-                            entry_dist_pips = 0.0
-                            order_dist_pips = 0.0
-
-                        if trade.entry_price:
-                            mfe_dist_pips = trade.direction * (trade.best_price() - trade.entry_price) / pip_means
-                            mae_dist_pips = trade.direction * (trade.worst_price() - trade.entry_price) / pip_means
+                            dumps[key] = (source, dump)
                         else:
-                            mae_dist_pips = 0.0
-                            mfe_dist_pips = 0.0
-
-                        etd = trade.direction * (
-                                strategy_trader.instrument.close_exec_price(trade.direction) - trade.best_price())
-                        etd_dist_pips = min(0.0, etd) / pip_means
-
-                        results.append({
-                            'mid': strategy_trader.instrument.market_id,
-                            'sym': strategy_trader.instrument.symbol,
-                            'id': trade.id,
-                            'eot': trade.entry_open_time,
-                            'xot': trade.exit_open_time,
-                            'freot': trade.first_realized_entry_time,
-                            'frxot': trade.first_realized_exit_time,
-                            'lreot': trade.last_realized_entry_time,
-                            'lrxot': trade.last_realized_exit_time,
-                            'd': trade.direction_to_str(),
-                            'l': strategy_trader.instrument.format_price(trade.order_price),
-                            'aep': strategy_trader.instrument.format_price(trade.entry_price),
-                            'axp': strategy_trader.instrument.format_price(trade.exit_price),
-                            'q': strategy_trader.instrument.format_quantity(trade.order_quantity),
-                            'e': strategy_trader.instrument.format_quantity(trade.exec_entry_qty),
-                            'x': strategy_trader.instrument.format_quantity(trade.exec_exit_qty),
-                            'tp': strategy_trader.instrument.format_price(trade.take_profit),
-                            'sl': strategy_trader.instrument.format_price(trade.stop_loss),
-                            'tf': timeframe_to_str(trade.timeframe),
-                            's': trade.state_to_str(),
-                            'b': strategy_trader.instrument.format_price(trade.best_price()),
-                            'w': strategy_trader.instrument.format_price(trade.worst_price()),
-                            'bt': trade.best_price_timestamp(),
-                            'wt': trade.worst_price_timestamp(),
-                            'etd': strategy_trader.instrument.format_price(etd),
-                            'label': trade.label,
-                            'pl': profit_loss_rate,
-                            'upnl': strategy_trader.instrument.format_settlement(trade.unrealized_profit_loss),
-                            'pnlcur': trade.profit_loss_currency,
-                            'fees': trade.entry_fees_rate() + trade.margin_fees_rate() + trade.estimate_exit_fees_rate(strategy_trader.instrument),
-                            'loep': strategy_trader.instrument.format_price(strategy_trader.instrument.open_exec_price(trade.direction)),
-                            'lcep': strategy_trader.instrument.format_price(strategy_trader.instrument.close_exec_price(trade.direction)),
-                            'qs': strategy_trader.instrument.format_quote(trade.invested_quantity),
-                            'stop-loss-dist-pips': fmt_pips(sl_dist_pips),
-                            'take-profit-dist-pips': fmt_pips(tp_dist_pips),
-                            'entry-dist-pips': fmt_pips(entry_dist_pips),
-                            'order-dist-pips': fmt_pips(order_dist_pips),
-                            'mae-dist-pips': fmt_pips(mae_dist_pips),
-                            'mfe-dist-pips': fmt_pips(mfe_dist_pips),
-                            'etd-dist-pips': fmt_pips(etd_dist_pips)
-                        })
+                            dump = dumps_active_trade(strategy_trader, trade)
+
+                        results.append(dump)
         except Exception as e:
             error_logger.error(repr(e))
             error_logger.error(traceback.format_exc())
 
+    if cache is not None:
+        # only the existing trades
+        cache.clear()
+        cache.update(dumps)
+
     return results
+
+
+def active_trade_source(strategy_trader, trade) -> tuple:
+    """
+    Values from which the dump of an active trade is computed, to detect a change.
+    The persistent state (states, quantities, prices, timestamps, statistics) comes from the journal key, plus the
+    values depending on the market (prices, fees) and the unrealized profit/loss.
+    """
+    instrument = strategy_trader.instrument
+
+    return (trade.journal_key(), instrument.open_exec_price(trade.direction),
+            instrument.close_exec_price(trade.direction), trade.best_price(), trade.worst_price(),
+            trade.best_price_timestamp(), trade.worst_price_timestamp(), trade.unrealized_profit_loss,
+            trade.profit_loss_currency, trade.entry_fees_rate(), trade.margin_fees_rate(),
+            trade.estimate_exit_fees_rate(instrument), trade.invested_quantity)
+
+
+def dumps_active_trade(strategy_trader, trade) -> dict:
+    """
+    Dump of an active trade, see get_all_active_trades.
+    """
+    pip_means = strategy_trader.instrument.one_pip_means
+
+    profit_loss_rate = trade.estimate_profit_loss_rate(strategy_trader.instrument)
+
+    if trade.entry_price or trade.order_price:
+        sl_dist_pips = (trade.direction * (trade.stop_loss - (
+                trade.entry_price or trade.order_price))) / pip_means
+        tp_dist_pips = (trade.direction * (trade.take_profit - (
+                trade.entry_price or trade.order_price))) / pip_means
+
+        entry_dist_pips = (trade.direction * (strategy_trader.instrument.open_exec_price(
+            trade.direction) - trade.entry_price)) / pip_means if trade.entry_price else 0.0
+        order_dist_pips = (trade.direction * (strategy_trader.instrument.open_exec_price(
+            trade.direction) - trade.order_price)) / pip_means if trade.order_price else 0.0
+    else:
+        sl_dist_pips = 0.0
+        tp_dist_pips = 0.0
+        entry_dist_pips = 0.0
+        order_dist_pips = 0.0
+
+    if trade.entry_price:
+        mfe_dist_pips = trade.direction * (trade.best_price() - trade.entry_price) / pip_means
+        mae_dist_pips = trade.direction * (trade.worst_price() - trade.entry_price) / pip_means
+    else:
+        mae_dist_pips = 0.0
+        mfe_dist_pips = 0.0
+
+    etd = trade.direction * (
+            strategy_trader.instrument.close_exec_price(trade.direction) - trade.best_price())
+    etd_dist_pips = min(0.0, etd) / pip_means
+
+    return {
+        'mid': strategy_trader.instrument.market_id,
+        'sym': strategy_trader.instrument.symbol,
+        'id': trade.id,
+        'eot': trade.entry_open_time,
+        'xot': trade.exit_open_time,
+        'freot': trade.first_realized_entry_time,
+        'frxot': trade.first_realized_exit_time,
+        'lreot': trade.last_realized_entry_time,
+        'lrxot': trade.last_realized_exit_time,
+        'd': trade.direction_to_str(),
+        'l': strategy_trader.instrument.format_price(trade.order_price),
+        'aep': strategy_trader.instrument.format_price(trade.entry_price),
+        'axp': strategy_trader.instrument.format_price(trade.exit_price),
+        'q': strategy_trader.instrument.format_quantity(trade.order_quantity),
+        'e': strategy_trader.instrument.format_quantity(trade.exec_entry_qty),
+        'x': strategy_trader.instrument.format_quantity(trade.exec_exit_qty),
+        'tp': strategy_trader.instrument.format_price(trade.take_profit),
+        'sl': strategy_trader.instrument.format_price(trade.stop_loss),
+        'tf': timeframe_to_str(trade.timeframe),
+        's': trade.state_to_str(),
+        'b': strategy_trader.instrument.format_price(trade.best_price()),
+        'w': strategy_trader.instrument.format_price(trade.worst_price()),
+        'bt': trade.best_price_timestamp(),
+        'wt': trade.worst_price_timestamp(),
+        'etd': strategy_trader.instrument.format_price(etd),
+        'label': trade.label,
+        'pl': profit_loss_rate,
+        'upnl': strategy_trader.instrument.format_settlement(trade.unrealized_profit_loss),
+        'pnlcur': trade.profit_loss_currency,
+        'fees': trade.entry_fees_rate() + trade.margin_fees_rate() + trade.estimate_exit_fees_rate(strategy_trader.instrument),
+        'loep': strategy_trader.instrument.format_price(strategy_trader.instrument.open_exec_price(trade.direction)),
+        'lcep': strategy_trader.instrument.format_price(strategy_trader.instrument.close_exec_price(trade.direction)),
+        'qs': strategy_trader.instrument.format_quote(trade.invested_quantity),
+        'stop-loss-dist-pips': fmt_pips(sl_dist_pips),
+        'take-profit-dist-pips': fmt_pips(tp_dist_pips),
+        'entry-dist-pips': fmt_pips(entry_dist_pips),
+        'order-dist-pips': fmt_pips(order_dist_pips),
+        'mae-dist-pips': fmt_pips(mae_dist_pips),
+        'mfe-dist-pips': fmt_pips(mfe_dist_pips),
+        'etd-dist-pips': fmt_pips(etd_dist_pips)
+    }
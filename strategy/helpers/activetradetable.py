@@ -3,6 +3,8 @@
 # @license Copyright (c) 2018 Dream Overflow
 # Strategy display table formatter helpers for views or notifiers
 
+from typing import Optional
+
 from datetime import datetime
 
 from terminal.terminal import Color
@@ -19,9 +21,13 @@ def trades_stats_table(strategy, style='', offset=None, limit=None, col_ofs=None
                        quantities=False, stats=False,
                        percents=False, pips=False,
                        group=None, ordering=None,
-                       datetime_format='%y-%m-%d %H:%M:%S'):
+                       datetime_format='%y-%m-%d %H:%M:%S',
+                       cache: Optional[dict] = None):
     """
     Returns a table of any active trades.
+
+    @param cache: Optional dict kept by the caller between two calls. The trades are dumped again only if changed,
+        and the rows are formatted again only if their trade or the format options changed.
     """
     columns = ['Symbol', '#', charmap.ARROWUPDN, 'P/L', 'OP', 'SL', 'TP', 'Signal date',
                'Entry date', 'Avg EP', 'Exit date', 'Avg XP', 'Label', 'Status']
@@ -38,8 +44,22 @@ def trades_stats_table(strategy, style='', offset=None, limit=None, col_ofs=None
     num_actives_trades = 0
     sub_totals = {}
 
+    dataset_cache = None
+    row_cache = None
+    rows = None
+
+    if cache is not None:
+        options = (style, col_ofs, quantities, stats, percents, pips, datetime_format)
+        if cache.get('options') != options:
+            cache['options'] = options
+            cache['rows'] = {}
+
+        dataset_cache = cache.setdefault('dataset', {})
+        row_cache = cache['rows']
+        rows = {}
+
     with strategy.mutex:
-        trades = get_all_active_trades(strategy)
+        trades = get_all_active_trades(strategy, dataset_cache)
         total_size = (len(columns), len(trades))
 
         if stats:
@@ -75,6 +95,16 @@ def trades_stats_table(strategy, style='', offset=None, limit=None, col_ofs=None
         trades = trades[offset:limit]
 
         for t in trades:
+            if row_cache is not None:
+                key = (t['mid'], t['id'])
+                cached = row_cache.get(key)
+
+                # same dump of the trade, then same row
+                if cached is not None and cached[0] is t:
+                    rows[key] = cached
+                    data.append(cached[1])
+                    continue
+
             fmt_direction = Color.colorize_cond(charmap.ARROWUP if t['d'] == "long" else charmap.ARROWDN,
                                             t['d'] == "long", style=style, true=Color.GREEN, false=Color.RED)
 
@@ -222,7 +252,16 @@ def trades_stats_table(strategy, style='', offset=None, limit=None, col_ofs=None
                 row.append(fmt_mae)
                 row.append(fmt_etd)
 
-            data.append(row[0:4] + row[4+col_ofs:])
+            row = row[0:4] + row[4+col_ofs:]
+
+            if rows is not None:
+                rows[(t['mid'], t['id'])] = (t, row)
+
+            data.append(row)
+
+    if cache is not None:
+        # only the displayed rows
+        cache['rows'] = rows
 
     if sub_totals:
         row = [
@@ -75,7 +75,7 @@ class TriangleIndicator(Indicator):
         split_idx = data_splitter(range(len(bottom)), inversion_tendance_index)
         split_bottom_data, split_top_data = data_splitter(bottom, inversion_tendance_index), data_splitter(top, inversion_tendance_index)
 
-        bottom_partial_interp, top_partial_interp = map(st.linregress, zip(split_idx, split_bottom_data)), map(st.linregress, zip(split_idx, split_top_data))
+        bottom_partial_interp, top_partial_interp = map(st.linregress, split_idx, split_bottom_data), map(st.linregress, split_idx, split_top_data)
         return split_idx, bottom_partial_interp, top_partial_interp
 
     @staticmethod
@@ -91,7 +91,7 @@ class TriangleIndicator(Indicator):
         split_idx = data_splitter(range(len(bottom)), inversion_tendance_index)
         split_bottom_data, split_top_data = data_splitter(bottom, inversion_tendance_index), data_splitter(top, inversion_tendance_index)
 
-        bottom_partial_interp, top_partial_interp = map(st.linregress, zip(split_idx, split_bottom_data)), map(st.linregress, zip(split_idx, split_top_data))
+        bottom_partial_interp, top_partial_interp = map(st.linregress, split_idx, split_bottom_data), map(st.linregress, split_idx, split_top_data)
         return split_idx, bottom_partial_interp, top_partial_interp
 
     def compute(self, timestamp, bottom, top):
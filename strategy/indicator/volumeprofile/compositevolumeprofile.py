@@ -3,14 +3,11 @@
 # @license Copyright (c) 2020 Dream Overflow
 # Composite Volume Profile indicator
 
-from strategy.indicator.indicator import Indicator
+from typing import Optional, List, Tuple
+
 from strategy.indicator.models import VolumeProfile
 from instrument.instrument import Instrument
 
-from database.database import Database
-
-from common.utils import truncate
-
 import numpy as np
 
 from strategy.indicator.volumeprofile.volumeprofilebase import VolumeProfileBaseIndicator
@@ -32,11 +29,22 @@ class CompositeVolumeProfile(object):
     The main usage of composite in mostly for big timeframe, many days or weeks or month, then it is not important
     to update at every tick. You can consider combining the composite plus a current volume profile.
 
-    @todo Update using new format of VolumeProfile
+    Volumes are cumulated into a fixed width array of bins (bid, ask), aligned on the bins of the source volume
+    profile (sensibility). The column 0 of the array is the bin of index _min_index, where the index of a bin is
+    floor(price / sensibility). The array grows into both direction when needed.
+
+    The process method is incremental : the newest consolidated profiles are added and the ones leaving the window
+    are subtracted, then POC, VA, peaks and valleys are recomputed on the array.
     """
 
     __slots__ = '_timeframe', '_length', '_use_current', '_vp', '_volume_profile', \
-        '_last_timestamp', '_last_base_timestamp'
+        '_last_timestamp', '_last_base_timestamp', '_bins', '_min_index', '_merged'
+
+    _bins: Optional[np.array]    # 2d array of volume bid/ask, per bin
+    _min_index: int              # bin index of the column 0 of bins
+    _merged: List[VolumeProfile]  # consolidated profiles currently merged, ordered by timestamp
+
+    EPSILON = 1e-12  # residual volume after subtraction considered as zero
 
     def __init__(self, timeframe: float, length: int, volume_profile: VolumeProfileBaseIndicator, merge_current=False):
         """
@@ -55,12 +63,20 @@ class CompositeVolumeProfile(object):
 
         self._volume_profile = volume_profile
 
+        self._bins = None
+        self._min_index = 0
+        self._merged = []
+
         self._vp = VolumeProfile(0, timeframe)
 
     @property
     def vp(self):
         return self._vp
 
+    @property
+    def length(self) -> int:
+        return self._length
+
     def is_update_needed(self, timestamp: float, partial_update: bool = True) -> bool:
         """
         Returns true when the closing timestamp is reached.
@@ -76,11 +92,37 @@ class CompositeVolumeProfile(object):
 
     def process(self, timestamp: float):
         """
-        Append the last volume profile if it is consolidated. This method is incremental.
-        @param timestamp:
-        @return:
+        Append the last volume profiles if they are consolidated and remove the ones leaving the window.
+        This method is incremental.
+
+        @param timestamp: Current timestamp.
+        @return: Updated composite volume profile.
         """
-        # @todo
+        if self._volume_profile is None or not self._volume_profile.vps:
+            return self._vp
+
+        if self._bins is None:
+            # initial setup
+            return self.composite(timestamp)
+
+        last_merged_timestamp = self._merged[-1].timestamp if self._merged else -1.0
+        updated = False
+
+        for vp in self._volume_profile.vps[-self._length:]:
+            if vp.timestamp > last_merged_timestamp:
+                self._add(vp, 1.0)
+                self._merged.append(vp)
+                updated = True
+
+        while len(self._merged) > self._length:
+            self._add(self._merged.pop(0), -1.0)
+            updated = True
+
+        if updated or self._use_current:
+            self._last_base_timestamp = self._volume_profile.vps[-1].timestamp
+            self.finalize()
+
+        self._last_timestamp = timestamp
 
         return self._vp
 
@@ -93,56 +135,191 @@ class CompositeVolumeProfile(object):
         if self._volume_profile is None or not self._volume_profile.vps:
             return self._vp
 
+        self._bins = None
+        self._min_index = 0
+        self._merged = []
+
+        for vp in self._volume_profile.vps[-self._length:]:
+            self._add(vp, 1.0)
+            self._merged.append(vp)
+
+        self._last_base_timestamp = self._volume_profile.vps[-1].timestamp
+        self._last_timestamp = timestamp
+
+        self.finalize()
+
+        return self._vp
+
+    def finalize(self):
+        """
+        Finalize the computation of the composite VP : POC, VA, peaks and valleys are computed on the array of bins,
+        then the resulting composite VP is rebuilt.
+        """
+        if self._bins is None or not self._merged:
+            return
+
         volume_profile = self._volume_profile
+        sensibility = volume_profile.sensibility
+
+        bins = self._bins
+        min_index = self._min_index
 
-        poc_vol = 0.0
+        if self._use_current and volume_profile.current is not None and volume_profile.current.as_dict():
+            # overlay of the non consolidated VP onto a copy
+            indices, bids, asks = self._to_arrays(volume_profile.current.as_dict(), sensibility)
+            bins, min_index = self._merged_bins(bins.copy(), min_index, indices, bids, asks)
 
-        base_index = max(-self._length, -len(volume_profile.vps))
-        base_timestamp = volume_profile.vps[base_index].timestamp
+        # only keep the range of non-empty bins
+        weights = bins[0] + bins[1]
+        non_empty = np.flatnonzero(weights > CompositeVolumeProfile.EPSILON)
+
+        base_timestamp = self._merged[0].timestamp
 
         if self._timeframe > 0:
             # adjust for fixe timeframe
-            cvp = VolumeProfile(Instrument.basetime(self._timeframe, base_timestamp), self._timeframe)
+            cvp = VolumeProfile(Instrument.basetime(self._timeframe, base_timestamp), self._timeframe, sensibility)
         else:
             # simply use timestamp of the first VP
-            cvp = VolumeProfile(base_timestamp, 0.0)
+            cvp = VolumeProfile(base_timestamp, 0.0, sensibility)
 
-        for vp in volume_profile.vps[base_index:]:
-            for b, v in vp.volumes.items():
-                if b not in cvp.volumes:
-                    cvp.volumes[b] = v
-                else:
-                    cvp.volumes[b] += v
+        if not len(non_empty):
+            self._vp = cvp
+            return
 
-                if cvp.volumes[b] > poc_vol:
-                    poc_vol = cvp.volumes[b]
-                    vp.poc = b
+        left, right = non_empty[0], non_empty[-1] + 1
 
-        self._last_base_timestamp = volume_profile.vps[-1].timestamp
-        self._last_timestamp = timestamp
+        weights = weights[left:right]
+        prices = (np.arange(min_index + left, min_index + right, dtype=np.double) + 0.5) * sensibility
+
+        poc_idx = int(np.argmax(weights))
+        cvp.poc = float(prices[poc_idx])
+
+        if volume_profile.is_compute_peaks_and_valleys:
+            ps, vs = VolumeProfileBaseIndicator.find_peaks_and_valleys_sci_peak_weights(weights)
+
+            cvp.peaks = prices[ps].tolist()
+            cvp.valleys = prices[vs].tolist()
+
+        if volume_profile.is_compute_volume_area:
+            val_idx, vah_idx = self.compute_volume_area(weights, poc_idx, volume_profile.volume_area)
+
+            cvp.val = float(prices[val_idx])
+            cvp.vah = float(prices[vah_idx])
+
+        cvp.volumes = {p: [b, a] for p, b, a in zip(prices.tolist(), bins[0, left:right].tolist(),
+                                                     bins[1, left:right].tolist()) if b + a > 0.0}
 
-        # current
         self._vp = cvp
-        return cvp
 
-    def finalize(self):
+    #
+    # volume area
+    #
+
+    @staticmethod
+    def compute_volume_area(weights: np.array, poc_idx: int, volume_area: float = 70) -> Tuple[int, int]:
+        """
+        Same algorithm as VolumeProfileBaseIndicator.compute_volume_area but directly on the array of volumes.
+
+        @param weights Volumes array ordered by ascending price.
+        @param poc_idx Index of the POC into weights.
+        @param volume_area in percentage ]0..100] (default 70%)
+        @return Tuple(int, int) with val and vah indices.
+        """
+        in_area = float(weights.sum()) * volume_area * 0.01
+
+        # the expansion depends on the previous step, then loop on a list is faster than on the array
+        volumes = weights.tolist()
+        max_index = len(volumes) - 1
+
+        summed = volumes[poc_idx]
+
+        left = poc_idx - 1
+        right = poc_idx + 1
+
+        while summed < in_area:
+            if left < 0 and right > max_index:
+                break
+
+            if left >= 0 and (right > max_index or volumes[left] > volumes[right]):
+                summed += volumes[left]
+                left -= 1
+            else:
+                summed += volumes[right]
+                right += 1
+
+        return left + 1, right - 1
+
+    #
+    # bins
+    #
+
+    @staticmethod
+    def _to_arrays(volumes: dict, sensibility: float) -> Tuple[np.array, np.array, np.array]:
         """
-        Finalize the computation of the current VP.
-        Does by update when the last trade timestamp open a new session.
+        Convert a dict of centered bin price: (bid, ask) volumes into arrays of bin indices, bid and ask volumes.
         """
-        # todo
-        pass
-        # # volumes arranged by price
-        # volumes_by_price = VolumeProfileBaseIndicator._sort_volumes_by_price(composite)
+        count = len(volumes)
+
+        prices = np.fromiter(volumes.keys(), dtype=np.double, count=count)
+        indices = np.floor(prices / sensibility).astype(np.int64)
 
-        # # # find peaks and valley
-        # # composite.peaks, composite.valleys = VolumeProfileBaseIndicator.basic_peaks_and_valleys_detection(
-        # #     volume_profile.bins, volume_profile.sensibility, composite)
+        bid_ask = np.array([v if isinstance(v, (list, tuple)) else (v * 0.5, v * 0.5) for v in volumes.values()],
+                           dtype=np.double).reshape(count, 2)
+
+        return indices, bid_ask[:, 0], bid_ask[:, 1]
+
+    @staticmethod
+    def _merged_bins(bins: np.array, min_index: int, indices: np.array, bids: np.array, asks: np.array,
+                     sign: float = 1.0):
+        """
+        Cumulate (or subtract with a negative sign) the volumes into the bins, growing the array if necessary.
+        @return A tuple of the bins array (could be the same or a new one) and the bin index of its column 0.
+        """
+        if not len(indices):
+            return bins, min_index
+
+        lo = int(indices.min())
+        hi = int(indices.max()) + 1
+
+        if bins is None:
+            # grow by a margin to limit further reallocations
+            margin = max(1, (hi - lo) // 2)
+
+            min_index = lo - margin
+            bins = np.zeros((2, hi - lo + 2 * margin))
+
+        elif lo < min_index or hi > min_index + bins.shape[1]:
+            width = bins.shape[1]
+            margin = max(1, width // 2)
+
+            new_min_index = min(min_index, lo - margin) if lo < min_index else min_index
+            new_max_index = max(min_index + width, hi + margin) if hi > min_index + width else min_index + width
+
+            new_bins = np.zeros((2, new_max_index - new_min_index))
+            ofs = min_index - new_min_index
+            new_bins[:, ofs:ofs+width] = bins
+
+            bins = new_bins
+            min_index = new_min_index
+
+        cols = indices - min_index
+
+        # bin indices are unique per profile
+        bins[0, cols] += bids * sign
+        bins[1, cols] += asks * sign
+
+        return bins, min_index
+
+    def _add(self, vp: VolumeProfile, sign: float):
+        """
+        Add (sign=1) or subtract (sign=-1) the volumes of a consolidated profile.
+        """
+        if not vp.volumes:
+            return
 
-        # # find peaks and valley
-        # # # composite.peaks, composite.valleys = self.basic_peaks_and_valleys_detection(
-        # #     volume_profile.bins, volume_profile.sensibility, composite)
-        # # composite.peaks, composite.valleys = self.scipy_peaks_and_valleys_detection(vp)
+        indices, bids, asks = self._to_arrays(vp.volumes, self._volume_profile.sensibility)
+        self._bins, self._min_index = self._merged_bins(self._bins, self._min_index, indices, bids, asks, sign)
 
-        # # find the low and high of the volume area
-        # # composite.low_area, composite.high_area = self.single_volume_area(composite, volumes_by_price, composite.poc)
+        if sign < 0:
+            # clean up floating point residuals
+            self._bins[np.abs(self._bins) < CompositeVolumeProfile.EPSILON] = 0.0
@@ -612,6 +612,10 @@ class VolumeProfileBaseIndicator(Indicator):
     def sensibility(self) -> float:
         return self._sensibility
 
+    @property
+    def volume_area(self) -> float:
+        return self._volume_area
+
     @property
     def current(self) -> Union[None, BidAskLinearScaleArray, BidAskLinearScaleDict]:
         return self._current
@@ -852,8 +856,18 @@ class VolumeProfileBaseIndicator(Indicator):
         for i, x in enumerate(volumes_by_price):
             weights[i] = sum(x[1])
 
+        return VolumeProfileBaseIndicator.find_peaks_and_valleys_sci_peak_weights(weights)
+
+    @staticmethod
+    def find_peaks_and_valleys_sci_peak_weights(weights: np.array):
+        """
+        Same as find_peaks_and_valleys_sci_peak but directly from an array of volumes ordered by ascending price.
+        """
         l = len(weights)
 
+        if not l:
+            return np.array([], dtype=int), np.array([], dtype=int)
+
         distanceP = max(2, l // 6)
         distanceV = max(2, l // 6)
 
@@ -29,7 +29,7 @@ class BarVWAPIndicator(VWAPBaseIndicator):
         return Indicator.BASE_TICK
 
     def __init__(self, timeframe: float, days=2):
-        super().__init__("barvwap", 0, days)
+        super().__init__("barvwap", timeframe, days)
 
         self._compute_at_close = False  # computed at each tick or trade
 
@@ -5,7 +5,7 @@
 
 from __future__ import annotations
 
-from typing import Union, TYPE_CHECKING, List
+from typing import Union, TYPE_CHECKING, List, Optional
 
 if TYPE_CHECKING:
     from strategy.strategy import Strategy
@@ -13,6 +13,7 @@ if TYPE_CHECKING:
     from watcher.event import EconomicEvent
 
 from instrument.instrument import Instrument
+from database.economiceventcache import EconomicEventCache, EconomicEventFilter
 
 import logging
 
@@ -57,6 +58,10 @@ class DefaultEconomicEventMixin(object):
             self._economic_events_currency = economic_event_params.get('currency', "")
             self._economic_events_min_level = importance_str_to_level(economic_event_params.get('importance', ""))
 
+        self._economic_event_filter = EconomicEventFilter(
+            self._economic_events_country, self._economic_events_currency, self._economic_events_min_level,
+            self._economic_events_codes)
+
     @property
     def economic_event_country(self) -> str:
         return self._economic_events_country
@@ -73,6 +78,29 @@ class DefaultEconomicEventMixin(object):
     def economic_event_codes(self) -> List[str]:
         return self._economic_events_codes
 
+    @property
+    def economic_event_filter(self) -> EconomicEventFilter:
+        return self._economic_event_filter
+
+    def next_economic_event(self,  # type: Union[DefaultEconomicEventMixin, StrategyTraderBase]
+                            timestamp: Optional[float] = None) -> Optional[EconomicEvent]:
+        """
+        Next economic event of interest at or after the timestamp (default to the strategy timestamp),
+        from the shared cache of the process. O(log n), then it can be called at each bar.
+        @note In backtesting the future events are known like a calendar, but their actual values must not be used.
+        """
+        return EconomicEventCache.inst().next_event(
+            self._economic_event_filter, timestamp if timestamp is not None else self.strategy.timestamp)
+
+    def previous_economic_event(self,  # type: Union[DefaultEconomicEventMixin, StrategyTraderBase]
+                                timestamp: Optional[float] = None) -> Optional[EconomicEvent]:
+        """
+        Previous economic event of interest before the timestamp (default to the strategy timestamp),
+        from the shared cache of the process. O(log n), then it can be called at each bar.
+        """
+        return EconomicEventCache.inst().previous_event(
+            self._economic_event_filter, timestamp if timestamp is not None else self.strategy.timestamp)
+
     def on_received_economic_event(self,  # type: Union[DefaultEconomicEventMixin, StrategyTraderBase]
                                    economic_event: EconomicEvent):
         """
@@ -84,16 +112,7 @@ class DefaultEconomicEventMixin(object):
 
         # quote currency is not always as expected, uses a dedicated parameter
         # but could have a country code on market/instrument
-        if self._economic_events_currency and economic_event.currency != self._economic_events_currency:
-            return
-
-        if self._economic_events_country and economic_event.country != self._economic_events_country:
-            return
-
-        if self._economic_events_min_level and economic_event.level < self._economic_events_min_level:
-            return
-
-        if self._economic_events_codes and economic_event.code not in self._economic_events_codes:
+        if not self._economic_event_filter.accept(economic_event):
             return
 
         # event of interest and cleanup eventually older
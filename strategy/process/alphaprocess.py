@@ -9,6 +9,8 @@ import traceback
 from datetime import datetime, timedelta
 
 from common.utils import UTC, timestamp_to_str, duration_to_str
+from common.latency import LatencyTracer
+from common.profiler import Profiler
 from instrument.instrument import Instrument
 from strategy.mixins.defaulteconomiceventmixin import DefaultEconomicEventMixin
 
@@ -17,6 +19,7 @@ from watcher.watcher import Watcher
 from strategy.strategydatafeeder import StrategyDataFeeder
 
 from database.database import Database
+from database.economiceventcache import EconomicEventCache
 
 import logging
 logger = logging.getLogger('siis.strategy.process.alpha')
@@ -259,7 +262,14 @@ def alpha_async_update_strategy(strategy, strategy_trader, timestamp: float):
                 alpha_bootstrap(strategy, strategy_trader)
             else:
                 # then : until process instrument update
-                strategy_trader.process(timestamp)
+                trace = LatencyTracer.inst().begin(strategy_trader)
+                measure = Profiler.inst().begin(strategy_trader)
+                try:
+                    strategy_trader.process(timestamp)
+                finally:
+                    # on failure too, else they stay the current ones of the worker thread
+                    Profiler.inst().end(measure)
+                    LatencyTracer.inst().end(trace)
 
             strategy_trader.last_timestamp = timestamp
 
@@ -340,6 +350,21 @@ def alpha_setup_backtest(strategy, from_date: datetime, to_date: datetime, base_
     with strategy.mutex:
         strategy_traders = strategy.strategy_traders.values()
 
+    # fetch the market info from the DB, a single query per watcher
+    market_ids_by_watcher = {}
+
+    for strategy_trader in strategy_traders:
+        if not strategy_trader.instrument:
+            continue
+
+        market_data_watcher = strategy_trader.instrument.watcher(Watcher.WATCHER_MARKET_DATA)
+        if market_data_watcher:
+            market_ids_by_watcher.setdefault(market_data_watcher.name, []).append(
+                strategy_trader.instrument.market_id)
+
+    for watcher_name, market_ids in market_ids_by_watcher.items():
+        Database.inst().load_market_infos(strategy.service, watcher_name, market_ids)
+
     # query for history and initialize feeders
     for strategy_trader in strategy_traders:
         if not strategy_trader.instrument:
@@ -366,9 +391,6 @@ def alpha_setup_backtest(strategy, from_date: datetime, to_date: datetime, base_
 
                 analyser.query_historical_data(from_date)
 
-            # fetch market info from the DB
-            Database.inst().load_market_info(strategy.service, market_data_watcher.name, strategy_trader.instrument.market_id)
-
             # create a feeder per instrument for ticks history
             feeder = StrategyDataFeeder(strategy, strategy_trader.instrument.market_id, [], True,
                                         evt_country, evt_currency, evt_min_level)
@@ -398,6 +420,15 @@ def alpha_setup_live(strategy):
     with strategy.mutex:
         strategy_traders = strategy.strategy_traders.values()
 
+    # recent and coming economic events, completed by the live ones
+    if any(isinstance(strategy_trader, DefaultEconomicEventMixin) for strategy_trader in strategy_traders):
+        now = datetime.utcnow().replace(tzinfo=UTC())
+
+        try:
+            EconomicEventCache.inst().load(now - timedelta(days=1), now + timedelta(days=7))
+        except Exception as e:
+            logger.error(repr(e))
+
     # query for history and initialize feeders
     for strategy_trader in strategy_traders:
         if strategy_trader.instrument:
@@ -9,6 +9,8 @@ import traceback
 from datetime import datetime, timedelta
 
 from common.utils import UTC, timestamp_to_str, duration_to_str
+from common.latency import LatencyTracer
+from common.profiler import Profiler
 
 from instrument.instrument import Instrument
 
@@ -439,7 +441,14 @@ def beta_async_update_strategy(strategy, strategy_trader, timestamp: float):
 
             else:
                 # then : until process instrument update
-                strategy_trader.process(strategy.timestamp)
+                trace = LatencyTracer.inst().begin(strategy_trader)
+                measure = Profiler.inst().begin(strategy_trader)
+                try:
+                    strategy_trader.process(strategy.timestamp)
+                finally:
+                    # on failure too, else they stay the current ones of the worker thread
+                    Profiler.inst().end(measure)
+                    LatencyTracer.inst().end(trace)
 
         except Exception as e:
             error_logger.error(repr(e))
@@ -490,6 +499,16 @@ def beta_setup_backtest(strategy, from_date, to_date, base_timeframe=Instrument.
     """
     Simple load history of trades, no OHLCs.
     """
+    # fetch the market info from the DB, a single query per watcher
+    market_ids_by_watcher = {}
+
+    for market_id, instrument in strategy._instruments.items():
+        watcher = instrument.watcher(Watcher.WATCHER_MARKET_DATA)
+        market_ids_by_watcher.setdefault(watcher.name, []).append(instrument.market_id)
+
+    for watcher_name, market_ids in market_ids_by_watcher.items():
+        Database.inst().load_market_infos(strategy.service, watcher_name, market_ids)
+
     for market_id, instrument in strategy._instruments.items():
         # retrieve the related price and volume watcher
         watcher = instrument.watcher(Watcher.WATCHER_MARKET_DATA)
@@ -498,9 +517,6 @@ def beta_setup_backtest(strategy, from_date, to_date, base_timeframe=Instrument.
         feeder = StrategyDataFeeder(strategy, instrument.market_id, [], True)
         strategy.add_feeder(feeder)
 
-        # fetch market info from the DB
-        Database.inst().load_market_info(strategy.service, watcher.name, instrument.market_id)
-
         feeder.initialize(watcher.name, from_date, to_date)
 
     # initialized state
@@ -16,6 +16,7 @@ if TYPE_CHECKING:
     from .region.region import Region
     from .tradeop.tradeop import TradeOp
     from .indicator.indicator import Indicator
+    from .shareddatafeed import SharedDataFeed
 
 from typing import Union
 
@@ -25,6 +26,7 @@ import traceback
 
 from datetime import datetime
 from importlib import import_module
+from importlib.machinery import PathFinder
 
 from common.service import Service
 from common.workerpool import WorkerPool
@@ -44,6 +46,48 @@ error_logger = logging.getLogger('siis.error.strategy.service')
 traceback_logger = logging.getLogger('siis.traceback.strategy.service')
 
 
+def module_exists(module_name: str) -> bool:
+    """
+    Check that a module can be found, without importing it nor its parent packages (unlike find_spec).
+    """
+    path = None
+
+    for part in module_name.split('.'):
+        if path is not None and not path:
+            # a module is not a package
+            return False
+
+        spec = PathFinder.find_spec(part, path)
+        if spec is None:
+            return False
+
+        path = list(spec.submodule_search_locations or [])
+
+    return True
+
+
+def used_indicators(parameters: dict) -> set:
+    """
+    Names of the indicators used by the analysers of strategy parameters, including the market specifics,
+    nested or dot formatted (ie. "timeframes.4h.indicators.rsi").
+    """
+    names = set()
+
+    def walk(node, key: str = ""):
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if key == "indicators" or str(k).rsplit('.', 2)[-2:-1] == ["indicators"]:
+                    # an indicator entry is a list whose first element is the indicator name
+                    if isinstance(v, (list, tuple)) and v and isinstance(v[0], str):
+                        names.add(v[0])
+                else:
+                    walk(v, str(k))
+
+    walk(parameters)
+
+    return names
+
+
 class StrategyService(Service):
     """
     Strategy service is responsible for build, initialize, load configuration, start/stop the strategy.
@@ -84,6 +128,7 @@ class StrategyService(Service):
         self._profile_config = utils.load_config(options, "profiles/%s" % self._profile)
         self._learning_config = utils.load_learning(options, self._learning)
         self._learning_path = options['learning-path']
+        self._journal_path = options.get('user-path', './user') + '/journal'
 
         # backtesting options
         self._backtesting = options.get('backtesting', False)
@@ -123,6 +168,14 @@ class StrategyService(Service):
         self._time_factor = 0.0
         self._backtest_progress = 0.0
 
+        # synchronous backtest state (see run_backtest)
+        self._backtest_current = 0.0
+        self._backtest_samples = 0
+        self._backtest_bench_ts = 0.0
+
+        # ticks shared with the others strategies of the process, for a multi-strategy backtest
+        self._shared_data_feed = None
+
         self._check_trades_at_start = options.get('check-trades', False)
 
         if self._backtesting:
@@ -135,7 +188,10 @@ class StrategyService(Service):
         self._next_key = 1
 
         # worker pool of jobs for running data analysis
-        self._worker_pool = WorkerPool()
+        worker_pool_config = self._profile_config.get('worker-pool', {})
+
+        self._worker_pool = WorkerPool(worker_pool_config.get('num-workers'),
+                                       worker_pool_config.get('affinity', False))
 
     @property
     def identity(self) -> str:
@@ -185,6 +241,10 @@ class StrategyService(Service):
     def load_on_startup(self) -> bool:
         return self._load_on_startup
 
+    @property
+    def journal_path(self) -> str:
+        return self._journal_path
+
     @property
     def save_on_exit(self) -> bool:
         return self._save_on_exit
@@ -238,23 +298,19 @@ class StrategyService(Service):
         return self._completed
 
     def start(self, options: dict):
-        # indicators
+        # indicators, only the classpath, the class is imported by the strategy using it (see load_indicators)
         for k, indicator in self._indicators_config.items():
             if indicator.get("status") is not None and indicator.get("status") == "load":
-                # retrieve the class-name and instantiate it
-                parts = indicator.get('classpath').split('.')
+                if not indicator.get('classpath'):
+                    raise StrategyServiceException("Cannot load indicator %s" % k)
 
-                try:
-                    module = import_module('.'.join(parts[:-1]))
-                    Clazz = getattr(module, parts[-1])
-                except Exception as e:
-                    traceback_logger.error(traceback.format_exc())
-                    raise
+                # fail here and not at its first use if its module does not exist
+                module_name = indicator['classpath'].rsplit('.', 1)[0]
 
-                if not Clazz:
-                    raise StrategyServiceException("Cannot load indicator %s" % k) 
+                if not module_exists(module_name):
+                    raise StrategyServiceException("Cannot find module %s of indicator %s" % (module_name, k))
 
-                self._indicators[k] = Clazz
+                self._indicators[k] = indicator['classpath']
 
         # tradeops
         for k, tradeop in self._tradeops_config.items():
@@ -396,6 +452,9 @@ class StrategyService(Service):
 
         strategy_inst.set_identifier(strategy_profile.get('id', strategy_profile['name']))
 
+        # the indicators of the strategy are imported now, else a failure would only be logged at their setup
+        self.load_indicators(used_indicators(strategy_inst.parameters))
+
         if strategy_inst.start(options):
             self._strategy = strategy_inst
         else:
@@ -447,6 +506,9 @@ class StrategyService(Service):
                     error_logger.error(repr(e))
                     error_logger.error(traceback.format_exc())
 
+                # last changes of the trades in any case
+                strategy.close_trade_journal()
+
             Terminal.inst().info("Strategy terminated.")
 
         # terminate the worker pool
@@ -615,6 +677,107 @@ class StrategyService(Service):
 
                 self._completed = True
 
+    def run_backtest(self, ready_timeout: float = 0.0) -> bool:
+        """
+        Process the whole backtest synchronously into the calling thread, in place of sync and its time step thread.
+        There is no pause, no time factor and no yield between two steps. Used by the headless backtest.
+
+        @param ready_timeout: Maximum wait in seconds for the strategy to get its market data, 0 means no limit.
+        @return True once completed, False if the strategy cannot be backtested or is not ready in time.
+
+        @note The trader is updated after each step like with the time step thread, but there is no ping/pong.
+        """
+        if not self.begin_backtest(ready_timeout):
+            return False
+
+        while self.step_backtest():
+            pass
+
+        self.end_backtest()
+
+        return True
+
+    def begin_backtest(self, ready_timeout: float = 0.0) -> bool:
+        """
+        First part of run_backtest, wait for the strategy to be ready then complete its preprocessing and
+        bootstrapping. Separated to step many strategies at the same timestamps into a single thread.
+        """
+        if not self._backtesting or self._backtest or not self._strategy:
+            return False
+
+        strategy = self._strategy
+        trader = strategy.trader()
+
+        if not trader:
+            return False
+
+        # avoid re-enter and a concurrent time step thread from sync
+        self._backtest = True
+        self._backtest_progress = 0.0
+
+        # wait the strategy instance get its data and are ready
+        wait_begin_ts = time.time()
+
+        while not strategy.running or not strategy.backtest_ready():
+            if ready_timeout > 0.0 and time.time() - wait_begin_ts > ready_timeout:
+                error_logger.error("Strategy not ready to backtest after %g seconds" % ready_timeout)
+                return False
+
+            time.sleep(0.001)
+
+        self._backtest_current = self._begin_ts
+        self._backtest_samples = 0
+
+        # complete the preprocessing and bootstrapping before any time progression
+        while not strategy.backtest_prepared():
+            trader.set_timestamp(self._backtest_current)
+            strategy.backtest_prepare(self._backtest_current)
+
+        self._backtest_bench_ts = time.time()
+
+        return True
+
+    def step_backtest(self) -> bool:
+        """
+        Process one time step of the backtest.
+        @return False once the end of the backtest is reached, nothing processed.
+        """
+        if self._backtest_current >= self._end_ts + self._timestep:
+            return False
+
+        strategy = self._strategy
+        trader = strategy.trader()
+
+        # now sync the trader base time
+        trader.set_timestamp(self._backtest_current)
+
+        strategy.backtest_update(self._backtest_current, self._end_ts)
+
+        self._backtest_current += self._timestep  # add one time step
+        self._timestamp = self._backtest_current
+
+        # one more step, then we can update trader (limits orders, P/L update...)
+        trader.update()
+
+        self._backtest_samples += 1
+
+        return True
+
+    def end_backtest(self):
+        """
+        Last part of run_backtest, once every step was processed.
+        """
+        self._backtest_progress = 100.0
+
+        logger.info("Backtested %i samples within a duration of %s" % (
+            self._backtest_samples, format_delta(time.time() - self._backtest_bench_ts)))
+
+        # write trainer output data if specified
+        if self._learning:
+            self._strategy.write_trainer_report(self._learning_path, self._learning, self._learning_config)
+
+        self._completed = True
+
     def notify(self, signal_type: int, source_name: str, signal_data):
         if signal_data is None:
             return
@@ -644,9 +807,55 @@ class StrategyService(Service):
     def receiver(self, signal: Signal):
         pass
 
+    def load_indicators(self, names: set):
+        """
+        Import the indicators from their names, then they are available from indicator.
+        @raise StrategyServiceException If an indicator is not loaded from the configuration or cannot be imported.
+        """
+        for name in sorted(names):
+            Clazz = self._indicators.get(name)
+
+            if Clazz is None:
+                raise StrategyServiceException("Indicator %s is not loaded" % name)
+
+            if not isinstance(Clazz, str):
+                # already imported
+                continue
+
+            parts = Clazz.split('.')
+
+            try:
+                module = import_module('.'.join(parts[:-1]))
+                Clazz = getattr(module, parts[-1])
+            except Exception as e:
+                traceback_logger.error(traceback.format_exc())
+                raise StrategyServiceException("Cannot load indicator %s : %s" % (name, repr(e)))
+
+            self._indicators[name] = Clazz
+
     def indicator(self, name: str) -> Union[Type[Indicator], None]:
-        """Return a specific indicator model by its name"""
-        return self._indicators.get(name)
+        """
+        Return a specific indicator model by its name.
+        @note The module of the indicator is imported at the first call, then most of them are never imported.
+        """
+        Clazz = self._indicators.get(name)
+
+        if isinstance(Clazz, str):
+            # retrieve the class-name from its classpath
+            parts = Clazz.split('.')
+
+            try:
+                module = import_module('.'.join(parts[:-1]))
+                Clazz = getattr(module, parts[-1])
+            except Exception as e:
+                error_logger.error("Cannot load indicator %s : %s" % (name, repr(e)))
+                traceback_logger.error(traceback.format_exc())
+                return None
+
+            # the import is thread-safe and it is the same class from any thread
+            self._indicators[name] = Clazz
+
+        return Clazz
 
     def strategy(self) -> Strategy:
         """Return the instanced strategy"""
@@ -680,6 +889,15 @@ class StrategyService(Service):
         """True if backtesting"""
         return self._backtesting
 
+    @property
+    def shared_data_feed(self) -> Optional[SharedDataFeed]:
+        """Data feed shared with the others strategies of a multi-strategy backtest, or None"""
+        return self._shared_data_feed
+
+    def set_shared_data_feed(self, shared_data_feed: Optional[SharedDataFeed]):
+        """Must be set before start."""
+        self._shared_data_feed = shared_data_feed
+
     @property
     def backtesting_play(self) -> bool:
         """True if backtesting playing"""
@@ -0,0 +1,140 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Backtesting data feed shared between many strategies of the same process
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+import threading
+
+from datetime import datetime
+
+from database.database import Database
+
+import logging
+logger = logging.getLogger('siis.strategy.shareddatafeed')
+
+
+class SharedTickStream(object):
+    """
+    A single tick streamer of a market read by many consumers (one per strategy). Each tick is read and decoded once
+    from the storage, then kept into a buffer until any consumer get it.
+
+    The consumers can progress at different paces, but the buffer grows with the distance between the slowest and
+    the fastest, then they should be processed at the same timestamps (see the headless multi-strategy backtest).
+
+    @note Ticks are immutable tuples, then they are shared without copy.
+    """
+
+    TRIM_SIZE = 32768  # trim the consumed ticks by blocks of this size
+
+    def __init__(self, streamer):
+        self._streamer = streamer
+        self._mutex = threading.Lock()
+
+        self._buffer = []   # ticks not consumed by every consumer
+        self._base = 0      # absolute index of the first tick of the buffer
+
+        self._consumers = []
+
+    def consumer(self) -> SharedTickConsumer:
+        with self._mutex:
+            consumer = SharedTickConsumer(self, self._base)
+            self._consumers.append(consumer)
+
+        return consumer
+
+    def next_to(self, consumer: SharedTickConsumer, timestamp: float, dest: list) -> int:
+        n = 0
+
+        with self._mutex:
+            buffer = self._buffer
+            i = consumer.cursor - self._base
+
+            while 1:
+                # until timestamp
+                while i < len(buffer) and buffer[i][0] <= timestamp:
+                    dest.append(buffer[i])
+                    i += 1
+                    n += 1
+
+                if i < len(buffer) or self._streamer.finished():
+                    break
+
+                # consumed any buffered ticks, read the next ones from the storage
+                if not self._streamer.next_to(timestamp, buffer):
+                    break
+
+            consumer.cursor = self._base + i
+
+            # trim the ticks consumed by every consumer
+            consumed = min(c.cursor for c in self._consumers) - self._base
+            if consumed >= SharedTickStream.TRIM_SIZE:
+                del buffer[:consumed]
+                self._base += consumed
+
+        return n
+
+    def finished(self, consumer: SharedTickConsumer) -> bool:
+        with self._mutex:
+            return consumer.cursor >= self._base + len(self._buffer) and self._streamer.finished()
+
+
+class SharedTickConsumer(object):
+    """
+    Consumer of a shared tick stream, having the interface of a tick streamer used by the strategy data feeder.
+    """
+
+    __slots__ = '_stream', 'cursor'
+
+    def __init__(self, stream: SharedTickStream, cursor: int):
+        self._stream = stream
+        self.cursor = cursor   # absolute index of the next tick to consume
+
+    def finished(self) -> bool:
+        return self._stream.finished(self)
+
+    def next_to(self, timestamp: float, dest: list) -> int:
+        return self._stream.next_to(self, timestamp, dest)
+
+    def next(self, timestamp: float) -> List[tuple]:
+        results = []
+        self._stream.next_to(self, timestamp, results)
+
+        return results
+
+
+class SharedDataFeed(object):
+    """
+    Registry of the tick streams shared by the strategies of a multi-strategy backtest, one per market and period.
+    It is set to each strategy service, then the data feeders of its strategy consume the shared streams in place
+    of their own streamer.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._tick_streams: Dict[Tuple[str, str, float, float], SharedTickStream] = {}
+
+    def create_tick_streamer(self, broker_id: str, market_id: str, from_date: datetime,
+                             to_date: datetime) -> SharedTickConsumer:
+        """
+        Same as Database.create_tick_streamer but returns a consumer of the shared stream.
+        """
+        key = (broker_id, market_id, from_date.timestamp(), to_date.timestamp())
+
+        with self._mutex:
+            stream = self._tick_streams.get(key)
+
+            if stream is None:
+                stream = SharedTickStream(Database.inst().create_tick_streamer(
+                    broker_id, market_id, from_date=from_date, to_date=to_date))
+
+                self._tick_streams[key] = stream
+
+        return stream.consumer()
+
+    @property
+    def num_streams(self) -> int:
+        return len(self._tick_streams)
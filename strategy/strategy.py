@@ -31,6 +31,8 @@ from .alert.alert import Alert
 from terminal.terminal import Terminal
 
 from common.runnable import Runnable
+from common.workerpool import WorkerPool
+from common.latency import LatencyTracer
 from common.utils import timeframe_to_str, timeframe_from_str
 from config.utils import merge_parameters, write_learning, override_dot_format_parameters
 
@@ -40,6 +42,9 @@ from instrument.instrument import Instrument
 from watcher.watcher import Watcher
 
 from database.database import Database
+from database.economiceventcache import EconomicEventCache
+
+from .tradejournal import TradeJournal
 
 from .process import alphaprocess
 
@@ -203,6 +208,8 @@ class Strategy(Runnable):
 
         self._trader = None        # trader proxy
 
+        self._trade_journal = None  # write-ahead journal of the trades (live mode on real accounts only)
+
         self._signals = collections.deque()  # filtered received signals
 
         self._instruments = {}       # mapped instruments
@@ -491,10 +498,13 @@ class Strategy(Runnable):
 
         # need market data on the trader before set up process
         if self.service.backtesting:
-            for symbol in self._trader_conf.get('symbols', []):
-                # synchronous load of market info
-                market = Database.inst().get_market_info(self._trader_conf.get('name', ""), symbol)
-                self._trader.set_market(market)
+            symbols = self._trader_conf.get('symbols', [])
+
+            # synchronous load of the market info, in a single query
+            markets = Database.inst().get_market_infos(self._trader_conf.get('name', ""), symbols)
+
+            for symbol in symbols:
+                self._trader.set_market(markets.get(symbol))
 
         for watcher_name, watcher_conf in self._watchers_conf.items():
             # retrieve the watcher instance
@@ -606,6 +616,9 @@ class Strategy(Runnable):
         if self.service.backtesting:
             self._setup_backtest(self, self.service.from_date, self.service.to_date, self.service.timeframe)
         else:
+            if not self._trader.paper_mode:
+                self.open_trade_journal()
+
             self._setup_live(self)
 
         # one done once after startup and first connection
@@ -661,9 +674,13 @@ class Strategy(Runnable):
                 if strategy_trader:
                     strategy_trader.save()
 
+            if self._trade_journal:
+                self._trade_journal.compact()
+
     def load(self):
         """
         Load from database user strategy trader state and user trades.
+        The trades are replayed from the trade journal if any, else they are loaded from the database.
         @return:
         """
         if self._loaded:
@@ -673,13 +690,68 @@ class Strategy(Runnable):
 
         if trader:
             Database.inst().load_user_traders(self.service, self, trader.name,  trader.account.name, self.identifier)
-            Database.inst().load_user_trades(self.service, self, trader.name, trader.account.name, self.identifier)
+
+            if self._trade_journal and self._trade_journal.has_records:
+                self.service.notify(Signal.SIGNAL_STRATEGY_TRADE_LIST, self.identifier, self._trade_journal.trades())
+            else:
+                Database.inst().load_user_trades(self.service, self, trader.name, trader.account.name,
+                                                 self.identifier)
 
             self._loaded = True
             return True
 
         return False
 
+    #
+    # trade journal
+    #
+
+    @property
+    def trade_journal(self) -> Optional[TradeJournal]:
+        return self._trade_journal
+
+    def open_trade_journal(self):
+        """
+        Open and replay the trade journal of the strategy. The trades are journalized once the previous ones are
+        loaded, or immediately if they are not loaded at startup.
+        """
+        if self._trade_journal:
+            return
+
+        trader = self.trader()
+        if not trader:
+            return
+
+        filename = "%s/%s_%s.jnl" % (self.service.journal_path, trader.name, self.identifier)
+
+        try:
+            trade_journal = TradeJournal(filename, trader, self.identifier)
+            trade_journal.open()
+        except OSError as e:
+            error_logger.error("Unable to open the trade journal %s : %s" % (filename, repr(e)))
+            return
+
+        if not self.service.load_on_startup:
+            trade_journal.arm()
+
+        self._trade_journal = trade_journal
+
+    def close_trade_journal(self):
+        """
+        Journalize the last changes, compact and close the trade journal.
+        """
+        if not self._trade_journal:
+            return
+
+        with self._mutex:
+            strategy_traders = list(self._strategy_traders.values())
+
+        for strategy_trader in strategy_traders:
+            strategy_trader.journal_trades()
+
+        self._trade_journal.close()
+        self._trade_journal = None
+
     def indicator(self, name: str) -> Union[Type[Indicator], None]:
         """
         Get an indicator by its name
@@ -969,6 +1041,7 @@ class Strategy(Runnable):
                 return True
 
         do_update = set()
+        do_update_order = set()  # order/position signals are processed first
 
         while self._signals:
             signal = self._signals.popleft()
@@ -1045,9 +1118,18 @@ class Strategy(Runnable):
                                 strategy_trader.loads_trade(data[1], data[2], data[3], data[4], check=True)
                                 time.sleep(2)
 
-                    # clear once done (@todo or by trade...)
-                    trader = self.trader()
-                    Database.inst().clear_user_trades(trader.name, trader.account.name, self.identifier)
+                    if self._trade_journal:
+                        if not self._trade_journal.has_records:
+                            # loaded from the database, they will be stored again from the journal
+                            trader = self.trader()
+                            Database.inst().clear_user_trades(trader.name, trader.account.name, self.identifier)
+
+                        # previous trades are loaded, now follow them
+                        self._trade_journal.arm()
+                    else:
+                        # clear once done (@todo or by trade...)
+                        trader = self.trader()
+                        Database.inst().clear_user_trades(trader.name, trader.account.name, self.identifier)
 
                 elif signal.signal_type == Signal.SIGNAL_STRATEGY_TRADER_LIST:
                     # for each market load the corresponding settings and regions to the strategy trader
@@ -1087,6 +1169,9 @@ class Strategy(Runnable):
                             strategy_trader.instrument.add_tick(signal.data[1])
                             do_update.add(strategy_trader)
 
+                        if signal.trace is not None:
+                            LatencyTracer.inst().dequeued(signal.trace, strategy_trader)
+
                 elif signal.signal_type == Signal.SIGNAL_STREAM_CANDLE_DATA:
                     # interest in candle data
                     strategy_trader = self._strategy_traders.get(signal.data[0])
@@ -1301,8 +1386,16 @@ class Strategy(Runnable):
                         do_update.add(strategy_trader)
 
                 elif signal.signal_type == Signal.SIGNAL_ECONOMIC_EVENT:
+                    # indexed once for any strategy trader (next/previous queries)
+                    EconomicEventCache.inst().add(signal.data)
+
                     # interest in economic event
                     for k, strategy_trader in self._strategy_traders.items():
+                        # filter before locking
+                        event_filter = getattr(strategy_trader, 'economic_event_filter', None)
+                        if event_filter is not None and not event_filter.accept(signal.data):
+                            continue
+
                         with strategy_trader.mutex:
                             strategy_trader.on_received_economic_event(signal.data)
 
@@ -1348,19 +1441,32 @@ class Strategy(Runnable):
                     # position signal
                     self.position_signal(signal.signal_type, signal.data)
 
+                    strategy_trader = self._strategy_traders.get(signal.data[0])
+                    if strategy_trader:
+                        do_update_order.add(strategy_trader)
+
                 elif Signal.SIGNAL_ORDER_OPENED <= signal.signal_type <= Signal.SIGNAL_ORDER_TRADED:
                     # trade signal
                     self.order_signal(signal.signal_type, signal.data)
 
+                    strategy_trader = self._strategy_traders.get(signal.data[0])
+                    if strategy_trader:
+                        do_update_order.add(strategy_trader)
+
         if not self.service.backtesting:
             # normal processing
+            if do_update_order:
+                do_update.update(do_update_order)
+
             if do_update:
                 if len(self._strategy_traders) >= 1:
                     # always async update process
                     for strategy_trader in do_update:
-                        # parallelize jobs on workers
+                        # parallelize jobs on workers, at most one pending job per strategy trader
                         self.service.worker_pool.add_job(None, (self._async_update_strategy, (
-                            self, strategy_trader, self.timestamp)))
+                            self, strategy_trader, self.timestamp)),
+                            self.update_priority(strategy_trader, strategy_trader in do_update_order),
+                            strategy_trader)
                 else:
                     # no parallelization for single instrument
                     for strategy_trader in do_update:
@@ -1368,6 +1474,22 @@ class Strategy(Runnable):
 
         return True
 
+    @staticmethod
+    def update_priority(strategy_trader: StrategyTraderBase, order_signal: bool) -> int:
+        """
+        Priority of the update job of a strategy trader.
+        Order and position signals are processed first, then the tick updates, then the bootstrap/initialization.
+        """
+        if order_signal:
+            return WorkerPool.PRIORITY_ORDER
+
+        if (strategy_trader.initialized != strategy_trader.STATE_NORMAL or
+                strategy_trader.bootstrapping != strategy_trader.STATE_NORMAL or
+                strategy_trader.preprocessing != strategy_trader.PREPROCESSING_STATE_NORMAL):
+            return WorkerPool.PRIORITY_BOOTSTRAP
+
+        return WorkerPool.PRIORITY_TICK
+
     def stream_ping(self):
         try:
             now = time.time()
@@ -3,9 +3,12 @@
 # @license Copyright (c) 2018 Dream Overflow
 # Backtesting strategy data feeder/promise
 from datetime import datetime
-from typing import List, Optional, Dict, TYPE_CHECKING
+from typing import List, Optional, Dict, Union, TYPE_CHECKING
 
-from database.economiceventstorage import EconomicEventStreamer
+if TYPE_CHECKING:
+    from .shareddatafeed import SharedTickConsumer
+
+from database.economiceventcache import EconomicEventCache, EconomicEventFilter, EconomicEventCacheStreamer
 from database.tickstorage import TickStreamer
 from instrument.instrument import Instrument
 from database.ohlcstorage import OhlcStreamer
@@ -24,8 +27,8 @@ class StrategyDataFeeder(object):
 
     _instrument: Optional[Instrument]
     _candle_streamer: Dict[float, Optional[OhlcStreamer]]
-    _tick_streamer: Optional[TickStreamer]
-    _economic_events_streamer: Optional[EconomicEventStreamer]
+    _tick_streamer: Optional[Union[TickStreamer, 'SharedTickConsumer']]
+    _economic_events_streamer: Optional[EconomicEventCacheStreamer]
 
     def __init__(self, strategy, market_id: str, timeframes: List[float], ticks: bool,
                  country: str = None, currency: str = None, min_level: int = 1):
@@ -76,15 +79,22 @@ class StrategyDataFeeder(object):
                                                                              from_date=from_date, to_date=to_date)
 
         if self._fetch_ticks:
-            self._tick_streamer = Database.inst().create_tick_streamer(watcher_name, self._market_id,
-                                                                       from_date=from_date, to_date=to_date)
-
-        self._economic_events_streamer = Database.inst().create_economic_event_streamer(
-            self._country, self._currency, self._min_level, from_date=from_date, to_date=to_date)
-
-        if self._country or self._currency:
-            self._economic_events_streamer = Database.inst().create_economic_event_streamer(
-                self._country, self._currency, self._min_level, from_date=from_date, to_date=to_date)
+            shared_data_feed = self._strategy.service.shared_data_feed
+
+            if shared_data_feed:
+                # ticks read once for any strategy of the process
+                self._tick_streamer = shared_data_feed.create_tick_streamer(watcher_name, self._market_id,
+                                                                            from_date=from_date, to_date=to_date)
+            else:
+                self._tick_streamer = Database.inst().create_tick_streamer(watcher_name, self._market_id,
+                                                                           from_date=from_date, to_date=to_date)
+
+        # economic events are loaded once for any feeder of the process, then filtered from the shared cache
+        economic_event_cache = EconomicEventCache.inst()
+        economic_event_cache.load(from_date, to_date)
+
+        self._economic_events_streamer = economic_event_cache.create_streamer(
+            EconomicEventFilter(self._country, self._currency, self._min_level), from_date, to_date)
 
         self._initialized = True
 
@@ -19,6 +19,7 @@ if TYPE_CHECKING:
     from trader.trader import Trader
     from instrument.instrument import TickType
     from monitor.streamable import Streamable
+    from common.latency import LatencyTrace
 
 import pathlib
 import threading
@@ -129,6 +130,7 @@ class StrategyTraderBase(object):
     _processing: bool
 
     last_timestamp: float
+    latency_trace: Optional[LatencyTrace]
 
     _trade_mutex: threading.RLock
     _trades: List[StrategyTrade]
@@ -204,6 +206,7 @@ class StrategyTraderBase(object):
 
         self._processing = False   # True during processing
         self.last_timestamp = 0.0  # Last processed timestamp
+        self.latency_trace = None  # Oldest latency trace of the unprocessed market data (live only)
 
         self._trade_short = False  # short are supported by market/strategy
 
@@ -1097,6 +1100,9 @@ class StrategyTraderBase(object):
         # streaming
         self.stream()
 
+        # persistence of the changed trades
+        self.journal_trades()
+
     def update_time_deviation(self, timestamp):
         if self.strategy.timestamp - timestamp > self._stats['time-deviation']:
             self._stats['time-deviation'] = self.strategy.timestamp - timestamp
@@ -1182,18 +1188,24 @@ class StrategyTraderBase(object):
         trader = self.strategy.trader()
 
         with self._mutex:
-            # clear DB before
-            Database.inst().clear_user_trades(trader.name, trader.account.name, self.strategy.identifier)
+            trade_journal = self.strategy.trade_journal
 
-            with self._trade_mutex:
-                for trade in self._trades:
-                    t_data = trade.dumps()
-                    ops_data = [operation.dumps() for operation in trade.operations]
+            if trade_journal:
+                # last changes, the journal compaction stores only the changed trades
+                self.journal_trades()
+            else:
+                # clear DB before
+                Database.inst().clear_user_trades(trader.name, trader.account.name, self.strategy.identifier)
 
-                    # store per trade
-                    Database.inst().store_user_trade((
-                        trader.name, trader.account.name, self.instrument.market_id,
-                        self.strategy.identifier, trade.id, trade.trade_type, t_data, ops_data))
+                with self._trade_mutex:
+                    for trade in self._trades:
+                        t_data = trade.dumps()
+                        ops_data = [operation.dumps() for operation in trade.operations]
+
+                        # store per trade
+                        Database.inst().store_user_trade((
+                            trader.name, trader.account.name, self.instrument.market_id,
+                            self.strategy.identifier, trade.id, trade.trade_type, t_data, ops_data))
 
             # dumps of trader data, regions and alerts
             trader_data = {
@@ -1208,6 +1220,20 @@ class StrategyTraderBase(object):
             trader.name, trader.account.name, self.instrument.market_id,
             self.strategy.identifier, self.activity, trader_data, regions_data, alerts_data))
 
+    def journal_trades(self):
+        """
+        Append the changed and removed trades to the trade journal of the strategy, if any (live mode only).
+        """
+        trade_journal = self.strategy.trade_journal
+
+        if trade_journal and trade_journal.armed:
+            with self._trade_mutex:
+                try:
+                    trade_journal.update(self.instrument.market_id, self._trades)
+                except Exception as e:
+                    error_logger.error(repr(e))
+                    traceback_logger.error(traceback.format_exc())
+
     def dumps(self) -> dict:
         """
         Trader state, context and trades persistence.
@@ -1484,6 +1510,8 @@ class StrategyTraderBase(object):
                 error_logger.error(traceback.format_exc())
                 error_logger.error(repr(e))
 
+            self.journal_trades()
+
     def position_signal(self, signal_type: int, data: dict):
         """
         Update quantity/filled on a trade, delete or cancel.
@@ -1517,6 +1545,8 @@ class StrategyTraderBase(object):
                 error_logger.error(traceback.format_exc())
                 error_logger.error(repr(e))
 
+            self.journal_trades()
+
     #
     # trade
     #
@@ -793,6 +793,14 @@ class StrategyAssetTrade(StrategyTrade):
                 # clean dirty flag if all the order have been updated
                 self._dirty = False
 
+    def journal_key(self) -> tuple:
+        # orders identifiers and states
+        return super().journal_key() + (
+            self.entry_ref_oid, self.stop_ref_oid, self.limit_ref_oid, self.oco_ref_oid,
+            self.entry_oid, self.stop_oid, self.limit_oid, self.oco_oid,
+            self.stop_order_qty, self.limit_order_qty, self.stop_order_exec,
+            self.limit_order_exec)
+
     def is_target_order(self, order_id: str, ref_order_id: str) -> bool:
         if order_id and (order_id == self.entry_oid or order_id == self.stop_oid or
                          order_id == self.limit_oid or order_id == self.oco_oid):
@@ -995,6 +995,14 @@ class StrategyIndMarginTrade(StrategyTrade):
                     # for stats
                     self._stats['last-realized-exit-timestamp'] = data.get('timestamp', 0.0)
 
+    def journal_key(self) -> tuple:
+        # orders identifiers and states
+        return super().journal_key() + (
+            self.create_ref_oid, self.stop_ref_oid, self.limit_ref_oid, self.create_oid,
+            self.stop_oid, self.limit_oid, self.position_id, self.leverage,
+            self.stop_order_qty, self.limit_order_qty, self.stop_order_exec,
+            self.limit_order_exec)
+
     def is_target_order(self, order_id: str, ref_order_id: str) -> bool:
         if order_id and (order_id == self.create_oid or order_id == self.stop_oid or order_id == self.limit_oid):
             return True
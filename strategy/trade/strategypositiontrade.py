@@ -664,6 +664,12 @@ class StrategyPositionTrade(StrategyTrade):
             if data.get('stop-loss'):
                 self.position_stop = data['stop-loss']
 
+    def journal_key(self) -> tuple:
+        # orders identifiers and states
+        return super().journal_key() + (
+            self.create_ref_oid, self.create_oid, self.position_id, self.position_stop,
+            self.position_limit, self.position_quantity, self.leverage, self.hedging)
+
     def is_target_order(self, order_id: str, ref_order_id: str) -> bool:
         if order_id and (order_id == self.create_oid):
             return True
@@ -49,7 +49,7 @@ class StrategyTrade(object):
     __slots__ = '_trade_type', '_entry_state', '_exit_state', '_closing', '_timeframe', '_operations', '_user_trade', \
                 '_next_operation_id', 'id', 'dir', 'op', 'oq', 'tp', 'sl', 'aep', 'axp', 'eot', 'xot', 'e', 'x', \
                 'pl', '_stats', 'last_tp_ot', 'last_stop_ot', 'exit_trades', '_label', '_entry_timeout', '_expiry', \
-                '_dirty', '_extra', 'context', '_comment'
+                '_dirty', '_modified', '_extra', 'context', '_comment'
 
     VERSION = "1.0.0"
 
@@ -98,6 +98,9 @@ class StrategyTrade(object):
         # flag set when the quantity of the entry trade increase and then the exit orders must be updated
         self._dirty = False
 
+        # flag set on a change not reflected by the journal key (extra, operations), reset once journalized
+        self._modified = False
+
         self._timeframe = timeframe  # timeframe that have given this trade
 
         # list containing the operation to process during the trade for semi-automated trading
@@ -374,6 +377,30 @@ class StrategyTrade(object):
     def is_dirty(self) -> bool:
         return self._dirty
 
+    @property
+    def modified(self) -> bool:
+        return self._modified
+
+    def set_modified(self, modified: bool = True):
+        self._modified = modified
+
+    def journal_key(self) -> tuple:
+        """
+        Key of the persistent state of the trade, compared by the trade journal to detect the changes (states,
+        quantities, prices, orders, statistics, operations) without dumping the trade.
+        Specializations append their orders identifiers and states.
+
+        @note The unrealized profit/loss is excluded, it changes with the market price and is recomputed.
+        @note The extra values are covered by the modified flag (see set and unset).
+        """
+        return (self._entry_state, self._exit_state, self._closing, self.e, self.x, self.oq, self.op, self.tp,
+                self.sl, self.aep, self.axp, self._user_trade, self._label, self._expiry, self._entry_timeout,
+                self._next_operation_id, len(self._operations), self._comment, self.pl,
+                self.eot, self.xot, tuple(self.last_tp_ot or ()), tuple(self.last_stop_ot or ()),
+                tuple(self.exit_trades.items()),
+                tuple(v for k, v in self._stats.items() if k != 'unrealized-profit-loss'),
+                self.context.name if self.context else None)
+
     @property
     def comment(self) -> str:
         return self._comment
@@ -1249,11 +1276,13 @@ class StrategyTrade(object):
         persistence.
         """
         self._extra[key] = value
+        self._modified = True
 
     def unset(self, key: str):
         """Remove a previously set extra key"""
         if key in self._extra:
             del self._extra[key]
+            self._modified = True
 
     def get(self, key: str, default=None):
         """Return a value for a previously defined key or default value if not exists"""
@@ -1281,6 +1310,9 @@ class StrategyTrade(object):
                 ops.append(operation)
 
         # replace the operations list
+        if len(ops) != len(self._operations):
+            self._modified = True
+
         self._operations = ops
 
     def add_operation(self, trade_operation: TradeOp):
@@ -1288,11 +1320,13 @@ class StrategyTrade(object):
         self._next_operation_id += 1
 
         self._operations.append(trade_operation)
+        self._modified = True
 
     def remove_operation(self, trade_operation_id: int) -> bool:
         for operation in self._operations:
             if operation.id == trade_operation_id:
                 self._operations.remove(operation)
+                self._modified = True
                 return True
 
         return False
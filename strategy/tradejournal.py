@@ -0,0 +1,281 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Write-ahead journal of the trades of a strategy
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
+
+if TYPE_CHECKING:
+    from trader.trader import Trader
+    from .trade.strategytrade import StrategyTrade
+
+import os
+import json
+import time
+import pathlib
+import threading
+import traceback
+
+from database.database import Database
+
+import logging
+logger = logging.getLogger('siis.strategy.tradejournal')
+error_logger = logging.getLogger('siis.error.strategy.tradejournal')
+traceback_logger = logging.getLogger('siis.traceback.strategy.tradejournal')
+
+
+class TradeJournal(object):
+    """
+    Append-only journal of the state of the trades of a strategy, one JSON record per line :
+        - a trade record, the whole dump of a trade and of its operations, written each time the trade changed
+          (state, quantities, prices, operations... see StrategyTrade.journal_key and StrategyTrade.modified)
+        - a remove record once a trade is no longer managed by its strategy trader.
+
+    At startup the journal is replayed to restore the trades, the last record of each trade wins, in place of
+    loading them from the database. Periodically the journal is compacted, it is rewritten with only the last record
+    of the existing trades and the changes since the previous compaction are applied to the user_trade table,
+    per trade (upsert or delete), then there is never a full rewrite of the trades into the database.
+
+    The journal only follows a market once armed, after the trades of the previous session were loaded, else the
+    trades not yet loaded would be removed.
+
+    @note Lines are flushed at each write (resists to a crash of the process, not to a crash of the system).
+    """
+
+    VERSION = 1
+
+    COMPACT_RECORDS = 1000   # compact after this number of records appended
+
+    def __init__(self, filename: str, trader: Trader, strategy_id: str):
+        self._filename = filename
+        self._trader = trader
+        self._strategy_id = strategy_id
+
+        self._mutex = threading.RLock()
+        self._file = None
+        self._armed = False
+
+        self._records: Dict[Tuple[str, int], dict] = {}       # last record of each existing trade
+        self._keys: Dict[str, Dict[int, Optional[tuple]]] = {}   # per market last journaled key of each trade
+
+        self._upserts = set()   # trades to update into the database at the next compaction
+        self._removes = set()   # trades to delete from the database at the next compaction
+
+        self._num_appended = 0
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @property
+    def armed(self) -> bool:
+        return self._armed
+
+    @property
+    def has_records(self) -> bool:
+        return len(self._records) > 0
+
+    #
+    # session
+    #
+
+    def open(self) -> bool:
+        """
+        Replay the existing journal then open it for append.
+        @return True if a journal of a previous session was replayed.
+        """
+        replayed = False
+
+        with self._mutex:
+            path = pathlib.Path(self._filename)
+
+            if path.exists():
+                self._replay(path)
+                replayed = True
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+
+            # the previous trades are removed at the first update if they were not reloaded
+            for market_id, trade_id in self._records.keys():
+                self._keys.setdefault(market_id, {})[trade_id] = None
+
+            self._file = open(self._filename, 'at')
+
+        return replayed
+
+    def close(self):
+        with self._mutex:
+            if self._file:
+                self.compact()
+
+                self._file.close()
+                self._file = None
+
+    def arm(self):
+        """
+        Start to follow the trades of the strategy traders.
+        """
+        with self._mutex:
+            self._armed = True
+
+    def trades(self) -> List[Tuple[str, int, int, dict, List[dict]]]:
+        """
+        Trades of the previous session, in the format of Database.load_user_trades.
+        @return List of tuple (market_id, trade_id, trade_type, data, operations).
+        """
+        with self._mutex:
+            return [(r['m'], r['id'], r['type'], r['data'], r['ops']) for r in self._records.values()]
+
+    #
+    # processing
+    #
+
+    def update(self, market_id: str, trades: List[StrategyTrade]):
+        """
+        Journalize the changed trades of a strategy trader and the removed ones.
+        @note Must be called with the trades mutex of the strategy trader locked.
+        """
+        if not self._armed or not self._file:
+            return
+
+        with self._mutex:
+            keys = self._keys.setdefault(market_id, {})
+            records = []
+            existing = set()
+
+            for trade in trades:
+                existing.add(trade.id)
+
+                key = trade.journal_key()
+
+                if trade.modified or keys.get(trade.id, ()) != key:
+                    keys[trade.id] = key
+                    trade.set_modified(False)
+
+                    records.append({
+                        'r': 'trade',
+                        'ts': time.time(),
+                        'm': market_id,
+                        'id': trade.id,
+                        'type': trade.trade_type,
+                        'data': trade.dumps(),
+                        'ops': [operation.dumps() for operation in trade.operations]
+                    })
+
+            for trade_id in [trade_id for trade_id in keys.keys() if trade_id not in existing]:
+                del keys[trade_id]
+
+                records.append({
+                    'r': 'remove',
+                    'ts': time.time(),
+                    'm': market_id,
+                    'id': trade_id
+                })
+
+            if records:
+                self._append(records)
+
+                if self._num_appended >= TradeJournal.COMPACT_RECORDS:
+                    self.compact()
+
+    def compact(self):
+        """
+        Rewrite the journal with only the last record of each existing trade, and apply the changes since the
+        previous compaction to the database.
+        """
+        with self._mutex:
+            if not self._file:
+                return
+
+            tmp_filename = self._filename + ".tmp"
+
+            try:
+                with open(tmp_filename, 'wt') as f:
+                    f.write(json.dumps({'r': 'header', 'version': TradeJournal.VERSION}) + '\n')
+
+                    for record in self._records.values():
+                        f.write(json.dumps(record) + '\n')
+
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                self._file.close()
+                os.replace(tmp_filename, self._filename)
+
+            except OSError as e:
+                error_logger.error("Unable to compact trade journal %s : %s" % (self._filename, repr(e)))
+                traceback_logger.error(traceback.format_exc())
+
+            finally:
+                # continue to append in any case
+                if self._file.closed:
+                    self._file = open(self._filename, 'at')
+
+            self._num_appended = 0
+
+            # apply to the database the changed trades since the previous compaction
+            trader = self._trader
+            account_name = trader.account.name
+
+            for market_id, trade_id in self._removes:
+                Database.inst().delete_user_trade(trader.name, account_name, market_id, self._strategy_id, trade_id)
+
+            upserts = []
+
+            for k in self._upserts:
+                record = self._records.get(k)
+                if record:
+                    upserts.append((trader.name, account_name, record['m'], self._strategy_id,
+                                    record['id'], record['type'], record['data'], record['ops']))
+
+            if upserts:
+                Database.inst().store_user_trade(upserts)
+
+            self._removes.clear()
+            self._upserts.clear()
+
+    #
+    # internal
+    #
+
+    def _append(self, records: List[dict]):
+        for record in records:
+            k = (record['m'], record['id'])
+
+            if record['r'] == 'trade':
+                self._records[k] = record
+                self._upserts.add(k)
+                self._removes.discard(k)
+            else:
+                self._records.pop(k, None)
+                self._upserts.discard(k)
+                self._removes.add(k)
+
+            self._file.write(json.dumps(record) + '\n')
+
+        self._file.flush()
+        self._num_appended += len(records)
+
+    def _replay(self, path: pathlib.Path):
+        num_lines = 0
+
+        with open(path, 'rt') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # a partially written last line after a crash
+                    error_logger.warning("Ignore an invalid record of trade journal %s" % self._filename)
+                    continue
+
+                num_lines += 1
+
+                if record.get('r') == 'trade':
+                    self._records[(record['m'], record['id'])] = record
+                elif record.get('r') == 'remove':
+                    self._records.pop((record['m'], record['id']), None)
+
+        logger.info("Trade journal %s replayed, %i records for %i trades" % (
+            self._filename, num_lines, len(self._records)))
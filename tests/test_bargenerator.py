@@ -0,0 +1,125 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Batch mode (tick array) versus per tick generation of the non-temporal bars.
+
+import time
+
+import numpy as np
+import pytest
+
+from instrument.bargeneratorbase import TickArrayType
+from instrument.volumebargenerator import VolumeBarGenerator
+from instrument.tickbargenerator import TickBarGenerator
+from instrument.rangebargenerator import RangeBarGenerator
+from instrument.reversalbargenerator import ReversalBarGenerator
+
+
+def make_ticks(num: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+
+    ticks = np.zeros(num, dtype=TickArrayType)
+
+    ticks['t'] = 1672531200.0 + np.arange(num) * 0.5
+    ticks['l'] = np.round(100.0 + rng.normal(0.0, 0.5, num).cumsum(), 2)
+    ticks['b'] = ticks['l'] - 0.01
+    ticks['a'] = ticks['l'] + 0.01
+
+    # decimal volumes whose sums are inexact, and some greater than the bar size
+    ticks['v'] = rng.choice(np.array([0.1, 0.2, 0.3, 0.7, 1.0, 2.5, 7.0]), num)
+    ticks['d'] = rng.choice(np.array([-1, 1], dtype=np.int8), num)
+
+    return ticks
+
+
+def per_tick(generator, ticks: np.ndarray) -> list:
+    bars = generator.generate_from_ticks(ticks.tolist())
+    return [(b.timestamp, b.open, b.high, b.low, b.close, b.volume) for b in bars]
+
+
+def batch(generator, ticks: np.ndarray, chunks: int) -> list:
+    bars = []
+
+    for chunk in np.array_split(ticks, chunks):
+        bars.extend(generator.generate_from_tick_array(chunk).tolist())
+
+    # timestamp, duration, open, high, low, close, volume
+    return [(b[0], b[2], b[3], b[4], b[5], b[6]) for b in bars]
+
+
+FACTORIES = {
+    'volume-1': lambda: VolumeBarGenerator(1),
+    'volume-3': lambda: VolumeBarGenerator(3),
+    'volume-50': lambda: VolumeBarGenerator(50),
+    'tick': lambda: TickBarGenerator(16),
+    'range': lambda: RangeBarGenerator(50),
+    'reversal': lambda: ReversalBarGenerator(50, 20),
+}
+
+
+@pytest.mark.parametrize("name", sorted(FACTORIES.keys()))
+@pytest.mark.parametrize("chunks", [1, 3, 17])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_batch_same_as_per_tick(name, chunks, seed):
+    ticks = make_ticks(2000, seed)
+
+    expected = per_tick(FACTORIES[name](), ticks)
+    results = batch(FACTORIES[name](), ticks, chunks)
+
+    assert len(results) == len(expected)
+    np.testing.assert_allclose(np.array(results), np.array(expected), rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("name", sorted(FACTORIES.keys()))
+def test_batch_current_bar(name):
+    ticks = make_ticks(500, 4)
+
+    generator_a = FACTORIES[name]()
+    generator_b = FACTORIES[name]()
+
+    per_tick(generator_a, ticks)
+    batch(generator_b, ticks, 5)
+
+    a, b = generator_a.current, generator_b.current
+
+    assert (a.timestamp, a.open, a.high, a.low, a.close) == (b.timestamp, b.open, b.high, b.low, b.close)
+    assert a.volume == pytest.approx(b.volume)
+
+
+def test_batch_ignore_older_ticks():
+    ticks = make_ticks(200, 5)
+
+    generator = VolumeBarGenerator(3)
+    generator._last_timestamp = float(ticks['t'][100])
+
+    results = generator.generate_from_tick_array(ticks)
+
+    assert generator._last_consumed == len(ticks)
+    assert len(results) == 0 or results['timestamp'][0] >= ticks['t'][100]
+
+    expected = VolumeBarGenerator(3)
+    expected._last_timestamp = float(ticks['t'][100])
+
+    assert len(results) == len(per_tick(expected, ticks))
+
+
+@pytest.mark.parametrize("chunks", [1, 7])
+def test_batch_skewed_volume(chunks):
+    # a quiet stretch then a busy one, where each tick completes a bar
+    ticks = make_ticks(40000, 6)
+    ticks['v'][:20000] = 1e-5
+    ticks['v'][20000:] = 5000.0
+
+    begin = time.perf_counter()
+    expected = per_tick(VolumeBarGenerator(1000), ticks)
+    per_tick_time = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    results = batch(VolumeBarGenerator(1000), ticks, chunks)
+    batch_time = time.perf_counter() - begin
+
+    assert len(results) == len(expected)
+    np.testing.assert_allclose(np.array(results), np.array(expected), rtol=0, atol=1e-9)
+
+    # the batch mode must not degrade after the quiet stretch (margin for the timing noise)
+    assert batch_time < 2.0 * per_tick_time + 0.1
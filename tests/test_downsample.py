@@ -0,0 +1,91 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Downsampling of the chart series and the OHLC pyramid.
+
+import threading
+import time
+
+import numpy as np
+
+import monitor.chartseries
+
+from charting.downsample import lttb, aggregate_ohlc, OHLC_TIMESTAMP
+from monitor.chartseries import OhlcPyramid
+
+
+def test_lttb_first_last_and_threshold():
+    y = np.sin(np.arange(1000) / 20.0)
+
+    indices = lttb(y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_never_select_nan():
+    # warmup of an indicator then a gap, both larger than a bucket
+    y = np.sin(np.arange(1000) / 20.0)
+    y[:300] = np.nan
+    y[600:700] = np.nan
+
+    indices = lttb(y, 100)
+
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+    assert len(indices) < 100
+
+    # the first point only is into the warmup
+    assert not np.isnan(y[indices[1:]]).any()
+
+    # the valid values are still downsampled
+    assert np.count_nonzero(indices >= 300) > 50
+
+
+def test_lttb_all_nan():
+    y = np.full(1000, np.nan)
+
+    assert list(lttb(y, 100)) == [0, 999]
+
+
+def test_pyramid_concurrent_levels(monkeypatch):
+    timeframe = 60.0
+    num = 4 ** 6
+
+    ohlc = np.zeros((num, 7))
+    # aligned on the period of the last level
+    ohlc[:, OHLC_TIMESTAMP] = timeframe * OhlcPyramid.FACTOR ** 7 * 1700 + np.arange(num) * timeframe
+    ohlc[:, 1:5] = 100.0
+    ohlc[:, 6] = 1.0
+
+    def slow_aggregate_ohlc(*args):
+        # let the other threads build the same level meanwhile
+        time.sleep(0.01)
+        return aggregate_ohlc(*args)
+
+    monkeypatch.setattr(monitor.chartseries, 'aggregate_ohlc', slow_aggregate_ohlc)
+
+    pyramid = OhlcPyramid(timeframe, ohlc, ohlc[0, 0], ohlc[-1, 0])
+    barrier = threading.Barrier(8)
+    results = []
+
+    def select(resolution):
+        barrier.wait()
+        results.append((resolution, pyramid.select(ohlc[0, 0], ohlc[-1, 0], resolution)))
+
+    threads = [threading.Thread(target=select, args=(4 ** (i % 6 + 1),)) for i in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8
+
+    for resolution, (level, bars) in results:
+        # the bars of the returned level are of the period of this level
+        period = timeframe * OhlcPyramid.FACTOR ** level
+        np.testing.assert_array_equal(bars, aggregate_ohlc(ohlc, period)[:len(bars)])
+        assert len(bars) <= resolution
@@ -0,0 +1,131 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Benchmark tool
+
+import os
+import pathlib
+
+from tools.tool import Tool
+
+from terminal.terminal import Terminal
+
+from benchmark.benchmark import BenchmarkRunner, collect_benchmarks
+
+import logging
+logger = logging.getLogger('siis.tools.benchmark')
+error_logger = logging.getLogger('siis.tools.error.benchmark')
+
+
+class BenchmarkTool(Tool):
+    """
+    Run the benchmarks of the hot paths with synthetic data, compare with a baseline and report the regressions.
+    """
+
+    @classmethod
+    def alias(cls):
+        return "bench"
+
+    @classmethod
+    def help(cls):
+        return ("Run the benchmarks of the hot paths and compare with the baseline.",
+                "Optional --spec=<pattern,...> to select the benchmarks (ex: indicator.*,papertrader.*).",
+                "Optional --filename=<results.json> to write the results.",
+                "Optional --baseline=<baseline.json> (default <reports-path>/benchmark/baseline.json).",
+                "Optional --update to write the results as the new baseline.",
+                "Optional --profile, --from, --to, --timestep for the end-to-end backtest benchmark.")
+
+    @classmethod
+    def detailed_help(cls):
+        return ("The process exits with an error if a benchmark is slower than its baseline by more than %i%%." %
+                int(BenchmarkRunner.DEFAULT_THRESHOLD * 100),
+                "The baseline must be produced on the same host.")
+
+    @classmethod
+    def need_identity(cls):
+        return False
+
+    def __init__(self, options):
+        super().__init__("benchmark", options)
+
+        self._runner = None
+        self._baseline_filename = None
+
+    def check_options(self, options):
+        if options.get('filename') and not options['filename'].endswith('.json'):
+            logger.error("Results filename must have a .json extension")
+            return False
+
+        return True
+
+    def init(self, options):
+        self._runner = BenchmarkRunner()
+
+        self._baseline_filename = options.get('baseline') or os.path.join(
+            options['reports-path'], 'benchmark', 'baseline.json')
+
+        return True
+
+    def run(self, options):
+        benchmarks, failed = collect_benchmarks(options)
+
+        for module_name, reason in failed.items():
+            Terminal.inst().warning("Benchmarks of %s not loaded : %s" % (module_name, reason))
+
+        patterns = options['spec'].replace(' ', '').split(',') if options.get('spec') else None
+        benchmarks = BenchmarkRunner.select(benchmarks, patterns)
+
+        if not benchmarks:
+            logger.error("No benchmark selected")
+            return False
+
+        baseline = BenchmarkRunner.load(self._baseline_filename)
+
+        def on_result(result):
+            msg = "%-48s best %10.3f ms  median %10.3f ms  %10.1f ns/item" % (
+                result.name, result.best * 1000.0, result.median * 1000.0, result.per_item * 1e9)
+
+            base = baseline.get('results', {}).get(result.name) if baseline else None
+            if base and base.get('best'):
+                msg += "  %+6.1f%%" % ((result.best / base['best'] - 1.0) * 100.0)
+
+            Terminal.inst().info(msg)
+
+        Terminal.inst().info("Run %i benchmarks..." % len(benchmarks))
+
+        self._runner.run(benchmarks, on_result)
+
+        for name, reason in self._runner.skipped.items():
+            Terminal.inst().notice("%-48s skipped : %s" % (name, reason))
+
+        if options.get('filename'):
+            self._runner.save(options['filename'])
+            Terminal.inst().info("Results written to %s" % options['filename'])
+
+        if options.get('update'):
+            pathlib.Path(self._baseline_filename).parent.mkdir(parents=True, exist_ok=True)
+
+            self._runner.save(self._baseline_filename)
+            Terminal.inst().info("Baseline written to %s" % self._baseline_filename)
+
+            return True
+
+        if not baseline:
+            Terminal.inst().notice("No baseline found at %s, use --update to create it" % self._baseline_filename)
+            return True
+
+        regressions = self._runner.regressions(self._runner.compare(baseline))
+
+        for name in regressions:
+            Terminal.inst().error("Performance regression of %s" % name)
+
+        return not regressions
+
+    def terminate(self, options):
+        return True
+
+    def forced_interrupt(self, options):
+        return True
+
+
+tool = BenchmarkTool
@@ -36,8 +36,18 @@ def do_binarizer(options):
         logger.error("Invalid timeframe !")
         sys.exit(-1)
 
-    converter = TextToBinary(options['markets-path'], options['broker'], options['market'], options.get('from'), options.get('to'))
-    converter.process()
+    if options.get('timeframe'):
+        # quotes (OHLC) of the timeframe, to the binary format of the version 2
+        from database.quotestorage import QuoteConverter
+
+        converter = QuoteConverter(options['markets-path'], options['broker'], options['market'], timeframe,
+                                   options.get('from'), options.get('to'))
+        converter.process()
+
+        Terminal.inst().info("%i quote file(s) converted" % converter.converted)
+    else:
+        converter = TextToBinary(options['markets-path'], options['broker'], options['market'], options.get('from'), options.get('to'))
+        converter.process()
 
     Terminal.inst().info("Binarization done!")
     Terminal.inst().flush()
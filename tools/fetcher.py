@@ -6,17 +6,22 @@
 import sys
 import time
 
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Tuple
 
-from common.utils import UTC, TIMEFRAME_FROM_STR_MAP
+from common.utils import UTC, TIMEFRAME_FROM_STR_MAP, format_datetime
 from watcher.event import BaseEvent
 
 from watcher.service import WatcherService
+from watcher.fetchengine import FetchEngine
 from instrument.instrument import Instrument
+from trader.market import Market
 
 from terminal.terminal import Terminal
 from database.database import Database
+from database.gapindex import GapIndex
+
+from tools.optimizer import TICK_MAX_GAP
 
 import logging
 logger = logging.getLogger('siis.tools.fetcher')
@@ -169,6 +174,105 @@ def fetch_events(fetcher, events: List[str], from_date, to_date):
         fetcher.fetch_events(BaseEvent.EVENT_TYPE_ECONOMIC, from_date, to_date, filters)
 
 
+# weekly closing of the non-crypto markets, from Friday 21:00 UTC to Sunday 22:00 UTC (summer and winter times)
+WEEKEND_FROM = 4*24*60*60 + 21*60*60
+WEEKEND_TO = 6*24*60*60 + 22*60*60
+
+
+def open_ranges(gap_from: float, gap_to: float, weekend_off: bool) -> List[Tuple[float, float]]:
+    """
+    Parts of a range during which the market is open, without the weekends if weekend_off.
+    """
+    if not weekend_off:
+        return [(gap_from, gap_to)]
+
+    results = []
+
+    start = gap_from
+    week = Instrument.basetime(Instrument.TF_WEEK, gap_from)
+
+    while week <= gap_to:
+        close_ts = week + WEEKEND_FROM
+        reopen_ts = week + WEEKEND_TO
+
+        if start < close_ts and start <= gap_to:
+            results.append((start, min(gap_to, close_ts)))
+
+        start = max(start, reopen_ts)
+        week += Instrument.TF_WEEK
+
+    return results
+
+
+def fill_gaps(fetcher, options, market_id: str, timeframe: float, cascaded, target_broker_id, target_market_id):
+    """
+    Fetch only the missing ranges of a market found by the optimizer tool, for the --from and --to range if defined.
+    The ranges during the weekends are skipped for the non-crypto markets.
+
+    A range is removed from the gap index only by the part covered by the fetched data, with the same tolerance as
+    the optimizer (one timeframe or TICK_MAX_GAP for the ticks), then the remaining parts will be fetched again
+    at the next call.
+    """
+    from_date = options.get('from')
+    to_date = options.get('to')
+
+    gap_index = GapIndex(options['markets-path'], target_broker_id or options['broker'],
+                         target_market_id or market_id)
+    gap_index.load()
+
+    gaps = gap_index.gaps(timeframe, from_date.timestamp() if from_date else None,
+                          to_date.timestamp() if to_date else None)
+
+    if not gaps:
+        Terminal.inst().info("No gap found for %s, run the optimizer before." % market_id)
+        return
+
+    market = Database.inst().get_market_info(options['broker'], market_id)
+    weekend_off = market is not None and market.market_type != Market.TYPE_CRYPTO
+
+    max_gap = TICK_MAX_GAP if timeframe == Instrument.TF_TICK else timeframe
+
+    Terminal.inst().info("Fill %i gaps for %s..." % (len(gaps), market_id))
+
+    filled = 0
+    skipped = 0
+
+    for gap_from, gap_to in gaps:
+        parts = open_ranges(gap_from, gap_to, weekend_off)
+        if not parts:
+            # market closed, nothing to fetch
+            skipped += 1
+            continue
+
+        for part_from, part_to in parts:
+            try:
+                count, first_ts, last_ts = fetcher.fetch_and_generate(
+                    market_id, timeframe,
+                    datetime.fromtimestamp(part_from, tz=UTC()),
+                    datetime.fromtimestamp(part_to, tz=UTC()),
+                    None, options.get('spec'), cascaded,
+                    target_broker_id=target_broker_id,
+                    target_market_id=target_market_id)
+            except Exception as e:
+                error_logger.error(repr(e))
+                continue
+
+            if not count:
+                Terminal.inst().warning("No data fetched for %s from %s to %s" % (
+                    market_id, format_datetime(part_from), format_datetime(part_to)))
+                continue
+
+            # only the covered part, the remaining beginning or end are kept
+            gap_index.remove(timeframe, part_from if first_ts - part_from < max_gap else first_ts,
+                             part_to if part_to - last_ts < max_gap else last_ts)
+
+            filled += 1
+
+    gap_index.save()
+
+    Terminal.inst().info("Filled %i ranges for %s, %i closed ranges skipped" % (filled, market_id, skipped))
+
+
 def do_fetcher(options):
     Terminal.inst().info("Starting SIIS fetcher using %s identity..." % options['identity'])
     Terminal.inst().flush()
@@ -224,6 +328,7 @@ def do_fetcher(options):
 
     do_update = False
     install_market = options.get('install-market', False)
+    do_fill_gaps = options.get('fill-gaps', False)
 
     if options.get('update'):
         # if options.get('from'):
@@ -237,6 +342,10 @@ def do_fetcher(options):
     else:
         delay = 0.0
 
+    # concurrent fetch of the markets when supported by the fetcher
+    parallel = options.get('parallel', 1)
+    engine = None
+
     try:
         fetcher.connect()
     except:
@@ -263,6 +372,9 @@ def do_fetcher(options):
         # filters only available instruments ('*' and '!' are not compatible with target mapping)
         markets = fetcher.matching_symbols_set(markets, fetcher.available_instruments())
 
+        if parallel > 1 and fetcher.max_concurrency > 1 and not install_market and not do_fill_gaps:
+            engine = FetchEngine(fetcher, parallel, cascaded)
+
         try:
             if not markets and 'event' in options.get('spec').split(','):
                 from_date = options.get('from')
@@ -282,6 +394,9 @@ def do_fetcher(options):
                 # install market or fetch history
                 if install_market:
                     fetcher.install_market(market_id)
+                elif do_fill_gaps:
+                    # only the missing ranges
+                    fill_gaps(fetcher, options, market_id, timeframe, cascaded, target_broker_id, target_market_id)
                 else:
                     # reset from initials options
                     from_date = options.get('from')
@@ -340,6 +455,14 @@ def do_fetcher(options):
                     else:
                         Terminal.inst().info("Update %s from %s..." % (market_id, from_date))
 
+                    if engine and from_date:
+                        if not to_date:
+                            to_date = today + timedelta(seconds=timeframe)
+
+                        engine.add_market(market_id, timeframe, from_date, to_date,
+                                          target_broker_id=target_broker_id, target_market_id=target_market_id)
+                        continue
+
                     fetcher.fetch_and_generate(market_id, timeframe, from_date, to_date, last, spec, cascaded,
                                                target_broker_id=target_broker_id,
                                                target_market_id=target_market_id)
@@ -347,6 +470,9 @@ def do_fetcher(options):
                 if delay > 0:
                     time.sleep(delay)
 
+            if engine:
+                engine.run()
+
         except Exception as e:
             logger.error(repr(e))
         except KeyboardInterrupt:
@@ -5,17 +5,23 @@
 
 import signal
 import sys
+import time
+import itertools
 import traceback
 import zipfile
 import pathlib
 
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import List, Optional
 
 from instrument.instrument import Instrument
 from common.utils import UTC, TIMEFRAME_FROM_STR_MAP, timeframe_from_str, timeframe_to_str
 
 from terminal.terminal import Terminal
 from database.database import Database
+from database.tickstorage import TickStorage
+
+import numpy as np
 
 import logging
 logger = logging.getLogger('siis.tools.importer')
@@ -73,6 +79,8 @@ MT5_TIMEFRAMES = {
     'W1': Instrument.TF_1W
 }
 
+IMPORT_CHUNK_SIZE = 16 * 1024 * 1024  # rows are read and parsed by block of about 16MB
+
 prev_bid = None
 prev_ask = None
 
@@ -123,269 +131,221 @@ def import_ohlc_siis_1_0_0(broker_id, market_id, timeframe, from_date, to_date,
     return 1
 
 
-def import_tick_mt4(self, broker_id, market_id, from_date, to_date, row):
+def read_chunks(src, size: int = IMPORT_CHUNK_SIZE):
     """
-    Date + time MT4 tick
-
-    DATE,TIME,BID,ASK,LAST,VOL
-    @note but some version can be : DATE,TIME,BID,ASK,BIDVOL,ASKVOL
+    Read complete rows by block of about size bytes.
     """
-    parts = row.split(',')
+    while 1:
+        lines = src.readlines(size)
+        if not lines:
+            break
 
-    if len(parts) < 6:
-        return 0
+        yield lines
 
-    if '.' in parts[0]:
-        dt = datetime.strptime(parts[0] + ' ' + parts[1], '%Y.%m.%d %H:%M:%S.%f').replace(tzinfo=UTC())
-    else:
-        dt = datetime.strptime(parts[0] + ' ' + parts[1], '%Y%m%d %H:%M:%S').replace(tzinfo=UTC())
 
-    timestamp = int(dt.timestamp() * 1000)
+def split_columns(lines: List[str], sep: str, num_cols: int) -> Optional[List[np.ndarray]]:
+    """
+    Split rows into arrays of strings, one per column. Rows with missing columns are ignored.
+    """
+    rows = [parts[:num_cols] for parts in (row.rstrip('\r\n').split(sep) for row in lines) if len(parts) >= num_cols]
 
-    if parts[2]:
-        self.prev_bid = parts[2]
+    if not rows:
+        return None
 
-    if parts[3]:
-        self.prev_ask = parts[3]
+    return [np.array(col) for col in zip(*rows)]
 
-    if parts[4]:
-        self.prev_last = parts[4]
-    else:
-        # else use bid price
-        self.prev_last = self.prev_bid
 
-    if parts[5]:
-        fvol = parts[5]
+def parse_timestamps(dates: np.ndarray, times: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Vectorised conversion of a column of dates (YYYY.MM.DD or YYYYMMDD) and an optional column of times
+    (HH:MM, HH:MM:SS or HH:MM:SS.fff) to UTC timestamps in milliseconds.
+    """
+    if '.' in dates[0]:
+        iso = np.char.replace(dates, '.', '-')
     else:
-        fvol = "1"
+        iso = np.array([d[:4] + '-' + d[4:6] + '-' + d[6:8] for d in dates.tolist()])
 
-    self.prev_datetime = dt
+    if times is not None:
+        iso = np.char.add(np.char.add(iso, 'T'), times)
 
-    if from_date and dt < from_date:
-        return 0
+    return iso.astype('datetime64[ms]').astype(np.int64)
 
-    if to_date and dt > to_date:
-        return 0
 
-    Database.inst().store_market_trade((
-        broker_id, market_id, timestamp,
-        self.prev_bid, self.prev_ask,
-        self.prev_last,
-        fvol,
-        0))
-
-    return 1
-
-
-def import_ohlc_mt4(broker_id, market_id, timeframe, from_date, to_date, row):
+def parse_numbers(col: np.ndarray, prev: Optional[float] = None) -> np.ndarray:
     """
-    Date + time MT4 OHLC
-
-    DATE,TIME,OPEN,HIGH,LOW,CLOSE,TICKVOL
+    Vectorised conversion of a column of decimal numbers. Empty values are filled with the previous one, or with
+    prev for the leading ones, or NaN.
     """
-    parts = row.split(',')
+    values = np.where(col == '', 'nan', col).astype(np.float64)
 
-    if len(parts) < 7:
-        return 0
+    missing = np.isnan(values)
 
-    if '.' in parts[0]:
-        dt = datetime.strptime(parts[0] + ' ' + parts[1], '%Y.%m.%d %H:%M').replace(tzinfo=UTC())
-    else:
-        dt = datetime.strptime(parts[0] + ' ' + parts[1], '%Y%m%d %H:%M:%S').replace(tzinfo=UTC())
+    if missing.any():
+        if missing[0] and prev is not None:
+            values[0] = prev
+            missing[0] = False
 
-    timestamp = int(dt.timestamp() * 1000)
+        # index of the last non-missing value for each row
+        idx = np.where(missing, 0, np.arange(len(values)))
+        np.maximum.accumulate(idx, out=idx)
 
-    if from_date and dt < from_date:
-        return 0
+        values = values[idx]
 
-    if to_date and dt > to_date:
-        return 0
+    return values
 
-    if parts[6]:
-        fvol = parts[6]
-    else:
-        fvol = "1"
 
-    Database.inst().store_market_ohlc((
-        broker_id, market_id, timestamp, int(timeframe),
-        parts[2], parts[3], parts[4], parts[5],
-        "0",  # undefined spread
-        fvol))
-
-    return 1
-
-
-def import_ohlc_mt4_long(broker_id, market_id, timeframe, from_date, to_date, row):
+def import_ticks_mtx(tool, src, sep, broker_id, market_id, from_date, to_date):
     """
-    Date + time + vol + spread MT4 OHLC
+    Chunked import of MT4 or MT5 ticks, written directly to the tick files.
+
+    MT4 : DATE,TIME,BID,ASK,LAST,VOL
+    @note but some version can be : DATE,TIME,BID,ASK,BIDVOL,ASKVOL
+    MT5 : <DATE>  <TIME>  <BID>   <ASK>   <LAST>  <VOLUME>
 
-    DATE,TIME,OPEN,HIGH,LOW,CLOSE,TICKVOL,VOL,SPREAD
+    Empty bid, ask are filled with the previous values, empty last with the bid price, and empty volume with 1.
+    Ticks older than from_date or older than the previous tick are ignored.
     """
-    parts = row.split(',')
+    total_count = 0
+    total_rows = 0
 
-    if len(parts) < 9:
-        return 0
+    start_time = time.time()
 
-    if '.' in parts[0]:
-        dt = datetime.strptime(parts[0] + ' ' + parts[1], '%Y.%m.%d %H:%M').replace(tzinfo=UTC())
-    else:
-        dt = datetime.strptime(parts[0] + ' ' + parts[1], '%Y%m%d %H:%M:%S').replace(tzinfo=UTC())
+    from_ts = int(from_date.timestamp() * 1000) if from_date else None
+    to_ts = int(to_date.timestamp() * 1000) if to_date else None
 
-    timestamp = int(dt.timestamp() * 1000)
+    prev_ts = None
 
-    if from_date and dt < from_date:
-        return 0
+    for lines in read_chunks(src):
+        cols = split_columns(lines, sep, 6)
+        if cols is None:
+            continue
 
-    if to_date and dt > to_date:
-        return 0
+        timestamps = parse_timestamps(cols[0], cols[1])
 
-    # vol else tick vol
-    tickvol = float(parts[6]) if parts[6] else 0.0
-    vol = float(parts[7]) if parts[7] else 0.0
+        bids = parse_numbers(cols[2], tool.prev_bid)
+        asks = parse_numbers(cols[3], tool.prev_ask)
 
-    if vol > 0:
-        fvol = parts[7]
-    elif tickvol > 0:
-        fvol = parts[6]
-    else:
-        fvol = "1"
+        # else use bid price
+        lasts = np.where(cols[4] == '', 'nan', cols[4]).astype(np.float64)
+        lasts = np.where(np.isnan(lasts), bids, lasts)
 
-    Database.inst().store_market_ohlc((
-        broker_id, market_id, timestamp, int(timeframe),
-        parts[2], parts[3], parts[4], parts[5],
-        parts[8],  # spread
-        fvol))
+        # at least 1 tick mean 1 tick volume
+        volumes = np.where(cols[5] == '', '1', cols[5]).astype(np.float64)
 
-    return 1
+        tool.prev_bid = float(bids[-1])
+        tool.prev_ask = float(asks[-1])
+        tool.prev_last = float(lasts[-1])
+        tool.prev_datetime = datetime.fromtimestamp(timestamps[-1] * 0.001, tz=UTC())
 
+        # never go back in time
+        prevs = np.empty_like(timestamps)
+        prevs[0] = prev_ts if prev_ts is not None else timestamps[0]
+        prevs[1:] = timestamps[:-1]
 
-def import_tick_mt5(self, broker_id, market_id, from_date, to_date, row):
-    """
-    Date + time MT5 tick
+        mask = timestamps >= prevs
 
-    <DATE>  <TIME>  <BID>   <ASK>   <LAST>  <VOLUME>
-    """
-    parts = row.split('\t')
+        if from_ts is not None:
+            mask &= timestamps >= from_ts
 
-    if len(parts) < 6:
-        return 0
+        if to_ts is not None:
+            mask &= timestamps <= to_ts
 
-    dt = datetime.strptime(parts[0] + ' ' + parts[1], '%Y.%m.%d %H:%M:%S.%f').replace(tzinfo=UTC())
-    timestamp = int(dt.timestamp() * 1000)
+        prev_ts = int(timestamps[-1])
 
-    if parts[2]:
-        self.prev_bid = parts[2]
+        ticks = np.empty(int(mask.sum()), dtype=TickStorage.TICK_DTYPE)
 
-    if parts[3]:
-        self.prev_ask = parts[3]
+        ticks['t'] = timestamps[mask] * 0.001
+        ticks['b'] = bids[mask]
+        ticks['a'] = asks[mask]
+        ticks['l'] = lasts[mask]
+        ticks['v'] = volumes[mask]
+        ticks['d'] = 0
 
-    if parts[4]:
-        self.prev_last = parts[4]
-    else:
-        # else use bid price
-        self.prev_last = self.prev_bid
+        Database.inst().store_market_trade_array(broker_id, market_id, ticks)
 
-    if parts[5]:
-        ltv = parts[5]
-    else:
-        ltv = "1"  # at least 1 tick mean 1 tick volume, but could depend on what we want
+        total_count += len(ticks)
+        total_rows += len(timestamps)
 
-    self.prev_datetime = dt
+        report_progress(tool.prev_datetime, total_rows, start_time)
 
-    if from_date and dt < from_date:
-        return 0
+    return total_count
 
-    if to_date and dt > to_date:
-        return 0
 
-    Database.inst().store_market_trade((
-        broker_id, market_id, timestamp,
-        self.prev_bid, self.prev_ask,
-        self.prev_last,
-        ltv,
-        0))
-
-    return 1
+def import_ohlcs_mtx(src, sep, layout, broker_id, market_id, timeframe, from_date, to_date):
+    """
+    Chunked import of MT4 or MT5 OHLCs, stored by bulk insert.
 
+    Layouts :
+        - MT4 : DATE,TIME,OPEN,HIGH,LOW,CLOSE,TICKVOL
+        - MT4 long : DATE,TIME,OPEN,HIGH,LOW,CLOSE,TICKVOL,VOL,SPREAD
+        - MT5 : <DATE>  <OPEN>  <HIGH>  <LOW>   <CLOSE> <TICKVOL>   <VOL>   <SPREAD>
+        - MT5 time : <DATE>  <TIME>  <OPEN>  <HIGH>  <LOW>   <CLOSE> <TICKVOL>   <VOL>   <SPREAD>
 
-def import_ohlc_mt5(broker_id, market_id, timeframe, from_date, to_date, row):
+    Volume is the real volume else the tick volume else 1.
     """
-    Date MT5 OHLC
+    has_time, has_vol_spread = layout
 
-    <DATE>  <OPEN>  <HIGH>  <LOW>   <CLOSE> <TICKVOL>   <VOL>   <SPREAD>
-    """
-    parts = row.split('\t')
+    ofs = 2 if has_time else 1
+    num_cols = ofs + (7 if has_vol_spread else 5)
 
-    if len(parts) < 8:
-        return 0
+    total_count = 0
+    total_rows = 0
 
-    dt = datetime.strptime(parts[0], '%Y.%m.%d').replace(tzinfo=UTC())
-    timestamp = int(dt.timestamp() * 1000)
+    start_time = time.time()
 
-    if from_date and dt < from_date:
-        return 0
+    from_ts = int(from_date.timestamp() * 1000) if from_date else None
+    to_ts = int(to_date.timestamp() * 1000) if to_date else None
 
-    if to_date and dt > to_date:
-        return 0
+    for lines in read_chunks(src):
+        cols = split_columns(lines, sep, num_cols)
+        if cols is None:
+            continue
 
-    # vol else tick vol
-    tickvol = float(parts[5]) if parts[5] else 0.0
-    vol = float(parts[6]) if parts[6] else 0.0
+        timestamps = parse_timestamps(cols[0], cols[1] if has_time else None)
 
-    if vol > 0:
-        fvol = parts[6]
-    elif tickvol > 0:
-        fvol = parts[5]
-    else:
-        fvol = "1"
+        tick_vols = cols[ofs+4]
 
-    Database.inst().store_market_ohlc((
-        broker_id, market_id, timestamp, int(timeframe),
-        parts[1], parts[2], parts[3], parts[4],
-        parts[7],  # spread
-        fvol))
+        if has_vol_spread:
+            # vol else tick vol
+            vols = cols[ofs+5]
+            spreads = cols[ofs+6]
 
-    return 1
+            fvols = np.where(np.where(vols == '', '0', vols).astype(np.float64) > 0, vols,
+                             np.where(np.where(tick_vols == '', '0', tick_vols).astype(np.float64) > 0, tick_vols, '1'))
+        else:
+            spreads = np.full(len(timestamps), "0")  # undefined spread
+            fvols = np.where(tick_vols == '', '1', tick_vols)
 
+        mask = np.ones(len(timestamps), dtype=bool)
 
-def import_ohlc_mt5_time(broker_id, market_id, timeframe, from_date, to_date, row):
-    """
-    Date + time MT5 OHLC
-    
-    <DATE>  <TIME>  <OPEN>  <HIGH>  <LOW>   <CLOSE> <TICKVOL>   <VOL>   <SPREAD>
-    """
-    parts = row.split('\t')
+        if from_ts is not None:
+            mask &= timestamps >= from_ts
 
-    if len(parts) < 9:
-        return 0
+        if to_ts is not None:
+            mask &= timestamps <= to_ts
 
-    dt = datetime.strptime(parts[0] + ' ' + parts[1], '%Y.%m.%d %H:%M:%S').replace(tzinfo=UTC())
-    timestamp = int(dt.timestamp() * 1000)
+        rows = list(zip(
+            itertools.repeat(broker_id), itertools.repeat(market_id),
+            timestamps[mask].tolist(), itertools.repeat(int(timeframe)),
+            cols[ofs][mask].tolist(), cols[ofs+1][mask].tolist(), cols[ofs+2][mask].tolist(), cols[ofs+3][mask].tolist(),
+            spreads[mask].tolist(),
+            fvols[mask].tolist()))
 
-    if from_date and dt < from_date:
-        return 0
+        Database.inst().bulk_store_market_ohlc(rows)
 
-    if to_date and dt > to_date:
-        return 0
+        total_count += len(rows)
+        total_rows += len(timestamps)
 
-    # vol else tick vol
-    tickvol = float(parts[6]) if parts[6] else 0.0
-    vol = float(parts[7]) if parts[7] else 0.0
+        report_progress(datetime.fromtimestamp(timestamps[-1] * 0.001, tz=UTC()), total_rows, start_time)
 
-    if vol > 0:
-        fvol = parts[7]
-    elif tickvol > 0:
-        fvol = parts[6]
-    else:
-        fvol = "1"
+    return total_count
 
-    Database.inst().store_market_ohlc((
-        broker_id, market_id, timestamp, int(timeframe),
-        parts[2], parts[3], parts[4], parts[5],
-        parts[8],  # spread
-        fvol))
 
-    return 1
+def report_progress(position: datetime, total_rows: int, start_time: float):
+    elapsed = time.time() - start_time
+
+    Terminal.inst().info("Import progress %s, %i rows parsed, %i rows/s..." % (
+        position.strftime("%Y-%m-%dT%H:%M:%SZ"), total_rows, total_rows / elapsed if elapsed > 0 else 0))
 
 
 def unzip_file(filename, tmpdir="/tmp/"):
@@ -624,6 +584,7 @@ def do_importer(options):
     to_date_str = to_date.strftime("%Y-%m-%dT%H:%M:%SZ") if to_date else None
 
     total_count = 0
+    start_time = time.time()
 
     def tool_signal_handler(sig, frame):
         Terminal.inst().info("User interruption !")
@@ -672,106 +633,32 @@ def do_importer(options):
                     total_count += import_ohlc_siis_1_0_0(broker_id, market_id, cur_timeframe,
                                                           cur_from_date, cur_to_date, row)
 
-        elif detected_format == FORMAT_MT4:
-            cur_timeframe = timeframe if not is_mtx_tick else Instrument.TF_TICK
-            cur_from_date = from_date
-            cur_to_date = to_date
-            position = cur_from_date
-
-            if cur_timeframe == Instrument.TF_TICK:
-                # do not overwrite ticks/trades/quotes
-                cur_from_date = adjust_from_date(broker_id, market_id, cur_timeframe, cur_from_date)
-
-                if cur_from_date:
-                    Terminal.inst().info("Start from %s..." % cur_from_date)
-
-                while 1:
-                    row = src.readline()
-                    if not row:
-                        break
-
-                    # do not overwrite ticks/trades/quotes
-                    # cur_from_date = adjust_from_date(broker_id, market_id, cur_timeframe, cur_from_date)
-
-                    if position and cur_from_date and cur_from_date - position >= timedelta(days=1):
-                        position = cur_from_date
-                        Terminal.inst().info("Import progress %s..." % position)
-
-                    row = row.rstrip("\n")
-                    total_count += import_tick_mt4(tool, broker_id, market_id, cur_from_date, cur_to_date, row)
-
-                    if total_count > 0:
-                        cur_from_date = tool.prev_datetime
+        elif detected_format in (FORMAT_MT4, FORMAT_MT5):
+            sep = ',' if detected_format == FORMAT_MT4 else '\t'
 
-            elif cur_timeframe > 0:
-                if is_mtx_long:
-                    while 1:
-                        row = src.readline()
-                        if not row:
-                            break
-
-                        row = row.rstrip("\n")
-                        total_count += import_ohlc_mt4_long(broker_id, market_id, cur_timeframe,
-                                                            cur_from_date, cur_to_date, row)
-                else:
-                    while 1:
-                        row = src.readline()
-                        if not row:
-                            break
-
-                        row = row.rstrip("\n")
-                        total_count += import_ohlc_mt4(broker_id, market_id, cur_timeframe,
-                                                       cur_from_date, cur_to_date, row)
-
-        elif detected_format == FORMAT_MT5:
             cur_timeframe = timeframe if not is_mtx_tick else Instrument.TF_TICK
             cur_from_date = from_date
             cur_to_date = to_date
-            position = cur_from_date
 
             if cur_timeframe == Instrument.TF_TICK:
+                # do not overwrite ticks/trades/quotes
                 cur_from_date = adjust_from_date(broker_id, market_id, cur_timeframe, cur_from_date)
 
                 if cur_from_date:
                     Terminal.inst().info("Start from %s..." % cur_from_date)
 
-                while 1:
-                    row = src.readline()
-                    if not row:
-                        break
-
-                    # do not overwrite ticks/trades/quotes
-                    # cur_from_date = adjust_from_date(broker_id, market_id, cur_timeframe, cur_from_date)
-
-                    if position and cur_from_date and cur_from_date - position >= timedelta(days=1):
-                        position = cur_from_date
-                        Terminal.inst().info("Import progress %s..." % position)
-
-                    row = row.rstrip("\n")
-                    total_count += import_tick_mt5(tool, broker_id, market_id, cur_from_date, cur_to_date, row)
-
-                    if total_count > 0:
-                        cur_from_date = tool.prev_datetime
+                total_count += import_ticks_mtx(tool, src, sep, broker_id, market_id, cur_from_date, cur_to_date)
 
             elif cur_timeframe > 0:
-                if is_mtx_time:
-                    while 1:
-                        row = src.readline()
-                        if not row:
-                            break
-
-                        row = row.rstrip("\n")
-                        total_count += import_ohlc_mt5_time(broker_id, market_id, cur_timeframe,
-                                                            cur_from_date, cur_to_date, row)
+                if detected_format == FORMAT_MT4:
+                    # MT4 has always a time column
+                    layout = (True, is_mtx_long)
                 else:
-                    while 1:
-                        row = src.readline()
-                        if not row:
-                            break
+                    # MT5 has always volume and spread columns
+                    layout = (is_mtx_time, True)
 
-                        row = row.rstrip("\n")
-                        total_count += import_ohlc_mt5(broker_id, market_id, cur_timeframe,
-                                                       cur_from_date, cur_to_date, row)
+                total_count += import_ohlcs_mtx(src, sep, layout, broker_id, market_id, cur_timeframe,
+                                                cur_from_date, cur_to_date)
 
     except Exception as e:
         error_logger.error(str(e))
@@ -780,7 +667,10 @@ def do_importer(options):
         src.close()
         src = None
 
-    Terminal.inst().info("Imported %s samples" % total_count)
+    elapsed = time.time() - start_time
+
+    Terminal.inst().info("Imported %s samples in %.1f seconds (%i samples/s)" % (
+        total_count, elapsed, total_count / elapsed if elapsed > 0 else 0))
 
     Terminal.inst().info("Flushing database...")
     Terminal.inst().flush() 
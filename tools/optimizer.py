@@ -3,201 +3,289 @@
 # @license Copyright (c) 2018 Dream Overflow
 # Optimizer tool.
 
+import os
 import sys
+import time
+import pathlib
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
 
 from instrument.instrument import Instrument
 from common.utils import UTC, TIMEFRAME_FROM_STR_MAP, timeframe_to_str, format_datetime, format_delta
 
 from terminal.terminal import Terminal
 from database.database import Database
+from database.tickstorage import TickStorage
+from database.gapindex import GapIndex
 
 import logging
 logger = logging.getLogger('siis.tools.optimizer')
+error_logger = logging.getLogger('siis.error.tools.optimizer')
 
 # candles from 1m to 1 month
 GENERATED_TF = [60, 60*3, 60*5, 60*15, 60*30, 60*60, 60*60*2, 60*60*4, 60*60*24, 60*60*24*7, 60*60*24*30]
 # GENERATED_TF = [60, 60*5, 60*15, 60*30, 60*60, 60*60*2, 60*60*4, 60*60*24, 60*60*24*7]
 
+TICK_MAX_GAP = 60.0     # duration without tick considered as a gap
+MAX_REPORTED = 100      # maximum number of detailed issues displayed per category
 
-def check_ohlcs(broker_id, market_id, timeframe, from_date, to_date):
-    last_ohlcs = {}
 
-    ohlc_streamer = Database.inst().create_ohlc_streamer(broker_id, market_id, timeframe, from_date=from_date,
-                                                         to_date=to_date, buffer_size=100)
-    timestamp = from_date.timestamp()
-    to_timestamp = to_date.timestamp()
-    progression = 0.0
-    prev_update = timestamp
-    count = 0
-    total_count = 0
+class IntegrityReport(object):
+    """
+    Result of the integrity check of the ticks or OHLCs of a market for a timeframe.
+    Each chunk of data is checked at once and its results are merged into the report.
+    """
 
-    progression_incr = (to_timestamp - timestamp) * 0.01
+    __slots__ = 'market_id', 'timeframe', 'count', 'first', 'last', 'backwards', 'duplicates', 'gaps', 'invalids'
 
-    tts = 0.0
-    prev_tts = 0.0
+    def __init__(self, market_id: str, timeframe: float):
+        self.market_id = market_id
+        self.timeframe = timeframe
 
-    while not ohlc_streamer.finished():
-        ohlcs = ohlc_streamer.next(timestamp + timeframe * 100)  # per 100
+        self.count = 0
+        self.first = None
+        self.last = None
 
-        count = len(ohlcs)
-        total_count += len(ohlcs)
+        self.backwards = []    # list of tuple (timestamp, delta)
+        self.duplicates = []   # list of timestamp
+        self.gaps = []         # list of missing ranges (from, to) both included
+        self.invalids = {}     # per field list of tuple (timestamp, value)
 
-        for ohlc in ohlcs:
-            tts = ohlc.timestamp
+    def add_invalids(self, field: str, timestamps: np.ndarray, values: np.ndarray, mask: np.ndarray):
+        if mask.any():
+            self.invalids.setdefault(field, []).extend(zip(timestamps[mask].tolist(), values[mask].tolist()))
 
-            if not prev_tts:
-                prev_tts = tts
+    def has_issues(self) -> bool:
+        return bool(self.backwards or self.duplicates or self.gaps or self.invalids)
 
-            gap_duration = tts - prev_tts - timeframe
-            if gap_duration != 0:
-                date = format_datetime(tts)
-                Terminal.inst().warning("Ohlc gap of %s on %s !" % (format_delta(gap_duration), date))
-
-            if ohlc.open <= 0.0:
-                date = format_datetime(tts)
-                Terminal.inst().warning("Open price is lesser than 0 %s on %s !" % (ohlc.open, date))
-            if ohlc.high <= 0.0:
-                date = format_datetime(tts)
-                Terminal.inst().warning("High price is lesser than 0 %s on %s !" % (ohlc.high, date))
-            if ohlc.low <= 0.0:
-                date = format_datetime(tts)
-                Terminal.inst().warning("Low price is lesser than 0 %s on %s !" % (ohlc.low, date))
-            if ohlc.close <= 0.0:
-                date = format_datetime(tts)
-                Terminal.inst().warning("Close price is lesser than 0 %s on %s !" % (ohlc.close, date))
 
-            if ohlc.spread < 0.0:
-                date = format_datetime(tts)
-                Terminal.inst().warning("Spread is lesser than 0 %s on %s !" % (ohlc.spread, date))
-            if ohlc.volume < 0.0:
-                date = format_datetime(tts)
-                Terminal.inst().warning("Volume quantity is lesser than 0 %s on %s !" % (ohlc.volume, date))
+def check_timestamps(report: IntegrityReport, timestamps: np.ndarray, prev_timestamp: Optional[float],
+                     step: float, max_gap: float) -> np.ndarray:
+    """
+    Vectorised check of monotonicity and gaps of a chunk of timestamps.
 
-            prev_tts = tts
-            timestamp = tts
+    @param report Report to complete.
+    @param timestamps Timestamps in seconds of the chunk.
+    @param prev_timestamp Last timestamp of the previous chunk or None.
+    @param step Expected duration between two samples (0 for ticks).
+    @param max_gap Maximal duration between two samples before considering a gap.
+    @return Array of the differences with the previous timestamp.
+    """
+    if prev_timestamp is not None:
+        diffs = np.diff(timestamps, prepend=prev_timestamp)
+    else:
+        diffs = np.diff(timestamps, prepend=timestamps[0])
 
-            if tts > to_timestamp:
-                break
+    backwards = np.flatnonzero(diffs < 0.0)
+    if len(backwards):
+        report.backwards.extend(zip(timestamps[backwards].tolist(), diffs[backwards].tolist()))
 
-        if tts - prev_update >= progression_incr:
-            progression += 1
+    gaps = np.flatnonzero(diffs > max_gap)
+    if len(gaps):
+        # from the first missing sample to the last missing sample
+        report.gaps.extend(zip((timestamps[gaps] - diffs[gaps] + (step or 0.001)).tolist(),
+                               (timestamps[gaps] - (step or 0.001)).tolist()))
 
-            Terminal.inst().info("%i%% on %s, %s for last 100 candles, current total of %s..." % (
-                progression, format_datetime(timestamp), count, total_count))
+    report.count += len(timestamps)
 
-            prev_update = timestamp
-            count = 0
+    if report.first is None:
+        report.first = float(timestamps[0])
 
-        if tts > to_timestamp:
-            break
+    report.last = float(timestamps[-1])
 
-        if len(ohlcs) == 0:
-            # no results, inc from one step
-            timestamp += timeframe * 100
+    return diffs
 
-    if progression < 100:
-        Terminal.inst().info("100%% on %s, %s for last 100 candles, current total of %s..." % (
-            format_datetime(timestamp), count, total_count))
-    
-    Terminal.inst().info("Last candle datetime is %s" % (format_datetime(tts),))
 
+def read_ticks(markets_path: str, broker_id: str, market_id: str, month: datetime) -> np.ndarray:
+    """
+    Load a complete month of ticks, from the binary file, or from the text file if there is no binary file.
+    """
+    market_id = market_id.replace('/', '')
+    data_path = pathlib.Path(markets_path, broker_id, market_id, 'T')
 
-def check_ticks(broker_id, market_id, from_date, to_date):
-    last_ticks = []
+    pathname = str(data_path / ("%s%s.dat" % (month.strftime('%Y%m'), market_id)))
+    if os.path.isfile(pathname):
+        return np.fromfile(pathname, dtype=TickStorage.TICK_DTYPE)
 
-    tick_streamer = Database.inst().create_tick_streamer(broker_id, market_id, from_date=from_date, to_date=to_date)
-    timestamp = from_date.timestamp()
-    to_timestamp = to_date.timestamp()
-    progression = 0.0
-    prev_update = timestamp
-    count = 0
-    total_count = 0
+    pathname = str(data_path / ("%s%s" % (month.strftime('%Y%m'), market_id)))
+    if os.path.isfile(pathname):
+        rows = np.loadtxt(pathname, delimiter='\t', ndmin=2)
 
-    progression_incr = (to_timestamp - timestamp) * 0.01
+        ticks = np.empty(len(rows), dtype=TickStorage.TICK_DTYPE)
+        if len(rows):
+            ticks['t'] = rows[:, 0] * 0.001
+            ticks['b'] = rows[:, 1]
+            ticks['a'] = rows[:, 2]
+            ticks['l'] = rows[:, 3]
+            ticks['v'] = rows[:, 4]
+            ticks['d'] = rows[:, 5]
 
-    tts = 0.0
-    prev_tts = 0.0
+        return ticks
 
-    while not tick_streamer.finished():
-        # return any ticks until last time to 1 min more
-        ticks = tick_streamer.next(timestamp + Instrument.TF_1M)
+    return np.empty(0, dtype=TickStorage.TICK_DTYPE)
 
-        count = len(ticks)
-        total_count += len(ticks)
 
-        for data in ticks:
-            tts = data[0]
-            bid = data[1]
-            ask = data[2]
-            last = data[3]
-            vol = data[4]
+def month_starts(from_date: datetime, to_date: datetime) -> List[datetime]:
+    results = []
+    month = from_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-            if not prev_tts:
-                prev_tts = tts
+    while month < to_date:
+        results.append(month)
+        month = (month + timedelta(days=32)).replace(day=1)
 
-            gap_duration = tts - prev_tts
+    return results
 
-            if tts != prev_tts and gap_duration < 0.0:
-                date = format_datetime(timestamp)
-                Terminal.inst().error("Tick timestamp is before previous of %s on %s ! Broken file !" % (
-                    format_delta(gap_duration), date))
 
-            if gap_duration > 60.0:
-                date = format_datetime(timestamp)
-                Terminal.inst().warning("Tick gap of %s on %s !" % (format_delta(gap_duration), date))
+def check_ticks(options: dict, broker_id: str, market_id: str, from_date: datetime,
+                to_date: datetime) -> IntegrityReport:
+    """
+    Check the ticks of a market, one month file at time. Does not need the database.
+    """
+    report = IntegrityReport(market_id, Instrument.TF_TICK)
 
-            if bid <= 0.0:
-                date = format_datetime(timestamp)
-                Terminal.inst().warning("Bid price is lesser than 0 %s on %s !" % (bid, date))
-            if ask <= 0.0:
-                date = format_datetime(timestamp)
-                Terminal.inst().warning("Ask price is lesser than 0 %s on %s !" % (ask, date))
-            if last <= 0.0:
-                date = format_datetime(timestamp)
-                Terminal.inst().warning("Last price is lesser than 0 %s on %s !" % (last, date))
+    from_ts = from_date.timestamp()
+    to_ts = to_date.timestamp()
 
-            if vol < 0.0:
-                date = format_datetime(timestamp)
-                Terminal.inst().warning("Volume quantity is lesser than 0 %s on %s !" % (vol, date))
+    prev_tick = None
 
-            prev_tts = tts
+    for month in month_starts(from_date, to_date):
+        ticks = read_ticks(options['markets-path'], broker_id, market_id, month)
+        ticks = ticks[(ticks['t'] >= from_ts) & (ticks['t'] <= to_ts)]
 
-            if tts > to_timestamp:
-                break
+        if not len(ticks):
+            continue
 
-        if tts - prev_update >= progression_incr:
-            progression += 1
+        timestamps = ticks['t']
+        diffs = check_timestamps(report, timestamps, prev_tick['t'] if prev_tick is not None else None,
+                                 0.0, TICK_MAX_GAP)
 
-            Terminal.inst().info("%i%% on %s, %s ticks/trades for 1 minute, current total of %s..." % (
-                progression, format_datetime(timestamp), count, total_count))
+        # same timestamp and same values than the previous tick
+        same = diffs == 0.0
+        same[1:] &= ticks[1:] == ticks[:-1]
+        if prev_tick is not None:
+            same[0] &= ticks[0] == prev_tick
+        else:
+            same[0] = False
 
-            prev_update = tts
-            count = 0
+        if same.any():
+            report.duplicates.extend(timestamps[same].tolist())
 
-        if tts > to_timestamp:
-            break
+        report.add_invalids('bid', timestamps, ticks['b'], ticks['b'] <= 0.0)
+        report.add_invalids('ask', timestamps, ticks['a'], ticks['a'] <= 0.0)
+        report.add_invalids('last', timestamps, ticks['l'], ticks['l'] <= 0.0)
+        report.add_invalids('volume', timestamps, ticks['v'], ticks['v'] < 0.0)
 
-        timestamp += Instrument.TF_1M  # by step of 1m
+        prev_tick = ticks[-1].copy()
 
-    if progression < 100:
-        Terminal.inst().info("100%% on %s, %s ticks/trades for 1 minute, current total of %s..." % (
-            format_datetime(timestamp), count, total_count))
-    
-    Terminal.inst().info("Last tick datetime is %s" % (format_datetime(tts),))
+    return report
 
 
-def do_optimizer(options):
-    Terminal.inst().info("Starting SIIS optimizer...")
-    Terminal.inst().flush()
+def check_ohlcs(options: dict, broker_id: str, market_id: str, timeframe: float, from_date: datetime,
+                to_date: datetime) -> IntegrityReport:
+    """
+    Check the OHLCs of a market for a timeframe, queried per month. It uses its own database connection.
+    """
+    report = IntegrityReport(market_id, timeframe)
 
-    # database manager
     Database.create(options)
     Database.inst().setup(options)
 
+    try:
+        ohlc_streamer = Database.inst().create_ohlc_streamer(broker_id, market_id, timeframe, from_date=from_date,
+                                                             to_date=to_date)
+        prev_timestamp = None
+
+        # monthly candles does not have a constant duration
+        max_gap = timeframe if timeframe < Instrument.TF_MONTH else Instrument.TF_MONTH + Instrument.TF_3D
+
+        for month in month_starts(from_date, to_date):
+            chunk_from = max(month, from_date)
+            chunk_to = min((month + timedelta(days=32)).replace(day=1) - timedelta(milliseconds=1), to_date)
+
+            ohlcs = ohlc_streamer.query_array(timeframe, chunk_from, chunk_to)
+            if not len(ohlcs):
+                continue
+
+            timestamps = ohlcs[:, 0]
+            diffs = check_timestamps(report, timestamps, prev_timestamp, timeframe, max_gap)
+
+            # same timestamp means a duplicate candle
+            same = diffs == 0.0
+            if prev_timestamp is None:
+                same[0] = False
+
+            if same.any():
+                report.duplicates.extend(timestamps[same].tolist())
+
+            for i, field in enumerate(('open', 'high', 'low', 'close')):
+                report.add_invalids(field, timestamps, ohlcs[:, i+1], ohlcs[:, i+1] <= 0.0)
+
+            report.add_invalids('spread', timestamps, ohlcs[:, 5], ohlcs[:, 5] < 0.0)
+            report.add_invalids('volume', timestamps, ohlcs[:, 6], ohlcs[:, 6] < 0.0)
+
+            # low must be the lowest and high the highest
+            incoherent = (ohlcs[:, 3] > np.minimum(ohlcs[:, 1], ohlcs[:, 4])) | (
+                    ohlcs[:, 2] < np.maximum(ohlcs[:, 1], ohlcs[:, 4]))
+            report.add_invalids('range', timestamps, ohlcs[:, 2] - ohlcs[:, 3], incoherent)
+
+            prev_timestamp = float(timestamps[-1])
+    finally:
+        Database.terminate()
+
+    return report
+
+
+def check_market(options: dict, broker_id: str, market_id: str, timeframe: float, from_date: datetime,
+                 to_date: datetime) -> IntegrityReport:
+    """
+    Check a market for a timeframe. Could be run into a sub-process.
+    """
+    if timeframe == Instrument.TF_TICK:
+        return check_ticks(options, broker_id, market_id, from_date, to_date)
+    else:
+        return check_ohlcs(options, broker_id, market_id, timeframe, from_date, to_date)
+
+
+def display_report(report: IntegrityReport):
+    if report.timeframe == Instrument.TF_TICK:
+        Terminal.inst().info("Verified %s ticks/trades, %s samples" % (report.market_id, report.count))
+    else:
+        Terminal.inst().info("Verified %s OHLC %s, %s samples" % (
+            report.market_id, timeframe_to_str(report.timeframe), report.count))
+
+    for tts, delta in report.backwards[:MAX_REPORTED]:
+        Terminal.inst().error("Timestamp is before previous of %s on %s ! Broken data !" % (
+            format_delta(delta), format_datetime(tts)))
+
+    for tts in report.duplicates[:MAX_REPORTED]:
+        Terminal.inst().warning("Duplicate on %s !" % format_datetime(tts))
+
+    for gap_from, gap_to in report.gaps[:MAX_REPORTED]:
+        Terminal.inst().warning("Gap of %s from %s to %s !" % (
+            format_delta(gap_to - gap_from), format_datetime(gap_from), format_datetime(gap_to)))
+
+    for field, values in report.invalids.items():
+        for tts, value in values[:MAX_REPORTED]:
+            Terminal.inst().warning("Invalid %s %s on %s !" % (field, value, format_datetime(tts)))
+
+    if report.has_issues():
+        Terminal.inst().info("%s backwards, %s duplicates, %s gaps, %s invalids" % (
+            len(report.backwards), len(report.duplicates), len(report.gaps),
+            sum(len(v) for v in report.invalids.values())))
+
+    if report.last is not None:
+        Terminal.inst().info("Last sample datetime is %s" % format_datetime(report.last))
+
+
+def do_optimizer(options):
+    Terminal.inst().info("Starting SIIS optimizer...")
+    Terminal.inst().flush()
+
     broker_id = options['broker']
-    market_id = options['market']
 
     timeframe = None
 
@@ -218,54 +306,82 @@ def do_optimizer(options):
     if not to_date:
         today = datetime.now().astimezone(UTC())
 
-        if timeframe == Instrument.TF_MONTH:
+        if timeframe == Instrument.TF_MONTH or timeframe is None:
             to_date = today + timedelta(days=30)
         else:
             to_date = today + timedelta(seconds=timeframe)
 
         to_date = to_date.replace(microsecond=0)
 
-    try:
-        # checking data integrity, gap...
-        if timeframe is None:
-            for market in options['market'].replace(' ', '').split(','):
-                if market.startswith('!') or market.startswith('*'):
-                    continue
+    # number of sub-process
+    parallel = options.get('parallel', 1)
 
-                for tf in GENERATED_TF:
-                    Terminal.inst().info("Verifying %s OHLC %s..." % (market, timeframe_to_str(tf)))
+    # checking data integrity, gap...
+    if timeframe is None:
+        timeframes = GENERATED_TF
+    else:
+        timeframes = [timeframe]
+
+    jobs = []
+
+    for market in options['market'].replace(' ', '').split(','):
+        if market.startswith('!') or market.startswith('*'):
+            continue
+
+        for tf in timeframes:
+            jobs.append((market, tf))
 
-                    check_ohlcs(options['broker'], market, tf, from_date, to_date)
+    Terminal.inst().info("Verify %i markets/timeframes using %i process..." % (len(jobs), parallel))
+    Terminal.inst().flush()
 
-        elif timeframe == Instrument.TF_TICK:
-            for market in options['market'].replace(' ', '').split(','):
-                if market.startswith('!') or market.startswith('*'):
-                    continue
+    start_time = time.time()
 
-                Terminal.inst().info("Verifying %s ticks/trades..." % (market,))
+    def on_report(_report: IntegrityReport):
+        display_report(_report)
 
-                check_ticks(options['broker'], market, from_date, to_date)
+        # persist the missing ranges for the fetcher
+        gap_index = GapIndex(options['markets-path'], broker_id, _report.market_id)
+        gap_index.load()
+        gap_index.update(_report.timeframe, from_date.timestamp(), to_date.timestamp(), _report.gaps)
+        gap_index.save()
 
-        elif timeframe > 0:
-            # particular ohlc
-            for market in options['market'].replace(' ', '').split(','):
-                if market.startswith('!') or market.startswith('*'):
-                    continue
+        Terminal.inst().flush()
 
-                Terminal.inst().info("Verifying %s OHLC %s..." % (market, timeframe_to_str(timeframe)))
+    try:
+        if parallel > 1:
+            with ProcessPoolExecutor(max_workers=parallel) as executor:
+                futures = {executor.submit(check_market, options, broker_id, market, tf, from_date, to_date):
+                           (market, tf) for market, tf in jobs}
+
+                try:
+                    for future in as_completed(futures):
+                        market, tf = futures[future]
+
+                        try:
+                            report = future.result()
+                        except Exception as e:
+                            error_logger.error("Verification of %s %s failed : %s" % (
+                                market, timeframe_to_str(tf), repr(e)))
+                            continue
+
+                        on_report(report)
+                except KeyboardInterrupt:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise
+        else:
+            for market, tf in jobs:
+                if tf == Instrument.TF_TICK:
+                    Terminal.inst().info("Verifying %s ticks/trades..." % (market,))
+                else:
+                    Terminal.inst().info("Verifying %s OHLC %s..." % (market, timeframe_to_str(tf)))
 
-                check_ohlcs(options['broker'], market, timeframe, from_date, to_date)
+                on_report(check_market(options, broker_id, market, tf, from_date, to_date))
     except KeyboardInterrupt:
         pass
     finally:
         pass
 
-    Terminal.inst().info("Flushing database...")
-    Terminal.inst().flush() 
-
-    Database.terminate()
-
-    Terminal.inst().info("Optimization done!")
+    Terminal.inst().info("Optimization done in %.1f seconds!" % (time.time() - start_time))
     Terminal.inst().flush()
 
     Terminal.terminate()
@@ -3,23 +3,29 @@
 # @license Copyright (c) 2017 Dream Overflow
 # Ohlc rebuilder from ticks/trades data tool
 
+import os
 import sys
+import json
 import time
+import pathlib
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from common.utils import UTC, TIMEFRAME_FROM_STR_MAP, timeframe_to_str, format_datetime
 from instrument.bar import BarBase
-from instrument.bargeneratorbase import BarGeneratorBase
+from instrument.bargeneratorbase import BarGeneratorBase, TickArrayType
 from instrument.rangebargenerator import RangeBarGenerator
 
 from terminal.terminal import Terminal
-from database.database import Database
+from database.database import Database, DatabaseException
 
 from instrument.instrument import Instrument, Candle
 from instrument.timeframebargenerator import TimeframeBarGenerator
 
+import numpy as np
+
 import logging
 logger = logging.getLogger('siis.tools.rebuilder')
 error_logger = logging.getLogger('siis.error.tools.rebuilder')
@@ -28,8 +34,7 @@ error_logger = logging.getLogger('siis.error.tools.rebuilder')
 # candles from 1m to 1 week
 GENERATED_TF = [60, 60*5, 60*15, 60*30, 60*60, 60*60*2, 60*60*4, 60*60*24, 60*60*24*7]
 
-BAR_STORAGE_DELAY = 0.05  # 50ms
-MAX_PENDING_BARS = 10000
+BULK_FLUSH_SIZE = 10000  # generated bars are written by bulk of this size
 
 # @todo volume profile generation
 
@@ -106,31 +111,380 @@ MAX_PENDING_BARS = 10000
 # tool = Rebuilder
 
 
-def store_ohlc(broker_name, market_id, timeframe, ohlc):
-    Database.inst().store_market_ohlc((
-        broker_name, market_id, int(ohlc.timestamp*1000.0), int(timeframe),
-        str(ohlc.open), str(ohlc.high), str(ohlc.low), str(ohlc.close),
-        str(ohlc.spread),
-        str(ohlc.volume)))
+class BarWriter(object):
+    """
+    Retains the generated bars of a market and writes them by bulk, synchronously, through the database.
+    """
 
+    def __init__(self, broker_id: str, market_id: str):
+        self._broker_id = broker_id
+        self._market_id = market_id
 
-def store_range_bar(broker_name, market_id, bar_size, bar):
-    Database.inst().store_market_range_bar((
-        broker_name, market_id, int(bar.timestamp * 1000.0), int(bar.duration * 1000.0), int(bar_size),
-        str(bar.open), str(bar.high), str(bar.low), str(bar.close),
-        str(bar.volume)))
+        self._ohlcs = []
+        self._range_bars = []
 
+        self._count = 0
 
-def do_rebuilder(options):
-    Terminal.inst().info("Starting SIIS rebuilder using %s identity..." % options['identity'])
-    Terminal.inst().flush()
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def store_ohlc(self, timeframe: float, ohlc: Candle):
+        self._ohlcs.append((
+            self._broker_id, self._market_id, int(ohlc.timestamp*1000.0), int(timeframe),
+            str(ohlc.open), str(ohlc.high), str(ohlc.low), str(ohlc.close),
+            str(ohlc.spread),
+            str(ohlc.volume)))
+
+        if len(self._ohlcs) >= BULK_FLUSH_SIZE:
+            self.flush()
+
+    def store_range_bar(self, bar_size: int, bar: BarBase):
+        self._range_bars.append((
+            self._broker_id, self._market_id, int(bar.timestamp * 1000.0), int(bar.duration * 1000.0), int(bar_size),
+            str(bar.open), str(bar.high), str(bar.low), str(bar.close),
+            str(bar.volume)))
+
+        if len(self._range_bars) >= BULK_FLUSH_SIZE:
+            self.flush()
+
+    def store_range_bar_array(self, bar_size: int, bars: np.ndarray):
+        # from a BarArrayType array, see BarGeneratorBase.generate_from_tick_array
+        for timestamp, duration, o, h, l, c, v in bars.tolist():
+            self._range_bars.append((
+                self._broker_id, self._market_id, int(timestamp * 1000.0), int(duration * 1000.0), int(bar_size),
+                str(o), str(h), str(l), str(c),
+                str(v)))
+
+        if len(self._range_bars) >= BULK_FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._ohlcs:
+            Database.inst().bulk_store_market_ohlc(self._ohlcs)
+            self._count += len(self._ohlcs)
+            self._ohlcs = []
+
+        if self._range_bars:
+            Database.inst().bulk_store_market_range_bar(self._range_bars)
+            self._count += len(self._range_bars)
+            self._range_bars = []
+
+
+class Checkpoint(object):
+    """
+    Persistent set of the completed chunks of a rebuild, to resume an interrupted run.
+    The file is named according to the rebuild parameters, and is removed once every chunk is completed.
+    """
+
+    def __init__(self, markets_path: str, broker_id: str, spec: str):
+        self._path = pathlib.Path(markets_path, broker_id, "rebuilder-%s.json" % spec)
+        self._completed = set()
+
+    @staticmethod
+    def key(market_id: str, from_date: datetime, to_date: datetime) -> str:
+        return "%s:%i:%i" % (market_id, int(from_date.timestamp()), int(to_date.timestamp()))
+
+    def load(self):
+        if self._path.exists():
+            try:
+                with open(str(self._path), 'rt') as f:
+                    self._completed = set(json.load(f).get('completed', []))
+            except (ValueError, OSError) as e:
+                error_logger.error("Unable to read checkpoint file %s : %s" % (self._path, repr(e)))
+
+    def is_completed(self, key: str) -> bool:
+        return key in self._completed
+
+    def complete(self, key: str):
+        self._completed.add(key)
+
+        if not self._path.parent.exists():
+            self._path.parent.mkdir(parents=True)
+
+        # write then rename to never leave a truncated file
+        tmp_path = str(self._path) + ".tmp"
+
+        with open(tmp_path, 'wt') as f:
+            json.dump({'completed': sorted(self._completed)}, f)
+
+        os.replace(tmp_path, str(self._path))
+
+    def remove(self):
+        if self._path.exists():
+            self._path.unlink()
 
-    # database manager
+
+def parse_bar_spec(value: str) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Parse a target or cascaded parameter : a timeframe or a non-temporal bar (rb, rvb, tb, vb suffix).
+    """
+    if value in TIMEFRAME_FROM_STR_MAP:
+        return TIMEFRAME_FROM_STR_MAP[value], "timeframe"
+
+    for suffix, bar_type in (('rvb', "reversal-bar"), ('rb', "range-bar"), ('tb', "tick-bar"), ('vb', "volume-bar")):
+        if value.endswith(suffix):
+            try:
+                return int(value[0:-len(suffix)]), bar_type
+            except ValueError:
+                return None, None
+
+    return None, None
+
+
+def month_chunks(from_date: datetime, to_date: datetime) -> List[Tuple[datetime, datetime]]:
+    """
+    Split a range of datetime by month (UTC), first and last chunk could be partial.
+    """
+    chunks = []
+    curr_date = from_date
+
+    while curr_date < to_date:
+        if curr_date.month == 12:
+            next_date = datetime(year=curr_date.year+1, month=1, day=1, tzinfo=UTC())
+        else:
+            next_date = datetime(year=curr_date.year, month=curr_date.month+1, day=1, tzinfo=UTC())
+
+        chunks.append((curr_date, min(next_date, to_date)))
+        curr_date = next_date
+
+    return chunks
+
+
+def rebuild_chunk(options: dict, job: dict, market: str, from_date: datetime, to_date: datetime) -> Tuple[int, int]:
+    """
+    Rebuild a market for a range of datetime (to excluded). Could be run into a sub-process.
+    It uses its own database connection and writes the bars by bulk.
+
+    @return A tuple with the number of processed ticks/OHLCs and the number of stored bars.
+    @raise DatabaseException if a bulk insert failed.
+    """
     Database.create(options)
     Database.inst().setup(options)
 
-    # want speedup the database inserts
-    Database.inst().enable_fetch_mode()
+    try:
+        writer = BarWriter(job['broker-id'], market)
+        count = rebuild_market(job, market, from_date, to_date, writer)
+        writer.flush()
+    finally:
+        Database.terminate()
+
+    return count, writer.count
+
+
+def rebuild_market(job: dict, market: str, from_date: datetime, to_date: datetime, writer: BarWriter) -> int:
+    """
+    Process a market from a source of ticks or OHLCs.
+    @return The number of processed ticks/OHLCs.
+    """
+    broker_id = job['broker-id']
+    src_timeframe = job['timeframe']
+    cascaded_bar = job['cascaded-bar']
+    target_bar = job['target-bar']
+    target_type = job['target-type']
+
+    timestamp = from_date.timestamp()
+    to_timestamp = to_date.timestamp()
+
+    total_count = 0
+
+    timeframe_generators: List[TimeframeBarGenerator] = []   # one or multiple timeframe generators
+    bar_generator: Optional[BarGeneratorBase] = None  # or a single non-temporal generator (BarBaseGenerator)
+    from_tf = src_timeframe
+
+    last_ticks = []
+    last_bars = {}
+
+    # need a source data streamer, either ticks or OHLCs
+    if src_timeframe == Instrument.TF_TICK:
+        ohlc_streamer = None
+        tick_streamer = Database.inst().create_tick_streamer(broker_id, market,
+                                                             from_date=from_date, to_date=to_date)
+    else:
+        tick_streamer = None
+        ohlc_streamer = Database.inst().create_ohlc_streamer(broker_id, market, src_timeframe,
+                                                             from_date=from_date, to_date=to_date)
+
+    def store_bar(bar_type: str, last_bar: BarBase):
+        if bar_type == "range-bar":
+            writer.store_range_bar(bar_generator.size, last_bar)
+
+    def store_bar_array(bar_type: str, bars: np.ndarray):
+        if bar_type == "range-bar":
+            writer.store_range_bar_array(bar_generator.size, bars)
+
+    def finalize_timeframe_generators():
+        # need to complete with the current OHLC and store them
+        for _generator in timeframe_generators:
+            if _generator.from_tf > 0:
+                # retrieve the 'from' generator and update from its current candle
+                for gen in timeframe_generators:
+                    if gen.to_tf == _generator.from_tf:
+                        _candles = _generator.generate_from_candles([gen.current], False)
+                        if _candles:
+                            for _c in _candles:
+                                writer.store_ohlc(_generator.to_tf, _c)
+                        break
+
+            if _generator.current:
+                # and store current candle
+                writer.store_ohlc(_generator.to_tf, _generator.current)
+
+    def finalize_bar_generator():
+        # need to complete with the current OHLC and store them
+        if bar_generator:
+            if bar_generator.current:
+                store_bar(target_type, bar_generator.current)
+
+    # cascaded generation of candles
+    if cascaded_bar:
+        for tf in GENERATED_TF:
+            if tf > src_timeframe:
+                # from timeframe greater than initial
+                if tf <= cascaded_bar:
+                    # until max cascaded timeframe
+                    generator = TimeframeBarGenerator(from_tf, tf)
+                    timeframe_generators.append(generator)
+                    from_tf = tf
+
+                    # not loaded but preferred to regenerate because else volume are accumulated again
+                    # else it will need to know the exact last timestamp of used base timeframe,
+                    # and it is not possible to find this information otherwise than to store it somewhere
+
+                    # store for generation
+                    last_bars[tf] = []
+            else:
+                from_tf = tf
+
+    if target_bar:
+        if target_type == "timeframe":
+            generator = TimeframeBarGenerator(src_timeframe, target_bar)
+            timeframe_generators.append(generator)
+
+            # store for generating
+            last_bars[target_bar] = []
+
+        elif target_type == "range-bar":
+            # single range-bar at time
+            bar_generator = RangeBarGenerator(target_bar, job['tick-scale'])
+
+            # store for generating
+            last_bars[target_bar] = []
+
+    if src_timeframe > 0:
+        last_bars[src_timeframe] = []
+
+    #
+    # generate from a source of ticks/trades
+    #
+
+    if src_timeframe == 0:
+        while not tick_streamer.finished():
+            ticks = tick_streamer.next(timestamp + Instrument.TF_1H)
+
+            total_count += len(ticks)
+
+            for data in ticks:
+                if data[0] >= to_timestamp:
+                    break
+
+                if timeframe_generators or bar_generator:
+                    last_ticks.append(data)
+
+            if bar_generator:
+                # generate non-temporal bar series, in batch mode
+                new_bars = bar_generator.generate_from_tick_array(np.array(last_ticks, dtype=TickArrayType))
+                if len(new_bars):
+                    store_bar_array(target_type, new_bars)
+
+                # remove consumed ticks
+                last_ticks = []
+
+            elif timeframe_generators:
+                # generate higher candles
+                for generator in timeframe_generators:
+                    if generator.from_tf == 0:
+                        new_bars = generator.generate_from_ticks(last_ticks)
+                        if new_bars:
+                            for bar in new_bars:
+                                writer.store_ohlc(generator.to_tf, bar)
+
+                            last_bars[generator.to_tf] += new_bars
+
+                        # remove consumed ticks
+                        last_ticks = []
+                    else:
+                        new_bars = generator.generate_from_candles(last_bars[generator.from_tf])
+                        if new_bars:
+                            for bar in new_bars:
+                                writer.store_ohlc(generator.to_tf, bar)
+
+                            last_bars[generator.to_tf] += new_bars
+
+                        # remove consumed candles
+                        last_bars[generator.from_tf] = []
+
+            if timestamp >= to_timestamp:
+                break
+
+            timestamp += Instrument.TF_1H  # by step of 1h
+
+        # complete the lasts non-ended bars
+        if bar_generator:
+            finalize_bar_generator()
+        elif timeframe_generators:
+            finalize_timeframe_generators()
+
+    #
+    # generate from a source of timeframe bars
+    # this mode only works with a target/cascaded of timeframes only
+    #
+
+    elif src_timeframe > 0:
+        while not ohlc_streamer.finished():
+            new_bars = ohlc_streamer.next(timestamp + src_timeframe * 100)  # per 100
+
+            total_count += len(new_bars)
+
+            for data in new_bars:
+                if data.timestamp >= to_timestamp:
+                    timestamp = data.timestamp
+                    break
+
+                if timeframe_generators:
+                    last_bars[src_timeframe].append(data)
+
+                timestamp = data.timestamp
+
+            # generate higher candles
+            for generator in timeframe_generators:
+                new_bars = generator.generate_from_candles(last_bars[generator.from_tf])
+                if new_bars:
+                    for bar in new_bars:
+                        writer.store_ohlc(generator.to_tf, bar)
+
+                    last_bars[generator.to_tf].extend(new_bars)
+
+                # remove consumed candles
+                last_bars[generator.from_tf] = []
+
+            if timestamp >= to_timestamp:
+                # last timestamp is over to_date, stop here
+                break
+
+            if len(new_bars) == 0:
+                # no date for this frame, jump to next one
+                timestamp += src_timeframe * 100
+
+        # complete the lasts non-ended bars
+        finalize_timeframe_generators()
+
+    return total_count
+
+
+def do_rebuilder(options):
+    Terminal.inst().info("Starting SIIS rebuilder using %s identity..." % options['identity'])
+    Terminal.inst().flush()
 
     src_timeframe = -1
 
@@ -198,6 +552,9 @@ def do_rebuilder(options):
         error_logger.error("Tick-scale must be a decimal number !")
         sys.exit(-1)
 
+    # number of sub-process
+    parallel = options.get('parallel', 1)
+
     #
     # parse target and cascaded parameters
     #
@@ -206,36 +563,7 @@ def do_rebuilder(options):
         cascaded_bar = None
         cascaded_type = None
     else:
-        cascaded_bar = None
-        cascaded_type = None
-
-        if options['cascaded'] in TIMEFRAME_FROM_STR_MAP:
-            cascaded_bar = TIMEFRAME_FROM_STR_MAP[options['cascaded']]
-            cascaded_type = "timeframe"
-        elif options['cascaded'].endswith('rb'):
-            try:
-                cascaded_bar = int(options['cascaded'][0:-2])
-                cascaded_type = "range-bar"
-            except ValueError:
-                pass
-        elif options['cascaded'].endswith('rvb'):
-            try:
-                cascaded_bar = int(options['cascaded'][0:-3])
-                cascaded_type = "reversal-bar"
-            except ValueError:
-                pass
-        elif options['cascaded'].endswith('tb'):
-            try:
-                cascaded_bar = int(options['cascaded'][0:-2])
-                cascaded_type = "tick-bar"
-            except ValueError:
-                pass
-        elif options['cascaded'].endswith('vb'):
-            try:
-                cascaded_bar = int(options['cascaded'][0:-2])
-                cascaded_type = "volume-bar"
-            except ValueError:
-                pass
+        cascaded_bar, cascaded_type = parse_bar_spec(options['cascaded'])
 
         if not cascaded_type:
             error_logger.error("Cascaded %s is not allowed !" % options.get('cascaded'))
@@ -246,36 +574,7 @@ def do_rebuilder(options):
         target_type = None
     else:
         # target timeframe or bar
-        target_bar = None
-        target_type = None
-        
-        if options['target'] in TIMEFRAME_FROM_STR_MAP:
-            target_bar = TIMEFRAME_FROM_STR_MAP.get(options['target'])
-            target_type = "timeframe"
-        elif options['target'].endswith('rb'):
-            try:
-                target_bar = int(options['target'][0:-2])
-                target_type = "range-bar"
-            except ValueError:
-                pass
-        elif options['target'].endswith('rvb'):
-            try:
-                target_bar = int(options['target'][0:-3])
-                target_type = "reversal-bar"
-            except ValueError:
-                pass
-        elif options['target'].endswith('tb'):
-            try:
-                target_bar = int(options['target'][0:-2])
-                target_type = "tick-bar"
-            except ValueError:
-                pass
-        elif options['target'].endswith('vb'):
-            try:
-                target_bar = int(options['target'][0:-2])
-                target_type = "volume-bar"
-            except ValueError:
-                pass
+        target_bar, target_type = parse_bar_spec(options['target'])
 
         if not target_type:
             error_logger.error("Target %s is not allowed !" % options.get('target'))
@@ -291,11 +590,38 @@ def do_rebuilder(options):
         error_logger.error("Cascaded mode is only compatible with timeframe bars !")
         sys.exit(-1)
 
+    if target_type == "timeframe" and src_timeframe > 0 and target_bar % src_timeframe != 0:
+        error_logger.error("Timeframe %s is not a multiple of %s !" % (
+            timeframe_to_str(target_bar), timeframe_to_str(src_timeframe)))
+        sys.exit(-1)
+
+    job = {
+        'broker-id': broker_id,
+        'timeframe': src_timeframe,
+        'cascaded-bar': cascaded_bar,
+        'target-bar': target_bar,
+        'target-type': target_type,
+        'tick-scale': tick_scale,
+    }
+
+    # timeframes up to daily are aligned on months, then the work can be split per month,
+    # else non-temporal bars and weekly bars depend on the previous ones and need to be processed at once
+    max_bar = cascaded_bar or (target_bar if target_type == "timeframe" else 0)
+    split_monthly = max_bar and max_bar <= Instrument.TF_DAY and (not target_type or target_type == "timeframe")
+
     #
-    # processing for each market, one at time
+    # compute the chunks, (market, month) or per market
     #
 
+    # database manager (only for initial queries, each chunk uses its own)
+    Database.create(options)
+    Database.inst().setup(options)
+
+    chunks = []
+
     for market in markets:
+        market_from_date = from_date
+
         # need a from datetime and timestamp else compute from last value of the greatest target
         if do_update:
             if cascaded_bar:
@@ -314,292 +640,103 @@ def do_rebuilder(options):
                 last_ohlc = None
 
             if last_ohlc:
-                from_date = datetime.utcfromtimestamp(last_ohlc.timestamp).replace(tzinfo=UTC())
-                # Terminal.inst().debug(last_ohlc.volume)
+                market_from_date = datetime.utcfromtimestamp(last_ohlc.timestamp).replace(tzinfo=UTC())
 
-        if not from_date:
+        if not market_from_date:
             error_logger.error("Unable to find a previous bar for %s !" % market)
             continue
 
-        Terminal.inst().info("Rebuild for %s from %s..." % (market, from_date.strftime("%Y-%m-%dT%H:%M:%SZ")))
-
-        timestamp = from_date.timestamp()
-        to_timestamp = to_date.timestamp()
-
-        progression = 0.0
-        prev_update = timestamp
-        iterate = 0
-        count = 0
-        total_count = 0
-
-        progression_incr = (to_timestamp - timestamp) * 0.01
-
-        tts = 0.0
-        prev_tts = 0.0
-
-        timeframe_generators: List[TimeframeBarGenerator] = []   # one or multiple timeframe generators
-        bar_generator: Optional[BarGeneratorBase] = None  # or a single non-temporal generator (BarBaseGenerator)
-        from_tf = src_timeframe
-
-        last_ticks = []
-        last_bars = {}
-
-        # need a source data streamer, either ticks or OHLCs
-        if src_timeframe == Instrument.TF_TICK:
-            ohlc_streamer = None
-            tick_streamer = Database.inst().create_tick_streamer(broker_id, market,
-                                                                 from_date=from_date, to_date=to_date)
+        if split_monthly:
+            for chunk_from, chunk_to in month_chunks(market_from_date, to_date):
+                chunks.append((market, chunk_from, chunk_to))
         else:
-            tick_streamer = None
-            ohlc_streamer = Database.inst().create_ohlc_streamer(broker_id, market, src_timeframe,
-                                                                 from_date=from_date, to_date=to_date)
-
-        def load_ohlc(_timestamp: float, _timeframe: float) -> Candle:
-            # inner function to retrieve to the last OHLC for each generator
-            return Database.inst().get_last_ohlc_at(broker_id, market, _timeframe,
-                                                    Instrument.basetime(_timeframe, _timestamp))
-
-        def store_bar(bar_type: str, last_bar: BarBase):
-            if bar_type == "range-bar":
-                store_range_bar(broker_id, market, bar_generator.size, last_bar)
-
-        def finalize_timeframe_generators():
-            # need to complete with the current OHLC and store them
-            for _generator in timeframe_generators:
-                if _generator.from_tf > 0:
-                    # retrieve the 'from' generator and update from its current candle
-                    for gen in timeframe_generators:
-                        if gen.to_tf == _generator.from_tf:
-                            _candles = _generator.generate_from_candles([gen.current], False)
-                            if _candles:
-                                for _c in _candles:
-                                    store_ohlc(broker_id, market, _generator.to_tf, _c)
-                            break
-
-                if _generator.current:
-                    # and store current candle
-                    store_ohlc(broker_id, market, _generator.to_tf, _generator.current)
-
-        def finalize_bar_generator():
-            # need to complete with the current OHLC and store them
-            if bar_generator:
-                if bar_generator.current:
-                    store_bar(target_type, bar_generator.current)
-
-        # cascaded generation of candles
-        if cascaded_bar:
-            for tf in GENERATED_TF:
-                if tf > src_timeframe:
-                    # from timeframe greater than initial
-                    if tf <= cascaded_bar:
-                        # until max cascaded timeframe
-                        generator = TimeframeBarGenerator(from_tf, tf)
-                        timeframe_generators.append(generator)
-                        from_tf = tf
-
-                        # load OHLC at the base timestamp (if exists)
-                        # not loaded but preferred to regenerate because else volume are accumulated again
-                        # else it will need to know the exact last timestamp of used base timeframe,
-                        # and it is not possible to find this information otherwise than to store it somewhere
-                        # generator.current = load_ohlc(timestamp, tf)
-                        # Terminal.inst().debug(generator.current)
-
-                        # store for generation
-                        last_bars[tf] = []
-                else:
-                    from_tf = tf
-
-        if target_bar:
-            if target_type == "timeframe":
-                if src_timeframe > 0 and target_bar % src_timeframe != 0:
-                    logger.error("Timeframe %s is not a multiple of %s !" % (
-                        timeframe_to_str(target_bar), timeframe_to_str(src_timeframe)))
-                    sys.exit(-1)
-
-                generator = TimeframeBarGenerator(src_timeframe, target_bar)
-                timeframe_generators.append(generator)
-
-                # load OHLC at the base timestamp (if exists) or rebuild for its base timestamp (more simple case)
-                # @see line 297 for reason of comment
-                # generator.current = load_ohlc(timestamp, target)
-                # Terminal.inst().debug(generator.current)
-
-                # store for generating
-                last_bars[target_bar] = []
-
-            elif target_type == "range-bar":
-                # single range-bar at time
-                bar_generator = RangeBarGenerator(target_bar, tick_scale)
-
-                # store for generating
-                last_bars[target_bar] = []
+            chunks.append((market, market_from_date, to_date))
 
-        if src_timeframe > 0:
-            last_bars[src_timeframe] = []
-
-        #
-        # generate from a source of ticks/trades
-        #
-
-        if src_timeframe == 0:
-            while not tick_streamer.finished():
-                ticks = tick_streamer.next(timestamp + Instrument.TF_1M)
-
-                iterate += 1
-                count += len(ticks)
-                total_count += len(ticks)
-
-                for data in ticks:
-                    if data[0] > to_timestamp:
-                        break
-
-                    if timeframe_generators or bar_generator:
-                        last_ticks.append(data)
-
-                if bar_generator:
-                    # generate non-temporal bar series
-                    new_bars = bar_generator.generate_from_ticks(last_ticks)
-                    if new_bars:
-                        for new_bar in new_bars:
-                            store_bar(target_type, new_bar)
-
-                        # not necessary to keep in memory the new bar
-
-                    # remove consumed ticks
-                    last_ticks = []
-
-                elif timeframe_generators:
-                    # generate higher candles
-                    for generator in timeframe_generators:
-                        if generator.from_tf == 0:
-                            new_bars = generator.generate_from_ticks(last_ticks)
-                            if new_bars:
-                                for bar in new_bars:
-                                    store_ohlc(broker_id, market, generator.to_tf, bar)
-
-                                last_bars[generator.to_tf] += new_bars
-
-                            # remove consumed ticks
-                            last_ticks = []
-                        else:
-                            new_bars = generator.generate_from_candles(last_bars[generator.from_tf])
-                            if new_bars:
-                                for bar in new_bars:
-                                    store_ohlc(broker_id, market, generator.to_tf, bar)
-
-                                last_bars[generator.to_tf] += new_bars
-
-                            # remove consumed candles
-                            last_bars[generator.from_tf] = []
-
-                if timestamp - prev_update >= progression_incr:
-                    progression += 1
-
-                    Terminal.inst().info("%i%% on %s, %s ticks/trades for last %s minutes, current total of %s..." % (
-                        progression, format_datetime(timestamp), count, iterate, total_count))
-
-                    prev_update = timestamp
-                    count = 0
-                    iterate = 0
-
-                if timestamp > to_timestamp:
-                    break
-
-                timestamp += Instrument.TF_1M  # by step of 1m
-
-                # calm down the storage of OHLCs/bars, if generation is faster
-                while Database.inst().num_pending_bars_storage() > MAX_PENDING_BARS:
-                    time.sleep(BAR_STORAGE_DELAY)
-
-            # complete the lasts non-ended bars
-            if bar_generator:
-                finalize_bar_generator()
-            elif timeframe_generators:
-                finalize_timeframe_generators()
-
-            if progression < 100:
-                Terminal.inst().info("100%% on %s, %s ticks/trades for last %s minutes, current total of %s..." % (
-                    format_datetime(timestamp), count, iterate, total_count))
-
-        #
-        # generate from a source of timeframe bars
-        # this mode only works with a target/cascaded of timeframes only
-        #
-
-        elif src_timeframe > 0:
-            while not ohlc_streamer.finished():
-                new_bars = ohlc_streamer.next(timestamp + src_timeframe * 100)  # per 100
-
-                iterate += 1
-                count += len(new_bars)
-                total_count += len(new_bars)
-
-                for data in new_bars:
-                    if data.timestamp > to_timestamp:
-                        break
-
-                    if timeframe_generators:
-                        last_bars[src_timeframe].append(data)
-
-                    tts = data.timestamp
-
-                    if not prev_tts:
-                        prev_tts = tts
-
-                    prev_tts = tts
-                    timestamp = tts
-
-                # generate higher candles
-                for generator in timeframe_generators:
-                    new_bars = generator.generate_from_candles(last_bars[generator.from_tf])
-                    if new_bars:
-                        for bar in new_bars:
-                            store_ohlc(options['broker'], market, generator.to_tf, bar)
+    Database.terminate()
 
-                        last_bars[generator.to_tf].extend(new_bars)
+    spec = "%s-%s-%s-%g" % (timeframe_to_str(src_timeframe), options.get('target', ''), options.get('cascaded', ''),
+                            tick_scale)
 
-                    # remove consumed candles
-                    last_bars[generator.from_tf] = []
+    checkpoint = Checkpoint(options['markets-path'], broker_id, spec)
+    checkpoint.load()
 
-                if timestamp - prev_update >= progression_incr:
-                    progression += 1
+    pending = [chunk for chunk in chunks if not checkpoint.is_completed(Checkpoint.key(*chunk))]
 
-                    Terminal.inst().info("%i%% on %s, %s OHLCs for last bulk of %s OHLCs, current total of %s..." % (
-                        progression, format_datetime(timestamp), count, iterate*100, total_count))
+    if len(pending) < len(chunks):
+        Terminal.inst().info("Resume, %i chunks over %i already completed..." % (len(chunks) - len(pending),
+                                                                                  len(chunks)))
 
-                    prev_update = timestamp
-                    count = 0
-                    iterate = 0
+    Terminal.inst().info("Rebuild %i chunks for %i markets using %i process..." % (
+        len(pending), len(markets), parallel))
+    Terminal.inst().flush()
 
-                if timestamp > to_timestamp:
-                    # last timestamp is over to_date, stop here
-                    break
+    #
+    # processing, either sequentially or distributed into a pool of process
+    #
 
-                if len(new_bars) == 0:
-                    # no date for this frame, jump to next one
-                    timestamp += src_timeframe * 100
+    start_time = time.time()
+    done = 0
+    failed = 0
 
-                # calm down the storage of OHLCs, if generation is faster
-                while Database.inst().num_pending_bars_storage() > MAX_PENDING_BARS:
-                    time.sleep(BAR_STORAGE_DELAY)
+    def on_chunk_done(_market: str, _from: datetime, _to: datetime, _count: int, _stored: int):
+        checkpoint.complete(Checkpoint.key(_market, _from, _to))
 
-            # complete the lasts non-ended bars
-            finalize_timeframe_generators()
+        Terminal.inst().info("%i/%i : %s from %s to %s, %s ticks/OHLCs, %s bars stored" % (
+            done, len(pending), _market, format_datetime(_from.timestamp()), format_datetime(_to.timestamp()),
+            _count, _stored))
 
-            if progression < 100:
-                Terminal.inst().info("100%% on %s,  %s OHLCs for last bulk of %s OHLCs, current total of %s..." % (
-                    format_datetime(timestamp), count, iterate*100, total_count))
+    try:
+        if parallel > 1:
+            with ProcessPoolExecutor(max_workers=parallel) as executor:
+                futures = {executor.submit(rebuild_chunk, options, job, *chunk): chunk for chunk in pending}
+
+                try:
+                    for future in as_completed(futures):
+                        market, chunk_from, chunk_to = futures[future]
+
+                        try:
+                            count, stored = future.result()
+                        except Exception as e:
+                            failed += 1
+                            error_logger.error("Rebuild of %s from %s failed : %s" % (
+                                market, format_datetime(chunk_from.timestamp()), repr(e)))
+                            continue
+
+                        done += 1
+                        on_chunk_done(market, chunk_from, chunk_to, count, stored)
+                except KeyboardInterrupt:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise
+        else:
+            for market, chunk_from, chunk_to in pending:
+                try:
+                    count, stored = rebuild_chunk(options, job, market, chunk_from, chunk_to)
+                except DatabaseException as e:
+                    failed += 1
+                    error_logger.error("Rebuild of %s from %s failed : %s" % (
+                        market, format_datetime(chunk_from.timestamp()), repr(e)))
+                    continue
+
+                done += 1
+                on_chunk_done(market, chunk_from, chunk_to, count, stored)
+
+    except KeyboardInterrupt:
+        Terminal.inst().info("Interrupted, %i chunks completed, relaunch the same command to resume." % done)
+        Terminal.inst().flush()
+
+        Terminal.terminate()
+        sys.exit(-1)
 
     #
     # termination
     #
 
-    Terminal.inst().info("Flushing database...")
-    Terminal.inst().flush() 
-
-    Database.terminate()
+    if not failed:
+        checkpoint.remove()
+        Terminal.inst().info("Rebuild done in %.1f seconds!" % (time.time() - start_time))
+    else:
+        Terminal.inst().info("Rebuild done with %i failed chunks, relaunch the same command to retry them." % failed)
 
-    Terminal.inst().info("Rebuild done!")
     Terminal.inst().flush()
 
     Terminal.terminate()
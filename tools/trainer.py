@@ -358,7 +358,7 @@ class TrainerTool(Tool):
                     '--timeframe=%s' % timeframe,
                     '--timestep=%s' % timestep,
                     '--learning=%s' % learning_filename,
-                    '--no-interactive'
+                    '--headless'
                 ]
 
             trainer_result = None
@@ -31,6 +31,8 @@ from connector.binance.client import Client
 
 from trader.traderexception import TraderException
 
+from common.latency import LatencyTracer
+
 import logging
 logger = logging.getLogger('siis.trader.binance')
 error_logger = logging.getLogger('siis.error.trader.binance')
@@ -189,6 +191,9 @@ class BinanceTrader(Trader):
         if not order or not market_or_instrument:
             return Order.REASON_INVALID_ARGS
 
+        # latency from the received market data to the order submission
+        LatencyTracer.inst().order()
+
         if not self._watcher.connector:
             error_logger.error("Trader %s refuse order because of missing connector" % (self.name,))
             return Order.REASON_ERROR
@@ -27,6 +27,8 @@ from trader.order import Order
 from connector.binance.exceptions import *
 from connector.binance.client import Client
 
+from common.latency import LatencyTracer
+
 import logging
 logger = logging.getLogger('siis.trader.binancefutures')
 error_logger = logging.getLogger('siis.error.trader.binancefutures')
@@ -166,6 +168,9 @@ class BinanceFuturesTrader(Trader):
         if not order or not market_or_instrument:
             return Order.REASON_INVALID_ARGS
 
+        # latency from the received market data to the order submission
+        LatencyTracer.inst().order()
+
         if not self._watcher.connector:
             error_logger.error("Trader %s refuse order because of missing connector" % (self.name,))
             return Order.REASON_ERROR
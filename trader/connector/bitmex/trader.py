@@ -19,6 +19,7 @@ import requests
 
 from datetime import datetime
 from common.utils import UTC
+from common.latency import LatencyTracer
 
 from trader.trader import Trader
 from trader.market import Market
@@ -404,6 +405,9 @@ class BitMexTrader(Trader):
         if not order or not market_or_instrument:
             return Order.REASON_INVALID_ARGS
 
+        # latency from the received market data to the order submission
+        LatencyTracer.inst().order()
+
         if not self._watcher.connector:
             error_logger.error("Trader %s refuse order because of missing connector" % self.name)
             return Order.REASON_ERROR
@@ -8,6 +8,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, List, Union, Optional
 
 from common.utils import UTC
+from common.latency import LatencyTracer
 
 if TYPE_CHECKING:
     from trader.service import TraderService
@@ -214,6 +215,9 @@ class IGTrader(Trader):
         if not order or not market_or_instrument:
             return Order.REASON_INVALID_ARGS
 
+        # latency from the received market data to the order submission
+        LatencyTracer.inst().order()
+
         if not self._watcher.connector:
             error_logger.error("Trader %s refuse order because of missing connector" % (self.name,))
             return Order.REASON_ERROR
@@ -30,6 +30,8 @@ from trader.asset import Asset
 
 from database.database import Database
 
+from common.latency import LatencyTracer
+
 import logging
 logger = logging.getLogger('siis.trader.kraken')
 error_logger = logging.getLogger('siis.error.trader.kraken')
@@ -217,6 +219,9 @@ class KrakenTrader(Trader):
         if not order or not market_or_instrument:
             return Order.REASON_INVALID_ARGS
 
+        # latency from the received market data to the order submission
+        LatencyTracer.inst().order()
+
         if not self._watcher.connector:
             error_logger.error("Trader %s refuse order because of missing connector" % (self.name,))
             return Order.REASON_ERROR
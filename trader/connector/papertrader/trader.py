@@ -22,6 +22,7 @@ import uuid
 from datetime import datetime
 
 from common.signal import Signal
+from common.latency import LatencyTracer
 
 from trader.trader import Trader
 
@@ -522,6 +523,9 @@ class PaperTrader(Trader):
         if not order or not market_or_instrument:
             return Order.REASON_INVALID_ARGS
 
+        # latency from the received market data to the order submission
+        LatencyTracer.inst().order()
+
         trader_market = self._markets.get(market_or_instrument.market_id)
         if not trader_market:
             error_logger.error("Trader %s refuse order because the market %s is not found" % (
@@ -103,12 +103,6 @@ class TraderService(Service):
             raise StrategyServiceException("Trader config missing into profile")
 
         if trader_config.get("status") is not None and trader_config.get("status") == "load":
-            # retrieve the class-name and instantiate it
-            parts = trader_config.get('classpath').split('.')
-
-            module = __import__('.'.join(parts[:-1]), None, locals(), [parts[-1], ], 0)
-            Clazz = getattr(module, parts[-1])
-
             # backtesting always create paper traders
             if self.backtesting or self._paper_mode:
                 inst_trader = PaperTrader(self, profile_trader_config['name'])
@@ -150,6 +144,12 @@ class TraderService(Service):
                     if inst_trader.start(options):
                         self._trader = inst_trader
             else:
+                # retrieve the class-name and instantiate it, the connector is only imported for a real trader
+                parts = trader_config.get('classpath').split('.')
+
+                module = __import__('.'.join(parts[:-1]), None, locals(), [parts[-1], ], 0)
+                Clazz = getattr(module, parts[-1])
+
                 # live with real trader
                 inst_trader = Clazz(self)
                 preference = trader_config.get('preference', None)
@@ -86,6 +86,16 @@ def setup_default_views(view_service: ViewService, watcher_service: WatcherServi
     asset = AssetView(view_service, trader_service)
     view_service.add_view(asset)
 
+    # 'latency'
+    from view.latencyview import LatencyView
+    latency = LatencyView(view_service)
+    view_service.add_view(latency)
+
+    # 'profiler'
+    from view.profilerview import ProfilerView
+    profiler = ProfilerView(view_service)
+    view_service.add_view(profiler)
+
     # # 'orderbook' @todo
     # from view.orderbookview import OrderBookView
     # orderbook = AssetView(view_service, trader_service)
@@ -0,0 +1,74 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Latency view.
+
+from common.latency import LatencyTracer
+
+from view.tableview import TableView
+
+import logging
+logger = logging.getLogger('siis.view.latency')
+error_logger = logging.getLogger('siis.error.view.latency')
+
+
+class LatencyView(TableView):
+    """
+    Latency view. Per market and per stage p50/p99 durations in milliseconds, from the market data message
+    to the order submission.
+    """
+
+    REFRESH_RATE = 1.0
+
+    def __init__(self, service):
+        super().__init__("latency", service)
+
+    def count_items(self):
+        return 1
+
+    def latency_table(self, style='', offset=None, limit=None, col_ofs=None):
+        columns = ['Market'] + ['%s p50/p99' % stage for stage in LatencyTracer.STAGES]
+        data = []
+
+        stats = LatencyTracer.inst().stats()
+        markets = sorted(stats.keys(), reverse=self._ordering)
+
+        total_size = (len(columns), len(markets))
+
+        if offset is None:
+            offset = 0
+
+        if limit is None:
+            limit = len(markets)
+
+        limit = offset + limit
+
+        for market_id in markets[offset:limit]:
+            stages = stats[market_id]
+            row = [market_id]
+
+            for stage in LatencyTracer.STAGES:
+                stage_stats = stages.get(stage)
+                if stage_stats:
+                    row.append("%.3f / %.3f" % (stage_stats['p50'], stage_stats['p99']))
+                else:
+                    row.append("-")
+
+            data.append(row[0:1] + row[1+col_ofs:])
+
+        return columns[0:1] + columns[1+col_ofs:], data, total_size
+
+    def refresh(self):
+        num = 0
+
+        try:
+            columns, table, total_size = self.latency_table(*self.table_format())
+            self.table(columns, table, total_size)
+            num = total_size[1]
+        except Exception as e:
+            error_logger.error(str(e))
+
+        if LatencyTracer.inst().enabled:
+            self.set_title("[Latency %i] p50/p99 in ms <%s>" % (num, "Desc." if self._ordering else "Asc."))
+        else:
+            self.set_title("[Latency 0] Disabled, use --latency option <>")
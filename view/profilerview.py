@@ -0,0 +1,73 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Strategy traders profiler view.
+
+from common.profiler import Profiler
+
+from view.tableview import TableView
+
+import logging
+logger = logging.getLogger('siis.view.profiler')
+error_logger = logging.getLogger('siis.error.view.profiler')
+
+
+class ProfilerView(TableView):
+    """
+    Profiler view. Per strategy trader and per section (process, update-trades, analysers, indicators)
+    the wall and CPU time, the allocated blocks and the load, over the last minute.
+    Sections are ordered by descending load per market.
+    """
+
+    REFRESH_RATE = 1.0
+
+    def __init__(self, service):
+        super().__init__("profiler", service)
+
+    def count_items(self):
+        return 1
+
+    def profiler_table(self, style='', offset=None, limit=None, col_ofs=None):
+        columns = ('Market', 'Section', 'Calls/s', 'Wall ms', 'Max ms', 'CPU ms', 'Allocs', 'Load %')
+        data = []
+        rows = []
+
+        stats = Profiler.inst().stats()
+
+        for market_id in sorted(stats.keys(), reverse=self._ordering):
+            sections = stats[market_id]
+
+            for section in sorted(sections.keys(), key=lambda x: sections[x]['load'], reverse=True):
+                s = sections[section]
+                rows.append((market_id, section, "%.2f" % s['rate'], "%.3f" % s['wall'], "%.3f" % s['max'],
+                             "%.3f" % s['cpu'], "%.1f" % s['allocs'], "%.2f" % (s['load'] * 100.0)))
+
+        total_size = (len(columns), len(rows))
+
+        if offset is None:
+            offset = 0
+
+        if limit is None:
+            limit = len(rows)
+
+        limit = offset + limit
+
+        for row in rows[offset:limit]:
+            data.append(row[0:2] + row[2+col_ofs:])
+
+        return columns[0:2] + columns[2+col_ofs:], data, total_size
+
+    def refresh(self):
+        num = 0
+
+        try:
+            columns, table, total_size = self.profiler_table(*self.table_format())
+            self.table(columns, table, total_size)
+            num = total_size[1]
+        except Exception as e:
+            error_logger.error(str(e))
+
+        if Profiler.inst().enabled:
+            self.set_title("[Profiler %i] last %gs <%s>" % (num, Profiler.WINDOW, "Desc." if self._ordering else "Asc."))
+        else:
+            self.set_title("[Profiler 0] Disabled, use --profiler option or profiler on command <>")
@@ -23,6 +23,11 @@ class TableView(View):
         self._col = 0       # offset
 
         self._table = [0, 0]  # for table view, number of columns, number of rows
+        self._drawn = None    # last drawn table, to not redraw an unchanged table
+
+    def create(self):
+        super().create()
+        self._drawn = None
 
     def scroll_row(self, n):
         """
@@ -89,6 +94,17 @@ class TableView(View):
         tablefmt = TableView.TABLE_FORMAT[self._table_mode] if 0 <= self._table_mode < len(
             TableView.TABLE_FORMAT) else 'psql'
 
+        vt = Terminal.inst().view(self._id)
+        if not vt:
+            return
+
+        # nothing changed since the last draw, the terminal view still have the content
+        drawn = (vt, tablefmt, columns, table)
+        if self._drawn is not None and self._drawn == drawn:
+            return
+
+        self._drawn = drawn
+
         table_data = tabulate(table, headers=columns, tablefmt=tablefmt, showindex=False,
                               floatfmt=".2f", disable_numparse=True)
 
@@ -97,9 +113,7 @@ class TableView(View):
             table_data = table_data.replace(k, v)
 
         # draw the table
-        vt = Terminal.inst().view(self._id)
-        if vt:
-            vt.draw('', table_data, True)
+        vt.draw('', table_data, True)
 
     def display_mode_str(self):
         """
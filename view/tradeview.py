@@ -29,6 +29,8 @@ class TradeView(TableView):
         self._quantities = True  # display quantity related columns
         self._stats = False      # display statistics related columns
 
+        self._cache = {}  # dumps and rows of the trades, only the changed ones are formatted again
+
     def on_key_pressed(self, key):
         super().on_key_pressed(key)
 
@@ -65,7 +67,8 @@ class TradeView(TableView):
                     quantities=self._quantities, stats=self._stats,
                     percents=self._percent, pips=self._opt1,
                     group=self._group, ordering=self._ordering,
-                    datetime_format=self._datetime_format)
+                    datetime_format=self._datetime_format,
+                    cache=self._cache)
 
                 self.table(columns, table, total_size)
                 num = total_size[1]
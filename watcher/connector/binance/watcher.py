@@ -15,6 +15,7 @@ from datetime import datetime
 
 from watcher.watcher import Watcher
 from common.signal import Signal
+from common.netcore import NetworkCore
 
 from connector.binance.connector import Connector
 
@@ -442,7 +443,11 @@ class BinanceWatcher(Watcher):
 
     def post_update(self):
         super().post_update()
-        time.sleep(0.0005)
+
+        if NetworkCore.inst().enabled:
+            self.idle()
+        else:
+            time.sleep(0.0005)
 
     def post_run(self):
         super().post_run()
@@ -807,6 +812,8 @@ class BinanceWatcher(Watcher):
         # # self.service.notify(Signal.SIGNAL_ORDER_BOOK, self.name, (symbol, depth[1], depth[2]))
 
     def __on_trade_data(self, data):
+        received = time.perf_counter()
+
         if type(data) is not dict:
             return
 
@@ -832,7 +839,7 @@ class BinanceWatcher(Watcher):
             spread = 0.0
 
             tick = (trade_time, price, price, price, vol, buyer_maker)
-            self.service.notify(Signal.SIGNAL_STREAM_TICK_DATA, self.name, (symbol, tick))
+            self.service.notify(Signal.SIGNAL_STREAM_TICK_DATA, self.name, (symbol, tick), received)
 
             if self._store_trade:
                 Database.inst().store_market_trade((self.name, symbol, int(data['T']), data['p'], data['p'], data['p'],
@@ -95,6 +95,11 @@ class BinanceFuturesFetcher(Fetcher):
     def connected(self) -> bool:
         return self._connector is not None and self._connector.connected
 
+    @property
+    def max_concurrency(self) -> int:
+        # the requests are limited by the shared token bucket of the client
+        return 8
+
     @property
     def authenticated(self) -> bool:
         return self._connector and self._connector.authenticated
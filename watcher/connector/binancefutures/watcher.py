@@ -16,6 +16,7 @@ from datetime import datetime
 
 from watcher.watcher import Watcher
 from common.signal import Signal
+from common.netcore import NetworkCore
 
 from connector.binance.connector import Connector
 from connector.binance.client import Client
@@ -464,7 +465,11 @@ class BinanceFuturesWatcher(Watcher):
 
     def post_update(self):
         super().post_update()
-        time.sleep(0.0005)
+
+        if NetworkCore.inst().enabled:
+            self.idle()
+        else:
+            time.sleep(0.0005)
 
     def post_run(self):
         super().post_run()
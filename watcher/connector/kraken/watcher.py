@@ -9,6 +9,7 @@ import math
 
 from watcher.watcher import Watcher
 from common.signal import Signal
+from common.netcore import NetworkCore
 from common.utils import timeframe_to_str
 
 from connector.kraken.connector import Connector
@@ -646,7 +647,11 @@ class KrakenWatcher(Watcher):
 
     def post_update(self):
         super().post_update()
-        time.sleep(0.0005)
+
+        if NetworkCore.inst().enabled:
+            self.idle()
+        else:
+            time.sleep(0.0005)
 
     def post_run(self):
         super().post_run()
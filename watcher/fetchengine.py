@@ -0,0 +1,284 @@
+# @date 2023-10-02
+# @author Frederic Scherma, All rights reserved without prejudices.
+# @license Copyright (c) 2023 Dream Overflow
+# Parallel historical fetcher engine
+
+import collections
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, List, Tuple
+
+import numpy as np
+
+from terminal.terminal import Terminal
+
+from instrument.instrument import Candle, Instrument
+from instrument.timeframebargenerator import TimeframeBarGenerator
+
+from database.database import Database
+from database.tickstorage import TickStorage
+
+import logging
+logger = logging.getLogger('siis.watcher.fetchengine')
+error_logger = logging.getLogger('siis.error.watcher.fetchengine')
+
+
+class FetchChunk(object):
+    """
+    A range of date to fetch for a market, from date included, to date included.
+    """
+
+    __slots__ = 'market_id', 'timeframe', 'from_date', 'to_date', 'target_broker_id', 'target_market_id'
+
+    def __init__(self, market_id: str, timeframe: float, from_date: datetime, to_date: datetime,
+                 target_broker_id: str, target_market_id: str):
+        self.market_id = market_id
+        self.timeframe = timeframe
+        self.from_date = from_date
+        self.to_date = to_date
+        self.target_broker_id = target_broker_id
+        self.target_market_id = target_market_id
+
+
+class FetchEngine(object):
+    """
+    Fetch many markets and ranges of date concurrently, using a pool of threads sharing the fetcher, then its
+    connector and the rate limiter of its client. Then the number of requests is limited by the quota of the
+    exchange and not by a serial loop.
+
+    The ranges are split into chunks (one day of trades or a fixed number of bars) interleaved between the markets.
+    The results are stored in bulk from the calling thread, in the order of the chunks of each market, then the
+    tick files are appended in order and the cascaded bars are generated as with Fetcher.fetch_and_generate.
+
+    The fetch of a chunk is retried with an exponential backoff, then the chunk is reported as failed and the
+    next chunks are continued.
+
+    @note Only for fetchers supporting concurrent calls (see Fetcher.max_concurrency).
+    """
+
+    TICK_CHUNK_DURATION = Instrument.TF_1D
+    OHLC_CHUNK_BARS = 10000
+
+    MAX_RETRY = 5
+    RETRY_DELAY = 5.0   # doubled at each retry
+
+    def __init__(self, fetcher, num_workers: int, cascaded: Optional[float] = None):
+        self._fetcher = fetcher
+        self._num_workers = max(1, min(num_workers, fetcher.max_concurrency))
+        self._cascaded = cascaded
+
+        self._chunks = collections.OrderedDict()   # per market list of chunks
+        self._states = {}                          # per market cascaded generation states
+
+        self._count = 0
+        self._failed = []
+
+    @property
+    def num_workers(self) -> int:
+        return self._num_workers
+
+    @property
+    def failed(self) -> List[FetchChunk]:
+        return self._failed
+
+    def add_market(self, market_id: str, timeframe: float, from_date: datetime, to_date: datetime,
+                   target_broker_id: Optional[str] = None, target_market_id: Optional[str] = None):
+        """
+        Add a range of date to fetch for a market, split into chunks.
+        """
+        if timeframe > 0 and timeframe not in self._fetcher.GENERATED_TF:
+            logger.error("Timeframe %i is not allowed !" % (timeframe,))
+            return
+
+        target_broker_id = target_broker_id or self._fetcher.name
+        target_market_id = target_market_id or market_id
+
+        if timeframe > 0:
+            duration = max(Instrument.TF_1D, timeframe * FetchEngine.OHLC_CHUNK_BARS)
+        else:
+            duration = FetchEngine.TICK_CHUNK_DURATION
+
+        chunks = self._chunks.setdefault(market_id, [])
+        chunk_from = from_date
+
+        while chunk_from < to_date:
+            chunk_to = min(chunk_from + timedelta(seconds=duration), to_date)
+
+            # to date is included, then exclude the first millisecond of the next chunk
+            chunks.append(FetchChunk(market_id, timeframe, chunk_from,
+                                     chunk_to - timedelta(milliseconds=1) if chunk_to < to_date else chunk_to,
+                                     target_broker_id, target_market_id))
+
+            chunk_from = chunk_to
+
+        self._states[market_id] = self._generators(timeframe)
+
+    def _generators(self, timeframe: float) -> List[TimeframeBarGenerator]:
+        generators = []
+
+        if self._cascaded:
+            from_tf = timeframe
+
+            for tf in self._fetcher.GENERATED_TF:
+                if tf > timeframe:
+                    if tf <= self._cascaded:
+                        generators.append(TimeframeBarGenerator(from_tf, tf))
+                        from_tf = tf
+                else:
+                    from_tf = tf
+
+        return generators
+
+    def run(self) -> int:
+        """
+        Fetch and store every chunk.
+        @return Number of fetched trades or bars.
+        """
+        # interleave the markets to distribute the requests
+        pending = collections.deque()
+        queues = [collections.deque(chunks) for chunks in self._chunks.values()]
+
+        while queues:
+            for queue in queues:
+                pending.append(queue.popleft())
+
+            queues = [queue for queue in queues if queue]
+
+        total = len(pending)
+        done = 0
+        last_report = time.time()
+        start_time = last_report
+
+        Terminal.inst().info("Fetch %i chunks of %i markets using %i threads..." % (
+            total, len(self._chunks), self._num_workers))
+
+        with ThreadPoolExecutor(max_workers=self._num_workers) as executor:
+            # limit the number of in-flight chunks, results are consumed in order of submission
+            futures = collections.deque()
+
+            while pending or futures:
+                while pending and len(futures) < self._num_workers * 2:
+                    chunk = pending.popleft()
+                    futures.append((chunk, executor.submit(self._fetch_chunk, chunk)))
+
+                chunk, future = futures.popleft()
+
+                try:
+                    self._store_chunk(chunk, future.result())
+                except Exception as e:
+                    error_logger.error("Unable to fetch %s from %s to %s : %s" % (
+                        chunk.market_id, chunk.from_date, chunk.to_date, repr(e)))
+
+                    self._failed.append(chunk)
+
+                done += 1
+
+                if time.time() - last_report >= 10.0:
+                    last_report = time.time()
+                    Terminal.inst().info("%i/%i chunks, %i %s fetched, latest %s %s..." % (
+                        done, total, self._count, "OHLCs" if chunk.timeframe > 0 else "trades",
+                        chunk.market_id, chunk.to_date.strftime('%Y-%m-%dT%H:%M:%S')))
+
+        elapsed = time.time() - start_time
+
+        Terminal.inst().info("Fetched %i trades or OHLCs in %.1f seconds (%.0f/s), %i failed chunks" % (
+            self._count, elapsed, self._count / elapsed if elapsed > 0 else 0.0, len(self._failed)))
+
+        return self._count
+
+    def _fetch_chunk(self, chunk: FetchChunk) -> List[Tuple]:
+        """
+        Fetch a complete chunk into a list, from a worker thread.
+        """
+        retry = 0
+
+        while True:
+            try:
+                if chunk.timeframe > 0:
+                    return list(self._fetcher.fetch_candles(chunk.market_id, chunk.timeframe,
+                                                            chunk.from_date, chunk.to_date, None))
+                else:
+                    return list(self._fetcher.fetch_trades(chunk.market_id, chunk.from_date, chunk.to_date, None))
+
+            except Exception as e:
+                if retry >= FetchEngine.MAX_RETRY:
+                    raise
+
+                delay = FetchEngine.RETRY_DELAY * (2 ** retry)
+                retry += 1
+
+                logger.warning("Retry %i fetch of %s in %g seconds after %s" % (
+                    retry, chunk.market_id, delay, repr(e)))
+
+                time.sleep(delay)
+
+    def _store_chunk(self, chunk: FetchChunk, rows: List[Tuple]):
+        """
+        Bulk storage of a chunk and the cascaded generation, from the calling thread.
+        """
+        if not rows:
+            return
+
+        generators = self._states[chunk.market_id]
+        ohlcs = []
+
+        if chunk.timeframe > 0:
+            # (int timestamp ms, str open, high, low, close, spread, volume)
+            ohlcs.extend((chunk.target_broker_id, chunk.target_market_id, data[0], int(chunk.timeframe),
+                          data[1], data[2], data[3], data[4], data[5], data[6]) for data in rows)
+
+            if generators:
+                source = []
+
+                for data in rows:
+                    candle = Candle(float(data[0]) * 0.001, chunk.timeframe)
+
+                    candle.set_ohlc(float(data[1]), float(data[2]), float(data[3]), float(data[4]))
+                    candle.set_spread(float(data[5]))
+                    candle.set_volume(float(data[6]))
+                    candle.set_consolidated(True)
+
+                    source.append(candle)
+
+                self._generate(chunk, generators, source, ohlcs)
+        else:
+            # (int timestamp in ms, str bid, str ask, str last, str volume, int direction)
+            columns = list(zip(*rows))
+            ticks = np.empty(len(rows), dtype=TickStorage.TICK_DTYPE)
+
+            ticks['t'] = np.array(columns[0], dtype=np.float64) * 0.001
+            ticks['b'] = np.array(columns[1], dtype=np.float64)
+            ticks['a'] = np.array(columns[2], dtype=np.float64)
+            ticks['l'] = np.array(columns[3], dtype=np.float64)
+            ticks['v'] = np.array(columns[4], dtype=np.float64)
+            ticks['d'] = np.array(columns[5], dtype=np.int8)
+
+            Database.inst().store_market_trade_array(chunk.target_broker_id, chunk.target_market_id, ticks)
+
+            if generators:
+                self._generate(chunk, generators, ticks.tolist(), ohlcs)
+
+        if ohlcs:
+            Database.inst().bulk_store_market_ohlc(ohlcs)
+
+        self._count += len(rows)
+
+    @staticmethod
+    def _generate(chunk: FetchChunk, generators: List[TimeframeBarGenerator], source: List, ohlcs: List):
+        """
+        Cascaded generation, each generator consumes the bars of the previous one.
+        """
+        for generator in generators:
+            if generator.from_tf == 0:
+                candles = generator.generate_from_ticks(source)
+            else:
+                candles = generator.generate_from_candles(source)
+
+            for c in candles:
+                ohlcs.append((chunk.target_broker_id, chunk.target_market_id, int(c.timestamp*1000.0),
+                              int(generator.to_tf), str(c.open), str(c.high), str(c.low), str(c.close),
+                              str(c.spread), str(c.volume)))
+
+            source = candles
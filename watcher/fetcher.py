@@ -93,6 +93,14 @@ class Fetcher(object):
     def connected(self) -> bool:
         return False
 
+    @property
+    def max_concurrency(self) -> int:
+        """
+        Maximum number of threads fetching at the same time using this fetcher.
+        Default to 1, because the connectors are not thread safe unless specified.
+        """
+        return 1
+
     #
     # fetcher and helpers
     #
@@ -106,10 +114,13 @@ class Fetcher(object):
         It is possible to generate higher multiple of the timeframe, until cascaded timeframe. Not that it is important
         to have enough past sample to have a correct rebuild higher timeframes (ex: timeframe=1D, cascaded=1W,
         then from date must at least look for the first day of week, else the first 1w OHLCs will be wrong).
+
+        @return Tuple with the number of fetched trades or OHLCs, the timestamp of the first and of the last one
+            in seconds (0 if none).
         """
         if timeframe > 0 and timeframe not in self.GENERATED_TF:
             logger.error("Timeframe %i is not allowed !" % (timeframe,))
-            return
+            return 0, 0.0, 0.0
 
         generators = []
         from_tf = timeframe
@@ -175,9 +186,13 @@ class Fetcher(object):
         n = 0
         t = 0
         data = None
+        first_data = None
 
         if timeframe == 0:
             for data in self.fetch_trades(market_id, from_date, to_date, None):
+                if first_data is None:
+                    first_data = data
+
                 # store (int timestamp in ms, str bid, str ask, str last, str volume, int direction)
                 Database.inst().store_market_trade((
                     target_broker_id, target_market_id, data[0], data[1], data[2], data[3], data[4], data[5]))
@@ -234,6 +249,9 @@ class Fetcher(object):
 
         elif timeframe > 0:
             for data in self.fetch_candles(market_id, timeframe, from_date, to_date, None):
+                if first_data is None:
+                    first_data = data
+
                 # store (int timestamp ms, str open, high, low, close, spread, volume)
                 Database.inst().store_market_ohlc((
                     target_broker_id, target_market_id, data[0], int(timeframe),
@@ -279,6 +297,11 @@ class Fetcher(object):
                     t, market_id, timeframe_to_str(timeframe),
                     datetime.fromtimestamp(float(data[0]) * 0.001, tz=UTC()).strftime('%Y-%m-%dT%H:%M:%S')))
 
+        if first_data is None:
+            return 0, 0.0, 0.0
+
+        return t, float(first_data[0]) * 0.001, float(data[0]) * 0.001
+
     def fetch_trades(self, market_id, from_date=None, to_date=None, n_last=None):
         """
         Retrieve the historical trade's data for a certain a period of date.
@@ -19,6 +19,7 @@ from config import utils
 from common.service import Service
 
 from common.signal import Signal
+from common.latency import LatencyTracer
 from config.utils import merge_parameters
 
 from watcher.watcher import Watcher
@@ -143,16 +144,16 @@ class WatcherService(Service):
                 continue
 
             if watcher.get("status") is not None and watcher.get("status") == "load":
-                # retrieve the class-name and instantiate it
-                parts = watcher.get('classpath').split('.')
-
-                module = import_module('.'.join(parts[:-1]))
-                Clazz = getattr(module, parts[-1])
-
-                # dummy watcher in backtesting
+                # dummy watcher in backtesting, else the connector is only imported when used
                 if self.backtesting:
                     inst_watcher = DummyWatcher(self, k)
                 else:
+                    # retrieve the class-name and instantiate it
+                    parts = watcher.get('classpath').split('.')
+
+                    module = import_module('.'.join(parts[:-1]))
+                    Clazz = getattr(module, parts[-1])
+
                     inst_watcher = Clazz(self)
 
                 if inst_watcher.start(options):
@@ -171,12 +172,21 @@ class WatcherService(Service):
 
         self._watchers = {}
 
-    def notify(self, signal_type: int, source_name: str, signal_data):
+    def notify(self, signal_type: int, source_name: str, signal_data, received: float = 0.0):
+        """
+        @param signal_type:
+        @param source_name:
+        @param signal_data:
+        @param received: Optional perf-counter at the reception of the message, for latency tracing.
+        """
         if signal_data is None:
             return
 
         signal = Signal(Signal.SOURCE_WATCHER, source_name, signal_type, signal_data)
 
+        if received:
+            signal.trace = LatencyTracer.inst().notified(signal_data[0], received)
+
         with self._mutex:
             self._signals_handler.notify(signal)
 
@@ -14,7 +14,9 @@ if TYPE_CHECKING:
     from trader.market import Market
     from instrument.instrument import TickType, OHLCType
 
+import math
 import time
+import threading
 import collections
 
 from datetime import datetime, timedelta
@@ -140,6 +142,8 @@ class Watcher(Runnable):
 
         self._last_market_update = time.time()
 
+        self._wakeup = threading.Event()
+
         # listen to its service
         self.service.add_listener(self)
 
@@ -341,12 +345,31 @@ q
         self.disconnect()
         Terminal.inst().message("Watcher %s stopped." % self._name)
 
+    def stop(self):
+        super().stop()
+        self.wakeup()
+
     def update(self):
         """
         Nothing by default but must return True.
         """
         return True
 
+    def wakeup(self):
+        """
+        Wake up the watcher thread waiting into idle.
+        """
+        self._wakeup.set()
+
+    def idle(self):
+        """
+        In place of polling, when the network I/O are processed by the network core loop, the watcher thread only
+        needs to process its periodic tasks (closing of the OHLCs, reconnections, balances...) at each second.
+        Then it waits until the next second, or a wake-up.
+        """
+        if self._wakeup.wait(1.0 - math.fmod(time.time(), 1.0)):
+            self._wakeup.clear()
+
     def post_update(self):
         # streaming
         try: